@@ -3,6 +3,9 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable
 
 # Common street suffix abbreviations (USPS Publication 28)
 SUFFIX_MAP = {
@@ -54,35 +57,172 @@ UNIT_MAP = {
 }
 
 
+# Punctuation stripped before tokenizing (everything but # for unit numbers)
+_STRIP_PUNCT = str.maketrans("", "", ".,;:!?'\"()[]")
+
+# One lookup per token. Precedence matches the original if/elif chain:
+# directionals, then suffixes, then unit designators.
+_TOKEN_MAP = {**UNIT_MAP, **SUFFIX_MAP, **DIRECTIONAL_MAP}
+
+NORMALIZE_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize(address: str) -> str:
+    tokens = address.upper().translate(_STRIP_PUNCT).split()
+    get = _TOKEN_MAP.get
+    return " ".join([get(t, t) for t in tokens])
+
+
 def normalize_address(address: str | None) -> str:
     """Normalize an address string for matching.
 
     v1 approach: uppercase, strip punctuation, expand/abbreviate suffixes,
     collapse whitespace. Future: USPS CASS or geocoding API.
+
+    Results are memoized in a bounded LRU cache; permit feeds repeat the
+    same addresses many times.
     """
     if not address:
         return ""
+    return _normalize(address)
+
+
+def normalize_addresses(addresses: Iterable[str | None]) -> list[str]:
+    """Normalize many addresses at once, returning results in input order."""
+    seen: dict[str, str] = {}
+    out = []
+    for address in addresses:
+        if not address:
+            out.append("")
+            continue
+        norm = seen.get(address)
+        if norm is None:
+            norm = seen[address] = _normalize(address)
+        out.append(norm)
+    return out
+
+
+# --- Structured parsing ------------------------------------------------------
+
+# Columns written alongside address_norm on every table that has one
+ADDRESS_COLUMNS = [
+    "house_number", "predir", "street_name", "street_suffix", "unit", "address_key",
+]
+
+_DIRECTIONS = set(DIRECTIONAL_MAP.values())
+_SUFFIXES = set(SUFFIX_MAP.values())
+_UNIT_DESIGNATORS = set(UNIT_MAP.values())
+_HOUSE_NUMBER = re.compile(r"^\d+[A-Z]?(-\d+[A-Z]?)?$")
+_ZIP = re.compile(r"^\d{5}(-\d{4})?$")
+_STATES = {"TX", "TEXAS"}
+# Single-word Travis County localities dropped from comma-less addresses
+_LOCALITIES = {"AUSTIN", "PFLUGERVILLE", "MANOR", "LAKEWAY", "JONESTOWN", "ROLLINGWOOD"}
+
+
+@dataclass(frozen=True)
+class AddressParts:
+    house_number: str | None = None
+    predir: str | None = None
+    street_name: str | None = None
+    street_suffix: str | None = None
+    postdir: str | None = None
+    unit: str | None = None
+
+    @property
+    def key(self) -> str | None:
+        """Canonical parcel-level match key (unit excluded).
+
+        Only defined when both a house number and a street name were found,
+        so "100 MAIN ST" and "1100 MAIN ST" can never share a key.
+        """
+        if not self.house_number or not self.street_name:
+            return None
+        return " ".join(
+            p for p in (self.house_number, self.predir, self.street_name,
+                        self.street_suffix, self.postdir) if p
+        )
+
+    def as_columns(self) -> dict[str, str | None]:
+        return {
+            "house_number": self.house_number,
+            "predir": self.predir,
+            "street_name": self.street_name,
+            "street_suffix": self.street_suffix,
+            "unit": self.unit,
+            "address_key": self.key,
+        }
+
+
+def _is_unit_token(token: str) -> bool:
+    return token in _UNIT_DESIGNATORS or token.startswith("#")
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _parse(address: str) -> AddressParts:
+    # Comma-separated tails are locality ("Austin TX 78701") unless they
+    # carry a unit ("..., Unit 12").
+    segments = address.split(",")
+    tokens = _normalize(segments[0]).split()
+    for seg in segments[1:]:
+        tail = _normalize(seg).split()
+        if tail and _is_unit_token(tail[0]):
+            tokens.extend(tail)
+
+    house_number = None
+    if tokens and _HOUSE_NUMBER.match(tokens[0]):
+        house_number = tokens.pop(0)
+
+    unit = None
+    for i, tok in enumerate(tokens):
+        if _is_unit_token(tok):
+            unit = " ".join(tokens[i:])
+            tokens = tokens[:i]
+            break
+
+    predir = None
+    if len(tokens) > 1 and tokens[0] in _DIRECTIONS:
+        predir = tokens.pop(0)
+
+    # Suffix is the last suffix word that leaves a non-empty street name;
+    # anything after it is a post-directional or trailing locality.
+    street_suffix = postdir = None
+    for i in range(len(tokens) - 1, 0, -1):
+        if tokens[i] in _SUFFIXES:
+            street_suffix = tokens[i]
+            trailing = tokens[i + 1:]
+            if trailing and trailing[0] in _DIRECTIONS:
+                postdir = trailing[0]
+            tokens = tokens[:i]
+            break
+    else:
+        stripped = False
+        while len(tokens) > 1 and (_ZIP.match(tokens[-1]) or tokens[-1] in _STATES):
+            tokens.pop()
+            stripped = True
+        if stripped and len(tokens) > 1 and tokens[-1] in _LOCALITIES:
+            tokens.pop()
+
+    return AddressParts(
+        house_number=house_number,
+        predir=predir,
+        street_name=" ".join(tokens) or None,
+        street_suffix=street_suffix,
+        postdir=postdir,
+        unit=unit,
+    )
+
+
+def parse_address(address: str | None) -> AddressParts:
+    """Split an address into house number, directionals, street, suffix and unit.
+
+    Components are normalized with the same rules as :func:`normalize_address`.
+    """
+    if not address:
+        return AddressParts()
+    return _parse(address)
+
 
-    addr = address.upper().strip()
-
-    # Remove punctuation except # (unit numbers)
-    addr = re.sub(r"[.,;:!?'\"\(\)\[\]]", "", addr)
-
-    # Replace directionals
-    words = addr.split()
-    normalized = []
-    for word in words:
-        if word in DIRECTIONAL_MAP:
-            normalized.append(DIRECTIONAL_MAP[word])
-        elif word in SUFFIX_MAP:
-            normalized.append(SUFFIX_MAP[word])
-        elif word in UNIT_MAP:
-            normalized.append(UNIT_MAP[word])
-        else:
-            normalized.append(word)
-
-    # Collapse whitespace
-    result = " ".join(normalized)
-    # Remove duplicate spaces
-    result = re.sub(r"\s+", " ", result).strip()
-    return result
+def address_key(address: str | None) -> str | None:
+    """Shortcut for ``parse_address(address).key``."""
+    return parse_address(address).key
@@ -0,0 +1,417 @@
+"""Trigram index over parcel and valuation addresses for fuzzy lookup.
+
+Every ``address_norm`` of the tables in :data:`INDEXED_TABLES` is padded
+(``"  600 CONGRESS AVE "``) and split into its distinct 3-character grams.
+Each gram is packed into one int64 (21 bits per code point). Postings are
+kept in segments: the sorted distinct grams, and for each the sorted
+documents holding it. Loads add a segment for the new or changed rows and
+mark the rows they replace dead. Segments are merged once there are too
+many or too many dead documents.
+
+Two lookups serve :func:`parcl.profile._find_parcel`:
+
+* :meth:`AddressIndex.prefix` is the anchored prefix match
+  (``address_norm LIKE 'q%' ORDER BY address_norm, id``): the documents with
+  every gram of ``"  q"``, confirmed by ``startswith``.
+* :meth:`AddressIndex.search` ranks documents by trigram similarity
+  (shared / union of gram sets, as pg_trgm), counting the grams each
+  document shares with the query in one pass over the query's postings.
+
+The index is saved under the cache directory. It is reused while the
+tables' stamp (row count and latest ``fetched_at``) is unchanged, and
+brought up to date by diffing the indexed rows otherwise. The pipeline
+updates it with the rows each load touched (:func:`update_address_index`).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from parcl.db import Database
+from parcl.index_cache import IndexCache
+from parcl.logger import get_logger
+
+log = get_logger("address_index")
+
+INDEXED_TABLES = ("parcels", "property_valuations")
+
+CACHE_FILE = "addresses.npz"
+
+# Lowest similarity search() returns by default
+MIN_SIMILARITY = 0.5
+
+# Segments (or a dead share) beyond which update() merges them
+MAX_SEGMENTS = 8
+MAX_DEAD_SHARE = 0.25
+
+# A segment's distinct grams (sorted), where each gram's docs start in its
+# doc array (one more entry than grams), and the docs, sorted within a gram
+Segment = tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+@dataclass(frozen=True)
+class AddressCandidate:
+    table: str
+    id: str
+    address_norm: str
+    score: float
+
+
+def _pack(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """UTF-8 blob and offsets of ``strings``."""
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8).copy(), offsets
+
+
+def _gram_pairs(texts: list[str], first_doc: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct (gram, doc) pairs of ``texts``, sorted by gram then doc."""
+    lengths = np.array([len(t) for t in texts], dtype=np.int64)
+    counts = np.maximum(lengths - 2, 0)
+    total = int(counts.sum())
+    if not total:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    starts = np.repeat(np.cumsum(lengths) - lengths, counts)
+    pos = starts + np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    grams = (codes[pos] << 42) | (codes[pos + 1] << 21) | codes[pos + 2]
+    docs = np.repeat(np.arange(first_doc, first_doc + len(texts), dtype=np.int32), counts)
+    order = np.lexsort((docs, grams))
+    grams, docs = grams[order], docs[order]
+    keep = np.ones(total, dtype=bool)
+    keep[1:] = (grams[1:] != grams[:-1]) | (docs[1:] != docs[:-1])
+    return grams[keep], docs[keep]
+
+
+def _segment(grams: np.ndarray, docs: np.ndarray) -> Segment:
+    """Postings of sorted (gram, doc) pairs: each distinct gram and where
+    its docs start."""
+    keys, first = np.unique(grams, return_index=True)
+    return keys, np.append(first, len(grams)).astype(np.int64), docs
+
+
+def _query_grams(text: str) -> np.ndarray:
+    return np.unique(_gram_pairs([text])[0])
+
+
+def _contains(sorted_docs: np.ndarray, docs: np.ndarray) -> np.ndarray:
+    if not len(sorted_docs):
+        return np.zeros(len(docs), dtype=bool)
+    idx = np.searchsorted(sorted_docs, docs)
+    return (idx < len(sorted_docs)) & (sorted_docs[np.minimum(idx, len(sorted_docs) - 1)] == docs)
+
+
+def _take(field: tuple[np.ndarray, np.ndarray], keep: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """The strings at the ``keep`` positions of a packed field."""
+    blob, offsets = field
+    lengths = np.diff(offsets)
+    mask = np.zeros(len(lengths), dtype=bool)
+    mask[keep] = True
+    new_offsets = np.zeros(len(keep) + 1, dtype=np.int64)
+    np.cumsum(lengths[keep], out=new_offsets[1:])
+    return blob[np.repeat(mask, lengths)], new_offsets
+
+
+class AddressIndex:
+    """Trigram postings over (table, id, address_norm) documents."""
+
+    def __init__(
+        self,
+        tables: np.ndarray,
+        ids: tuple[np.ndarray, np.ndarray],
+        norms: tuple[np.ndarray, np.ndarray],
+        gram_counts: np.ndarray,
+        alive: np.ndarray,
+        segments: list[Segment],
+        stamp: str = "",
+    ) -> None:
+        self.tables = tables
+        self.ids = ids
+        self.norms = norms
+        self.gram_counts = gram_counts
+        self.alive = alive
+        self.segments = segments
+        self.stamp = stamp
+        self._docs: dict[tuple[int, str], int] | None = None
+
+    @classmethod
+    def build(cls, rows: Iterable[tuple[str, str, str]], stamp: str = "") -> AddressIndex:
+        index = cls(
+            np.empty(0, dtype=np.uint8), _pack([]), _pack([]), np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=bool), [], stamp,
+        )
+        index.update(list(rows))
+        return index
+
+    def copy(self) -> AddressIndex:
+        """An index to update while this one is still being searched."""
+        return AddressIndex(
+            self.tables, self.ids, self.norms, self.gram_counts, self.alive.copy(), list(self.segments), self.stamp
+        )
+
+    def __len__(self) -> int:
+        return int(self.alive.sum())
+
+    def _text(self, field: tuple[np.ndarray, np.ndarray], doc: int) -> str:
+        blob, offsets = field
+        return blob[offsets[doc]:offsets[doc + 1]].tobytes().decode()
+
+    def _doc_map(self) -> dict[tuple[int, str], int]:
+        if self._docs is None:
+            self._docs = {
+                (int(self.tables[d]), self._text(self.ids, d)): d for d in np.flatnonzero(self.alive).tolist()
+            }
+        return self._docs
+
+    def update(self, rows: list[tuple[str, str, str | None]], removed: Iterable[tuple[str, str]] = ()) -> None:
+        """Index ``rows`` of (table, id, address_norm), replacing those
+        documents, and drop the ``removed`` (table, id) documents. Rows
+        without an address are only dropped."""
+        docs = self._doc_map()
+        codes = {t: i for i, t in enumerate(INDEXED_TABLES)}
+        for table, row_id in [*((r[0], r[1]) for r in rows), *removed]:
+            doc = docs.pop((codes[table], row_id), None)
+            if doc is not None:
+                self.alive[doc] = False
+        rows = [r for r in rows if r[2]]
+        if rows:
+            first = len(self.tables)
+            self.tables = np.concatenate([self.tables, np.array([codes[r[0]] for r in rows], dtype=np.uint8)])
+            self.ids = self._append(self.ids, [r[1] for r in rows])
+            self.norms = self._append(self.norms, [r[2] for r in rows])
+            grams, gram_docs = _gram_pairs([f"  {r[2]} " for r in rows], first)
+            self.gram_counts = np.concatenate(
+                [self.gram_counts, np.bincount(gram_docs - first, minlength=len(rows)).astype(np.int32)]
+            )
+            self.alive = np.concatenate([self.alive, np.ones(len(rows), dtype=bool)])
+            self.segments.append(_segment(grams, gram_docs))
+            docs.update(((codes[r[0]], r[1]), first + i) for i, r in enumerate(rows))
+        dead = len(self.alive) - len(docs)
+        if len(self.segments) > MAX_SEGMENTS or dead > MAX_DEAD_SHARE * max(len(self.alive), 1):
+            self._compact()
+
+    @staticmethod
+    def _append(field: tuple[np.ndarray, np.ndarray], strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        blob, offsets = field
+        new_blob, new_offsets = _pack(strings)
+        return np.concatenate([blob, new_blob]), np.concatenate([offsets, offsets[-1] + new_offsets[1:]])
+
+    def _compact(self) -> None:
+        """Drop dead documents and merge the segments into one."""
+        keep = np.flatnonzero(self.alive)
+        renumber = np.full(len(self.alive), -1, dtype=np.int32)
+        renumber[keep] = np.arange(len(keep), dtype=np.int32)
+        grams = np.concatenate([np.repeat(k, np.diff(o)) for k, o, _ in self.segments] or [np.empty(0, np.int64)])
+        docs = np.concatenate([d for _, _, d in self.segments] or [np.empty(0, np.int32)])
+        live = self.alive[docs]
+        grams, docs = grams[live], renumber[docs[live]]
+        order = np.lexsort((docs, grams))
+        self.segments = [_segment(grams[order], docs[order])]
+        self.tables = self.tables[keep]
+        self.ids, self.norms = _take(self.ids, keep), _take(self.norms, keep)
+        self.gram_counts = self.gram_counts[keep]
+        self.alive = np.ones(len(keep), dtype=bool)
+        self._docs = None
+
+    def _postings(self, gram: int) -> np.ndarray:
+        """Sorted docs holding ``gram`` (later segments hold later docs)."""
+        parts = []
+        for keys, offsets, docs in self.segments:
+            i = np.searchsorted(keys, gram)
+            if i < len(keys) and keys[i] == gram:
+                parts.append(docs[offsets[i]:offsets[i + 1]])
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+
+    def _candidate(self, doc: int, score: float) -> AddressCandidate:
+        return AddressCandidate(
+            INDEXED_TABLES[self.tables[doc]], self._text(self.ids, doc), self._text(self.norms, doc), score
+        )
+
+    def prefix(self, norm: str, table: str = "parcels") -> AddressCandidate | None:
+        """First ``table`` document by (address_norm, id) starting with ``norm``."""
+        grams = _query_grams(f"  {norm}")
+        if not len(grams):
+            return None
+        postings = sorted((self._postings(int(g)) for g in grams), key=len)
+        docs = postings[0]
+        for other in postings[1:]:
+            if not len(docs):
+                return None
+            docs = docs[_contains(other, docs)]
+        code = INDEXED_TABLES.index(table)
+        docs = docs[self.alive[docs] & (self.tables[docs] == code)]
+        matches = [(self._text(self.norms, d), self._text(self.ids, d), d) for d in docs.tolist()]
+        matches = [m for m in matches if m[0].startswith(norm)]
+        if not matches:
+            return None
+        return self._candidate(min(matches)[2], 1.0)
+
+    def search(self, norm: str, limit: int = 10, min_score: float = MIN_SIMILARITY) -> list[AddressCandidate]:
+        """Documents by trigram similarity to ``norm``, best first (ties by
+        address, table and id)."""
+        grams = _query_grams(f"  {norm} ")
+        if not len(grams):
+            return []
+        shared = np.bincount(
+            np.concatenate([self._postings(int(g)) for g in grams]), minlength=len(self.alive)
+        )
+        # shared >= min_score * len(grams) holds for every document that can reach min_score
+        candidates = np.flatnonzero((shared >= math.ceil(min_score * len(grams))) & self.alive)
+        shared = shared[candidates]
+        scores = shared / (len(grams) + self.gram_counts[candidates] - shared)
+        keep = scores >= min_score
+        scores, candidates = scores[keep], candidates[keep]
+        if len(scores) > limit:
+            # Only documents scoring at least the limit-th best can be returned
+            keep = scores >= np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            scores, candidates = scores[keep], candidates[keep]
+        ranked = sorted(
+            (-float(s), self._text(self.norms, d), int(self.tables[d]), self._text(self.ids, d), d)
+            for s, d in zip(scores.tolist(), candidates.tolist())
+        )
+        return [self._candidate(r[4], round(-r[0], 4)) for r in ranked[:limit]]
+
+    def save(self, path: Path) -> None:
+        """Write the index, segments and dead documents as they are."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        segments = {}
+        for i, (keys, offsets, docs) in enumerate(self.segments):
+            segments.update({f"keys{i}": keys, f"offsets{i}": offsets, f"docs{i}": docs})
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            header=np.array(json.dumps({"stamp": self.stamp, "segments": len(self.segments)})),
+            tables=self.tables, ids=self.ids[0], id_offsets=self.ids[1],
+            norms=self.norms[0], norm_offsets=self.norms[1], gram_counts=self.gram_counts,
+            alive=self.alive, **segments,
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> AddressIndex:
+        with np.load(path) as data:
+            header = json.loads(str(data["header"]))
+            return cls(
+                data["tables"], (data["ids"], data["id_offsets"]), (data["norms"], data["norm_offsets"]),
+                data["gram_counts"], data["alive"],
+                [(data[f"keys{i}"], data[f"offsets{i}"], data[f"docs{i}"]) for i in range(header["segments"])],
+                header["stamp"],
+            )
+
+
+def _present_tables(db: Database) -> list[str]:
+    return [t for t in INDEXED_TABLES if "address_norm" in db.column_info(t)]
+
+
+def address_stamp(db: Database) -> str:
+    """Row count and latest fetched_at of every indexed table: cheap, and
+    changed by every insert. Rows rewritten in place by a load are applied
+    through :func:`update_address_index`."""
+    parts = []
+    for table in _present_tables(db):
+        row = db.fetchone(f"SELECT COUNT(*), MAX(fetched_at) FROM {table}")
+        parts.append(f"{table}:{row[0]}:{row[1]}")
+    return ";".join(parts)
+
+
+def _rows(db: Database, table: str, ids: list[str] | None = None) -> list[tuple[str, str, str | None]]:
+    """(table, id, address_norm) of every addressed row, or of ``ids``
+    (None for the ids without a row)."""
+    if ids is None:
+        rows = db.fetchall(f"SELECT id, address_norm FROM {table} WHERE address_norm <> '' ORDER BY id")
+        return [(table, r[0], r[1]) for r in rows]
+    out = []
+    for start in range(0, len(ids), 1000):
+        chunk = ids[start:start + 1000]
+        found = dict(db.fetchall(
+            f"SELECT id, address_norm FROM {table} WHERE id IN ({', '.join('?' for _ in chunk)})", tuple(chunk)
+        ))
+        out.extend((table, i, found.get(i)) for i in chunk)
+    return out
+
+
+def _sync(index: AddressIndex, db: Database) -> int:
+    """Bring ``index`` in line with the tables by diffing every indexed row;
+    returns the documents added, changed or removed."""
+    codes = {t: i for i, t in enumerate(INDEXED_TABLES)}
+    current = {
+        (codes[table], row_id): norm
+        for table in _present_tables(db) for _, row_id, norm in _rows(db, table)
+    }
+    docs = index._doc_map()
+    changed = [
+        (INDEXED_TABLES[code], row_id, norm) for (code, row_id), norm in current.items()
+        if (code, row_id) not in docs or index._text(index.norms, docs[(code, row_id)]) != norm
+    ]
+    removed = [(INDEXED_TABLES[code], row_id) for code, row_id in docs if (code, row_id) not in current]
+    index.update(changed, removed)
+    return len(changed) + len(removed)
+
+
+def _build(db: Database, stamp: str) -> AddressIndex:
+    index = AddressIndex.build(row for table in _present_tables(db) for row in _rows(db, table))
+    index.stamp = stamp
+    log.info(f"Built address index: {len(index)} addresses")
+    return index
+
+
+def _update(index: AddressIndex, db: Database, stamp: str) -> AddressIndex:
+    index = index.copy()
+    log.info(f"Updated address index: {_sync(index, db)} addresses changed")
+    index.stamp = stamp
+    return index
+
+
+_cache: IndexCache[AddressIndex] = IndexCache(
+    "address index", CACHE_FILE, AddressIndex.load, address_stamp, _build, _update
+)
+
+
+def load_address_index(db: Database, cache_dir: Path | None = None) -> AddressIndex:
+    """The address index for the current table contents.
+
+    Reuses the index already loaded in this process, then the one saved in
+    ``cache_dir``, while their stamp matches; otherwise brings it up to date
+    from the tables and saves it (see :class:`~parcl.index_cache.IndexCache`).
+    """
+    return _cache.get(db, cache_dir)
+
+
+def rebuild_address_index(db: Database, cache_dir: Path | None = None) -> AddressIndex:
+    """Index every address afresh and save it."""
+    path = _cache.path(cache_dir)
+    with _cache.lock:
+        return _cache.store(path, _build(db, address_stamp(db)))
+
+
+def update_address_index(
+    db: Database, table: str, ids: set[str] | None = None, cache_dir: Path | None = None
+) -> int:
+    """Apply a load of ``table`` to the saved index: re-index the rows with
+    ``ids``, or, with None, every row that differs. Returns the addresses
+    updated."""
+    path = _cache.path(cache_dir)
+    with _cache.lock:
+        loaded = _cache.loaded.get(str(path))
+        index = loaded.copy() if loaded is not None else _cache.saved(path)
+        if index is None:
+            index = _build(db, "")
+            updated = len(index)
+        elif ids is None:
+            updated = _sync(index, db)
+        else:
+            rows = _rows(db, table, sorted(ids))
+            index.update(rows)
+            updated = len(rows)
+        index.stamp = address_stamp(db)
+        _cache.store(path, index)
+    return updated
@@ -0,0 +1,187 @@
+"""Nearest transit stops and parks, answered in process.
+
+:class:`AmenityIndex` holds one :class:`~parcl.kdtree.KDTree` per kind in
+:data:`AMENITY_KINDS`, over the ``transit_amenities`` rows of those types.
+A row is placed at its latitude/longitude, or else at the centroid of its
+geometry, so polygon parks are found by their centre.
+
+The index is saved under the cache directory and reused while the stamp of
+the indexed rows (see :func:`amenity_stamp`) is unchanged; any change
+rebuilds it, which takes well under a second for the few thousand stops
+and parks of a county.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+from parcl.db import Database
+from parcl.index_cache import IndexCache
+from parcl.kdtree import KDTree
+from parcl.logger import get_logger
+
+log = get_logger("amenities")
+
+# Kinds of amenity indexed, by the amenity_type values they cover
+AMENITY_KINDS = {
+    "stop": ("bus_stop",),
+    "park": ("park",),
+}
+
+CACHE_FILE = "amenities.npz"
+
+_LAT = "COALESCE(latitude, centroid_y)"
+_LON = "COALESCE(longitude, centroid_x)"
+
+
+class AmenityIndex:
+    """Amenities of each kind, queryable by nearest and by radius."""
+
+    def __init__(self, trees: dict[str, KDTree], rows: dict[str, dict[str, np.ndarray]], stamp: str = ""):
+        self.trees = trees
+        # Per kind: "ids", "names" and "categories", in the order the tree was built
+        self.rows = rows
+        self.stamp = stamp
+
+    def __len__(self) -> int:
+        return sum(len(tree) for tree in self.trees.values())
+
+    @classmethod
+    def build(
+        cls, rows: Iterable[tuple[str, str, str | None, str | None, float, float]], stamp: str = ""
+    ) -> AmenityIndex:
+        """Build from ``(kind, id, name, category, latitude, longitude)`` rows."""
+        by_kind: dict[str, list[tuple]] = {kind: [] for kind in AMENITY_KINDS}
+        for kind, *row in rows:
+            by_kind[kind].append(row)
+        trees, columns = {}, {}
+        for kind, kind_rows in by_kind.items():
+            ids, names, categories, lats, lons = (list(c) for c in zip(*kind_rows)) if kind_rows else ([],) * 5
+            trees[kind] = KDTree.build(lats, lons)
+            columns[kind] = {
+                "ids": np.array([str(i) for i in ids], dtype=str),
+                "names": np.array([n or "" for n in names], dtype=str),
+                "categories": np.array([c or "" for c in categories], dtype=str),
+            }
+        return cls(trees, columns, stamp)
+
+    def nearest(
+        self, kind: str, lats: Iterable[float], lons: Iterable[float], k: int = 1, radius: float = math.inf
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(point, row, metres) for the ``k`` nearest amenities of ``kind`` to
+        each point; rows index :attr:`rows` of that kind."""
+        return self.trees[kind].nearest(lats, lons, k, radius)
+
+    def within(
+        self, kind: str, lats: Iterable[float], lons: Iterable[float], radius: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(point, row, metres) for every amenity of ``kind`` within ``radius`` metres."""
+        return self.trees[kind].within(lats, lons, radius)
+
+    def count_within(self, kind: str, lats: Iterable[float], lons: Iterable[float], radius: float) -> np.ndarray:
+        return self.trees[kind].count_within(lats, lons, radius)
+
+    def describe(self, kind: str, row: int, distance_m: float) -> dict[str, Any]:
+        """One result as ``{"id", "name", "category", "distance_m"}``."""
+        columns = self.rows[kind]
+        return {
+            "id": str(columns["ids"][row]),
+            "name": str(columns["names"][row]),
+            "category": str(columns["categories"][row]),
+            "distance_m": float(distance_m),
+        }
+
+    def nearest_to(
+        self, lat: float, lon: float, kind: str, k: int = 1, radius: float = math.inf
+    ) -> list[dict[str, Any]]:
+        """The ``k`` nearest amenities of ``kind`` to one point, nearest first."""
+        _, rows, distances = self.nearest(kind, [lat], [lon], k, radius)
+        return [self.describe(kind, row, d) for row, d in zip(rows, distances)]
+
+    def save(self, path: Path) -> None:
+        arrays: dict[str, np.ndarray] = {}
+        for kind, tree in self.trees.items():
+            for name, values in {**tree.arrays(), **self.rows[kind]}.items():
+                arrays[f"{kind}_{name}"] = values
+        arrays["header"] = np.array(json.dumps({"stamp": self.stamp, "kinds": list(self.trees)}))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> AmenityIndex:
+        with np.load(path) as data:
+            header = json.loads(str(data["header"]))
+            trees, rows = {}, {}
+            for kind in header["kinds"]:
+                prefix = f"{kind}_"
+                arrays = {k[len(prefix):]: data[k] for k in data.files if k.startswith(prefix)}
+                trees[kind] = KDTree.from_arrays(arrays)
+                rows[kind] = {name: arrays[name] for name in ("ids", "names", "categories")}
+            return cls(trees, rows, header["stamp"])
+
+
+def _kind_sql() -> str:
+    cases = " ".join(
+        f"WHEN amenity_type IN ({', '.join(repr(t) for t in types)}) THEN '{kind}'"
+        for kind, types in AMENITY_KINDS.items()
+    )
+    return f"CASE {cases} END"
+
+
+def _indexed_where() -> str:
+    types = [t for kind_types in AMENITY_KINDS.values() for t in kind_types]
+    return f"amenity_type IN ({', '.join(repr(t) for t in types)}) AND {_LAT} IS NOT NULL AND {_LON} IS NOT NULL"
+
+
+def _present(db: Database) -> bool:
+    return "centroid_x" in db.column_info("transit_amenities")
+
+
+def amenity_stamp(db: Database) -> str:
+    """Content stamp of the indexed rows: changes when any is added,
+    removed, renamed or moved."""
+    if not _present(db):
+        return ""
+    row = db.fetchone(
+        "SELECT COUNT(*), md5(COALESCE(string_agg("
+        "id || '|' || amenity_type || '|' || COALESCE(name, '') || '|' || "
+        f"CAST({_LAT} AS VARCHAR) || '|' || CAST({_LON} AS VARCHAR), ',' ORDER BY id), '')) "
+        f"FROM transit_amenities WHERE {_indexed_where()}"
+    )
+    return f"{row[0]}:{row[1]}"
+
+
+def _amenity_rows(db: Database) -> list[tuple]:
+    if not _present(db):
+        return []
+    return db.fetchall(
+        f"SELECT {_kind_sql()}, id, name, amenity_type, {_LAT}, {_LON} "
+        f"FROM transit_amenities WHERE {_indexed_where()} ORDER BY id"
+    )
+
+
+def _build(db: Database, stamp: str) -> AmenityIndex:
+    index = AmenityIndex.build(_amenity_rows(db), stamp)
+    log.info(f"Built amenity index: {len(index)} amenities")
+    return index
+
+
+_cache: IndexCache[AmenityIndex] = IndexCache("amenity", CACHE_FILE, AmenityIndex.load, amenity_stamp, _build)
+
+
+def load_amenity_index(db: Database, cache_dir: Path | None = None) -> AmenityIndex:
+    """The amenity index for the current table contents.
+
+    Reuses the index already loaded in this process, then the one saved in
+    ``cache_dir``, while their stamp matches; otherwise rebuilds and saves
+    it (see :class:`~parcl.index_cache.IndexCache`).
+    """
+    return _cache.get(db, cache_dir)
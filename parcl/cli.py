@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import csv
 import json
 import sys
+import time
 from datetime import datetime, timezone, timedelta
+from typing import Iterator
 
 import click
 
@@ -52,10 +55,12 @@ def main(verbose: bool) -> None:
 
 @main.command()
 def init() -> None:
-    """Initialize the database schema (create all tables and views)."""
+    """Initialize the database schema (create all tables and indexes)."""
     settings = load_settings()
     db = create_database(settings.database)
     init_schema(db)
+    # init_schema backfills derived columns and resolves rows to parcels
+    _clear_profile_cache(settings)
     click.echo("Database initialized successfully.")
     counts = db.table_row_counts()
     for table, count in counts.items():
@@ -115,6 +120,32 @@ def run(source_id: str | None, run_all: bool, skip_fresh: bool) -> None:
     db.close()
 
 
+@main.command()
+@click.argument("source_id")
+@click.option("--run", "run_id", default=None, help="Landed run id (default: latest)")
+@click.option("--workers", type=int, default=None, help="Transform processes (default: CPU count)")
+def retransform(source_id: str, run_id: str | None, workers: int | None) -> None:
+    """Rebuild a source's table from its landed raw pages, without fetching."""
+    from parcl.etl.pipeline import retransform_source
+
+    settings = load_settings()
+    config_path = PROJECT_ROOT / settings.sources_dir / f"{source_id}.yaml"
+    if not config_path.exists():
+        click.echo(f"Source config not found: {config_path}", err=True)
+        sys.exit(1)
+    src = load_source_config(config_path)
+
+    db = create_database(settings.database)
+    try:
+        summary = retransform_source(src, db, run_id=run_id, workers=workers)
+    except ValueError as e:
+        click.echo(str(e), err=True)
+        db.close()
+        sys.exit(1)
+    click.echo(json.dumps(summary, indent=2))
+    db.close()
+
+
 @main.command("list-sources")
 def list_sources() -> None:
     """List all configured data sources and their last run status."""
@@ -139,16 +170,133 @@ def list_sources() -> None:
     db.close()
 
 
+def _profile_cache(settings):
+    """The profile cache under the cache directory, or None when disabled."""
+    from parcl.profile_cache import ProfileCache
+
+    if settings.profile_cache_entries <= 0:
+        return None
+    return ProfileCache.open(PROJECT_ROOT / settings.cache_dir, settings.profile_cache_entries)
+
+
+def _clear_profile_cache(settings) -> None:
+    cache = _profile_cache(settings)
+    if cache:
+        cache.clear()
+        cache.close()
+
+
+def _batch_queries(path: str) -> Iterator[str]:
+    """Queries from a CSV file: its ``address`` (or ``query``) column when the
+    header names one, else the first column of every row."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        names = [h.strip().lower() for h in header]
+        column = next((names.index(n) for n in ("address", "query") if n in names), None)
+        if column is None:
+            column = 0
+            yield header[0]
+        for row in reader:
+            if len(row) > column and row[column].strip():
+                yield row[column]
+
+
+def _batch_points(path: str) -> Iterator[tuple[float, float]] | None:
+    """``(lat, lon)`` points from a CSV file whose header names latitude and
+    longitude columns (``latitude``/``lat``, ``longitude``/``lon``/``lng``),
+    else None. Rows whose point is malformed or out of range are reported
+    and skipped."""
+    from parcl.locator import parse_point
+
+    with open(path, newline="", encoding="utf-8") as f:
+        names = [h.strip().lower() for h in next(csv.reader(f), [])]
+    lat = next((names.index(n) for n in ("latitude", "lat") if n in names), None)
+    lon = next((names.index(n) for n in ("longitude", "lon", "lng") if n in names), None)
+    if lat is None or lon is None:
+        return None
+
+    def points() -> Iterator[tuple[float, float]]:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader)
+            for line, row in enumerate(reader, start=2):
+                if len(row) > max(lat, lon) and row[lat].strip() and row[lon].strip():
+                    try:
+                        yield parse_point(f"{row[lat]},{row[lon]}")
+                    except ValueError as e:
+                        click.echo(f"Skipping line {line}: {e}", err=True)
+
+    return points()
+
+
 @main.command()
-@click.argument("query")
+@click.argument("query", required=False)
+@click.option("--at", "at", default=None, metavar="LAT,LON", help="Profile the parcel at or nearest to a point")
 @click.option("--output", "-o", type=click.Choice(["pretty", "json"]), default="pretty")
-def profile(query: str, output: str) -> None:
-    """Get risk profile for a parcel by address."""
-    from parcl.profile import get_parcel_risk_profile
+@click.option(
+    "--batch", "batch_file", type=click.Path(exists=True, dir_okay=False), default=None,
+    help="CSV of addresses, parcel IDs or latitude/longitude columns; writes one JSON profile per line",
+)
+@click.option("--no-cache", is_flag=True, help="Build the profile without the profile cache")
+@click.option("--cache-stats", is_flag=True, help="Show profile cache size and hit rate")
+def profile(
+    query: str | None, at: str | None, output: str, batch_file: str | None, no_cache: bool, cache_stats: bool
+) -> None:
+    """Get risk profile for a parcel by address, parcel ID or point."""
+    from parcl.locator import parse_point
+    from parcl.profile import (
+        get_parcel_risk_profile,
+        get_parcel_risk_profile_at,
+        get_parcel_risk_profiles,
+        get_parcel_risk_profiles_at,
+    )
+    from parcl.profile_cache import cached_profile, cached_profile_at
 
     settings = load_settings()
+    if cache_stats:
+        cache = _profile_cache(settings)
+        stats = cache.stats() if cache else {"entries": 0, "max_entries": 0}
+        if cache:
+            cache.close()
+        click.echo(json.dumps(stats, indent=2))
+        return
+    if sum(bool(v) for v in (query, at, batch_file)) != 1:
+        click.echo("Give one of a QUERY, --at LAT,LON or --batch FILE", err=True)
+        sys.exit(1)
+    point = None
+    if at:
+        try:
+            point = parse_point(at)
+        except ValueError as e:
+            click.echo(str(e), err=True)
+            sys.exit(1)
+
     db = create_database(settings.database)
-    result = get_parcel_risk_profile(query, db)
+    if batch_file:
+        started = time.perf_counter()
+        count = 0
+        points = _batch_points(batch_file)
+        if points is not None:
+            results = get_parcel_risk_profiles_at(points, db)
+        else:
+            results = get_parcel_risk_profiles(_batch_queries(batch_file), db)
+        for result in results:
+            click.echo(json.dumps(result, default=str))
+            count += 1
+        db.close()
+        elapsed = time.perf_counter() - started
+        click.echo(f"Profiled {count} queries in {elapsed:.1f}s ({count / max(elapsed, 1e-9):,.0f}/s)", err=True)
+        return
+
+    cache = None if no_cache else _profile_cache(settings)
+    if cache:
+        result = cached_profile_at(*point, db, cache) if point else cached_profile(query, db, cache)
+        cache.close()
+    else:
+        result = get_parcel_risk_profile_at(*point, db) if point else get_parcel_risk_profile(query, db)
     db.close()
 
     if output == "json":
@@ -156,6 +304,9 @@ def profile(query: str, output: str) -> None:
     else:
         click.echo(f"\nParcel Risk Profile: {result.get('query', query)}")
         click.echo(f"Matched: {result.get('matched_address', 'N/A')}")
+        location = result.get("location")
+        if location and location["method"]:
+            click.echo(f"Located: {location['method']} ({location['distance_m']} m)")
         click.echo(f"Zoning: {json.dumps(result.get('zoning', {}), indent=2)}")
         click.echo(f"\nRisks ({len(result.get('risks', []))}):")
         for risk in result.get("risks", []):
@@ -173,28 +324,92 @@ def profile(query: str, output: str) -> None:
             click.echo(f"\nWarnings: {result['warnings']}")
 
 
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8750, show_default=True)
+@click.option("--connections", type=int, default=4, show_default=True, help="Database connections in the pool")
+def serve(host: str, port: int, connections: int) -> None:
+    """Serve profiles over HTTP/JSON from warm connections and caches."""
+    from parcl.db import create_reader_databases
+    from parcl.profile_cache import ProfileCache
+    from parcl.server import ProfileServer
+
+    settings = load_settings()
+    databases = create_reader_databases(settings.database, connections)
+    cache = _profile_cache(settings) or ProfileCache(None, max_entries=0)
+    server = ProfileServer((host, port), databases, cache)
+    server.warm()
+    click.echo(f"Serving profiles on http://{host}:{server.server_address[1]} ({connections} connections)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
 @main.command()
 @click.option("--format", "fmt", type=click.Choice(["csv", "parquet", "jsonl"]), default="csv")
 @click.option("--output-dir", "-o", default=None, help="Output directory")
-def export(fmt: str, output_dir: str | None) -> None:
-    """Export parcel_features view to CSV, Parquet, or JSONL."""
+@click.option(
+    "--compression", type=click.Choice(["snappy", "zstd", "gzip", "lz4", "brotli", "uncompressed"]), default=None,
+    help="Parquet codec (default: export.compression in settings.yaml)",
+)
+@click.option("--row-group-size", type=int, default=None, help="Rows per Parquet row group")
+@click.option("--threads", type=int, default=None, help="DuckDB threads writing the file (0: all)")
+def export(
+    fmt: str, output_dir: str | None, compression: str | None, row_group_size: int | None, threads: int | None
+) -> None:
+    """Export parcel_features to CSV, Parquet, or JSONL."""
     from parcl.exporter import export_data
 
     settings = load_settings()
     db = create_database(settings.database)
     out_dir = output_dir or settings.export_output_dir
-    path = export_data(db, fmt, out_dir)
+    path = export_data(
+        db,
+        fmt,
+        out_dir,
+        compression=compression or settings.export_compression,
+        row_group_size=row_group_size or settings.export_row_group_size,
+        threads=settings.export_threads if threads is None else threads,
+    )
     db.close()
     click.echo(f"Exported to: {path}")
 
 
 @main.command("db")
 @click.option("--info", is_flag=True, help="Show table row counts")
-def db_info(info: bool) -> None:
+@click.option("--indexes", is_flag=True, help="Show secondary indexes and their size")
+@click.option("--analyze", is_flag=True, help="Create missing indexes and refresh statistics")
+@click.option("--resolve-parcels", is_flag=True, help="Resolve every permit, case and constraint to a parcel again")
+@click.option("--refresh-links", is_flag=True, help="Rebuild parcel_spatial_links for all parcels")
+@click.option("--refresh-features", is_flag=True, help="Rebuild parcel_features for all parcels")
+@click.option("--refresh-address-index", is_flag=True, help="Rebuild the address search index")
+@click.option("--workers", type=int, default=None, help="Processes for --refresh-links (default: CPU count)")
+def db_info(
+    info: bool,
+    indexes: bool,
+    analyze: bool,
+    resolve_parcels: bool,
+    refresh_links: bool,
+    refresh_features: bool,
+    refresh_address_index: bool,
+    workers: int | None,
+) -> None:
     """Database utilities."""
+    if not (
+        info or indexes or analyze or resolve_parcels or refresh_links or refresh_features or refresh_address_index
+    ):
+        click.echo(
+            "Use --info, --indexes, --analyze, --resolve-parcels, --refresh-links, --refresh-features "
+            "or --refresh-address-index"
+        )
+        return
+
+    settings = load_settings()
+    db = create_database(settings.database)
     if info:
-        settings = load_settings()
-        db = create_database(settings.database)
         counts = db.table_row_counts()
         click.echo(f"{'Table':<30} {'Rows':<10}")
         click.echo("-" * 40)
@@ -205,9 +420,56 @@ def db_info(info: bool) -> None:
                 total += count
         click.echo("-" * 40)
         click.echo(f"{'Total':<30} {total:<10}")
-        db.close()
-    else:
-        click.echo("Use --info to show table row counts")
+    if analyze:
+        from parcl.db import ensure_indexes, refresh_statistics
+
+        created = ensure_indexes(db)
+        refresh_statistics(db)
+        click.echo(f"Created {len(created)} indexes, statistics refreshed")
+    if resolve_parcels:
+        from parcl.resolve import requeue_for_parcels
+        from parcl.resolve import resolve_parcels as resolve
+
+        requeue_for_parcels(db)
+        _clear_profile_cache(settings)
+        for table, methods in resolve(db)["rows"].items():
+            click.echo(f"{table:<30} " + ", ".join(f"{method}={n}" for method, n in sorted(methods.items())))
+    if refresh_links:
+        from parcl.links import refresh_links as rebuild_links
+
+        result = rebuild_links(db, workers=workers)
+        _clear_profile_cache(settings)
+        click.echo(f"Rebuilt parcel_spatial_links: {result['links']} links")
+    if refresh_features:
+        from parcl.features import refresh_features as rebuild_features
+
+        result = rebuild_features(db)
+        _clear_profile_cache(settings)
+        click.echo(f"Rebuilt parcel_features: {result['parcels']} parcels")
+    if refresh_address_index:
+        from parcl.address_index import rebuild_address_index
+
+        index = rebuild_address_index(db)
+        _clear_profile_cache(settings)
+        click.echo(f"Rebuilt address index: {len(index)} addresses")
+    if indexes:
+        from parcl.db import index_report
+
+        approx = "~" if db.db_type == "duckdb" else ""
+        click.echo(f"{'Index':<45} {'Columns':<25} {'Size':>10} {'Scans':>8}  Status")
+        click.echo("-" * 100)
+        for entry in index_report(db):
+            size = f"{approx}{entry['size_bytes'] / 1e6:.1f} MB" if entry["size_bytes"] is not None else "-"
+            scans = entry["scans"] if entry["scans"] is not None else "-"
+            if not entry["declared"]:
+                status = "undeclared"
+            else:
+                status = "ok" if entry["exists"] else "missing"
+            click.echo(
+                f"{entry['name']:<45} {', '.join(entry['columns']):<25} "
+                f"{size:>10} {scans:>8}  {status}"
+            )
+    db.close()
 
 
 if __name__ == "__main__":
@@ -21,6 +21,10 @@ def _find_project_root() -> Path:
 
 PROJECT_ROOT = _find_project_root()
 
+# How a run writes its rows: upsert page by page, or replace the source's
+# whole row set atomically at the end of the run
+LOAD_MODES = ("upsert", "replace")
+
 
 @dataclass
 class DatabaseConfig:
@@ -37,6 +41,8 @@ class CrawlerConfig:
     timeout_seconds: int = 60
     max_retries: int = 3
     retry_backoff: float = 2.0
+    queue_max_pages: int = 4  # pages buffered between pipeline stages
+    queue_max_mb: int = 256  # ... and their estimated size
 
 
 @dataclass
@@ -62,8 +68,17 @@ class SourceConfig:
     filters: dict[str, Any] = field(default_factory=dict)
     field_map: list[FieldMapping] = field(default_factory=list)
     layers: list[dict[str, Any]] | None = None
+    simplify_tolerance: float | None = None  # ArcGIS only, in output SR units (degrees)
+    keep_original_geometry: bool = False  # also emit _geometry_wkb_original
+    load_mode: str = "upsert"  # one of LOAD_MODES
     extra: dict[str, Any] = field(default_factory=dict)
 
+    def __post_init__(self) -> None:
+        if self.load_mode not in LOAD_MODES:
+            raise ValueError(
+                f"Source '{self.id}': load_mode must be one of {LOAD_MODES}, got '{self.load_mode}'"
+            )
+
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> SourceConfig:
         fm = [
@@ -87,6 +102,13 @@ class Settings:
     logging_format: str = "structured"
     sources_dir: str = "config/sources"
     export_output_dir: str = "data/exports"
+    export_compression: str = "snappy"  # Parquet codec
+    export_row_group_size: int = 50_000  # Rows per Parquet row group
+    export_threads: int = 0  # DuckDB threads writing an export, 0 for the connection's setting
+    landing_enabled: bool = True
+    landing_dir: str = "data/raw"
+    cache_dir: str = "data/cache"
+    profile_cache_entries: int = 10_000  # 0 turns the profile cache off
 
 
 def load_settings(path: Path | None = None) -> Settings:
@@ -110,6 +132,8 @@ def load_settings(path: Path | None = None) -> Settings:
         timeout_seconds=cr_raw.get("timeout_seconds", 60),
         max_retries=cr_raw.get("max_retries", 3),
         retry_backoff=cr_raw.get("retry_backoff", 2.0),
+        queue_max_pages=cr_raw.get("queue_max_pages", 4),
+        queue_max_mb=cr_raw.get("queue_max_mb", 256),
     )
     log_raw = raw.get("logging", {})
     return Settings(
@@ -119,6 +143,13 @@ def load_settings(path: Path | None = None) -> Settings:
         logging_format=log_raw.get("format", "structured"),
         sources_dir=raw.get("sources_dir", "config/sources"),
         export_output_dir=raw.get("export", {}).get("output_dir", "data/exports"),
+        export_compression=raw.get("export", {}).get("compression", "snappy"),
+        export_row_group_size=raw.get("export", {}).get("row_group_size", 50_000),
+        export_threads=raw.get("export", {}).get("threads", 0),
+        landing_enabled=raw.get("landing", {}).get("enabled", True),
+        landing_dir=raw.get("landing", {}).get("output_dir", "data/raw"),
+        cache_dir=raw.get("cache", {}).get("dir", "data/cache"),
+        profile_cache_entries=raw.get("cache", {}).get("profile_entries", 10_000),
     )
 
 
@@ -3,34 +3,79 @@
 from __future__ import annotations
 
 import os
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
-from parcl.config import DatabaseConfig, PROJECT_ROOT, Settings, load_settings
+from parcl.config import PROJECT_ROOT, DatabaseConfig, Settings, load_settings
 from parcl.logger import get_logger
 
 log = get_logger("db")
 
 
+def _pg_placeholders(sql: str) -> str:
+    """Translate DuckDB-style ``?`` placeholders to psycopg2's ``%s``."""
+    return sql.replace("%", "%%").replace("?", "%s")
+
+
 class Database:
     """Thin wrapper over DuckDB or PostgreSQL connection."""
 
     def __init__(self, conn: Any, db_type: str):
         self.conn = conn
         self.db_type = db_type
+        self._column_info: dict[str, dict[str, tuple[str, bool]]] = {}
+        if db_type == "duckdb":
+            self._register_functions()
+
+    def _register_functions(self) -> None:
+        """Register SQL helpers on a DuckDB connection.
+
+        ``wkb_as_text(geometry_wkb)`` derives WKT from the stored WKB.
+        """
+        from parcl.geometry import wkb_to_wkt
+
+        try:
+            self.conn.create_function(
+                "wkb_as_text",
+                lambda wkb: wkb_to_wkt(wkb) if wkb is not None else None,
+                ["BLOB"],
+                "VARCHAR",
+                null_handling="special",
+            )
+        except Exception as e:  # already registered on a shared connection
+            log.debug(f"wkb_as_text not registered: {e}")
+
+    @property
+    def errors(self) -> tuple[type[Exception], ...]:
+        """What the driver raises for a failed statement, for ``except db.errors``."""
+        if self.db_type == "postgresql":
+            import psycopg2
+
+            return (psycopg2.Error,)
+        import duckdb
+
+        return (duckdb.Error,)
 
     def execute(self, sql: str, params: tuple | list | None = None) -> Any:
+        if self.db_type == "postgresql":
+            cur = self.conn.cursor()
+            if params:
+                cur.execute(_pg_placeholders(sql), params)
+            else:
+                cur.execute(sql)
+            return cur
         if params:
             return self.conn.execute(sql, params)
         return self.conn.execute(sql)
 
     def executemany(self, sql: str, params_list: list[tuple]) -> None:
         if self.db_type == "duckdb":
-            for params in params_list:
-                self.conn.execute(sql, params)
+            self.conn.executemany(sql, params_list)
         else:
             cur = self.conn.cursor()
-            cur.executemany(sql, params_list)
+            cur.executemany(_pg_placeholders(sql), params_list)
             self.conn.commit()
 
     def fetchall(self, sql: str, params: tuple | list | None = None) -> list[tuple]:
@@ -49,6 +94,32 @@ class Database:
             cur = result if hasattr(result, "fetchone") else self.conn.cursor()
             return cur.fetchone()
 
+    def column_info(self, table: str) -> dict[str, tuple[str, bool]]:
+        """Return ``{column: (data_type, nullable)}`` for a table, cached."""
+        if table not in self._column_info:
+            rows = self.fetchall(
+                "SELECT column_name, data_type, is_nullable FROM information_schema.columns "
+                "WHERE table_name = ? AND table_schema = current_schema() "
+                "ORDER BY ordinal_position",
+                (table,),
+            )
+            self._column_info[table] = {
+                name: (dtype.upper(), nullable == "YES") for name, dtype, nullable in rows
+            }
+        return self._column_info[table]
+
+    @contextmanager
+    def transaction(self) -> Iterator[Database]:
+        """Run a block atomically: commit on success, roll back on error."""
+        if self.db_type == "duckdb":
+            self.conn.begin()
+        try:
+            yield self
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
     def commit(self) -> None:
         if self.db_type == "postgresql":
             self.conn.commit()
@@ -63,6 +134,7 @@ class Database:
             "zoning_cases", "boa_cases", "zoning_overlays",
             "utility_capacity", "environmental_constraints",
             "rights_restrictions", "property_valuations", "transit_amenities",
+            "load_errors",
         ]
         counts = {}
         for t in tables:
@@ -98,15 +170,213 @@ def create_database(config: DatabaseConfig | None = None) -> Database:
         raise ValueError(f"Unsupported database type: {config.type}")
 
 
+def create_reader_databases(config: DatabaseConfig | None = None, count: int = 1) -> list[Database]:
+    """``count`` connections for concurrent readers.
+
+    On DuckDB these are cursors of one read-only connection, which share its
+    buffer cache; the file cannot be opened read-write by another process
+    meanwhile. On PostgreSQL each is a separate session. Those are not set
+    read-only, because batch profiles stage their queries in temp tables.
+    """
+    if config is None:
+        config = load_settings().database
+
+    if config.type == "duckdb":
+        import duckdb
+        db_path = PROJECT_ROOT / config.duckdb_path
+        conn = duckdb.connect(str(db_path), read_only=True)
+        log.info(f"Connected to DuckDB at {db_path} (read-only, {count} cursors)")
+        return [Database(conn, "duckdb")] + [Database(conn.cursor(), "duckdb") for _ in range(count - 1)]
+
+    elif config.type == "postgresql":
+        import psycopg2
+        url = config.postgres_url or os.environ.get("DATABASE_URL", "")
+        databases = []
+        for _ in range(count):
+            databases.append(Database(psycopg2.connect(url), "postgresql"))
+        log.info(f"Connected to PostgreSQL ({count} sessions)")
+        return databases
+
+    else:
+        raise ValueError(f"Unsupported database type: {config.type}")
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """A secondary index that ``init_schema`` keeps in place.
+
+    ``backends`` limits where it is built. DuckDB's ART indexes only serve
+    single-value equality lookups and slow down every merge into the table,
+    so range, sort and grid cell (``IN`` list) indexes are declared for
+    PostgreSQL only; DuckDB scans those filters with its zonemaps.
+    """
+
+    name: str
+    table: str
+    columns: tuple[str, ...]
+    backends: tuple[str, ...] = ("duckdb", "postgresql")
+
+    def create_sql(self, db_type: str) -> str:
+        columns = ", ".join(self.columns)
+        if db_type == "duckdb":
+            columns = ", ".join(c.split()[0] for c in self.columns)
+        return f"CREATE INDEX IF NOT EXISTS {self.name} ON {self.table} ({columns})"
+
+
+# Every secondary index; indexes named idx_* that are not listed here are dropped.
+SECONDARY_INDEXES: list[IndexSpec] = [
+    IndexSpec("idx_parcels_address_key", "parcels", ("address_key",)),
+    IndexSpec("idx_parcels_cell_z16", "parcels", ("cell_z16",), ("postgresql",)),
+    # text_pattern_ops lets PostgreSQL use it for the prefix LIKE in profile
+    IndexSpec("idx_parcels_address_norm", "parcels", ("address_norm text_pattern_ops",), ("postgresql",)),
+    IndexSpec("idx_permits_address_key", "permits", ("address_key",), ("duckdb",)),
+    IndexSpec("idx_permits_address_key_issued", "permits", ("address_key", "issued_date"), ("postgresql",)),
+    IndexSpec("idx_zoning_cases_address_key", "zoning_cases", ("address_key",), ("duckdb",)),
+    IndexSpec("idx_zoning_cases_address_key_status", "zoning_cases", ("address_key", "status"), ("postgresql",)),
+    IndexSpec("idx_boa_cases_address_key", "boa_cases", ("address_key",)),
+    IndexSpec("idx_environmental_constraints_address_key", "environmental_constraints", ("address_key",)),
+    IndexSpec("idx_environmental_constraints_cell_z14", "environmental_constraints", ("cell_z14",),
+              ("postgresql",)),
+    IndexSpec("idx_environmental_constraints_cell_z16", "environmental_constraints", ("cell_z16",),
+              ("postgresql",)),
+    IndexSpec("idx_rights_restrictions_address_key", "rights_restrictions", ("address_key",)),
+    IndexSpec("idx_property_valuations_address_key", "property_valuations", ("address_key",)),
+    IndexSpec("idx_transit_amenities_address_key", "transit_amenities", ("address_key",)),
+    IndexSpec("idx_transit_amenities_cell_z14", "transit_amenities", ("cell_z14",), ("postgresql",)),
+    # Rows resolved to a parcel (parcl.resolve), read by profile and parcel_features
+    IndexSpec("idx_permits_parcel_id", "permits", ("parcel_id",), ("postgresql",)),
+    IndexSpec("idx_zoning_cases_parcel_id", "zoning_cases", ("parcel_id",), ("postgresql",)),
+    IndexSpec("idx_boa_cases_parcel_id", "boa_cases", ("parcel_id",), ("postgresql",)),
+    IndexSpec("idx_environmental_constraints_parcel_id", "environmental_constraints", ("parcel_id",),
+              ("postgresql",)),
+    IndexSpec("idx_parcel_spatial_links_parcel_id", "parcel_spatial_links", ("parcel_id",), ("postgresql",)),
+    # Re-crawling one feature source replaces that source's links
+    IndexSpec("idx_parcel_spatial_links_source", "parcel_spatial_links", ("feature_table", "feature_source_id"),
+              ("postgresql",)),
+]
+
+
+def declared_indexes(db: Database) -> list[IndexSpec]:
+    return [spec for spec in SECONDARY_INDEXES if db.db_type in spec.backends]
+
+
+def existing_indexes(db: Database) -> dict[str, str]:
+    """Return ``{index_name: table}`` for secondary indexes in the current schema."""
+    if db.db_type == "duckdb":
+        rows = db.fetchall(
+            "SELECT index_name, table_name FROM duckdb_indexes() "
+            "WHERE schema_name = current_schema() AND NOT is_primary AND NOT is_unique"
+        )
+    else:
+        rows = db.fetchall(
+            "SELECT i.relname, t.relname FROM pg_index x "
+            "JOIN pg_class i ON i.oid = x.indexrelid "
+            "JOIN pg_class t ON t.oid = x.indrelid "
+            "WHERE t.relnamespace = current_schema()::regnamespace "
+            "AND NOT x.indisprimary AND NOT x.indisunique"
+        )
+    return dict(rows)
+
+
+def ensure_indexes(db: Database) -> list[str]:
+    """Create missing declared indexes and drop stale ``idx_*`` ones.
+
+    Returns the names of the indexes created.
+    """
+    declared = declared_indexes(db)
+    wanted = {spec.name for spec in declared}
+    existing = existing_indexes(db)
+
+    for name in sorted(existing):
+        if name.startswith("idx_") and name not in wanted:
+            log.info(f"Dropping undeclared index {name}")
+            db.execute(f"DROP INDEX IF EXISTS {name}")
+
+    created = []
+    for spec in declared:
+        if spec.name not in existing:
+            db.execute(spec.create_sql(db.db_type))
+            created.append(spec.name)
+    db.commit()
+    if created:
+        log.info(f"Created {len(created)} indexes: {', '.join(created)}")
+    return created
+
+
+def refresh_statistics(db: Database, tables: list[str] | None = None) -> None:
+    """Recompute planner statistics (ANALYZE), for all tables or the given ones."""
+    if not tables:
+        db.execute("ANALYZE")
+    else:
+        for table in tables:
+            db.execute(f"ANALYZE {table}")
+    db.commit()
+
+
+def index_report(db: Database) -> list[dict[str, Any]]:
+    """Describe declared and present secondary indexes with what each costs.
+
+    On PostgreSQL ``size_bytes`` is the on-disk index size and ``scans``
+    the number of index scans since statistics were last reset. DuckDB
+    keeps no per-index size, so ``size_bytes`` there is an estimate from
+    the key width (key bytes plus an 8-byte row id per indexed row) and
+    ``scans`` is None.
+    """
+    existing = existing_indexes(db)
+    specs = {spec.name: spec for spec in declared_indexes(db)}
+    pg_stats: dict[str, tuple[int, int]] = {}
+    if db.db_type == "postgresql":
+        rows = db.fetchall(
+            "SELECT indexrelname, pg_relation_size(indexrelid), idx_scan "
+            "FROM pg_stat_user_indexes WHERE schemaname = current_schema()"
+        )
+        pg_stats = {name: (size, scans) for name, size, scans in rows}
+
+    report = []
+    for name in sorted(set(specs) | set(existing)):
+        spec = specs.get(name)
+        table = spec.table if spec else existing[name]
+        entry: dict[str, Any] = {
+            "name": name,
+            "table": table,
+            "columns": [c.split()[0] for c in spec.columns] if spec else [],
+            "declared": spec is not None,
+            "exists": name in existing,
+            "size_bytes": None,
+            "scans": None,
+        }
+        if name in pg_stats:
+            entry["size_bytes"], entry["scans"] = pg_stats[name]
+        elif db.db_type == "duckdb" and spec and entry["exists"]:
+            widths = " + ".join(f"COALESCE(strlen(CAST({c} AS VARCHAR)), 0)" for c in entry["columns"])
+            row = db.fetchone(f"SELECT SUM({widths} + 8) FROM {table}")
+            entry["size_bytes"] = int(row[0] or 0)
+        report.append(entry)
+    return report
+
+
 def init_schema(db: Database) -> None:
-    """Create all tables and views from SQL files."""
+    """Create all tables from sql/schema.sql and the declared indexes."""
     json_type = "JSON" if db.db_type == "duckdb" else "JSONB"
+    blob_type = "BLOB" if db.db_type == "duckdb" else "BYTEA"
+    double_type = "DOUBLE" if db.db_type == "duckdb" else "DOUBLE PRECISION"
 
     schema_path = PROJECT_ROOT / "sql" / "schema.sql"
-    views_path = PROJECT_ROOT / "sql" / "views.sql"
 
-    schema_sql = schema_path.read_text().replace("{JSON_TYPE}", json_type)
-    views_sql = views_path.read_text().replace("{JSON_TYPE}", json_type)
+    schema_sql = (
+        schema_path.read_text()
+        .replace("{JSON_TYPE}", json_type)
+        .replace("{BLOB_TYPE}", blob_type)
+        .replace("{DOUBLE_TYPE}", double_type)
+    )
+
+    # parcel_features was a view before it became a maintained table
+    legacy_view = db.fetchone(
+        "SELECT 1 FROM information_schema.views "
+        "WHERE table_name = 'parcel_features' AND table_schema = current_schema()"
+    )
+    if legacy_view:
+        db.execute("DROP VIEW parcel_features")
 
     # Execute each statement separately
     for sql in schema_sql.split(";"):
@@ -114,12 +384,8 @@ def init_schema(db: Database) -> None:
         if sql:
             db.execute(sql)
 
-    for sql in views_sql.split(";"):
-        sql = sql.strip()
-        if sql:
-            db.execute(sql)
-
     db.commit()
+    db._column_info.clear()
 
     # Seed jurisdictions for Austin v1 (inserted in order for FK integrity)
     seeds = [
@@ -137,4 +403,20 @@ def init_schema(db: Database) -> None:
                 (jid, name, level, parent, state),
             )
     db.commit()
+
+    from parcl.etl.loader import (
+        backfill_address_parts,
+        backfill_geometry_bounds,
+        backfill_grid_cells,
+        backfill_parcel_points,
+    )
+
+    backfill_address_parts(db)
+    backfill_geometry_bounds(db)
+    backfill_parcel_points(db)
+    backfill_grid_cells(db)
+    from parcl.resolve import resolve_parcels
+
+    resolve_parcels(db)
+    ensure_indexes(db)
     log.info("Schema initialized with all tables and views")
@@ -2,94 +2,148 @@
 
 from __future__ import annotations
 
+import io
+import json
+from datetime import date, datetime
 from typing import Any
 
+from parcl.address import ADDRESS_COLUMNS, parse_address
 from parcl.db import Database
+from parcl.geometry import BOUNDS_COLUMNS, add_geometry_bounds, geometry_bounds
+from parcl.grid import add_grid_cells, cell_keys
 from parcl.logger import get_logger
 
 log = get_logger("loader")
 
+# Columns that must be present on every row regardless of table
+KEY_COLUMNS = ("id", "source_id", "external_id")
+
+# Column types that are loaded as-is (no TRY_CAST validation needed)
+_TEXT_TYPES = {"VARCHAR", "TEXT"}
+
+_STAGE_VIEW = "_parcl_load_stage"
+
 # Column lists for each target table (order must match INSERT)
 TABLE_COLUMNS: dict[str, list[str]] = {
     "parcels": [
         "id", "source_id", "external_id", "apn", "address", "address_norm",
-        "city", "state", "zip_code", "county", "latitude", "longitude",
-        "base_zoning", "zoning_desc", "lot_size_sqft", "jurisdiction_id", "raw_payload",
+        "house_number", "predir", "street_name", "street_suffix", "unit",
+        "address_key", "city", "state", "zip_code", "county", "latitude",
+        "longitude", "base_zoning", "zoning_desc", "lot_size_sqft",
+        "jurisdiction_id", "raw_payload", "cell_z12", "cell_z14", "cell_z16",
+        "location_source",
     ],
     "permits": [
         "id", "source_id", "external_id", "permit_number", "permit_type",
         "permit_class", "work_class", "status", "description", "address",
-        "address_norm", "applicant", "contractor", "valuation", "issued_date",
-        "filed_date", "completed_date", "expired_date", "latitude", "longitude",
-        "jurisdiction_id", "raw_payload",
+        "address_norm", "house_number", "predir", "street_name",
+        "street_suffix", "unit", "address_key", "applicant", "contractor",
+        "valuation", "issued_date", "filed_date", "completed_date",
+        "expired_date", "latitude", "longitude", "jurisdiction_id",
+        "raw_payload", "cell_z12", "cell_z14", "cell_z16",
     ],
     "zoning_cases": [
-        "id", "source_id", "external_id", "case_number", "case_name",
-        "address", "address_norm", "existing_zoning", "proposed_zoning",
-        "status", "filed_date", "decided_date", "council_district",
-        "description", "jurisdiction_id", "raw_payload",
+        "id", "source_id", "external_id", "case_number", "case_name", "address",
+        "address_norm", "house_number", "predir", "street_name",
+        "street_suffix", "unit", "address_key", "existing_zoning",
+        "proposed_zoning", "status", "filed_date", "decided_date",
+        "council_district", "description", "jurisdiction_id", "raw_payload",
     ],
     "boa_cases": [
         "id", "source_id", "external_id", "case_number", "address",
-        "address_norm", "variance_type", "status", "filed_date",
-        "hearing_date", "decision", "description", "jurisdiction_id", "raw_payload",
+        "address_norm", "house_number", "predir", "street_name",
+        "street_suffix", "unit", "address_key", "variance_type", "status",
+        "filed_date", "hearing_date", "decision", "description",
+        "jurisdiction_id", "raw_payload",
     ],
     "zoning_overlays": [
         "id", "source_id", "external_id", "overlay_name", "overlay_type",
-        "layer_name", "layer_id", "geometry_wkt", "properties",
-        "jurisdiction_id", "raw_payload",
+        "layer_name", "layer_id", "geometry_wkt", "geometry_wkb",
+        "geometry_wkb_original", "properties", "jurisdiction_id", "raw_payload",
+        "min_x", "min_y", "max_x", "max_y", "centroid_x", "centroid_y",
     ],
     "utility_capacity": [
         "id", "source_id", "external_id", "utility_type", "facility_name",
         "metric_name", "metric_value", "metric_unit", "period_start",
-        "period_end", "geometry_wkt", "jurisdiction_id", "raw_payload",
+        "period_end", "geometry_wkt", "geometry_wkb", "geometry_wkb_original",
+        "jurisdiction_id", "raw_payload", "min_x", "min_y", "max_x", "max_y", "centroid_x", "centroid_y",
     ],
     "environmental_constraints": [
-        "id", "source_id", "external_id", "constraint_type", "name",
-        "severity", "description", "address", "address_norm", "latitude",
-        "longitude", "geometry_wkt", "properties", "jurisdiction_id", "raw_payload",
+        "id", "source_id", "external_id", "constraint_type", "name", "severity",
+        "description", "address", "address_norm", "house_number", "predir",
+        "street_name", "street_suffix", "unit", "address_key", "latitude",
+        "longitude", "geometry_wkt", "geometry_wkb", "geometry_wkb_original",
+        "properties", "jurisdiction_id", "raw_payload", "cell_z12", "cell_z14",
+        "cell_z16", "min_x", "min_y", "max_x", "max_y", "centroid_x", "centroid_y",
     ],
     "rights_restrictions": [
         "id", "source_id", "external_id", "restriction_type", "parcel_id",
-        "address", "address_norm", "grantor", "grantee", "recorded_date",
-        "description", "geometry_wkt", "jurisdiction_id", "raw_payload",
+        "address", "address_norm", "house_number", "predir", "street_name",
+        "street_suffix", "unit", "address_key", "grantor", "grantee",
+        "recorded_date", "description", "geometry_wkt", "geometry_wkb",
+        "geometry_wkb_original", "jurisdiction_id", "raw_payload", "min_x", "min_y", "max_x", "max_y", "centroid_x", "centroid_y",
     ],
     "property_valuations": [
-        "id", "source_id", "external_id", "prop_id", "geo_id",
-        "address", "address_norm", "city", "zip_code", "subdivision",
-        "entities", "acreage", "legal_description",
-        "appraised_value", "land_value", "improvement_value",
-        "tax_year", "geometry_wkt", "jurisdiction_id", "raw_payload",
+        "id", "source_id", "external_id", "prop_id", "geo_id", "address",
+        "address_norm", "house_number", "predir", "street_name",
+        "street_suffix", "unit", "address_key", "city", "zip_code",
+        "subdivision", "entities", "acreage", "legal_description",
+        "appraised_value", "land_value", "improvement_value", "tax_year",
+        "geometry_wkt", "geometry_wkb", "geometry_wkb_original",
+        "jurisdiction_id", "raw_payload", "min_x", "min_y", "max_x", "max_y", "centroid_x", "centroid_y",
     ],
     "transit_amenities": [
-        "id", "source_id", "external_id", "amenity_type", "name",
-        "description", "address", "address_norm",
-        "stop_id", "route_id", "route_type", "park_type", "acreage",
-        "latitude", "longitude", "geometry_wkt", "properties",
-        "jurisdiction_id", "raw_payload",
+        "id", "source_id", "external_id", "amenity_type", "name", "description",
+        "address", "address_norm", "house_number", "predir", "street_name",
+        "street_suffix", "unit", "address_key", "stop_id", "route_id",
+        "route_type", "park_type", "acreage", "latitude", "longitude",
+        "geometry_wkt", "geometry_wkb", "geometry_wkb_original", "properties",
+        "jurisdiction_id", "raw_payload", "cell_z12", "cell_z14", "cell_z16",
+        "min_x", "min_y", "max_x", "max_y", "centroid_x", "centroid_y",
     ],
 }
 
+# Tables whose rows parcl.resolve links to a parcel. Updating a row clears
+# its parcel_resolved_at, which queues it to be resolved again.
+RESOLVED_TABLES = ("permits", "zoning_cases", "boa_cases", "environmental_constraints")
+
+
+def _set_clause(table: str, update_cols: list[str]) -> str:
+    clause = ", ".join(f"{c} = EXCLUDED.{c}" for c in update_cols)
+    if table in RESOLVED_TABLES:
+        clause += ", parcel_resolved_at = NULL"
+    return clause
 
-def _build_upsert_sql(table: str, columns: list[str], db_type: str) -> str:
-    """Build an INSERT ... ON CONFLICT upsert statement."""
-    placeholders = ", ".join(["?"] * len(columns)) if db_type == "duckdb" else ", ".join(["%s"] * len(columns))
+
+def _build_upsert_sql(table: str, columns: list[str]) -> str:
+    """Build a single-row INSERT ... ON CONFLICT upsert statement."""
+    placeholders = ", ".join(["?"] * len(columns))
     cols = ", ".join(columns)
 
     # Columns to update on conflict (everything except id, source_id, external_id)
-    update_cols = [c for c in columns if c not in ("id", "source_id", "external_id")]
-    if db_type == "duckdb":
-        set_clause = ", ".join(f"{c} = EXCLUDED.{c}" for c in update_cols)
-        return (
-            f"INSERT INTO {table} ({cols}) VALUES ({placeholders}) "
-            f"ON CONFLICT (source_id, external_id) DO UPDATE SET {set_clause}"
-        )
-    else:
-        set_clause = ", ".join(f"{c} = EXCLUDED.{c}" for c in update_cols)
-        return (
-            f"INSERT INTO {table} ({cols}) VALUES ({placeholders}) "
-            f"ON CONFLICT (source_id, external_id) DO UPDATE SET {set_clause}"
-        )
+    update_cols = [c for c in columns if c not in KEY_COLUMNS]
+    set_clause = _set_clause(table, update_cols)
+    return (
+        f"INSERT INTO {table} ({cols}) VALUES ({placeholders}) "
+        f"ON CONFLICT (source_id, external_id) DO UPDATE SET {set_clause}"
+    )
+
+
+def _build_merge_sql(table: str, columns: list[str], select: str, where: str = "") -> str:
+    """Build an INSERT ... SELECT upsert from a staged page.
+
+    The DO UPDATE only fires when a value changed: an update is a delete
+    plus insert in every index on the table (and a dead tuple on
+    PostgreSQL), and most re-crawled rows do not change.
+    """
+    update_cols = [c for c in columns if c not in KEY_COLUMNS]
+    set_clause = _set_clause(table, update_cols)
+    changed = " OR ".join(f"{table}.{c} IS DISTINCT FROM EXCLUDED.{c}" for c in update_cols)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) {select}"
+        + (f" WHERE {where}" if where else "")
+        + f" ON CONFLICT (source_id, external_id) DO UPDATE SET {set_clause} WHERE {changed}"
+    )
 
 
 def load_records(
@@ -99,6 +153,12 @@ def load_records(
 ) -> int:
     """Load transformed records into the target table using upsert.
 
+    Records repeating a (source_id, external_id) key within the batch are
+    collapsed to the last occurrence. The batch is staged (an Arrow table on
+    DuckDB, ``COPY FROM STDIN`` into a temp table on PostgreSQL) and merged
+    with a single statement; rows that fail validation are written to
+    ``load_errors`` instead of the target table.
+
     Returns the number of records loaded.
     """
     if not records:
@@ -108,16 +168,585 @@ def load_records(
     if not columns:
         raise ValueError(f"Unknown table '{table}'. Available: {list(TABLE_COLUMNS.keys())}")
 
-    sql = _build_upsert_sql(table, columns, db.db_type)
-    loaded = 0
+    return _load(db, table, columns, dedupe_records(records))
+
 
+def _load(
+    db: Database,
+    table: str,
+    columns: list[str],
+    records: list[dict[str, Any]],
+    shadow: str | None = None,
+    seq: int = 0,
+) -> int:
+    """Bulk-load a batch, retrying row by row if the bulk statement fails.
+
+    With ``shadow`` set, rows are appended to that staging table (numbered
+    from ``seq``) instead of being merged into ``table``.
+    """
+    if "cell_z16" in columns:
+        add_grid_cells(records)
+    if "min_x" in columns:
+        add_geometry_bounds(records)
+    bulk = _load_bulk_duckdb if db.db_type == "duckdb" else _load_bulk_postgres
+    try:
+        return bulk(db, table, columns, records, shadow, seq)
+    except (*db.errors, ValueError, TypeError, OverflowError) as e:
+        # A statement the database rejected, or a value Arrow or COPY could not encode
+        log.warning(f"Bulk load into {shadow or table} failed, falling back to row-by-row: {e}")
+
+    return _load_rows(db, table, columns, records, shadow, seq)
+
+
+def dedupe_records(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Keep the last record for each (source_id, external_id) key."""
+    by_key: dict[tuple, dict[str, Any]] = {}
     for record in records:
+        key = (record.get("source_id"), record.get("external_id"))
+        by_key.pop(key, None)
+        by_key[key] = record
+    if len(by_key) < len(records):
+        log.debug(f"Dropped {len(records) - len(by_key)} duplicate keys from batch")
+    return list(by_key.values())
+
+
+def _load_rows(
+    db: Database,
+    table: str,
+    columns: list[str],
+    records: list[dict[str, Any]],
+    shadow: str | None = None,
+    seq: int = 0,
+) -> int:
+    """Upsert one statement per record; failures go to ``load_errors``."""
+    if shadow:
+        sql = (
+            f"INSERT INTO {shadow} ({', '.join(columns)}, _seq) "
+            f"VALUES ({', '.join(['?'] * (len(columns) + 1))})"
+        )
+    else:
+        sql = _build_upsert_sql(table, columns)
+    # A failed statement aborts the whole PostgreSQL transaction, so each
+    # row gets its own savepoint there.
+    savepoints = db.db_type == "postgresql"
+    loaded = 0
+    failed = []
+
+    for i, record in enumerate(records):
         values = tuple(record.get(col) for col in columns)
+        if shadow:
+            values += (seq + i,)
         try:
+            error = _missing_required(db, table, columns, record) if shadow else None
+            if error:
+                raise ValueError(error)
+            if savepoints:
+                db.execute("SAVEPOINT load_row")
             db.execute(sql, values)
             loaded += 1
         except Exception as e:
             log.warning(f"Failed to upsert record {record.get('external_id')}: {e}")
+            if savepoints:
+                db.execute("ROLLBACK TO SAVEPOINT load_row")
+            failed.append((record, str(e)))
 
     db.commit()
+    record_errors(db, table, failed)
     return loaded
+
+
+def _arrow_column(values: list[Any]) -> Any:
+    """Build an Arrow array, falling back to text for mixed-type columns.
+
+    Text that does not fit the target column is caught by the TRY_CAST
+    checks in the merge rather than here.
+    """
+    import pyarrow as pa
+
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        return pa.array(
+            [
+                None if v is None
+                else json.dumps(v, default=str) if isinstance(v, (dict, list))
+                else str(v)
+                for v in values
+            ],
+            type=pa.string(),
+        )
+
+
+def _validation_expr(db: Database, table: str, columns: list[str]) -> str:
+    """SQL CASE yielding an error message for an invalid staged row, else NULL."""
+    info = db.column_info(table)
+    checks = []
+    for col in columns:
+        dtype, nullable = info.get(col, ("VARCHAR", True))
+        if col in KEY_COLUMNS or not nullable:
+            checks.append(f"WHEN {col} IS NULL THEN 'missing {col}'")
+        if dtype not in _TEXT_TYPES:
+            checks.append(
+                f"WHEN {col} IS NOT NULL AND TRY_CAST({col} AS {dtype}) IS NULL "
+                f"THEN 'invalid {dtype} in {col}: ' || CAST({col} AS VARCHAR)"
+            )
+    return "CASE " + " ".join(checks) + " END"
+
+
+def _load_bulk_duckdb(
+    db: Database,
+    table: str,
+    columns: list[str],
+    records: list[dict[str, Any]],
+    shadow: str | None = None,
+    seq: int = 0,
+) -> int:
+    """Stage the batch as an Arrow table and merge it in one statement."""
+    import pyarrow as pa
+
+    arrays = {col: _arrow_column([r.get(col) for r in records]) for col in columns}
+    arrays["_row"] = pa.array(range(len(records)), type=pa.int64())
+    stage = pa.table(arrays)
+
+    info = db.column_info(table)
+    error_expr = _validation_expr(db, table, columns)
+    casts = ", ".join(f"CAST({c} AS {info.get(c, ('VARCHAR',))[0]})" for c in columns)
+    if shadow:
+        insert = (
+            f"INSERT INTO {shadow} ({', '.join(columns)}, _seq) "
+            f"SELECT {casts}, _row + {seq} FROM {_STAGE_VIEW} WHERE ({error_expr}) IS NULL"
+        )
+    else:
+        insert = _build_merge_sql(
+            table, columns, f"SELECT {casts} FROM {_STAGE_VIEW}", f"({error_expr}) IS NULL"
+        )
+
+    db.conn.register(_STAGE_VIEW, stage)
+    try:
+        bad = db.fetchall(
+            f"SELECT _row, {error_expr} AS error FROM {_STAGE_VIEW} "
+            f"WHERE ({error_expr}) IS NOT NULL"
+        )
+        with db.transaction():
+            db.execute(insert)
+    finally:
+        db.conn.unregister(_STAGE_VIEW)
+
+    if bad:
+        log.warning(f"Rejected {len(bad)} of {len(records)} records for {table}")
+        record_errors(db, table, [(records[row], error) for row, error in bad])
+    return len(records) - len(bad)
+
+
+def _copy_field(value: Any) -> str:
+    """Render one value as a PostgreSQL CSV field.
+
+    NULL is an empty unquoted field; everything else is quoted so that an
+    empty string stays distinct from NULL. bytea uses the ``\\x`` hex form.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, default=str)
+    elif isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _copy_buffer(
+    columns: list[str], records: list[dict[str, Any]], seq: int | None = None
+) -> io.StringIO:
+    buf = io.StringIO()
+    for i, record in enumerate(records):
+        buf.write(",".join(_copy_field(record.get(col)) for col in columns))
+        if seq is not None:
+            buf.write(f",{seq + i}")
+        buf.write("\n")
+    buf.seek(0)
+    return buf
+
+
+def _missing_required(db: Database, table: str, columns: list[str], record: dict[str, Any]) -> str | None:
+    info = db.column_info(table)
+    for col in columns:
+        if (col in KEY_COLUMNS or not info.get(col, ("", True))[1]) and record.get(col) is None:
+            return f"missing {col}"
+    return None
+
+
+def _load_bulk_postgres(
+    db: Database,
+    table: str,
+    columns: list[str],
+    records: list[dict[str, Any]],
+    shadow: str | None = None,
+    seq: int = 0,
+) -> int:
+    """COPY the batch into a temp staging table and merge it in one statement.
+
+    The staging table is created per page with ``ON COMMIT DROP`` so the
+    copy and the merge share one transaction. A value that does not parse
+    as its column type fails the COPY, which rolls the page back and lets
+    :func:`load_records` retry it row by row.
+    """
+    good, bad = [], []
+    for record in records:
+        error = _missing_required(db, table, columns, record)
+        if error:
+            bad.append((record, error))
+        else:
+            good.append(record)
+
+    cols = ", ".join(columns)
+    with db.transaction():
+        cur = db.conn.cursor()
+        if shadow:
+            # The shadow table already is a staging table: copy straight in
+            cur.copy_expert(
+                f"COPY {shadow} ({cols}, _seq) FROM STDIN WITH (FORMAT csv)",
+                _copy_buffer(columns, good, seq),
+            )
+        else:
+            stage = f"_parcl_stage_{table}"
+            cur.execute(
+                f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+                f"SELECT {cols} FROM {table} WITH NO DATA"
+            )
+            cur.copy_expert(
+                f"COPY {stage} ({cols}) FROM STDIN WITH (FORMAT csv)",
+                _copy_buffer(columns, good),
+            )
+            cur.execute(_build_merge_sql(table, columns, f"SELECT {cols} FROM {stage}"))
+
+    if bad:
+        log.warning(f"Rejected {len(bad)} of {len(records)} records for {table}")
+        record_errors(db, table, bad)
+    return len(good)
+
+
+class ReplaceLoad:
+    """Load a full snapshot of one source's rows, then swap it in atomically.
+
+    Pages are appended to a temporary shadow table with no conflict checks.
+    :meth:`swap` then deletes the source's current rows and inserts the
+    shadow rows in a single transaction, so readers see either the old row
+    set or the new one. Rows keep their ``id`` when their external_id is
+    still present; rows that disappeared upstream are removed.
+    """
+
+    def __init__(self, db: Database, table: str, source_id: str):
+        columns = TABLE_COLUMNS.get(table)
+        if not columns:
+            raise ValueError(f"Unknown table '{table}'. Available: {list(TABLE_COLUMNS.keys())}")
+        self.db = db
+        self.table = table
+        self.columns = columns
+        self.source_id = source_id
+        self.shadow = f"_parcl_shadow_{table}"
+        self.rows = 0
+
+        cols = ", ".join(columns)
+        db.execute(f"DROP TABLE IF EXISTS {self.shadow}")
+        db.execute(
+            f"CREATE TEMP TABLE {self.shadow} AS "
+            f"SELECT {cols}, CAST(0 AS BIGINT) AS _seq FROM {table} LIMIT 0"
+        )
+        db.commit()
+
+    def load(self, records: list[dict[str, Any]]) -> int:
+        """Append a page to the shadow table. Returns the rows accepted."""
+        if not records:
+            return 0
+        loaded = _load(self.db, self.table, self.columns, records, self.shadow, self.rows)
+        self.rows += len(records)
+        return loaded
+
+    def swap(self) -> dict[str, int]:
+        """Replace the source's rows with the shadow rows in one transaction.
+
+        Repeated external_ids keep their last loaded version. Rows identical
+        to the snapshot are left in place (a delete plus insert in every
+        index is the expensive part); changed and vanished rows are deleted
+        and the new versions inserted. Returns counts of rows now present,
+        kept from before (same external_id) and removed.
+        """
+        old = "_parcl_replace_ids"
+        new = "_parcl_replace_rows"
+        cols = ", ".join(self.columns)
+        select = ", ".join(
+            "COALESCE(o.id, s.id)" if c == "id" else f"s.{c}" for c in self.columns
+        )
+        unchanged = " AND ".join(
+            f"s.{c} IS NOT DISTINCT FROM t.{c}" for c in self.columns if c not in KEY_COLUMNS
+        )
+        params = (self.source_id,)
+        with self.db.transaction():
+            for name in (old, new):
+                self.db.execute(f"DROP TABLE IF EXISTS {name}")
+            self.db.execute(
+                f"CREATE TEMP TABLE {old} AS "
+                f"SELECT id, external_id FROM {self.table} WHERE source_id = ?",
+                params,
+            )
+            self.db.execute(
+                f"CREATE TEMP TABLE {new} AS SELECT {cols} FROM ("
+                f"SELECT *, ROW_NUMBER() OVER (PARTITION BY external_id ORDER BY _seq DESC) AS _rn "
+                f"FROM {self.shadow} WHERE source_id = ?) latest WHERE _rn = 1",
+                params,
+            )
+            removed = self.db.fetchone(
+                f"SELECT COUNT(*) FROM {old} o WHERE NOT EXISTS "
+                f"(SELECT 1 FROM {new} s WHERE s.external_id = o.external_id)"
+            )[0]
+            self.db.execute(
+                f"DELETE FROM {self.table} t WHERE t.source_id = ? AND NOT EXISTS "
+                f"(SELECT 1 FROM {new} s WHERE s.external_id = t.external_id AND {unchanged})",
+                params,
+            )
+            self.db.execute(
+                f"INSERT INTO {self.table} ({cols}) "
+                f"SELECT {select} FROM {new} s "
+                f"LEFT JOIN {old} o ON o.external_id = s.external_id "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {self.table} t "
+                f"WHERE t.source_id = ? AND t.external_id = s.external_id)",
+                params,
+            )
+            total = self.db.fetchone(f"SELECT COUNT(*) FROM {new}")[0]
+            before = self.db.fetchone(f"SELECT COUNT(*) FROM {old}")[0]
+        self.discard()
+        for name in (old, new):
+            self.db.execute(f"DROP TABLE IF EXISTS {name}")
+        self.db.commit()
+        log.info(f"Replaced {self.table} rows for {self.source_id}: {total} rows, {removed} removed")
+        return {"rows": total, "kept": before - removed, "removed": removed}
+
+    def discard(self) -> None:
+        """Drop the shadow table without touching the target table."""
+        self.db.execute(f"DROP TABLE IF EXISTS {self.shadow}")
+        self.db.commit()
+
+
+def record_errors(
+    db: Database,
+    table: str,
+    failed: list[tuple[dict[str, Any], str]],
+) -> None:
+    """Write rejected records to ``load_errors``."""
+    if not failed:
+        return
+    params = [
+        (
+            table,
+            record.get("source_id"),
+            record.get("external_id"),
+            error,
+            json.dumps(
+                {k: v for k, v in record.items() if not isinstance(v, (bytes, bytearray))},
+                default=str,
+            ),
+        )
+        for record, error in failed
+    ]
+    try:
+        db.executemany(
+            "INSERT INTO load_errors (target_table, source_id, external_id, error, record) "
+            "VALUES (?, ?, ?, ?, ?)",
+            params,
+        )
+        db.commit()
+    except db.errors as e:
+        log.warning(f"Could not record {len(failed)} load errors for {table}: {e}")
+
+
+def backfill_address_parts(db: Database) -> int:
+    """Parse addresses of rows loaded before structured address columns existed.
+
+    Returns the number of rows updated.
+    """
+    set_clause = ", ".join(f"{c} = ?" for c in ADDRESS_COLUMNS)
+    updated = 0
+    for table, columns in TABLE_COLUMNS.items():
+        if "address_key" not in columns:
+            continue
+        rows = db.fetchall(
+            f"SELECT id, address FROM {table} WHERE address IS NOT NULL "
+            "AND house_number IS NULL AND street_name IS NULL AND unit IS NULL"
+        )
+        params = []
+        for row_id, address in rows:
+            parts = parse_address(address).as_columns()
+            if any(parts.values()):
+                params.append(tuple(parts[c] for c in ADDRESS_COLUMNS) + (row_id,))
+        if params:
+            db.executemany(f"UPDATE {table} SET {set_clause} WHERE id = ?", params)
+            db.commit()
+            log.info(f"Backfilled address components for {len(params)} {table} rows")
+            updated += len(params)
+    return updated
+
+
+def _stage_update(db: Database, table: str, ids: list[Any], values: dict[str, list[Any]]) -> None:
+    """Set ``values`` (column -> one value per id) on the rows with ``ids``.
+
+    The values are staged (Arrow on DuckDB, COPY on PostgreSQL) and applied
+    with a single ``UPDATE ... FROM``.
+    """
+    stage = "_parcl_backfill_stage"
+    columns = list(values)
+    set_clause = ", ".join(f"{c} = s.{c}" for c in columns)
+    update = f"UPDATE {table} t SET {set_clause} FROM {stage} s WHERE t.id = s.id"
+    with db.transaction():
+        if db.db_type == "duckdb":
+            import pyarrow as pa
+
+            data = {"id": ids, **values}
+            db.conn.register(stage, pa.table({k: pa.array(v) for k, v in data.items()}))
+            try:
+                db.execute(update)
+            finally:
+                db.conn.unregister(stage)
+        else:
+            cur = db.conn.cursor()
+            cur.execute(
+                f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+                f"SELECT id, {', '.join(columns)} FROM {table} WITH NO DATA"
+            )
+            records = [
+                {"id": row_id, **{c: values[c][i] for c in columns}}
+                for i, row_id in enumerate(ids)
+            ]
+            cur.copy_expert(
+                f"COPY {stage} FROM STDIN WITH (FORMAT csv)",
+                _copy_buffer(["id", *columns], records),
+            )
+            cur.execute(update)
+
+
+def stage_temp_table(db: Database, name: str, columns: dict[str, str], values: dict[str, list[Any]]) -> None:
+    """(Re)create TEMP table ``name`` (column -> SQL type) holding ``values``.
+
+    Rows are bulk-inserted from Arrow on DuckDB and copied in on PostgreSQL.
+    The table lives until it is dropped or the connection closes.
+    """
+    pg_types = {"DOUBLE": "DOUBLE PRECISION"}
+    types = {c: pg_types.get(t, t) if db.db_type == "postgresql" else t for c, t in columns.items()}
+    db.execute(f"DROP TABLE IF EXISTS {name}")
+    db.execute(f"CREATE TEMP TABLE {name} ({', '.join(f'{c} {t}' for c, t in types.items())})")
+    rows = len(next(iter(values.values()), []))
+    if rows and db.db_type == "duckdb":
+        import pyarrow as pa
+
+        source = f"{name}_arrow"
+        db.conn.register(source, pa.table({c: pa.array(values[c]) for c in columns}))
+        try:
+            db.execute(f"INSERT INTO {name} SELECT {', '.join(columns)} FROM {source}")
+        finally:
+            db.conn.unregister(source)
+    elif rows:
+        records = [{c: values[c][i] for c in columns} for i in range(rows)]
+        db.conn.cursor().copy_expert(
+            f"COPY {name} FROM STDIN WITH (FORMAT csv)", _copy_buffer(list(columns), records)
+        )
+    db.commit()
+
+
+def backfill_grid_cells(db: Database, tables: list[str] | None = None) -> int:
+    """Compute grid cell keys for rows with coordinates but no cells yet.
+
+    Covers rows loaded before the cell columns existed, or written outside
+    the loader. Returns the number of rows updated.
+    """
+    updated = 0
+    for table, columns in TABLE_COLUMNS.items():
+        if "cell_z16" not in columns or (tables and table not in tables):
+            continue
+        rows = db.fetchall(
+            f"SELECT id, latitude, longitude FROM {table} "
+            "WHERE latitude IS NOT NULL AND longitude IS NOT NULL AND cell_z16 IS NULL"
+        )
+        if not rows:
+            continue
+        cells = cell_keys((r[1] for r in rows), (r[2] for r in rows))
+        _stage_update(db, table, [r[0] for r in rows], cells)
+        log.info(f"Backfilled grid cells for {len(rows)} {table} rows")
+        updated += len(rows)
+    return updated
+
+
+def backfill_geometry_bounds(
+    db: Database, tables: list[str] | None = None, batch_size: int = 5000
+) -> int:
+    """Compute bounds and centroids for rows with WKB geometry but none yet.
+
+    Geometries are read in id order, ``batch_size`` at a time, so a table of
+    large polygons is never held in memory at once. Rows whose WKB cannot be
+    decoded keep NULL bounds. Returns the number of rows updated.
+    """
+    updated = 0
+    for table, columns in TABLE_COLUMNS.items():
+        if "min_x" not in columns or (tables and table not in tables):
+            continue
+        count = 0
+        last_id = ""
+        while True:
+            rows = db.fetchall(
+                f"SELECT id, geometry_wkb FROM {table} "
+                "WHERE geometry_wkb IS NOT NULL AND min_x IS NULL AND id > ? "
+                f"ORDER BY id LIMIT {int(batch_size)}",
+                (last_id,),
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            bounds = geometry_bounds(r[1] for r in rows)
+            keep = [i for i, v in enumerate(bounds["min_x"]) if v is not None]
+            if keep:
+                _stage_update(
+                    db, table, [rows[i][0] for i in keep],
+                    {c: [bounds[c][i] for i in keep] for c in BOUNDS_COLUMNS},
+                )
+                count += len(keep)
+        if count:
+            log.info(f"Backfilled geometry bounds for {count} {table} rows")
+        updated += count
+    return updated
+
+
+def backfill_parcel_points(db: Database) -> set[str]:
+    """Locate parcels without coordinates at their valuation lot's centroid.
+
+    A parcel source may carry addresses only. Such parcels take the centroid
+    of the first ``property_valuations`` row (by id) at their address key,
+    marked ``location_source = 'valuation'`` so a later run moves them with
+    the lot, or clears them when it is gone; a source's own coordinates are
+    never overwritten. Returns the ids of the parcels whose point changed.
+    """
+    if not db.column_info("property_valuations"):
+        return set()
+    rows = db.fetchall(
+        "SELECT p.id, v.centroid_y, v.centroid_x FROM parcels p "
+        "LEFT JOIN (SELECT address_key, centroid_x, centroid_y, "
+        "ROW_NUMBER() OVER (PARTITION BY address_key ORDER BY id) AS rn FROM property_valuations "
+        "WHERE address_key IS NOT NULL AND centroid_x IS NOT NULL AND centroid_y IS NOT NULL) v "
+        "ON v.address_key = p.address_key AND v.rn = 1 "
+        "WHERE (p.location_source IS NULL AND (p.latitude IS NULL OR p.longitude IS NULL) "
+        "AND v.centroid_x IS NOT NULL) "
+        "OR (p.location_source = 'valuation' AND (v.centroid_x IS NULL "
+        "OR p.latitude IS DISTINCT FROM v.centroid_y OR p.longitude IS DISTINCT FROM v.centroid_x))"
+    )
+    if not rows:
+        return set()
+    lats = [r[1] for r in rows]
+    lons = [r[2] for r in rows]
+    _stage_update(db, "parcels", [r[0] for r in rows], {
+        "latitude": lats,
+        "longitude": lons,
+        "location_source": ["valuation" if lat is not None else None for lat in lats],
+        **cell_keys(lats, lons),
+    })
+    log.info(f"Located {len(rows)} parcels at their valuation centroids")
+    return {r[0] for r in rows}
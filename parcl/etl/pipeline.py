@@ -2,19 +2,212 @@
 
 from __future__ import annotations
 
+import itertools
+import os
+import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any
 
-from parcl.config import SourceConfig, load_settings
-from parcl.db import Database
-from parcl.etl.loader import load_records
+from parcl.address_index import INDEXED_TABLES, update_address_index
+from parcl.config import PROJECT_ROOT, SourceConfig, load_settings
+from parcl.db import Database, refresh_statistics
+from parcl.etl.loader import (
+    RESOLVED_TABLES,
+    ReplaceLoad,
+    backfill_parcel_points,
+    load_records,
+)
+from parcl.etl.stages import PageQueue, StageTimer, estimate_page_bytes
 from parcl.etl.transformer import transform_batch
+from parcl.features import FeatureChanges, refresh_features
+from parcl.landing import RawPageWriter, list_pages, list_runs, read_manifest, read_page
+from parcl.links import refresh_links
 from parcl.logger import get_logger
+from parcl.polygons import POLYGON_TABLES
+from parcl.resolve import requeue_for_parcels, resolve_parcels
 from parcl.sources import get_source_class
 
 log = get_logger("pipeline")
 
+# Loads at least this large refresh the target table's planner statistics
+ANALYZE_MIN_ROWS = 10_000
+
+
+def _maybe_analyze(db: Database, table: str, loaded: int, replaced: dict | None) -> bool:
+    """ANALYZE the target table after a large load or a replace swap."""
+    if loaded < ANALYZE_MIN_ROWS and not replaced:
+        return False
+    refresh_statistics(db, [table])
+    return True
+
+
+def _step_errors(db: Database) -> tuple[type[Exception], ...]:
+    """What a post-load step may fail with: a statement the database
+    rejected, or an index that could not be built or saved."""
+    return (*db.errors, OSError, ValueError)
+
+
+def _touched_parcel_ids(db: Database, source_id: str, external_ids: set[str]) -> set[str]:
+    ids = sorted(external_ids)
+    found: set[str] = set()
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        found.update(r[0] for r in db.fetchall(
+            f"SELECT id FROM parcels WHERE source_id = ? AND external_id IN ({', '.join('?' for _ in chunk)})",
+            (source_id, *chunk),
+        ))
+    return found
+
+
+def _locate_parcels(
+    db: Database,
+    source_config: SourceConfig,
+    loaded: int,
+    replace: ReplaceLoad | None,
+    replaced: dict | None,
+) -> int | None:
+    """Place parcels without coordinates at their valuation lot's centroid.
+
+    After a parcel load the located parcels are among those the next steps
+    relink and resolve. After a valuation load the parcels that moved are
+    relinked, resolved and refreshed here. Returns the parcels moved.
+    """
+    table = source_config.target_table
+    if table not in ("parcels", "property_valuations") or not loaded or (replace and not replaced):
+        return None
+    try:
+        moved = backfill_parcel_points(db)
+        if moved and table == "property_valuations":
+            changes = FeatureChanges("parcels", source_config.id)
+            changes.add_parcels(moved)
+            changes.add_parcels(refresh_links(db, parcel_ids=moved)["changed_parcels"])
+            requeue_for_parcels(db, moved)
+            changes.add_parcels(resolve_parcels(db)["parcel_ids"])
+            refresh_features(db, changes)
+    except _step_errors(db) as e:
+        log.error(f"Locating parcels failed after loading {table}: {e}")
+        return None
+    return len(moved)
+
+
+def _refresh_links(
+    db: Database,
+    source_config: SourceConfig,
+    changes: FeatureChanges | None,
+    loaded: int,
+    replace: ReplaceLoad | None,
+    replaced: dict | None,
+) -> dict[str, Any] | None:
+    """Bring parcel_spatial_links up to date with what this run changed.
+
+    A polygon or transit source relinks its own features; a parcel source
+    relinks the parcels it loaded (all of them after a swap that removed rows).
+    The parcels whose links changed are passed on to ``changes``.
+    """
+    table = source_config.target_table
+    if not loaded or (replace and not replaced):
+        return None
+    try:
+        if table in POLYGON_TABLES:
+            result = refresh_links(db, source=(table, source_config.id))
+        elif table == "parcels" and changes is not None:
+            if changes.full or (replaced and replaced["removed"]):
+                result = refresh_links(db)
+            else:
+                result = refresh_links(db, parcel_ids=_touched_parcel_ids(db, source_config.id, changes.external_ids))
+        else:
+            return None
+    except _step_errors(db) as e:
+        log.error(f"Spatial link refresh failed after loading {table}: {e}")
+        return None
+    if changes is not None:
+        changes.add_parcels(result["changed_parcels"])
+    return {"mode": result["mode"], "links": result["links"],
+            "changed_parcels": None if result["changed_parcels"] is None else len(result["changed_parcels"])}
+
+
+def _resolve_parcels(
+    db: Database,
+    source_config: SourceConfig,
+    changes: FeatureChanges | None,
+    loaded: int,
+    replace: ReplaceLoad | None,
+    replaced: dict | None,
+) -> dict[str, Any] | None:
+    """Resolve the rows this run added or changed to parcels.
+
+    A parcel source first queues the rows at, near or resolved to the
+    parcels it loaded (every row after a swap that removed parcels). The
+    parcels whose resolved rows changed are passed on to ``changes``.
+    """
+    table = source_config.target_table
+    if not loaded or (replace and not replaced):
+        return None
+    try:
+        if table in RESOLVED_TABLES:
+            result = resolve_parcels(db, [table])
+        elif table == "parcels" and changes is not None:
+            if changes.full or (replaced and replaced["removed"]):
+                requeue_for_parcels(db)
+            else:
+                requeue_for_parcels(db, _touched_parcel_ids(db, source_config.id, changes.external_ids))
+            result = resolve_parcels(db)
+        else:
+            return None
+    except _step_errors(db) as e:
+        log.error(f"Parcel resolution failed after loading {table}: {e}")
+        return None
+    if changes is not None:
+        changes.add_parcels(result["parcel_ids"])
+    return result["rows"]
+
+
+def _refresh_address_index(
+    db: Database,
+    source_config: SourceConfig,
+    changes: FeatureChanges | None,
+    loaded: int,
+    replace: ReplaceLoad | None,
+    replaced: dict | None,
+) -> int | None:
+    """Update the saved address index with the addresses this run loaded:
+    the parcels it touched, or, for valuations and swaps that removed rows,
+    every address that differs. Returns the addresses updated."""
+    table = source_config.target_table
+    if table not in INDEXED_TABLES or not loaded or (replace and not replaced):
+        return None
+    try:
+        if table == "parcels" and changes is not None and not changes.full and not (replaced and replaced["removed"]):
+            return update_address_index(db, table, _touched_parcel_ids(db, source_config.id, changes.external_ids))
+        return update_address_index(db, table)
+    except _step_errors(db) as e:
+        log.error(f"Address index update failed after loading {table}: {e}")
+        return None
+
+
+def _refresh_features(
+    db: Database,
+    changes: FeatureChanges | None,
+    loaded: int,
+    replace: ReplaceLoad | None,
+    replaced: dict | None,
+) -> dict[str, Any] | None:
+    """Bring parcel_features up to date with what this run changed."""
+    if changes is None or not loaded or (replace and not replaced):
+        return None
+    if replaced:
+        changes.removed(replaced["removed"])
+    try:
+        return refresh_features(db, changes)
+    except _step_errors(db) as e:
+        log.error(f"Feature refresh failed after loading {changes.table}: {e}")
+        return None
+
 
 def _ensure_source_registered(db: Database, source_config: SourceConfig) -> None:
     """Ensure the source is registered in the sources table."""
@@ -38,15 +231,98 @@ def _ensure_source_registered(db: Database, source_config: SourceConfig) -> None
     db.commit()
 
 
+class StageError(Exception):
+    """Wraps the exception that stopped a pipeline stage."""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"{stage} error: {error}")
+        self.stage = stage
+        self.error = error
+
+
+# What a source plugin or a transform raises for a page it cannot fetch or
+# map: network and file errors, undecodable responses and malformed records
+_STAGE_ERRORS = (OSError, ValueError, KeyError, TypeError)
+
+
+def _propagating(stage: str) -> StageError | None:
+    """The exception leaving ``stage`` (from a ``finally``), wrapped, so a
+    stage that dies of anything else still fails the run."""
+    error = sys.exc_info()[1]
+    return StageError(stage, error) if error is not None else None
+
+
+def _fetch_stage(source: Any, out: PageQueue, timer: StageTimer) -> None:
+    """Pull pages from the source plugin into ``out``."""
+    pages = source.fetch()
+    error = None
+    try:
+        while True:
+            with timer.working():
+                batch = next(pages, None)
+            if batch is None:
+                break
+            with timer.waiting():
+                if not out.put(batch, estimate_page_bytes(batch)):
+                    break
+    except _STAGE_ERRORS as e:
+        error = StageError("Fetch", e)
+    finally:
+        pages.close()
+        out.close(error or _propagating("Fetch"))
+
+
+def _transform_stage(
+    source_config: SourceConfig,
+    inp: PageQueue,
+    out: PageQueue,
+    timer: StageTimer,
+    writer: RawPageWriter | None = None,
+) -> None:
+    """Transform raw pages from ``inp`` into ``(raw_count, records)`` on ``out``.
+
+    Raw pages are landed by ``writer`` (if any) before they are transformed.
+    """
+    error = None
+    try:
+        while True:
+            with timer.waiting():
+                batch = inp.get()
+            if batch is None:
+                error = inp.error
+                break
+            with timer.working():
+                if writer:
+                    writer.write(batch)
+                transformed = transform_batch(batch, source_config)
+            with timer.waiting():
+                if not out.put((len(batch), transformed), estimate_page_bytes(transformed)):
+                    break
+    except _STAGE_ERRORS as e:
+        error = StageError("Transform", e)
+    finally:
+        error = error or _propagating("Transform")
+        if error is not None:
+            inp.abort()
+        out.close(error)
+
+
 def run_source(
     source_config: SourceConfig,
     db: Database,
 ) -> dict[str, Any]:
     """Run the full ETL pipeline for a single source.
 
-    Returns a summary dict with rows loaded, duration, errors, etc.
+    Fetch and transform each run on their own thread, connected to the
+    loader (on the calling thread, which owns the DB connection) by queues
+    bounded in pages and bytes. Page N+1 is fetched while page N is being
+    transformed and loaded; a full queue blocks the stage feeding it.
+
+    Returns a summary dict with rows loaded, duration, errors, and busy/idle
+    seconds per stage.
     """
     settings = load_settings()
+    crawler = settings.crawler
     start = time.time()
 
     log.info(f"Starting ETL for source '{source_config.id}'")
@@ -56,37 +332,104 @@ def run_source(
 
     # Instantiate the correct plugin
     source_cls = get_source_class(source_config.source_type)
-    source = source_cls(source_config, settings.crawler)
+    source = source_cls(source_config, crawler)
 
     total_raw = 0
     total_loaded = 0
     page_count = 0
     errors = 0
 
+    replace = None
+    if source_config.load_mode == "replace":
+        replace = ReplaceLoad(db, source_config.target_table, source_config.id)
+    changes = FeatureChanges.for_table(db, source_config.target_table, source_config.id)
+
+    writer = None
+    if settings.landing_enabled:
+        writer = RawPageWriter(PROJECT_ROOT / settings.landing_dir, source_config.id)
+
+    max_bytes = crawler.queue_max_mb * 1024 * 1024
+    raw_q = PageQueue(crawler.queue_max_pages, max_bytes)
+    load_q = PageQueue(crawler.queue_max_pages, max_bytes)
+    timers = {"fetch": StageTimer(), "transform": StageTimer(), "load": StageTimer()}
+    threads = [
+        threading.Thread(
+            target=_fetch_stage, args=(source, raw_q, timers["fetch"]),
+            name=f"fetch-{source_config.id}", daemon=True,
+        ),
+        threading.Thread(
+            target=_transform_stage,
+            args=(source_config, raw_q, load_q, timers["transform"], writer),
+            name=f"transform-{source_config.id}", daemon=True,
+        ),
+    ]
+    for t in threads:
+        t.start()
+
     try:
-        for batch in source.fetch():
+        while True:
+            with timers["load"].waiting():
+                item = load_q.get()
+            if item is None:
+                break
+            raw_count, transformed = item
             page_count += 1
-            total_raw += len(batch)
+            total_raw += raw_count
 
-            # Transform
-            transformed = transform_batch(batch, source_config)
-            skipped = len(batch) - len(transformed)
+            skipped = raw_count - len(transformed)
             if skipped > 0:
                 log.debug(f"Page {page_count}: skipped {skipped} records (missing required fields)")
 
             # Load
             try:
-                loaded = load_records(db, source_config.target_table, transformed)
+                with timers["load"].working():
+                    if changes:
+                        changes.capture(db, transformed)
+                    if replace:
+                        loaded = replace.load(transformed)
+                    else:
+                        loaded = load_records(db, source_config.target_table, transformed)
+                    if changes:
+                        changes.add(transformed)
                 total_loaded += loaded
             except Exception as e:
                 errors += 1
+                loaded = 0
                 log.error(f"Load error on page {page_count}: {e}")
 
             log.info(f"Page {page_count}: {len(transformed)} transformed, {loaded} loaded")
+    finally:
+        # Normal end: both stages have already closed their queues. On an
+        # exception here this unblocks them so the threads can exit.
+        raw_q.abort()
+        load_q.abort()
+        for t in threads:
+            t.join()
 
-    except Exception as e:
+    if load_q.error is not None:
         errors += 1
-        log.error(f"Fetch error for source '{source_config.id}': {e}")
+        log.error(f"{load_q.error} (source '{source_config.id}')")
+
+    if writer:
+        writer.finish(complete=source.complete and load_q.error is None)
+
+    replaced = None
+    if replace:
+        # Only a complete, error-free fetch may replace the current rows
+        if errors or not source.complete or not total_loaded:
+            log.warning(
+                f"Not replacing rows for '{source_config.id}': "
+                f"errors={errors}, complete={source.complete}, loaded={total_loaded}"
+            )
+            replace.discard()
+        else:
+            replaced = replace.swap()
+    analyzed = _maybe_analyze(db, source_config.target_table, total_loaded, replaced)
+    located = _locate_parcels(db, source_config, total_loaded, replace, replaced)
+    links = _refresh_links(db, source_config, changes, total_loaded, replace, replaced)
+    resolved = _resolve_parcels(db, source_config, changes, total_loaded, replace, replaced)
+    addresses = _refresh_address_index(db, source_config, changes, total_loaded, replace, replaced)
+    features = _refresh_features(db, changes, total_loaded, replace, replaced)
 
     duration = time.time() - start
 
@@ -105,7 +448,149 @@ def run_source(
         "raw_records": total_raw,
         "loaded_records": total_loaded,
         "errors": errors,
+        "analyzed": analyzed,
+        "located": located,
+        "links": links,
+        "resolved": resolved,
+        "addresses_indexed": addresses,
+        "features": features,
         "duration_seconds": round(duration, 2),
     }
+    if writer:
+        summary["raw_run_id"] = writer.run_id
+    summary["stages"] = {name: timer.as_dict() for name, timer in timers.items()}
+    summary["bottleneck"] = max(timers, key=lambda name: timers[name].busy)
+    summary["queue_peak_pages"] = max(raw_q.peak_pages, load_q.peak_pages)
+    if replace:
+        summary["load_mode"] = "replace"
+        summary["replaced"] = replaced is not None
+        if replaced:
+            summary["removed_records"] = replaced["removed"]
+    summary.update(source.stats)
     log.info(f"ETL complete: {summary}")
     return summary
+
+
+def _transform_landed_page(path: Path, source_config: SourceConfig) -> tuple[int, list[dict[str, Any]]]:
+    """Worker: read one landed page and transform it."""
+    batch = read_page(path)
+    return len(batch), transform_batch(batch, source_config)
+
+
+def retransform_source(
+    source_config: SourceConfig,
+    db: Database,
+    run_id: str | None = None,
+    workers: int | None = None,
+) -> dict[str, Any]:
+    """Replay a landed run through the transformer and loader, no network.
+
+    Pages are read and transformed in a process pool and loaded in page
+    order on the calling thread. At most ``2 * workers`` transformed pages
+    are held in memory at a time. Replace-mode sources are only swapped
+    when the landed run was complete.
+    """
+    settings = load_settings()
+    root = PROJECT_ROOT / settings.landing_dir
+    runs = list_runs(root, source_config.id)
+    if run_id is None:
+        if not runs:
+            raise ValueError(f"No landed runs for source '{source_config.id}' under {root}")
+        run_id = runs[-1]
+    elif run_id not in runs:
+        raise ValueError(f"Run '{run_id}' not found for source '{source_config.id}'. Available: {runs}")
+    manifest = read_manifest(root, source_config.id, run_id)
+    pages = list_pages(root, source_config.id, run_id)
+    workers = workers or min(len(pages), os.cpu_count() or 1) or 1
+
+    log.info(f"Retransforming {len(pages)} pages of '{source_config.id}' run {run_id} with {workers} workers")
+    start = time.time()
+    _ensure_source_registered(db, source_config)
+
+    replace = None
+    if source_config.load_mode == "replace":
+        replace = ReplaceLoad(db, source_config.target_table, source_config.id)
+    changes = FeatureChanges.for_table(db, source_config.target_table, source_config.id)
+
+    total_raw = 0
+    total_loaded = 0
+    errors = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future] = deque()
+        todo = iter(pages)
+        for path in itertools.islice(todo, 2 * workers):
+            pending.append(pool.submit(_transform_landed_page, path, source_config))
+        page_num = 0
+        while pending:
+            page_num += 1
+            try:
+                raw_count, transformed = pending.popleft().result()
+            except _STAGE_ERRORS as e:
+                errors += 1
+                log.error(f"Transform error on landed page {page_num}: {e}")
+                raw_count, transformed = 0, []
+            for path in itertools.islice(todo, 1):
+                pending.append(pool.submit(_transform_landed_page, path, source_config))
+
+            total_raw += raw_count
+            try:
+                if changes:
+                    changes.capture(db, transformed)
+                if replace:
+                    total_loaded += replace.load(transformed)
+                else:
+                    total_loaded += load_records(db, source_config.target_table, transformed)
+                if changes:
+                    changes.add(transformed)
+            except _step_errors(db) as e:
+                errors += 1
+                log.error(f"Load error on landed page {page_num}: {e}")
+
+    replaced = None
+    if replace:
+        if errors or not manifest.get("complete") or not total_loaded:
+            log.warning(
+                f"Not replacing rows for '{source_config.id}': errors={errors}, "
+                f"complete={manifest.get('complete')}, loaded={total_loaded}"
+            )
+            replace.discard()
+        else:
+            replaced = replace.swap()
+    analyzed = _maybe_analyze(db, source_config.target_table, total_loaded, replaced)
+    located = _locate_parcels(db, source_config, total_loaded, replace, replaced)
+    links = _refresh_links(db, source_config, changes, total_loaded, replace, replaced)
+    resolved = _resolve_parcels(db, source_config, changes, total_loaded, replace, replaced)
+    addresses = _refresh_address_index(db, source_config, changes, total_loaded, replace, replaced)
+    features = _refresh_features(db, changes, total_loaded, replace, replaced)
+
+    # The table was rewritten: count it as a run, which also versions cached profiles
+    db.execute(
+        "UPDATE sources SET last_run_at = ?, last_row_count = ? WHERE id = ?",
+        (datetime.now(timezone.utc).isoformat(), total_loaded, source_config.id),
+    )
+    db.commit()
+
+    summary = {
+        "source_id": source_config.id,
+        "target_table": source_config.target_table,
+        "raw_run_id": run_id,
+        "pages": len(pages),
+        "raw_records": total_raw,
+        "loaded_records": total_loaded,
+        "errors": errors,
+        "workers": workers,
+        "analyzed": analyzed,
+        "located": located,
+        "links": links,
+        "resolved": resolved,
+        "addresses_indexed": addresses,
+        "features": features,
+        "duration_seconds": round(time.time() - start, 2),
+    }
+    if replace:
+        summary["load_mode"] = "replace"
+        summary["replaced"] = replaced is not None
+        if replaced:
+            summary["removed_records"] = replaced["removed"]
+    log.info(f"Retransform complete: {summary}")
+    return summary
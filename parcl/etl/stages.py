@@ -0,0 +1,127 @@
+"""Bounded page queues and stage timers for the threaded ETL pipeline."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+
+def estimate_page_bytes(records: list[dict[str, Any]], sample: int = 20) -> int:
+    """Rough in-memory size of a page, from a sample of its records.
+
+    Strings and binary values count their length, everything else a flat
+    16 bytes. It only has to be good enough to bound queue memory.
+    """
+    if not records:
+        return 0
+    step = max(1, len(records) // sample)
+    picked = records[::step]
+    size = 0
+    for record in picked:
+        for key, value in record.items():
+            size += len(key)
+            size += len(value) if isinstance(value, (str, bytes, bytearray)) else 16
+    return size * len(records) // len(picked)
+
+
+class PageQueue:
+    """FIFO of pages bounded by page count and by estimated bytes.
+
+    ``put`` blocks while the queue is full, which is what pushes back on a
+    faster upstream stage. A single page larger than ``max_bytes`` is still
+    admitted when the queue is empty, so an oversized page cannot deadlock.
+
+    The producer ends the stream with :meth:`close` (optionally carrying
+    the error that stopped it); consumers drain what is left and then get
+    ``None``. :meth:`abort` is the shutdown path: it drops queued pages and
+    makes every blocked ``put``/``get`` return immediately.
+    """
+
+    def __init__(self, max_pages: int, max_bytes: int):
+        self.max_pages = max(1, max_pages)
+        self.max_bytes = max(1, max_bytes)
+        self.error: BaseException | None = None
+        self.peak_pages = 0
+        self.peak_bytes = 0
+        self._items: deque[tuple[Any, int]] = deque()
+        self._bytes = 0
+        self._closed = False
+        self._aborted = False
+        self._cond = threading.Condition()
+
+    def _full(self, size: int) -> bool:
+        if not self._items:
+            return False
+        return len(self._items) >= self.max_pages or self._bytes + size > self.max_bytes
+
+    def put(self, item: Any, size: int) -> bool:
+        """Enqueue a page; returns False if the queue was aborted or closed."""
+        with self._cond:
+            while self._full(size) and not (self._closed or self._aborted):
+                self._cond.wait()
+            if self._closed or self._aborted:
+                return False
+            self._items.append((item, size))
+            self._bytes += size
+            self.peak_pages = max(self.peak_pages, len(self._items))
+            self.peak_bytes = max(self.peak_bytes, self._bytes)
+            self._cond.notify_all()
+            return True
+
+    def get(self) -> Any | None:
+        """Dequeue the next page, or None once the stream has ended."""
+        with self._cond:
+            while not self._items and not (self._closed or self._aborted):
+                self._cond.wait()
+            if self._aborted or not self._items:
+                return None
+            item, size = self._items.popleft()
+            self._bytes -= size
+            self._cond.notify_all()
+            return item
+
+    def close(self, error: BaseException | None = None) -> None:
+        """End the stream; queued pages can still be consumed."""
+        with self._cond:
+            self._closed = True
+            if error is not None and self.error is None:
+                self.error = error
+            self._cond.notify_all()
+
+    def abort(self) -> None:
+        """Drop queued pages and wake every waiter."""
+        with self._cond:
+            self._aborted = True
+            self._items.clear()
+            self._bytes = 0
+            self._cond.notify_all()
+
+
+class StageTimer:
+    """Accumulates busy (doing work) and idle (blocked on a queue) time."""
+
+    def __init__(self) -> None:
+        self.busy = 0.0
+        self.idle = 0.0
+
+    @contextmanager
+    def working(self) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.busy += time.perf_counter() - t0
+
+    @contextmanager
+    def waiting(self) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.idle += time.perf_counter() - t0
+
+    def as_dict(self) -> dict[str, float]:
+        return {"busy_seconds": round(self.busy, 3), "idle_seconds": round(self.idle, 3)}
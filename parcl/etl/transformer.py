@@ -7,7 +7,7 @@ import uuid
 from datetime import date, datetime
 from typing import Any
 
-from parcl.address import normalize_address
+from parcl.address import normalize_address, normalize_addresses, parse_address
 from parcl.config import FieldMapping, SourceConfig
 from parcl.logger import get_logger
 
@@ -40,6 +40,8 @@ def coerce_value(value: Any, target_type: str) -> Any:
             return s  # Return as-is if unparseable
         elif target_type == "boolean":
             return str(value).lower() in ("true", "1", "yes")
+        elif target_type == "wkb":
+            return bytes(value)
         else:
             return value
     except (ValueError, TypeError) as e:
@@ -55,6 +57,19 @@ def transform_record(
 
     Returns a dict with schema field names, or None if required fields missing.
     """
+    mapped = _map_record(raw, source_config)
+    if mapped is not None and mapped.get("address"):
+        mapped["address_norm"] = normalize_address(mapped["address"])
+        mapped.update(parse_address(mapped["address"]).as_columns())
+    return mapped
+
+
+def _map_record(
+    raw: dict[str, Any],
+    source_config: SourceConfig,
+) -> dict[str, Any] | None:
+    """Apply field_map, ids and table defaults; address normalization is left
+    to the caller so batches can normalize in one pass."""
     mapped: dict[str, Any] = {}
 
     for fm in source_config.field_map:
@@ -91,12 +106,11 @@ def transform_record(
         external_id = str(uuid.uuid5(uuid.NAMESPACE_URL, json.dumps(raw, sort_keys=True, default=str)))
     mapped["external_id"] = external_id
 
-    # Normalize address if present
-    if "address" in mapped and mapped["address"]:
-        mapped["address_norm"] = normalize_address(mapped["address"])
-
-    # Store raw payload for audit
-    mapped["raw_payload"] = json.dumps(raw, default=str)
+    # Store raw payload for audit (binary geometry lives in its own column)
+    mapped["raw_payload"] = json.dumps(
+        {k: v for k, v in raw.items() if not isinstance(v, (bytes, bytearray))},
+        default=str,
+    )
 
     # Add constraint_type / utility_type defaults based on source
     table = source_config.target_table
@@ -158,7 +172,14 @@ def transform_batch(
     """Transform a batch of raw records. Skips records with missing required fields."""
     results = []
     for raw in records:
-        mapped = transform_record(raw, source_config)
+        mapped = _map_record(raw, source_config)
         if mapped is not None:
             results.append(mapped)
+
+    # Normalize and parse addresses for the whole page at once
+    with_address = [r for r in results if r.get("address")]
+    norms = normalize_addresses(r["address"] for r in with_address)
+    for record, norm in zip(with_address, norms):
+        record["address_norm"] = norm
+        record.update(parse_address(record["address"]).as_columns())
     return results
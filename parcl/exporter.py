@@ -1,10 +1,22 @@
-"""Export parcel_features view to CSV, Parquet, or JSONL."""
+"""Export the parcel_features table to CSV, Parquet, or JSONL.
+
+On DuckDB the database writes the file itself with ``COPY (SELECT ...) TO``,
+in parallel and without passing rows through Python. On PostgreSQL rows are
+streamed: fetched :data:`EXPORT_BATCH_ROWS` at a time through a server-side
+cursor and appended to the output file batch by batch, each batch one
+Parquet row group, so memory stays flat however many parcels there are.
+Both paths write the same columns in the same order and the same CSV and
+JSON text. The file is written beside its final path and moved into place
+once complete.
+"""
 
 from __future__ import annotations
 
 import csv
 import json
+import time
 from pathlib import Path
+from typing import Any, Iterator
 
 from parcl.config import PROJECT_ROOT
 from parcl.db import Database
@@ -12,7 +24,7 @@ from parcl.logger import get_logger
 
 log = get_logger("exporter")
 
-# Columns in the parcel_features view
+# Exported columns of parcel_features
 VIEW_COLUMNS = [
     "parcel_id", "address", "address_norm", "city", "state", "zip_code",
     "county", "latitude", "longitude", "base_zoning", "zoning_desc",
@@ -21,52 +33,201 @@ VIEW_COLUMNS = [
     "environmental_flags", "overlay_count", "fetched_at",
 ]
 
+# Rows per Parquet row group, and rows fetched at a time on PostgreSQL
+EXPORT_BATCH_ROWS = 50_000
 
-def export_data(db: Database, fmt: str, output_dir: str | None = None) -> str:
-    """Export parcel_features view to the specified format.
+# Parquet compression codecs understood by both DuckDB and pyarrow
+PARQUET_CODECS = ("snappy", "zstd", "gzip", "lz4", "brotli", "uncompressed")
+
+# Seconds between progress log lines
+PROGRESS_INTERVAL = 5.0
+
+# COPY format of each export format
+_COPY_FORMATS = {"csv": "FORMAT CSV, HEADER", "jsonl": "FORMAT JSON", "parquet": "FORMAT PARQUET"}
+
+
+def export_data(
+    db: Database,
+    fmt: str,
+    output_dir: str | None = None,
+    compression: str = "snappy",
+    row_group_size: int = EXPORT_BATCH_ROWS,
+    threads: int | None = None,
+) -> str:
+    """Export parcel_features to the specified format.
+
+    ``compression`` (one of PARQUET_CODECS) and ``row_group_size`` apply to
+    Parquet. ``threads`` caps the DuckDB threads writing the file; None or
+    0 keeps the connection's setting.
 
     Returns the output file path.
     """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    if compression not in PARQUET_CODECS:
+        raise ValueError(f"Unsupported compression: {compression} (expected one of {', '.join(PARQUET_CODECS)})")
+    if row_group_size < 1:
+        raise ValueError(f"row_group_size must be positive, got {row_group_size}")
     out_dir = Path(output_dir) if output_dir else PROJECT_ROOT / "data" / "exports"
     out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"parcel_features.{fmt}"
+    tmp = path.with_name(path.name + ".tmp")
+
+    start = time.monotonic()
+    try:
+        if db.db_type == "duckdb":
+            written = _copy_export(db, fmt, tmp, compression, row_group_size, threads)
+        else:
+            written = _stream_export(db, fmt, tmp, compression, row_group_size)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    tmp.replace(path)
+    elapsed = time.monotonic() - start
+    log.info(f"Exported {written:,} rows to {path} in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/s)")
+    return str(path)
 
-    rows = db.fetchall("SELECT * FROM parcel_features")
 
-    if fmt == "csv":
-        return _export_csv(rows, out_dir)
-    elif fmt == "parquet":
-        return _export_parquet(rows, out_dir)
-    elif fmt == "jsonl":
-        return _export_jsonl(rows, out_dir)
+def _select_sql() -> str:
+    return f"SELECT {', '.join(VIEW_COLUMNS)} FROM parcel_features ORDER BY parcel_id"
+
+
+def _copy_export(
+    db: Database, fmt: str, path: Path, compression: str, row_group_size: int, threads: int | None
+) -> int:
+    """Write the export with DuckDB's COPY; returns the row count."""
+    options = _COPY_FORMATS[fmt]
+    if fmt == "parquet":
+        options += f", COMPRESSION {compression}, ROW_GROUP_SIZE {int(row_group_size)}"
+    target = str(path).replace("'", "''")
+    previous = db.fetchone("SELECT current_setting('threads')")[0] if threads else None
+    if threads:
+        db.execute(f"SET threads = {int(threads)}")
+    try:
+        return db.fetchone(f"COPY ({_select_sql()}) TO '{target}' ({options})")[0]
+    finally:
+        if previous is not None:
+            db.execute(f"SET threads = {int(previous)}")
+
+
+def _stream_export(db: Database, fmt: str, path: Path, compression: str, row_group_size: int) -> int:
+    """Write the export from rows fetched in batches; returns the row count."""
+    total = db.fetchone("SELECT COUNT(*) FROM parcel_features")[0]
+    start = last_log = time.monotonic()
+    written = 0
+    with _WRITERS[fmt](path, db, compression) as writer:
+        for rows in _row_batches(db, _select_sql(), row_group_size):
+            writer.write(rows)
+            written += len(rows)
+            now = time.monotonic()
+            if now - last_log >= PROGRESS_INTERVAL:
+                log.info(f"Exported {written:,}/{total:,} rows ({written / (now - start):,.0f} rows/s)")
+                last_log = now
+    return written
+
+
+def _row_batches(db: Database, sql: str, batch_rows: int) -> Iterator[list[tuple]]:
+    """Yield the rows of ``sql`` in lists of at most ``batch_rows``.
+
+    PostgreSQL reads through a named (server-side) cursor, which psycopg2
+    fetches ``itersize`` rows at a time instead of all at once.
+    """
+    if db.db_type == "postgresql":
+        cur = db.conn.cursor(name="parcl_export")
+        cur.itersize = batch_rows
+        cur.execute(sql)
     else:
-        raise ValueError(f"Unsupported format: {fmt}")
+        cur = db.execute(sql)
+    try:
+        while rows := cur.fetchmany(batch_rows):
+            yield rows
+    finally:
+        if db.db_type == "postgresql":
+            cur.close()
+            db.commit()
 
 
-def _export_csv(rows: list[tuple], out_dir: Path) -> str:
-    path = out_dir / "parcel_features.csv"
-    with open(path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(VIEW_COLUMNS)
-        writer.writerows(rows)
-    log.info(f"Exported {len(rows)} rows to {path}")
-    return str(path)
+class _FileWriter:
+    """Writes a text file, open for the duration of a ``with`` block."""
 
+    def __init__(self, path: Path, db: Database, compression: str):
+        self.path = path
 
-def _export_parquet(rows: list[tuple], out_dir: Path) -> str:
-    import pandas as pd
+    def __enter__(self) -> _FileWriter:
+        self.file = open(self.path, "w", newline="", encoding="utf-8")
+        return self
 
-    path = out_dir / "parcel_features.parquet"
-    df = pd.DataFrame(rows, columns=VIEW_COLUMNS)
-    df.to_parquet(str(path), index=False)
-    log.info(f"Exported {len(rows)} rows to {path}")
-    return str(path)
+    def __exit__(self, *exc: Any) -> None:
+        self.file.close()
 
 
-def _export_jsonl(rows: list[tuple], out_dir: Path) -> str:
-    path = out_dir / "parcel_features.jsonl"
-    with open(path, "w") as f:
-        for row in rows:
-            record = dict(zip(VIEW_COLUMNS, row))
-            f.write(json.dumps(record, default=str) + "\n")
-    log.info(f"Exported {len(rows)} rows to {path}")
-    return str(path)
+class _CsvWriter(_FileWriter):
+    def __enter__(self) -> _CsvWriter:
+        super().__enter__()
+        # Unix line ends, as DuckDB's COPY writes them
+        self.writer = csv.writer(self.file, lineterminator="\n")
+        self.writer.writerow(VIEW_COLUMNS)
+        return self
+
+    def write(self, rows: list[tuple]) -> None:
+        self.writer.writerows(rows)
+
+
+class _JsonlWriter(_FileWriter):
+    def write(self, rows: list[tuple]) -> None:
+        # Compact and unescaped, as DuckDB's COPY writes JSON
+        self.file.writelines(
+            json.dumps(dict(zip(VIEW_COLUMNS, row)), default=str, separators=(",", ":"), ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+class _ParquetWriter:
+    """Appends each batch as a row group under a schema fixed up front, so
+    a batch whose column happens to be all NULL still matches the rest."""
+
+    def __init__(self, path: Path, db: Database, compression: str):
+        import pyarrow as pa
+
+        self.pa = pa
+        self.path = path
+        self.schema = _arrow_schema(db)
+        self.compression = "none" if compression == "uncompressed" else compression
+
+    def __enter__(self) -> _ParquetWriter:
+        import pyarrow.parquet as pq
+
+        self.writer = pq.ParquetWriter(str(self.path), self.schema, compression=self.compression)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.writer.close()
+
+    def write(self, rows: list[tuple]) -> None:
+        pa = self.pa
+        columns = list(zip(*rows))
+        arrays = [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+
+_WRITERS: dict[str, Any] = {"csv": _CsvWriter, "jsonl": _JsonlWriter, "parquet": _ParquetWriter}
+
+
+def _arrow_schema(db: Database) -> Any:
+    """Arrow schema of VIEW_COLUMNS from the declared parcel_features types."""
+    import pyarrow as pa
+
+    info = db.column_info("parcel_features")
+    fields = []
+    for column in VIEW_COLUMNS:
+        dtype = info.get(column, ("TEXT", True))[0]
+        if dtype in ("BIGINT", "INTEGER", "SMALLINT"):
+            arrow_type = pa.int64()
+        elif dtype in ("DOUBLE", "DOUBLE PRECISION", "REAL", "FLOAT"):
+            arrow_type = pa.float64()
+        elif dtype.startswith("TIMESTAMP"):
+            arrow_type = pa.timestamp("us")
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields)
@@ -0,0 +1,217 @@
+"""Maintain the parcel_features table.
+
+``parcel_features`` holds one row per parcel with counts of the permits,
+cases and constraints resolved to it (see :mod:`parcl.resolve`) or nearby. :func:`refresh_features`
+rebuilds it with the set-based query in ``sql/features.sql``, either for every
+parcel or only for the parcels a load touched, as collected by
+:class:`FeatureChanges`. Overlay counts and polygon constraints come from
+``parcel_spatial_links`` (see :mod:`parcl.links`), which must be refreshed
+first.
+
+Only the date-relative ``permits_5yr`` count ages without a load touching the
+parcel; a periodic full refresh (``parcl db --refresh-features``) keeps it
+current.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from parcl.config import PROJECT_ROOT
+from parcl.db import Database
+from parcl.grid import CELL_COLUMNS, cells_near, level_for_radius
+from parcl.logger import get_logger
+
+log = get_logger("features")
+
+# Half-width in degrees of the box around a parcel that counts nearby constraints
+ENV_RADIUS = 0.001
+
+# Tables whose rows feed parcel_features, and whether their coordinates matter
+FEATURE_TABLES = {
+    "parcels": False,
+    "permits": False,
+    "zoning_cases": False,
+    "boa_cases": False,
+    "environmental_constraints": True,
+    "zoning_overlays": False,
+}
+
+# Past this many touched keys/points an incremental refresh is not worth it
+MAX_TRACKED = 50_000
+
+_CHUNK = 500
+_KEYS = "_parcl_touched_keys"
+_POINTS = "_parcl_touched_points"
+_CELLS = "_parcl_touched_cells"
+# Cell column that covers an ENV_RADIUS box with at most 3 x 3 cells
+_ENV_CELL = CELL_COLUMNS[level_for_radius(ENV_RADIUS)]
+_IDS = "_parcl_touched_ids"
+_PARCELS = "_parcl_touched_parcels"
+
+
+class FeatureChanges:
+    """What one source run touched, for an incremental feature refresh.
+
+    Call :meth:`capture` with each page before it is loaded (it records the
+    address keys and points the page's rows had before the load, so rows
+    that moved also refresh their old parcels) and :meth:`add` after it.
+    Parcels whose spatial links or resolved rows changed (see
+    :mod:`parcl.links` and :mod:`parcl.resolve`) are reported through
+    :meth:`add_parcels`.
+    """
+
+    def __init__(self, table: str, source_id: str):
+        self.table = table
+        self.source_id = source_id
+        self.use_points = FEATURE_TABLES.get(table, False)
+        self.keys: set[str] = set()
+        self.points: set[tuple[float, float]] = set()
+        self.external_ids: set[str] = set()
+        self.parcel_ids: set[str] = set()
+        self.full = False
+
+    @classmethod
+    def for_table(cls, db: Database, table: str, source_id: str) -> FeatureChanges | None:
+        """Return a tracker, or None when the table does not feed parcel_features."""
+        if table not in FEATURE_TABLES:
+            return None
+        return cls(table, source_id)
+
+    def _tracking(self) -> bool:
+        if self.full:
+            return False
+        tracked = len(self.keys) + len(self.points) + len(self.external_ids) + len(self.parcel_ids)
+        if tracked > MAX_TRACKED:
+            log.debug(f"More than {MAX_TRACKED} touched rows in {self.table}; will refresh all features")
+            self.full = True
+            return False
+        return True
+
+    def capture(self, db: Database, records: list[dict[str, Any]]) -> None:
+        """Record the current keys and points of rows about to be overwritten."""
+        # Parcels are tracked by external id and overlays (no address key) through links
+        if not self._tracking() or self.table in ("parcels", "zoning_overlays"):
+            return
+        columns = "address_key, latitude, longitude" if self.use_points else "address_key"
+        ids = list({r["external_id"] for r in records if r.get("external_id") is not None})
+        for i in range(0, len(ids), _CHUNK):
+            chunk = ids[i:i + _CHUNK]
+            rows = db.fetchall(
+                f"SELECT {columns} FROM {self.table} WHERE source_id = ? "
+                f"AND external_id IN ({', '.join('?' for _ in chunk)})",
+                (self.source_id, *chunk),
+            )
+            for row in rows:
+                self._add_row(row[0], *row[1:])
+
+    def add(self, records: list[dict[str, Any]]) -> None:
+        """Record the keys and points of rows that were just loaded."""
+        if not self._tracking() or self.table == "zoning_overlays":
+            return
+        for r in records:
+            if self.table == "parcels":
+                if r.get("external_id") is not None:
+                    self.external_ids.add(str(r["external_id"]))
+            else:
+                self._add_row(r.get("address_key"), r.get("latitude"), r.get("longitude"))
+
+    def _add_row(self, key: str | None, lat: float | None = None, lon: float | None = None) -> None:
+        if key:
+            self.keys.add(key)
+        if self.use_points and lat is not None and lon is not None:
+            self.points.add((float(lat), float(lon)))
+
+    def removed(self, count: int) -> None:
+        """Rows were deleted (replace swap); their parcels are unknown, so go full."""
+        if count:
+            self.full = True
+
+    def add_parcels(self, parcel_ids: set[str] | None) -> None:
+        """Record parcels to refresh by id; None means all of them."""
+        if parcel_ids is None:
+            self.full = True
+        elif self._tracking():
+            self.parcel_ids.update(parcel_ids)
+
+
+def _features_sql(parcel_filter: str) -> str:
+    sql = (PROJECT_ROOT / "sql" / "features.sql").read_text()
+    return sql.replace("{PARCEL_FILTER}", parcel_filter).replace("{ENV_RADIUS}", repr(ENV_RADIUS))
+
+
+def _fill_touched(db: Database, changes: FeatureChanges) -> None:
+    db.execute(f"CREATE TEMP TABLE {_KEYS} AS SELECT address_key FROM parcels LIMIT 0")
+    db.execute(f"CREATE TEMP TABLE {_POINTS} AS SELECT latitude, longitude FROM parcels LIMIT 0")
+    db.execute(f"CREATE TEMP TABLE {_IDS} AS SELECT external_id FROM parcels LIMIT 0")
+    db.execute(f"CREATE TEMP TABLE {_PARCELS} AS SELECT id FROM parcels LIMIT 0")
+    if changes.keys:
+        db.executemany(f"INSERT INTO {_KEYS} VALUES (?)", [(k,) for k in changes.keys])
+    if changes.points:
+        db.executemany(f"INSERT INTO {_POINTS} VALUES (?, ?)", list(changes.points))
+        cells = {key for lat, lon in changes.points for key in cells_near(lat, lon, ENV_RADIUS)[1]}
+        db.execute(f"CREATE TEMP TABLE {_CELLS} AS SELECT {_ENV_CELL} AS cell FROM parcels LIMIT 0")
+        db.executemany(f"INSERT INTO {_CELLS} VALUES (?)", [(c,) for c in cells])
+    if changes.external_ids:
+        db.executemany(f"INSERT INTO {_IDS} VALUES (?)", [(i,) for i in changes.external_ids])
+    if changes.parcel_ids:
+        db.executemany(f"INSERT INTO {_PARCELS} VALUES (?)", [(i,) for i in changes.parcel_ids])
+
+
+def _drop_touched(db: Database) -> None:
+    for name in (_KEYS, _POINTS, _CELLS, _IDS, _PARCELS):
+        db.execute(f"DROP TABLE IF EXISTS {name}")
+    db.commit()
+
+
+def _incremental_filter(changes: FeatureChanges) -> tuple[str, tuple]:
+    clauses: list[str] = []
+    params: list[Any] = []
+    if changes.keys:
+        clauses.append(f"p.address_key IN (SELECT address_key FROM {_KEYS})")
+    if changes.external_ids:
+        clauses.append(f"(p.source_id = ? AND p.external_id IN (SELECT external_id FROM {_IDS}))")
+        params.append(changes.source_id)
+    if changes.points:
+        # Parcels in the cells around a touched point, then the exact box test
+        clauses.append(
+            f"(p.{_ENV_CELL} IN (SELECT cell FROM {_CELLS}) AND EXISTS (SELECT 1 FROM {_POINTS} t "
+            f"WHERE p.latitude > t.latitude - {ENV_RADIUS!r} AND p.latitude < t.latitude + {ENV_RADIUS!r} "
+            f"AND p.longitude > t.longitude - {ENV_RADIUS!r} AND p.longitude < t.longitude + {ENV_RADIUS!r}))"
+        )
+    if changes.parcel_ids:
+        clauses.append(f"p.id IN (SELECT id FROM {_PARCELS})")
+    return " OR ".join(clauses), tuple(params)
+
+
+def refresh_features(db: Database, changes: FeatureChanges | None = None) -> dict[str, Any]:
+    """Rebuild parcel_features, fully or for the parcels ``changes`` touched.
+
+    Returns ``{"mode": "full" | "incremental" | "none", "parcels": n}``.
+    """
+    if changes is not None and not changes.full:
+        where, params = _incremental_filter(changes)
+        if not where:
+            return {"mode": "none", "parcels": 0}
+        _drop_touched(db)
+        _fill_touched(db, changes)
+        try:
+            with db.transaction():
+                db.execute(
+                    "DELETE FROM parcel_features WHERE parcel_id IN "
+                    f"(SELECT id FROM parcels p WHERE {where})",
+                    params,
+                )
+                db.execute(_features_sql(where), params)
+                count = db.fetchone(f"SELECT COUNT(*) FROM parcels p WHERE {where}", params)[0]
+        finally:
+            _drop_touched(db)
+        log.info(f"Refreshed features for {count} parcels touched by {changes.source_id}")
+        return {"mode": "incremental", "parcels": count}
+
+    with db.transaction():
+        db.execute("DELETE FROM parcel_features")
+        db.execute(_features_sql("TRUE"))
+        count = db.fetchone("SELECT COUNT(*) FROM parcel_features")[0]
+    log.info(f"Rebuilt parcel_features: {count} parcels")
+    return {"mode": "full", "parcels": count}
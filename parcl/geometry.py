@@ -0,0 +1,411 @@
+"""Geometry encoding for parcl-crawler: ArcGIS JSON -> WKB, WKT on demand.
+
+Coordinates are held as NumPy ``(n, 2)`` float64 arrays so that encoding to
+WKB is a header plus one ``tobytes()`` per ring, with no per-vertex Python.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+import numpy as np
+
+# OGC WKB geometry type codes (2D)
+WKB_TYPES = {
+    "Point": 1,
+    "LineString": 2,
+    "Polygon": 3,
+    "MultiPoint": 4,
+    "MultiLineString": 5,
+    "MultiPolygon": 6,
+}
+_WKB_KINDS = {code: kind for kind, code in WKB_TYPES.items()}
+
+_LE_F8 = np.dtype("<f8")
+
+
+@dataclass
+class Geometry:
+    """A 2D geometry as nested lists of coordinate arrays.
+
+    ``parts`` is always two lists deep: one entry per part, each a list of
+    ``(n, 2)`` arrays. Polygon parts are ``[shell, *holes]``; point and line
+    parts hold a single array.
+    """
+
+    kind: str
+    parts: list[list[np.ndarray]]
+
+    @property
+    def vertex_count(self) -> int:
+        return sum(len(arr) for part in self.parts for arr in part)
+
+    def coords(self) -> np.ndarray:
+        """All vertices stacked into one ``(n, 2)`` array."""
+        arrays = [arr for part in self.parts for arr in part]
+        if not arrays:
+            return np.empty((0, 2), dtype=_LE_F8)
+        return np.concatenate(arrays)
+
+
+def _as_coords(points: Any) -> np.ndarray:
+    """Convert a list of [x, y, (z, m)] vertices to a contiguous (n, 2) array."""
+    arr = np.asarray(points, dtype=_LE_F8)
+    if arr.ndim != 2 or arr.shape[1] < 2:
+        return np.empty((0, 2), dtype=_LE_F8)
+    return np.ascontiguousarray(arr[:, :2])
+
+
+def signed_area(ring: np.ndarray) -> float:
+    """Shoelace signed area; negative for clockwise rings."""
+    x, y = ring[:, 0], ring[:, 1]
+    return float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])) / 2.0
+
+
+def points_in_ring(xs: np.ndarray, ys: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    """Even-odd ray casting of many points against one ring.
+
+    Returns a boolean array the same length as ``xs``.
+    """
+    x1, y1 = ring[:-1, 0], ring[:-1, 1]
+    x2, y2 = ring[1:, 0], ring[1:, 1]
+    px = xs[:, None]
+    py = ys[:, None]
+    crosses = (y1 > py) != (y2 > py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_at = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+    return np.logical_xor.reduce(crosses & (px < x_at), axis=1)
+
+
+def _group_rings(rings: list[np.ndarray]) -> list[list[np.ndarray]]:
+    """Group ArcGIS rings into polygons.
+
+    ArcGIS writes exterior rings clockwise and holes counter-clockwise. Each
+    hole is attached to the first shell containing its first vertex; a hole
+    with no containing shell is promoted to a shell of its own. If no ring is
+    clockwise the service is not following the convention and every ring is
+    treated as a shell.
+    """
+    areas = [signed_area(r) for r in rings]
+    if not any(a < 0 for a in areas):
+        return [[r] for r in rings]
+
+    polygons = [[r] for r, a in zip(rings, areas) if a < 0]
+    for ring, area in zip(rings, areas):
+        if area < 0:
+            continue
+        x, y = ring[:1, 0], ring[:1, 1]
+        for poly in polygons:
+            if points_in_ring(x, y, poly[0])[0]:
+                poly.append(ring)
+                break
+        else:
+            polygons.append([ring])
+    return polygons
+
+
+def from_arcgis(geom: dict[str, Any] | None) -> Geometry | None:
+    """Parse an ArcGIS JSON geometry (point, multipoint, polyline, polygon)."""
+    if not geom:
+        return None
+    if "rings" in geom:
+        rings = [r for r in (_as_coords(r) for r in geom["rings"] or []) if len(r)]
+        if not rings:
+            return None
+        polygons = _group_rings(rings)
+        return Geometry("Polygon" if len(polygons) == 1 else "MultiPolygon", polygons)
+    if "paths" in geom:
+        paths = [[p] for p in (_as_coords(p) for p in geom["paths"] or []) if len(p)]
+        if not paths:
+            return None
+        return Geometry("LineString" if len(paths) == 1 else "MultiLineString", paths)
+    if "points" in geom:
+        pts = _as_coords(geom["points"] or [])
+        if not len(pts):
+            return None
+        return Geometry("MultiPoint", [[pts[i : i + 1]] for i in range(len(pts))])
+    if "x" in geom and "y" in geom:
+        try:
+            pt = np.array([[float(geom["x"]), float(geom["y"])]], dtype=_LE_F8)
+        except (TypeError, ValueError):
+            return None
+        if np.isnan(pt).any():
+            return None
+        return Geometry("Point", [[pt]])
+    return None
+
+
+# --- Simplification --------------------------------------------------------
+
+def simplify_coords(arr: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker simplification of one line or closed ring.
+
+    The recursion is run breadth-first: every open span at the current depth
+    is measured against its chord in one NumPy pass, so the number of Python
+    iterations is the recursion depth rather than the vertex count. Closed
+    rings (first == last) work unchanged: the degenerate first chord falls
+    back to point distance.
+    """
+    n = len(arr)
+    if n <= 2 or tolerance <= 0:
+        return arr
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    starts = np.array([0])
+    ends = np.array([n - 1])
+    while len(starts):
+        lengths = ends - starts - 1
+        open_spans = lengths > 0
+        starts, ends, lengths = starts[open_spans], ends[open_spans], lengths[open_spans]
+        if not len(starts):
+            break
+
+        # Interior vertex indices of every span, flattened
+        offsets = np.cumsum(lengths) - lengths
+        span_of = np.repeat(np.arange(len(starts)), lengths)
+        idx = np.arange(lengths.sum()) - offsets[span_of] + starts[span_of] + 1
+
+        a = arr[starts][span_of]
+        b = arr[ends][span_of]
+        p = arr[idx]
+        d = b - a
+        norm = np.hypot(d[:, 0], d[:, 1])
+        cross = np.abs(d[:, 0] * (a[:, 1] - p[:, 1]) - d[:, 1] * (a[:, 0] - p[:, 0]))
+        point_dist = np.hypot(p[:, 0] - a[:, 0], p[:, 1] - a[:, 1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dist = np.where(norm > 0, cross / norm, point_dist)
+
+        # Farthest vertex per span: first position where dist hits the span max
+        span_max = np.maximum.reduceat(dist, offsets)
+        hits = np.flatnonzero(dist == span_max[span_of])
+        first_hit = hits[np.unique(span_of[hits], return_index=True)[1]]
+
+        split_spans = span_max > tolerance
+        splits = idx[first_hit][split_spans]
+        keep[splits] = True
+        starts = np.concatenate([starts[split_spans], splits])
+        ends = np.concatenate([splits, ends[split_spans]])
+    return arr[keep]
+
+
+def simplify(geom: Geometry, tolerance: float) -> Geometry:
+    """Simplify every line and ring of a geometry.
+
+    Rings that would collapse below four vertices are kept as-is when they
+    are shells and dropped when they are holes. Points are returned untouched.
+    """
+    if tolerance <= 0 or geom.kind in ("Point", "MultiPoint"):
+        return geom
+    polygonal = geom.kind in ("Polygon", "MultiPolygon")
+    parts = []
+    for part in geom.parts:
+        out = []
+        for idx, arr in enumerate(part):
+            simple = simplify_coords(arr, tolerance)
+            if polygonal and len(simple) < 4:
+                if idx > 0:
+                    continue
+                simple = arr
+            out.append(simple)
+        parts.append(out)
+    return Geometry(geom.kind, parts)
+
+
+# --- WKB -------------------------------------------------------------------
+
+def _encode_part(kind: str, rings: list[np.ndarray]) -> bytes:
+    if kind == "Point":
+        return struct.pack("<BI", 1, 1) + rings[0].tobytes()
+    if kind == "LineString":
+        arr = rings[0]
+        return struct.pack("<BII", 1, 2, len(arr)) + arr.tobytes()
+    # Polygon
+    chunks = [struct.pack("<BII", 1, 3, len(rings))]
+    for ring in rings:
+        chunks.append(struct.pack("<I", len(ring)))
+        chunks.append(ring.tobytes())
+    return b"".join(chunks)
+
+
+_SINGLE_KIND = {"MultiPoint": "Point", "MultiLineString": "LineString", "MultiPolygon": "Polygon"}
+
+
+def to_wkb(geom: Geometry) -> bytes:
+    """Encode a geometry as little-endian OGC WKB."""
+    single = _SINGLE_KIND.get(geom.kind)
+    if single is None:
+        return _encode_part(geom.kind, geom.parts[0])
+    header = struct.pack("<BII", 1, WKB_TYPES[geom.kind], len(geom.parts))
+    return header + b"".join(_encode_part(single, part) for part in geom.parts)
+
+
+def _read_coords(buf: bytes, offset: int, n: int, dtype: np.dtype) -> tuple[np.ndarray, int]:
+    arr = np.frombuffer(buf, dtype=dtype, count=2 * n, offset=offset).reshape(n, 2)
+    return arr.astype(_LE_F8, copy=False), offset + 16 * n
+
+
+def _decode(buf: bytes, offset: int) -> tuple[str, list[list[np.ndarray]], int]:
+    order = "<" if buf[offset] == 1 else ">"
+    dtype = np.dtype(f"{order}f8")
+    (code,) = struct.unpack_from(f"{order}I", buf, offset + 1)
+    offset += 5
+    kind = _WKB_KINDS.get(code)
+    if kind is None:
+        raise ValueError(f"Unsupported WKB geometry type {code}")
+
+    if kind == "Point":
+        arr, offset = _read_coords(buf, offset, 1, dtype)
+        return kind, [[arr]], offset
+    if kind == "LineString":
+        (n,) = struct.unpack_from(f"{order}I", buf, offset)
+        arr, offset = _read_coords(buf, offset + 4, n, dtype)
+        return kind, [[arr]], offset
+    if kind == "Polygon":
+        (n_rings,) = struct.unpack_from(f"{order}I", buf, offset)
+        offset += 4
+        rings = []
+        for _ in range(n_rings):
+            (n,) = struct.unpack_from(f"{order}I", buf, offset)
+            arr, offset = _read_coords(buf, offset + 4, n, dtype)
+            rings.append(arr)
+        return kind, [rings], offset
+
+    (n_parts,) = struct.unpack_from(f"{order}I", buf, offset)
+    offset += 4
+    parts = []
+    for _ in range(n_parts):
+        _, sub, offset = _decode(buf, offset)
+        parts.extend(sub)
+    return kind, parts, offset
+
+
+def from_wkb(wkb: bytes | bytearray | memoryview | None) -> Geometry | None:
+    """Decode WKB produced by :func:`to_wkb` (or any 2D OGC WKB)."""
+    if not wkb:
+        return None
+    kind, parts, _ = _decode(bytes(wkb), 0)
+    return Geometry(kind, parts)
+
+
+# --- Bounds and centroids ----------------------------------------------------
+
+# Per-row columns derived from geometry_wkb (x is longitude, y latitude)
+BOUNDS_COLUMNS = ("min_x", "min_y", "max_x", "max_y", "centroid_x", "centroid_y")
+
+
+def geometry_bounds(wkbs: Iterable[Any]) -> dict[str, list[float | None]]:
+    """Bounding box and centroid of many WKB geometries at once.
+
+    Each geometry is decoded on its own, but every ring of the batch is then
+    stacked into one array so the extents and shoelace sums are a handful of
+    NumPy reductions rather than a loop per vertex or ring. Polygons get the
+    area-weighted centroid (holes subtract), which can fall outside a
+    concave shape; points and lines get the mean of their vertices. Values
+    are None where the WKB is missing, empty or unreadable.
+    """
+    rings: list[np.ndarray] = []
+    ring_geom: list[int] = []
+    ring_sign: list[float] = []
+    n = 0
+    for wkb in wkbs:
+        try:
+            geom = from_wkb(wkb)
+        except (ValueError, struct.error):
+            geom = None
+        if geom is not None:
+            polygonal = geom.kind in ("Polygon", "MultiPolygon")
+            for part in geom.parts:
+                for idx, arr in enumerate(part):
+                    if len(arr):
+                        rings.append(arr)
+                        ring_geom.append(n)
+                        ring_sign.append(0.0 if not polygonal else 1.0 if idx == 0 else -1.0)
+        n += 1
+
+    out: dict[str, list[float | None]] = {c: [None] * n for c in BOUNDS_COLUMNS}
+    if not rings:
+        return out
+
+    coords = np.concatenate(rings)
+    lengths = np.array([len(r) for r in rings])
+    starts = np.cumsum(lengths) - lengths
+    geom_of = np.array(ring_geom)
+    sign = np.array(ring_sign)
+
+    # Geometries are contiguous runs of rings: reduce rings, then geometries
+    geoms, first_ring = np.unique(geom_of, return_index=True)
+    ring_min = np.minimum.reduceat(coords, starts)
+    ring_max = np.maximum.reduceat(coords, starts)
+    lo = np.minimum.reduceat(ring_min, first_ring)
+    hi = np.maximum.reduceat(ring_max, first_ring)
+
+    # Shoelace terms for every edge; the edge leaving a ring's last vertex
+    # pairs it with the next ring's first and is zeroed out
+    x, y = coords[:, 0], coords[:, 1]
+    nx, ny = np.roll(x, -1), np.roll(y, -1)
+    cross = x * ny - nx * y
+    cross[starts + lengths - 1] = 0.0
+    area2 = np.add.reduceat(cross, starts)
+    cx6 = np.add.reduceat((x + nx) * cross, starts)
+    cy6 = np.add.reduceat((y + ny) * cross, starts)
+
+    # Orient each ring by its role: shells add area, holes subtract it
+    weight = sign * np.sign(area2)
+    area = np.add.reduceat(weight * area2, first_ring)
+    mx = np.add.reduceat(weight * cx6, first_ring)
+    my = np.add.reduceat(weight * cy6, first_ring)
+    count = np.add.reduceat(lengths, first_ring)
+    mean_x = np.add.reduceat(np.add.reduceat(x, starts), first_ring) / count
+    mean_y = np.add.reduceat(np.add.reduceat(y, starts), first_ring) / count
+    with np.errstate(divide="ignore", invalid="ignore"):
+        has_area = area > 0
+        cen_x = np.where(has_area, mx / (3.0 * area), mean_x)
+        cen_y = np.where(has_area, my / (3.0 * area), mean_y)
+
+    for column, values in zip(
+        BOUNDS_COLUMNS, (lo[:, 0], lo[:, 1], hi[:, 0], hi[:, 1], cen_x, cen_y)
+    ):
+        target = out[column]
+        for g, v in zip(geoms.tolist(), values.tolist()):
+            target[g] = v
+    return out
+
+
+def add_geometry_bounds(records: list[dict[str, Any]]) -> None:
+    """Set the bounds and centroid columns on records from their geometry_wkb."""
+    if not records:
+        return
+    bounds = geometry_bounds(r.get("geometry_wkb") for r in records)
+    for column, values in bounds.items():
+        for record, value in zip(records, values):
+            record[column] = value
+
+
+# --- WKT (derived) ---------------------------------------------------------
+
+def _coord_text(arr: np.ndarray) -> str:
+    return ", ".join(f"{x} {y}" for x, y in arr.tolist())
+
+
+def _part_text(kind: str, rings: list[np.ndarray]) -> str:
+    if kind in ("Polygon", "MultiPolygon"):
+        return "(" + ", ".join(f"({_coord_text(r)})" for r in rings) + ")"
+    return f"({_coord_text(rings[0])})"
+
+
+def to_wkt(geom: Geometry | None) -> str:
+    """Render a geometry as WKT text."""
+    if geom is None:
+        return ""
+    name = geom.kind.upper()
+    if geom.kind in _SINGLE_KIND:
+        body = ", ".join(_part_text(geom.kind, part) for part in geom.parts)
+        return f"{name}({body})"
+    return f"{name}{_part_text(geom.kind, geom.parts[0])}"
+
+
+def wkb_to_wkt(wkb: bytes | bytearray | memoryview | None) -> str:
+    """Derive WKT from a stored WKB value."""
+    return to_wkt(from_wkb(wkb))
@@ -0,0 +1,128 @@
+"""Indexes built from table rows and saved under the cache directory.
+
+The address index, the amenity index, the parcel locator and the polygon
+index are each built from database rows, saved as one ``.npz`` file and
+stamped with a cheap summary of the rows they came from. An
+:class:`IndexCache` hands out the index already loaded in this process, then
+the saved one, while its stamp matches the database's, and otherwise builds
+(or, given an ``update``, brings up to date) and saves a new one.
+
+An index handed out is never modified afterwards, so callers may keep
+querying it from other threads.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Generic, Protocol, TypeVar
+
+from parcl.config import PROJECT_ROOT, load_settings
+from parcl.db import Database
+from parcl.logger import get_logger
+
+log = get_logger("index_cache")
+
+# Seconds a stamp read from the database is trusted
+STAMP_TTL = 1.0
+
+
+class Stamped(Protocol):
+    stamp: str
+
+    def save(self, path: Path) -> None: ...
+
+
+T = TypeVar("T", bound=Stamped)
+
+
+def default_cache_dir() -> Path:
+    return PROJECT_ROOT / load_settings().cache_dir
+
+
+class IndexCache(Generic[T]):
+    """One kind of saved index, by cache path.
+
+    ``load`` reads a saved index, ``stamp`` summarizes the rows it is built
+    from, and ``build(db, stamp)`` builds it afresh. With ``update``, a
+    stale index is passed to ``update(index, db, stamp)`` instead, which
+    must return a changed copy rather than change it in place. The stamp is
+    re-read at most every ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        cache_file: str,
+        load: Callable[[Path], T],
+        stamp: Callable[[Database], str],
+        build: Callable[[Database, str], T],
+        update: Callable[[T, Database, str], T] | None = None,
+        ttl: float = STAMP_TTL,
+    ):
+        self.name = name
+        self.cache_file = cache_file
+        self.load = load
+        self.stamp = stamp
+        self.build = build
+        self.update = update
+        self.ttl = ttl
+        # Indexes already loaded in this process, by cache path
+        self.loaded: dict[str, T] = {}
+        # When each loaded index was last found current
+        self.checked: dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def path(self, cache_dir: Path | None = None) -> Path:
+        return (cache_dir or default_cache_dir()) / self.cache_file
+
+    def get(self, db: Database, cache_dir: Path | None = None) -> T:
+        """The index for the current table contents."""
+        path = self.path(cache_dir)
+        key = str(path)
+        now = time.monotonic()
+        index = self.loaded.get(key)
+        if index is not None and now - self.checked.get(key, -math.inf) < self.ttl:
+            return index
+        stamp = self.stamp(db)
+        if index is not None and index.stamp == stamp:
+            self.checked[key] = now
+            return index
+        with self.lock:
+            saved = self.saved(path)
+            if saved is not None and saved.stamp == stamp:
+                return self.store(path, saved, save=False)
+            stale = index if index is not None else saved
+            if self.update is not None and stale is not None:
+                index = self.update(stale, db, stamp)
+            else:
+                index = self.build(db, stamp)
+            return self.store(path, index)
+
+    def saved(self, path: Path) -> T | None:
+        """The index saved at ``path``, or None when missing or unreadable."""
+        if not path.exists():
+            return None
+        try:
+            return self.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            log.warning(f"Ignoring unreadable {self.name} cache {path}: {e}")
+            return None
+
+    def store(self, path: Path, index: T, save: bool = True) -> T:
+        """Save ``index`` at ``path`` and hand it out from now on.
+
+        Callers other than :meth:`get` must hold :attr:`lock`.
+        """
+        if save:
+            index.save(path)
+        self.loaded[str(path)] = index
+        self.checked[str(path)] = time.monotonic()
+        return index
+
+    def clear(self) -> None:
+        """Forget the indexes loaded in this process."""
+        self.loaded.clear()
+        self.checked.clear()
@@ -0,0 +1,215 @@
+"""Static 2-d tree over latitude/longitude points, queried in batches.
+
+Points are projected to metres on a plane tangent at the middle latitude of
+the set (``x = lon * M * cos(lat0)``, ``y = lat * M``) and split at the
+median of the wider axis, level by level, until each leaf holds about
+:data:`LEAF_SIZE` points. The tree is implicit: node ``i`` has children
+``2i + 1`` and ``2i + 2``, and every node covers one contiguous range of the
+points in tree order, so the whole tree is a handful of flat arrays.
+
+A batch of query points walks the tree one level at a time as arrays of
+(point, node) pairs, dropping the nodes whose box lies beyond the point's
+search radius, as :meth:`parcl.polygons.PolygonIndex.candidates` does.
+
+Reported distances are those of :func:`parcl.grid.distance_sql` measured
+from the query point (equirectangular at the query's latitude), so they
+agree with the distances stored in ``parcel_spatial_links``. The pruning
+radius is widened by the ratio between that metric and the tree's, which
+keeps every search exact.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable
+
+import numpy as np
+
+from parcl.grid import METRES_PER_DEGREE
+
+# Points per leaf, about
+LEAF_SIZE = 32
+
+# Query points sent down the tree together
+_POINT_BLOCK = 4096
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def _floats(values: Iterable[float] | float) -> np.ndarray:
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False)
+    if isinstance(values, (int, float)):
+        return np.array([values], dtype=np.float64)
+    return np.array(list(values), dtype=np.float64)
+
+
+class KDTree:
+    """Points queryable by radius and by k nearest, for batches of points."""
+
+    _ARRAYS = ("lats", "lons", "items", "start", "end", "min_x", "min_y", "max_x", "max_y")
+
+    def __init__(
+        self,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        items: np.ndarray,
+        start: np.ndarray,
+        end: np.ndarray,
+        min_x: np.ndarray,
+        min_y: np.ndarray,
+        max_x: np.ndarray,
+        max_y: np.ndarray,
+        lat0: float,
+    ):
+        # Points in tree order, and the input position of each
+        self.lats = lats
+        self.lons = lons
+        self.items = items
+        # Per node, in heap order: its range of points and their box in metres
+        self.start = start
+        self.end = end
+        self.min_x = min_x
+        self.min_y = min_y
+        self.max_x = max_x
+        self.max_y = max_y
+        self.lat0 = lat0
+        self.depth = int(math.log2(len(start) + 1)) - 1
+        self._scale = METRES_PER_DEGREE * math.cos(math.radians(lat0))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @classmethod
+    def build(cls, lats: Iterable[float], lons: Iterable[float]) -> KDTree:
+        """Build over points given in a fixed order; ties in distance are
+        broken by that order."""
+        lats, lons = _floats(lats), _floats(lons)
+        n = len(lats)
+        lat0 = float(lats.min() + lats.max()) / 2 if n else 0.0
+        x = lons * METRES_PER_DEGREE * math.cos(math.radians(lat0))
+        y = lats * METRES_PER_DEGREE
+        depth = max(0, math.ceil(math.log2(n / LEAF_SIZE))) if n > LEAF_SIZE else 0
+
+        order = np.arange(n)
+        start, end = np.zeros(1, dtype=np.int64), np.array([n], dtype=np.int64)
+        levels = [(start, end)]
+        for _ in range(depth):
+            px, py = x[order], y[order]
+            span_x = np.maximum.reduceat(px, start) - np.minimum.reduceat(px, start)
+            span_y = np.maximum.reduceat(py, start) - np.minimum.reduceat(py, start)
+            node = np.repeat(np.arange(len(start)), end - start)
+            key = np.where((span_x >= span_y)[node], px, py)
+            order = order[np.lexsort((key, node))]
+            mid = (start + end) // 2
+            start, end = np.stack([start, mid], axis=1).ravel(), np.stack([mid, end], axis=1).ravel()
+            levels.append((start, end))
+
+        px, py = x[order], y[order]
+        start = np.concatenate([s for s, _ in levels])
+        end = np.concatenate([e for _, e in levels])
+        boxes = []
+        for values, reduce in ((px, np.minimum), (py, np.minimum), (px, np.maximum), (py, np.maximum)):
+            if n:
+                boxes.append(np.concatenate([reduce.reduceat(values, s) for s, _ in levels]))
+            else:
+                boxes.append(np.full(1, np.inf if reduce is np.minimum else -np.inf))
+        return cls(lats[order], lons[order], order, start, end, *boxes, lat0)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """The tree as named arrays, for saving with its owner's index."""
+        return {**{name: getattr(self, name) for name in self._ARRAYS}, "lat0": np.array(self.lat0)}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> KDTree:
+        return cls(*(arrays[name] for name in cls._ARRAYS), float(arrays["lat0"]))
+
+    def _distance(self, qlat: np.ndarray, qlon: np.ndarray, pos: np.ndarray) -> np.ndarray:
+        dlat = qlat - self.lats[pos]
+        dlon = (qlon - self.lons[pos]) * np.cos(np.radians(qlat))
+        return METRES_PER_DEGREE * np.sqrt(dlat * dlat + dlon * dlon)
+
+    def _gap2(self, qx: np.ndarray, qy: np.ndarray, node: np.ndarray) -> np.ndarray:
+        """Squared metres from each point to its node's box (0 inside)."""
+        gx = np.maximum(np.maximum(self.min_x[node] - qx, qx - self.max_x[node]), 0.0)
+        gy = np.maximum(np.maximum(self.min_y[node] - qy, qy - self.max_y[node]), 0.0)
+        return gx * gx + gy * gy
+
+    def within(
+        self, lats: Iterable[float], lons: Iterable[float], radius: float | np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(point, item, metres) for every item within ``radius`` metres of
+        each point (one radius, or one per point), sorted by point, distance
+        and item."""
+        qlat, qlon = _floats(lats), _floats(lons)
+        radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), qlat.shape)
+        if not len(self) or not len(qlat):
+            return _EMPTY, _EMPTY, np.empty(0)
+        qx, qy = qlon * self._scale, qlat * METRES_PER_DEGREE
+        # The query's metric shrinks x by cos(lat) / cos(lat0); widen to cover it
+        ratio = np.minimum(np.cos(np.radians(qlat)) / math.cos(math.radians(self.lat0)), 1.0)
+        with np.errstate(invalid="ignore"):
+            reach2 = np.square(radius / ratio)
+
+        points, positions, distances = [], [], []
+        for first in range(0, len(qlat), _POINT_BLOCK):
+            point = np.arange(first, min(first + _POINT_BLOCK, len(qlat)))
+            node = np.zeros(len(point), dtype=np.int64)
+            for level in range(self.depth + 1):
+                keep = self._gap2(qx[point], qy[point], node) <= reach2[point]
+                point, node = point[keep], node[keep]
+                if level < self.depth:
+                    point = np.repeat(point, 2)
+                    node = (2 * node[:, None] + np.array([1, 2])).ravel()
+            counts = self.end[node] - self.start[node]
+            offsets = np.cumsum(counts) - counts
+            point = np.repeat(point, counts)
+            pos = np.repeat(self.start[node] - offsets, counts) + np.arange(counts.sum())
+            dist = self._distance(qlat[point], qlon[point], pos)
+            keep = dist <= radius[point]
+            points.append(point[keep])
+            positions.append(pos[keep])
+            distances.append(dist[keep])
+
+        point, item, dist = np.concatenate(points), self.items[np.concatenate(positions)], np.concatenate(distances)
+        order = np.lexsort((item, dist, point))
+        return point[order], item[order], dist[order]
+
+    def count_within(self, lats: Iterable[float], lons: Iterable[float], radius: float) -> np.ndarray:
+        """Number of items within ``radius`` metres of each point."""
+        qlat = _floats(lats)
+        point, _, _ = self.within(qlat, lons, radius)
+        return np.bincount(point, minlength=len(qlat))
+
+    def nearest(
+        self, lats: Iterable[float], lons: Iterable[float], k: int = 1, radius: float = math.inf
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(point, item, metres) for the ``k`` nearest items to each point,
+        optionally no farther than ``radius``; sorted like :meth:`within`.
+
+        Each point first descends to the smallest node holding ``k`` items;
+        the k-th nearest of those bounds the radius search that follows.
+        """
+        qlat, qlon = _floats(lats), _floats(lons)
+        k = min(k, len(self))
+        if k <= 0 or not len(qlat):
+            return _EMPTY, _EMPTY, np.empty(0)
+
+        sizes = self.end - self.start
+        level = 0
+        while level < self.depth and sizes[2 ** (level + 1) - 1:2 ** (level + 2) - 1].min() >= k:
+            level += 1
+        qx, qy = qlon * self._scale, qlat * METRES_PER_DEGREE
+        node = np.zeros(len(qlat), dtype=np.int64)
+        for _ in range(level):
+            left, right = 2 * node + 1, 2 * node + 2
+            node = np.where(self._gap2(qx, qy, right) < self._gap2(qx, qy, left), right, left)
+        held = int(sizes[2 ** level - 1:2 ** (level + 1) - 1].min())
+        pos = self.start[node][:, None] + np.arange(held)
+        dist = self._distance(qlat[:, None], qlon[:, None], pos)
+        bound = np.minimum(np.partition(dist, k - 1, axis=1)[:, k - 1], radius)
+
+        point, item, dist = self.within(qlat, qlon, bound)
+        first = np.searchsorted(point, point)
+        keep = np.arange(len(point)) - first < k
+        return point[keep], item[keep], dist[keep]
@@ -0,0 +1,113 @@
+"""Raw page landing zone: every fetched API page, gzipped, partitioned by run.
+
+Layout::
+
+    data/raw/<source_id>/run=<run_id>/page=00001.jsonl.gz
+    data/raw/<source_id>/run=<run_id>/_manifest.json
+
+Each page file holds one raw record per line. Binary values (ArcGIS WKB)
+are written as ``{"$b64": "..."}`` and restored on read. The manifest is
+written when the run ends; runs without one were interrupted.
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from parcl.logger import get_logger
+
+log = get_logger("landing")
+
+MANIFEST = "_manifest.json"
+
+
+def new_run_id() -> str:
+    """Sortable UTC timestamp, e.g. ``20240115T093000Z``."""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"$b64": base64.b64encode(bytes(value)).decode("ascii")}
+    return str(value)
+
+
+def _decode(obj: dict[str, Any]) -> Any:
+    if len(obj) == 1 and "$b64" in obj:
+        return base64.b64decode(obj["$b64"])
+    return obj
+
+
+def run_dir(root: Path, source_id: str, run_id: str) -> Path:
+    return root / source_id / f"run={run_id}"
+
+
+class RawPageWriter:
+    """Writes one source run's raw pages into the landing zone."""
+
+    def __init__(self, root: Path, source_id: str, run_id: str | None = None, compresslevel: int = 6):
+        self.source_id = source_id
+        self.run_id = run_id or new_run_id()
+        self.path = run_dir(root, source_id, self.run_id)
+        self.compresslevel = compresslevel
+        self.pages = 0
+        self.records = 0
+        self.bytes = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def write(self, records: list[dict[str, Any]]) -> Path:
+        """Write the next page; pages are numbered from 1 in arrival order."""
+        self.pages += 1
+        path = self.path / f"page={self.pages:05d}.jsonl.gz"
+        lines = "".join(json.dumps(r, default=_encode) + "\n" for r in records)
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=self.compresslevel) as f:
+            f.write(lines)
+        self.records += len(records)
+        self.bytes += path.stat().st_size
+        return path
+
+    def finish(self, complete: bool, **extra: Any) -> None:
+        """Write the run manifest. ``complete`` is False for partial fetches."""
+        manifest = {
+            "source_id": self.source_id,
+            "run_id": self.run_id,
+            "pages": self.pages,
+            "records": self.records,
+            "bytes": self.bytes,
+            "complete": complete,
+            **extra,
+        }
+        (self.path / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        log.info(f"Landed {self.pages} pages ({self.bytes / 1e6:.1f} MB) at {self.path}")
+
+
+def list_runs(root: Path, source_id: str) -> list[str]:
+    """Run ids with a manifest, oldest first."""
+    base = root / source_id
+    if not base.is_dir():
+        return []
+    return sorted(
+        p.name.split("=", 1)[1]
+        for p in base.glob("run=*")
+        if (p / MANIFEST).exists()
+    )
+
+
+def read_manifest(root: Path, source_id: str, run_id: str) -> dict[str, Any]:
+    return json.loads((run_dir(root, source_id, run_id) / MANIFEST).read_text())
+
+
+def list_pages(root: Path, source_id: str, run_id: str) -> list[Path]:
+    """Page files of a run in page order."""
+    return sorted(run_dir(root, source_id, run_id).glob("page=*.jsonl.gz"))
+
+
+def read_page(path: Path) -> list[dict[str, Any]]:
+    """Read one landed page back into raw records."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line, object_hook=_decode) for line in f if line.strip()]
@@ -0,0 +1,254 @@
+"""Maintain parcel_spatial_links: which polygons contain each parcel, and
+which transit stops are near it.
+
+Links are computed in batch and stored, so exports, ``parcel_features`` and
+the profile read them with plain joins instead of testing geometry per
+query:
+
+- ``within``: the parcel's point lies inside a polygon of one of the
+  :data:`~parcl.polygons.POLYGON_TABLES` (overlays, flood zones, utility
+  service areas, parks). Parcels are grouped by level-12 grid tile and the
+  tiles are shared out to a process pool, each worker querying its own copy
+  of the polygon index.
+- ``near``: a transit stop (a ``transit_amenities`` row with coordinates)
+  lies within :data:`TRANSIT_RADIUS_M` metres. This is a hash join on the
+  stop's neighbouring grid cells followed by the exact distance test.
+
+:func:`refresh_links` rebuilds every link, the links of one re-crawled
+feature source, or the links of given parcels, and reports which parcels'
+links changed so their features can be refreshed.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from parcl.db import Database
+from parcl.etl.loader import stage_temp_table
+from parcl.grid import (
+    CELL_COLUMNS,
+    cells_near_many,
+    degrees_for_metres,
+    distance_sql,
+    level_for_radius,
+)
+from parcl.logger import get_logger
+from parcl.polygons import POLYGON_TABLES, PolygonIndex, load_polygon_index
+
+log = get_logger("links")
+
+# Transit stops within this distance of a parcel are linked as "near"
+TRANSIT_RADIUS_M = 400.0
+
+# Fewer parcels than this are joined in process; a pool costs more to start
+PARALLEL_MIN_PARCELS = 20_000
+
+# Tasks per worker, so uneven tiles still spread over the pool
+_TASKS_PER_WORKER = 4
+
+# Half-width in degrees of the box holding TRANSIT_RADIUS_M
+_TRANSIT_BOX = degrees_for_metres(TRANSIT_RADIUS_M)
+_TRANSIT_CELL = CELL_COLUMNS[level_for_radius(_TRANSIT_BOX)]
+_TILE = CELL_COLUMNS[min(CELL_COLUMNS)]
+
+_WITHIN = "_parcl_link_within"
+_STOP_CELLS = "_parcl_link_stop_cells"
+_SCOPE = "_parcl_link_parcels"
+_BEFORE = "_parcl_link_before"
+
+# Polygon index of a pool worker, loaded once per process
+_worker_index: PolygonIndex | None = None
+
+
+def _init_worker(path: str) -> None:
+    global _worker_index
+    _worker_index = PolygonIndex.load(Path(path))
+
+
+def _query_tiles(points: np.ndarray, lats: np.ndarray, lons: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Worker: containment pairs for one group of tiles, in global point numbers."""
+    point, polygon = _worker_index.query(lats, lons)
+    return points[point], polygon
+
+
+def _tile_tasks(tiles: np.ndarray, tasks: int) -> list[np.ndarray]:
+    """Split point numbers into about ``tasks`` groups of whole tiles."""
+    order = np.argsort(tiles, kind="stable")
+    bounds = np.flatnonzero(np.r_[True, tiles[order][1:] != tiles[order][:-1], True])
+    groups: list[np.ndarray] = []
+    target = max(1, len(tiles) // tasks)
+    start = 0
+    for end in bounds[1:]:
+        if end - start >= target or end == len(tiles):
+            groups.append(order[start:end])
+            start = end
+    return groups
+
+
+def contained_pairs(
+    index: PolygonIndex,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    tiles: np.ndarray,
+    workers: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """(point, polygon) pairs for points inside the index's polygons.
+
+    Large batches are split by grid tile across a process pool; workers load
+    the index from a temporary file rather than receiving it per task.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(lats) < PARALLEL_MIN_PARCELS:
+        return index.query(lats, lons)
+
+    groups = _tile_tasks(tiles, workers * _TASKS_PER_WORKER)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "polygons.npz"
+        index.save(path)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(str(path),)) as pool:
+            results = list(pool.map(_query_tiles, groups, [lats[g] for g in groups], [lons[g] for g in groups]))
+    if not results:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+
+def _stage_stop_cells(db: Database, source_id: str | None) -> None:
+    """Stage every (cell, stop) pair for the cells around each transit stop."""
+    where = " AND source_id = ?" if source_id else ""
+    stops = db.fetchall(
+        "SELECT id, latitude, longitude FROM transit_amenities "
+        f"WHERE latitude IS NOT NULL AND longitude IS NOT NULL{where}",
+        (source_id,) if source_id else None,
+    )
+    _, point, cells = cells_near_many(
+        np.array([s[1] for s in stops], dtype=np.float64), np.array([s[2] for s in stops], dtype=np.float64),
+        _TRANSIT_BOX,
+    )
+    stage_temp_table(
+        db, _STOP_CELLS, {"cell": "BIGINT", "stop_id": "TEXT"},
+        {"cell": cells.tolist(), "stop_id": [stops[i][0] for i in point.tolist()]},
+    )
+
+
+def _link_rows_sql(tables: list[str], stops: bool, parcel_where: str) -> str:
+    """SELECT of every new link row, ordered by parcel so lookups prune well."""
+    columns = "parcel_id, feature_table, feature_id, feature_source_id, relation, distance_m"
+    parts = [
+        f"SELECT w.parcel_id, w.feature_table, w.feature_id, f.source_id, 'within', 0.0 "
+        f"FROM {_WITHIN} w JOIN {table} f ON f.id = w.feature_id WHERE w.feature_table = '{table}'"
+        for table in tables
+    ]
+    if stops:
+        # A stop that is also a polygon (a park) keeps its "within" link
+        within = (
+            f" AND NOT EXISTS (SELECT 1 FROM {_WITHIN} w WHERE w.parcel_id = d.parcel_id "
+            "AND w.feature_table = 'transit_amenities' AND w.feature_id = d.stop_id)"
+        ) if "transit_amenities" in tables else ""
+        parts.append(
+            "SELECT d.parcel_id, 'transit_amenities', d.stop_id, d.source_id, 'near', d.distance_m "
+            "FROM (SELECT p.id AS parcel_id, t.id AS stop_id, t.source_id, "
+            f"{distance_sql('p', 't')} AS distance_m FROM {_STOP_CELLS} c "
+            f"JOIN parcels p ON p.{_TRANSIT_CELL} = c.cell "
+            f"JOIN transit_amenities t ON t.id = c.stop_id WHERE {parcel_where}) d "
+            f"WHERE d.distance_m <= {TRANSIT_RADIUS_M!r}{within}"
+        )
+    return (
+        f"INSERT INTO parcel_spatial_links ({columns}) SELECT * FROM ("
+        + " UNION ALL ".join(parts) + ") n ORDER BY 1, 2, 3"
+    )
+
+
+def refresh_links(
+    db: Database,
+    source: tuple[str, str] | None = None,
+    parcel_ids: set[str] | None = None,
+    workers: int | None = None,
+) -> dict[str, Any]:
+    """Recompute parcel_spatial_links.
+
+    With ``source=(table, source_id)`` only that feature source's links are
+    rebuilt (for every parcel); with ``parcel_ids`` only those parcels'
+    links; with neither, all of them. Returns ``{"mode", "links",
+    "changed_parcels"}``; ``changed_parcels`` is the set of parcels whose
+    links differ afterwards, or None after a full rebuild.
+    """
+    table, source_id = source or (None, None)
+    tables = [t for t in POLYGON_TABLES if (not table or t == table) and db.column_info(t)]
+    stops = table in ("transit_amenities", None) and "latitude" in db.column_info("transit_amenities")
+    mode = "source" if source else "parcels" if parcel_ids is not None else "full"
+
+    parcel_where = "TRUE"
+    if parcel_ids is not None:
+        stage_temp_table(db, _SCOPE, {"id": "TEXT"}, {"id": sorted(parcel_ids)})
+        parcel_where = f"p.id IN (SELECT id FROM {_SCOPE})"
+    link_where, link_params = "TRUE", ()
+    if source:
+        link_where, link_params = "feature_table = ? AND feature_source_id = ?", (table, source_id)
+    elif parcel_ids is not None:
+        link_where = f"parcel_id IN (SELECT id FROM {_SCOPE})"
+
+    try:
+        if source and tables:
+            name, category = POLYGON_TABLES[table]
+            index = PolygonIndex.build(
+                (table, *row) for row in db.fetchall(
+                    f"SELECT id, {name}, {category}, geometry_wkb FROM {table} "
+                    "WHERE source_id = ? AND min_x < max_x AND min_y < max_y ORDER BY id",
+                    (source_id,),
+                )
+            )
+        else:
+            index = load_polygon_index(db)
+        rows = db.fetchall(
+            f"SELECT p.id, p.latitude, p.longitude, p.{_TILE} FROM parcels p WHERE {parcel_where} "
+            "AND p.latitude IS NOT NULL AND p.longitude IS NOT NULL"
+        )
+        lats = np.array([r[1] for r in rows], dtype=np.float64)
+        lons = np.array([r[2] for r in rows], dtype=np.float64)
+        tiles = np.array([r[3] if r[3] is not None else -1 for r in rows], dtype=np.int64)
+        point, polygon = contained_pairs(index, lats, lons, tiles, workers)
+        stage_temp_table(
+            db, _WITHIN, {"parcel_id": "TEXT", "feature_table": "TEXT", "feature_id": "TEXT"},
+            {
+                "parcel_id": [rows[i][0] for i in point.tolist()],
+                "feature_table": index.tables[polygon].tolist(),
+                "feature_id": index.ids[polygon].tolist(),
+            },
+        )
+        if stops:
+            _stage_stop_cells(db, source_id)
+        if mode != "full":
+            db.execute(
+                f"CREATE TEMP TABLE {_BEFORE} AS SELECT parcel_id, feature_table, feature_id, relation "
+                f"FROM parcel_spatial_links WHERE {link_where}",
+                link_params,
+            )
+
+        with db.transaction():
+            db.execute(f"DELETE FROM parcel_spatial_links WHERE {link_where}", link_params)
+            if tables or stops:
+                db.execute(_link_rows_sql(tables, stops, parcel_where))
+            count = db.fetchone(f"SELECT COUNT(*) FROM parcel_spatial_links WHERE {link_where}", link_params)[0]
+        changed = None
+        if mode != "full":
+            after = f"SELECT parcel_id, feature_table, feature_id, relation FROM parcel_spatial_links WHERE {link_where}"
+            changed = {r[0] for r in db.fetchall(
+                f"SELECT DISTINCT parcel_id FROM ((SELECT * FROM {_BEFORE} EXCEPT {after}) "
+                f"UNION ALL ({after} EXCEPT SELECT * FROM {_BEFORE})) d",
+                link_params * 2,
+            )}
+    finally:
+        for name in (_WITHIN, _STOP_CELLS, _SCOPE, _BEFORE):
+            db.execute(f"DROP TABLE IF EXISTS {name}")
+        db.commit()
+
+    scope = f" for {table} source {source_id}" if source else f" for {len(parcel_ids)} parcels" if parcel_ids is not None else ""
+    log.info(f"Refreshed parcel_spatial_links{scope}: {count} links")
+    return {"mode": mode, "links": count, "changed_parcels": changed}
@@ -0,0 +1,207 @@
+"""Find the parcel at, or nearest to, a latitude/longitude.
+
+:class:`ParcelLocator` answers batches of points from two in-process
+indexes:
+
+* the TCAD parcel polygons (``property_valuations.geometry_wkb``) in a
+  :class:`~parcl.polygons.PolygonIndex`: a point inside one belongs to the
+  parcel sharing that valuation's address key;
+* a :class:`~parcl.kdtree.KDTree` over the parcel points and the valuation
+  centroids, for points outside every polygon (or inside one with no
+  parcel): the nearest within :data:`LOCATE_RADIUS_M` wins.
+
+The locator is saved under the cache directory and reused while its stamp
+(row counts, latest ``fetched_at`` and the last run of the sources loading
+the two tables) is unchanged; any change rebuilds it.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from parcl.db import Database
+from parcl.index_cache import IndexCache
+from parcl.kdtree import KDTree
+from parcl.logger import get_logger
+from parcl.polygons import PolygonIndex
+
+log = get_logger("locator")
+
+# Points farther than this from every parcel point or centroid match no parcel
+LOCATE_RADIUS_M = 250.0
+
+CACHE_FILE = "parcel_locator.npz"
+
+_TABLES = ("parcels", "property_valuations")
+
+
+@dataclass
+class Located:
+    """The parcel found for one point."""
+
+    parcel_id: str
+    # "within" a TCAD polygon, or the "nearest" parcel point or centroid
+    method: str
+    distance_m: float
+
+
+class ParcelLocator:
+    """TCAD polygons and parcel points, each mapped to a parcel id."""
+
+    def __init__(
+        self,
+        polygon_index: PolygonIndex,
+        polygon_parcels: np.ndarray,
+        points: KDTree,
+        point_parcels: np.ndarray,
+        stamp: str = "",
+    ):
+        self.polygon_index = polygon_index
+        # Parcel of each indexed polygon, "" where its valuation has none
+        self.polygon_parcels = polygon_parcels
+        self.points = points
+        # Parcel of each point in the tree, in build order
+        self.point_parcels = point_parcels
+        self.stamp = stamp
+
+    @classmethod
+    def build(
+        cls,
+        polygon_rows: Iterable[tuple[str, bytes]],
+        point_rows: Iterable[tuple[str, float, float]],
+        valuation_parcels: dict[str, str],
+        stamp: str = "",
+    ) -> ParcelLocator:
+        """Build from ``(valuation id, geometry_wkb)`` polygons, ``(parcel id,
+        latitude, longitude)`` points and the parcel of each valuation."""
+        index = PolygonIndex.build(("property_valuations", vid, None, None, wkb) for vid, wkb in polygon_rows)
+        polygon_parcels = np.array([valuation_parcels.get(str(v), "") for v in index.ids], dtype=str)
+        point_rows = list(point_rows)
+        parcels, lats, lons = (list(c) for c in zip(*point_rows)) if point_rows else ([], [], [])
+        return cls(index, polygon_parcels, KDTree.build(lats, lons), np.array(parcels, dtype=str), stamp)
+
+    def locate(
+        self, lats: Iterable[float], lons: Iterable[float], radius: float = LOCATE_RADIUS_M
+    ) -> list[Located | None]:
+        """The parcel of each point: the first polygon containing it that has
+        a parcel, else the nearest point within ``radius`` metres."""
+        lats = np.asarray(lats if isinstance(lats, np.ndarray) else list(lats), dtype=np.float64)
+        lons = np.asarray(lons if isinstance(lons, np.ndarray) else list(lons), dtype=np.float64)
+        found: list[Located | None] = [None] * len(lats)
+        point, polygon = self.polygon_index.query(lats, lons)
+        for p, parcel_id in zip(point.tolist(), self.polygon_parcels[polygon].tolist()):
+            if parcel_id and found[p] is None:
+                found[p] = Located(parcel_id, "within", 0.0)
+        rest = np.array([i for i, hit in enumerate(found) if hit is None], dtype=np.int64)
+        if len(rest):
+            near, item, metres = self.points.nearest(lats[rest], lons[rest], 1, radius)
+            for p, parcel_id, d in zip(rest[near].tolist(), self.point_parcels[item].tolist(), metres.tolist()):
+                found[p] = Located(parcel_id, "nearest", d)
+        return found
+
+    def save(self, path: Path) -> None:
+        arrays = {f"polygons_{k}": v for k, v in self.polygon_index.arrays().items()}
+        arrays.update({f"points_{k}": v for k, v in self.points.arrays().items()})
+        arrays["polygon_parcels"] = self.polygon_parcels
+        arrays["point_parcels"] = self.point_parcels
+        arrays["header"] = np.array(json.dumps({"stamp": self.stamp}))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> ParcelLocator:
+        with np.load(path) as data:
+            parts: dict[str, dict[str, np.ndarray]] = {"polygons": {}, "points": {}}
+            for key in data.files:
+                prefix, _, name = key.partition("_")
+                if prefix in parts:
+                    parts[prefix][name] = data[key]
+            return cls(
+                PolygonIndex.from_arrays(parts["polygons"]), data["polygon_parcels"],
+                KDTree.from_arrays(parts["points"]), data["point_parcels"],
+                json.loads(str(data["header"]))["stamp"],
+            )
+
+
+def parse_point(text: str) -> tuple[float, float]:
+    """``"LAT,LON"`` as floats; ValueError when malformed or out of range."""
+    parts = text.split(",")
+    if len(parts) != 2:
+        raise ValueError(f"Expected LAT,LON, got {text!r}")
+    lat, lon = float(parts[0]), float(parts[1])
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        raise ValueError(f"Point out of range: {text!r}")
+    return lat, lon
+
+
+def locator_stamp(db: Database) -> str:
+    """Row count and latest fetched_at of parcels and valuations, and the last
+    run of the sources loading them: cheap, and changed by every insert and
+    every pipeline load."""
+    parts = []
+    for table in _TABLES:
+        if db.column_info(table):
+            row = db.fetchone(f"SELECT COUNT(*), MAX(fetched_at) FROM {table}")
+            parts.append(f"{table}:{row[0]}:{row[1]}")
+    runs = db.fetchall(
+        "SELECT id, last_run_at FROM sources WHERE target_table IN (?, ?) ORDER BY id", _TABLES
+    )
+    parts.extend(f"{r[0]}:{r[1]}" for r in runs)
+    return ";".join(parts)
+
+
+def _valuation_parcels(db: Database) -> dict[str, str]:
+    """The parcel of each valuation: the first sharing its address key."""
+    if "address_key" not in db.column_info("property_valuations"):
+        return {}
+    return dict(db.fetchall(
+        "SELECT v.id, MIN(p.id) FROM property_valuations v JOIN parcels p ON p.address_key = v.address_key "
+        "GROUP BY v.id"
+    ))
+
+
+def _build(db: Database, stamp: str) -> ParcelLocator:
+    columns = db.column_info("property_valuations")
+    valuation_parcels = _valuation_parcels(db)
+    polygon_rows = db.fetchall(
+        "SELECT id, geometry_wkb FROM property_valuations WHERE min_x < max_x AND min_y < max_y ORDER BY id"
+    ) if "min_x" in columns else []
+    point_rows = db.fetchall(
+        "SELECT id, latitude, longitude FROM parcels "
+        "WHERE latitude IS NOT NULL AND longitude IS NOT NULL ORDER BY id"
+    )
+    if "centroid_x" in columns:
+        point_rows += [
+            (valuation_parcels[r[0]], r[1], r[2])
+            for r in db.fetchall(
+                "SELECT id, centroid_y, centroid_x FROM property_valuations "
+                "WHERE centroid_x IS NOT NULL AND centroid_y IS NOT NULL ORDER BY id"
+            )
+            if r[0] in valuation_parcels
+        ]
+    locator = ParcelLocator.build(polygon_rows, point_rows, valuation_parcels, stamp)
+    log.info(f"Built parcel locator: {len(locator.polygon_index)} polygons, {len(locator.points)} points")
+    return locator
+
+
+_cache: IndexCache[ParcelLocator] = IndexCache(
+    "parcel locator", CACHE_FILE, ParcelLocator.load, locator_stamp, _build
+)
+
+
+def load_parcel_locator(db: Database, cache_dir: Path | None = None) -> ParcelLocator:
+    """The parcel locator for the current table contents.
+
+    Reuses the locator already loaded in this process, then the one saved in
+    ``cache_dir``, while their stamp matches; otherwise rebuilds and saves
+    it (see :class:`~parcl.index_cache.IndexCache`).
+    """
+    return _cache.get(db, cache_dir)
@@ -30,6 +30,12 @@ class Parcel:
     external_id: str
     address: str = ""
     address_norm: str = ""
+    house_number: str = ""
+    predir: str = ""
+    street_name: str = ""
+    street_suffix: str = ""
+    unit: str = ""
+    address_key: str = ""
     apn: str = ""
     city: str = ""
     state: str = ""
@@ -57,6 +63,12 @@ class Permit:
     description: str = ""
     address: str = ""
     address_norm: str = ""
+    house_number: str = ""
+    predir: str = ""
+    street_name: str = ""
+    street_suffix: str = ""
+    unit: str = ""
+    address_key: str = ""
     applicant: str = ""
     contractor: str = ""
     valuation: float | None = None
@@ -79,6 +91,12 @@ class ZoningCase:
     case_name: str = ""
     address: str = ""
     address_norm: str = ""
+    house_number: str = ""
+    predir: str = ""
+    street_name: str = ""
+    street_suffix: str = ""
+    unit: str = ""
+    address_key: str = ""
     existing_zoning: str = ""
     proposed_zoning: str = ""
     status: str = ""
@@ -98,6 +116,12 @@ class BoaCase:
     case_number: str = ""
     address: str = ""
     address_norm: str = ""
+    house_number: str = ""
+    predir: str = ""
+    street_name: str = ""
+    street_suffix: str = ""
+    unit: str = ""
+    address_key: str = ""
     variance_type: str = ""
     status: str = ""
     filed_date: date | None = None
@@ -118,6 +142,7 @@ class ZoningOverlay:
     layer_name: str = ""
     layer_id: int | None = None
     geometry_wkt: str = ""
+    geometry_wkb: bytes | None = None
     properties: dict[str, Any] | None = None
     jurisdiction_id: str = ""
     raw_payload: dict[str, Any] | None = None
@@ -136,6 +161,7 @@ class UtilityCapacity:
     period_start: date | None = None
     period_end: date | None = None
     geometry_wkt: str = ""
+    geometry_wkb: bytes | None = None
     jurisdiction_id: str = ""
     raw_payload: dict[str, Any] | None = None
 
@@ -151,9 +177,16 @@ class EnvironmentalConstraint:
     description: str = ""
     address: str = ""
     address_norm: str = ""
+    house_number: str = ""
+    predir: str = ""
+    street_name: str = ""
+    street_suffix: str = ""
+    unit: str = ""
+    address_key: str = ""
     latitude: float | None = None
     longitude: float | None = None
     geometry_wkt: str = ""
+    geometry_wkb: bytes | None = None
     properties: dict[str, Any] | None = None
     jurisdiction_id: str = ""
     raw_payload: dict[str, Any] | None = None
@@ -168,6 +201,12 @@ class RightsRestriction:
     parcel_id: str = ""
     address: str = ""
     address_norm: str = ""
+    house_number: str = ""
+    predir: str = ""
+    street_name: str = ""
+    street_suffix: str = ""
+    unit: str = ""
+    address_key: str = ""
     grantor: str = ""
     grantee: str = ""
     recorded_date: date | None = None
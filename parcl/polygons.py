@@ -0,0 +1,386 @@
+"""In-process point-in-polygon engine for overlay, flood zone and service area polygons.
+
+:class:`PolygonIndex` holds every polygon of the tables in ``POLYGON_TABLES``
+as flat NumPy arrays: one row of ``x1, y1, x2, y2`` per ring edge, and a
+packed STR (sort-tile-recursive) R-tree over the polygon bounding boxes. A
+batch of points walks the tree one level at a time as arrays of (point,
+node) pairs, so finding candidate polygons costs a few NumPy passes per
+level rather than a Python loop per point. Candidates are then confirmed by
+even-odd ray casting against the polygon's edges.
+
+The index is saved under the cache directory and reused until the content
+stamp of the polygon tables changes (see :func:`polygon_stamp`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+
+from parcl.db import Database
+from parcl.geometry import from_wkb
+from parcl.index_cache import IndexCache
+from parcl.logger import get_logger
+
+log = get_logger("polygons")
+
+# Tables whose polygons are indexed: (name column, category column)
+POLYGON_TABLES = {
+    "zoning_overlays": ("overlay_name", "overlay_type"),
+    "environmental_constraints": ("name", "constraint_type"),
+    "utility_capacity": ("facility_name", "utility_type"),
+    "transit_amenities": ("name", "amenity_type"),
+}
+
+# Children per R-tree node
+NODE_SIZE = 16
+
+# Polygons with more edges than this are ray-cast in horizontal bands
+BAND_EDGES = 256
+
+# Cap on points x edges compared in one ray-casting block
+_MAX_BLOCK = 4_000_000
+
+# Points sent down the R-tree together
+_POINT_BLOCK = 4096
+
+_BOX = ("min_x", "min_y", "max_x", "max_y")
+
+CACHE_FILE = "polygons.npz"
+
+
+def _str_order(boxes: np.ndarray, node_size: int) -> np.ndarray:
+    """Sort-tile-recursive order: vertical slices by x centre, then y within each."""
+    n = len(boxes)
+    leaves = -(-n // node_size)
+    slices = int(np.ceil(np.sqrt(leaves)))
+    per_slice = slices * node_size
+    cx = boxes[:, 0] + boxes[:, 2]
+    cy = boxes[:, 1] + boxes[:, 3]
+    by_x = np.argsort(cx, kind="stable")
+    slice_of = np.empty(n, dtype=np.int64)
+    slice_of[by_x] = np.arange(n) // per_slice
+    return np.lexsort((cy, slice_of))
+
+
+def _edges(geom: Any) -> np.ndarray:
+    """Every ring edge of a polygon as ``(x1, y1, x2, y2)`` rows."""
+    rows = [np.hstack([ring[:-1], ring[1:]]) for part in geom.parts for ring in part if len(ring) > 1]
+    return np.concatenate(rows) if rows else np.empty((0, 4))
+
+
+def _crossings(px: np.ndarray, py: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Even-odd test of points against a set of edges, in bounded blocks."""
+    inside = np.zeros(len(px), dtype=bool)
+    if not len(edges) or not len(px):
+        return inside
+    x1, y1, x2, y2 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+    step = max(1, _MAX_BLOCK // len(edges))
+    for i in range(0, len(px), step):
+        bx = px[i:i + step, None]
+        by = py[i:i + step, None]
+        spans = (y1 > by) != (y2 > by)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_at = x1 + (by - y1) * (x2 - x1) / (y2 - y1)
+        inside[i:i + step] = np.logical_xor.reduce(spans & (bx < x_at), axis=1)
+    return inside
+
+
+def _points_in_edges(px: np.ndarray, py: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Ray casting that only compares each point with the edges spanning its y.
+
+    Large polygons are cut into horizontal bands; each edge is listed in
+    every band its y-range touches and each point is tested against its own
+    band only.
+    """
+    if len(edges) <= BAND_EDGES:
+        return _crossings(px, py, edges)
+    bands = len(edges) // (BAND_EDGES // 4)
+    lo = np.minimum(edges[:, 1], edges[:, 3])
+    hi = np.maximum(edges[:, 1], edges[:, 3])
+    y0, height = lo.min(), (hi.max() - lo.min()) or 1.0
+    edge_lo = np.clip(((lo - y0) / height * bands).astype(np.int64), 0, bands - 1)
+    edge_hi = np.clip(((hi - y0) / height * bands).astype(np.int64), 0, bands - 1)
+    point_band = np.clip(((py - y0) / height * bands).astype(np.int64), 0, bands - 1)
+    inside = np.zeros(len(px), dtype=bool)
+    for band in np.unique(point_band):
+        members = np.flatnonzero(point_band == band)
+        in_band = (edge_lo <= band) & (edge_hi >= band)
+        inside[members] = _crossings(px[members], py[members], edges[in_band])
+    return inside
+
+
+class PolygonIndex:
+    """Polygons from several tables, queryable by batches of points."""
+
+    _META = ("tables", "ids", "names", "categories")
+
+    def __init__(
+        self,
+        tables: np.ndarray,
+        ids: np.ndarray,
+        names: np.ndarray,
+        categories: np.ndarray,
+        edges: np.ndarray,
+        edge_offsets: np.ndarray,
+        levels: list[dict[str, np.ndarray]],
+        stamp: str = "",
+    ):
+        self.tables = tables
+        self.ids = ids
+        self.names = names
+        self.categories = categories
+        self.edges = edges
+        self.edge_offsets = edge_offsets
+        # levels[0] is the root; the last level holds one box per polygon
+        # slot and ``polygon`` maps each slot to its polygon
+        self.levels = levels
+        self.stamp = stamp
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, rows: Iterable[tuple[str, str, str | None, str | None, Any]], stamp: str = "") -> PolygonIndex:
+        """Build from ``(table, id, name, category, geometry_wkb)`` rows.
+
+        Rows whose geometry is not a polygon or multipolygon are skipped.
+        """
+        meta: list[tuple[str, str, str, str]] = []
+        edge_sets: list[np.ndarray] = []
+        for table, row_id, name, category, wkb in rows:
+            try:
+                geom = from_wkb(wkb)
+            except ValueError:
+                continue
+            if geom is None or geom.kind not in ("Polygon", "MultiPolygon"):
+                continue
+            edges = _edges(geom)
+            if len(edges):
+                meta.append((table, str(row_id), name or "", category or ""))
+                edge_sets.append(edges)
+
+        counts = np.array([len(e) for e in edge_sets], dtype=np.int64)
+        edge_offsets = np.concatenate([[0], np.cumsum(counts)])
+        edges = np.concatenate(edge_sets) if edge_sets else np.empty((0, 4))
+        columns = list(zip(*meta)) if meta else [(), (), (), ()]
+        tables, ids, names, categories = (np.array(c, dtype=str) for c in columns)
+
+        boxes = np.empty((len(meta), 4))
+        if len(meta):
+            xs = np.minimum(edges[:, 0], edges[:, 2])
+            ys = np.minimum(edges[:, 1], edges[:, 3])
+            boxes[:, 0] = np.minimum.reduceat(xs, edge_offsets[:-1])
+            boxes[:, 1] = np.minimum.reduceat(ys, edge_offsets[:-1])
+            boxes[:, 2] = np.maximum.reduceat(np.maximum(edges[:, 0], edges[:, 2]), edge_offsets[:-1])
+            boxes[:, 3] = np.maximum.reduceat(np.maximum(edges[:, 1], edges[:, 3]), edge_offsets[:-1])
+        return cls(tables, ids, names, categories, edges, edge_offsets, cls._pack(boxes), stamp)
+
+    @staticmethod
+    def _pack(boxes: np.ndarray) -> list[dict[str, np.ndarray]]:
+        """Bulk-load the STR tree bottom-up over the polygon boxes.
+
+        Each level keeps its node boxes as four separate coordinate arrays,
+        which the batched descent gathers from far faster than from rows.
+        """
+        def level(nodes: np.ndarray, **extra: np.ndarray) -> dict[str, np.ndarray]:
+            columns = {c: np.ascontiguousarray(nodes[:, i]) for i, c in enumerate(_BOX)}
+            return {**columns, **extra}
+
+        order = _str_order(boxes, NODE_SIZE) if len(boxes) else np.empty(0, dtype=np.int64)
+        boxes = boxes[order]
+        levels = [level(boxes, polygon=order)]
+        while len(boxes) > NODE_SIZE:
+            starts = np.arange(0, len(boxes), NODE_SIZE)
+            ends = np.minimum(starts + NODE_SIZE, len(boxes))
+            nodes = np.hstack([
+                np.minimum.reduceat(boxes[:, :2], starts),
+                np.maximum.reduceat(boxes[:, 2:], starts),
+            ])
+            order = _str_order(nodes, NODE_SIZE)
+            boxes = nodes[order]
+            levels.insert(0, level(boxes, start=starts[order], end=ends[order]))
+        return levels
+
+    def candidates(self, lats: np.ndarray, lons: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(point, polygon) pairs whose bounding box contains the point.
+
+        Points descend the tree in blocks of ``_POINT_BLOCK`` so the pair
+        arrays stay small enough to remain in cache.
+        """
+        xs, ys = np.asarray(lons, dtype=np.float64), np.asarray(lats, dtype=np.float64)
+        top = len(self.levels[0]["min_x"])
+        points, polygons = [], []
+        for first in range(0, len(xs), _POINT_BLOCK):
+            count = min(_POINT_BLOCK, len(xs) - first)
+            point = np.repeat(np.arange(first, first + count), top)
+            node = np.tile(np.arange(top), count)
+            for level in self.levels:
+                x = xs[point]
+                hit = (level["min_x"][node] <= x) & (x <= level["max_x"][node])
+                point, node = point[hit], node[hit]
+                y = ys[point]
+                hit = (level["min_y"][node] <= y) & (y <= level["max_y"][node])
+                point, node = point[hit], node[hit]
+                if "polygon" in level:
+                    points.append(point)
+                    polygons.append(level["polygon"][node])
+                    break
+                start = level["start"][node]
+                counts = level["end"][node] - start
+                offsets = np.cumsum(counts) - counts
+                point = np.repeat(point, counts)
+                node = np.repeat(start - offsets, counts) + np.arange(counts.sum())
+        if not points:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(points), np.concatenate(polygons)
+
+    def query(self, lats: Iterable[float], lons: Iterable[float]) -> tuple[np.ndarray, np.ndarray]:
+        """(point, polygon) index pairs for every polygon containing each point.
+
+        Pairs are sorted by point, then polygon. Points on a boundary may
+        fall either side.
+        """
+        xs = np.asarray(lons if isinstance(lons, np.ndarray) else list(lons), dtype=np.float64)
+        ys = np.asarray(lats if isinstance(lats, np.ndarray) else list(lats), dtype=np.float64)
+        empty = np.empty(0, dtype=np.int64)
+        if not len(self) or not len(xs):
+            return empty, empty
+        point, polygon = self.candidates(ys, xs)
+        if not len(point):
+            return empty, empty
+
+        by_polygon = np.lexsort((point, polygon))
+        point, polygon = point[by_polygon], polygon[by_polygon]
+        inside = np.zeros(len(point), dtype=bool)
+        groups = np.flatnonzero(np.r_[True, polygon[1:] != polygon[:-1], True])
+        for start, end in zip(groups[:-1], groups[1:]):
+            p = polygon[start]
+            edges = self.edges[self.edge_offsets[p]:self.edge_offsets[p + 1]]
+            pts = point[start:end]
+            inside[start:end] = _points_in_edges(xs[pts], ys[pts], edges)
+
+        point, polygon = point[inside], polygon[inside]
+        by_point = np.lexsort((polygon, point))
+        return point[by_point], polygon[by_point]
+
+    def containing(self, lat: float, lon: float, table: str | None = None) -> list[dict[str, str]]:
+        """Polygons containing one point, optionally from one table only."""
+        _, polygons = self.query([lat], [lon])
+        return [
+            {
+                "table": str(self.tables[p]),
+                "id": str(self.ids[p]),
+                "name": str(self.names[p]),
+                "category": str(self.categories[p]),
+            }
+            for p in polygons
+            if table is None or self.tables[p] == table
+        ]
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """The index as named arrays, for saving alone or inside another index's file."""
+        arrays: dict[str, np.ndarray] = {name: getattr(self, name) for name in self._META}
+        arrays["edges"] = self.edges
+        arrays["edge_offsets"] = self.edge_offsets
+        for i, level in enumerate(self.levels):
+            for key, values in level.items():
+                arrays[f"level{i}_{key}"] = values
+        arrays["header"] = np.array(json.dumps({"stamp": self.stamp, "levels": len(self.levels)}))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> PolygonIndex:
+        header = json.loads(str(arrays["header"]))
+        levels = []
+        for i in range(header["levels"]):
+            prefix = f"level{i}_"
+            levels.append({k[len(prefix):]: arrays[k] for k in arrays if k.startswith(prefix)})
+        return cls(
+            *(arrays[name] for name in cls._META),
+            arrays["edges"], arrays["edge_offsets"], levels, header["stamp"],
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **self.arrays())
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> PolygonIndex:
+        with np.load(path) as data:
+            return cls.from_arrays(data)
+
+
+def _present_tables(db: Database) -> list[str]:
+    return [t for t in POLYGON_TABLES if "min_x" in db.column_info(t)]
+
+
+def table_stamp(db: Database, table: str, source_id: str | None = None) -> str:
+    """Content stamp of one table's polygon rows (optionally one source's).
+
+    Built from each row's id, labels, bounding box and centroid, so it is
+    one scan of small columns rather than of the geometry itself.
+    """
+    name, category = POLYGON_TABLES[table]
+    where = "min_x < max_x AND min_y < max_y" + (" AND source_id = ?" if source_id else "")
+    row = db.fetchone(
+        "SELECT COUNT(*), md5(COALESCE(string_agg("
+        f"id || '|' || COALESCE({name}, '') || '|' || COALESCE({category}, '') || '|' || "
+        "CAST(min_x AS VARCHAR) || '|' || CAST(min_y AS VARCHAR) || '|' || "
+        "CAST(max_x AS VARCHAR) || '|' || CAST(max_y AS VARCHAR) || '|' || "
+        "CAST(centroid_x AS VARCHAR) || '|' || CAST(centroid_y AS VARCHAR), ',' ORDER BY id), '')) "
+        f"FROM {table} WHERE {where}",
+        (source_id,) if source_id else None,
+    )
+    return f"{row[0]}:{row[1]}"
+
+
+def polygon_stamp(db: Database) -> str:
+    """Content stamp of every indexed polygon: changes when any is added,
+    removed, renamed or reshaped."""
+    digest = hashlib.sha256()
+    for table in _present_tables(db):
+        digest.update(f"{table}:{table_stamp(db, table)};".encode())
+    return digest.hexdigest()[:16]
+
+
+def _polygon_rows(db: Database) -> Iterable[tuple]:
+    for table in _present_tables(db):
+        name, category = POLYGON_TABLES[table]
+        yield from (
+            (table, *row)
+            for row in db.fetchall(
+                f"SELECT id, {name}, {category}, geometry_wkb FROM {table} "
+                "WHERE min_x < max_x AND min_y < max_y ORDER BY id"
+            )
+        )
+
+
+def _build(db: Database, stamp: str) -> PolygonIndex:
+    index = PolygonIndex.build(_polygon_rows(db), stamp)
+    log.info(f"Built polygon index: {len(index)} polygons, {len(index.edges)} edges")
+    return index
+
+
+# No TTL: the stamp is read on every call, so a relink right after a load sees its polygons
+_cache: IndexCache[PolygonIndex] = IndexCache(
+    "polygon", CACHE_FILE, PolygonIndex.load, polygon_stamp, _build, ttl=0.0
+)
+
+
+def load_polygon_index(db: Database, cache_dir: Path | None = None) -> PolygonIndex:
+    """The polygon index for the current table contents.
+
+    Reuses the index already loaded in this process, then the one saved in
+    ``cache_dir``, while their stamp matches; otherwise rebuilds and saves it
+    (see :class:`~parcl.index_cache.IndexCache`).
+    """
+    return _cache.get(db, cache_dir)
@@ -2,24 +2,99 @@
 
 from __future__ import annotations
 
-from typing import Any
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator
 
-from parcl.address import normalize_address
+import numpy as np
+
+from parcl.address import normalize_address, parse_address
+from parcl.address_index import AddressIndex, load_address_index
+from parcl.amenities import AmenityIndex, load_amenity_index
 from parcl.db import Database
+from parcl.etl.loader import stage_temp_table
+from parcl.grid import bbox_clause, cells_near_many, near_clause
+from parcl.locator import LOCATE_RADIUS_M, load_parcel_locator
 from parcl.logger import get_logger
+from parcl.polygons import POLYGON_TABLES
 
 log = get_logger("profile")
 
+# Half-width in degrees of the box searched for nearby environmental constraints
+NEARBY_RADIUS = 0.005
+
+# Most recent permits listed per profile
+PROFILE_PERMITS = 20
+
+# Closest address index candidates tried for a query matching no parcel exactly
+FUZZY_CANDIDATES = 10
+
+# Radii in metres within which a parcel's transit stops are counted
+TRANSIT_COUNT_RADII = (400.0, 800.0)
+
+# Queries profiled per set-based pass of get_parcel_risk_profiles
+BATCH_SIZE = 2000
+
+_PARCEL_COLUMNS = [
+    "id", "address", "address_norm", "address_key", "base_zoning", "zoning_desc",
+    "latitude", "longitude", "city", "state", "zip_code",
+]
+_PARCEL_SELECT = f"SELECT {', '.join(_PARCEL_COLUMNS)} FROM parcels"
+
+
+def _match_column(parcel: dict | None, key: str | None, norm_query: str) -> tuple[str, Any]:
+    """Column and value selecting the rows at the profiled address: the rows
+    resolved to the parcel (see parcl.resolve). Without a parcel, the indexed
+    address_key, or exact address_norm when the query has no house number to
+    build a key from."""
+    if parcel:
+        return "parcel_id", parcel["id"]
+    if key:
+        return "address_key", key
+    return "address_norm", norm_query
+
 
 def get_parcel_risk_profile(query: str, db: Database) -> dict[str, Any]:
     """Get a comprehensive risk profile for a parcel by address or ID.
 
     Resolution order:
     1. Try exact parcel UUID match
-    2. Try normalized address LIKE match on parcels table
-    3. Fallback to permits table address match
+    2. Try address_key equality, then an anchored address_norm prefix match
+    3. Try the closest indexed address with the same house number
+    4. Fallback to permits table address match
+
+    The parcel is looked up with one statement (plus the address index when
+    no id or key matches), and everything else with one more (see
+    :func:`_profile_rows`).
     """
     norm_query = normalize_address(query)
+    key = parse_address(query).key
+
+    # Try parcel match
+    parcel = _find_parcel(db, query, norm_query, key)
+    if parcel:
+        key = parcel.get("address_key") or key
+    column, value = _match_column(parcel, key, norm_query)
+    links, permits, at_address, inside, nearby, facts = _profile_rows(db, column, value, norm_query, parcel)
+    return _build_profile(
+        query, norm_query, parcel, links,
+        permits=permits,
+        risks=_risks_from_rows(at_address, inside, nearby),
+        facts=facts,
+        amenities=_amenity_facts(db, [parcel])[0],
+    )
+
+
+def _build_profile(
+    query: str,
+    norm_query: str,
+    parcel: dict | None,
+    links: list[dict[str, Any]],
+    permits: list[dict[str, Any]],
+    risks: list[dict[str, Any]],
+    facts: dict[str, Any],
+    amenities: dict[str, Any],
+) -> dict[str, Any]:
+    """Assemble the profile from the rows gathered for one query."""
     result: dict[str, Any] = {
         "query": query,
         "matched_address": None,
@@ -30,28 +105,32 @@ def get_parcel_risk_profile(query: str, db: Database) -> dict[str, Any]:
         "data_sources": [],
         "warnings": [],
     }
-
-    # Try parcel match
-    parcel = _find_parcel(db, query, norm_query)
+    areas = [link for link in links if link["relation"] == "within"]
     if parcel:
         result["matched_address"] = parcel.get("address_norm") or parcel.get("address")
-        result["zoning"] = _get_zoning_info(db, parcel, norm_query)
+        result["zoning"] = _zoning_info(parcel, areas, facts["open_zoning_cases"] > 0)
         result["data_sources"].append("parcels")
     else:
         result["warnings"].append(f"No parcel record found for '{query}'. Using permit/case data only.")
         result["matched_address"] = norm_query
 
-    # Get permits
-    permits = _get_permits(db, norm_query)
     if permits:
         result["permits"] = permits
         result["data_sources"].append("permits")
 
-    # Get risks
-    result["risks"] = _get_risks(db, norm_query, parcel)
+    result["risks"] = risks
 
-    # Get supporting facts
-    result["supporting_facts"] = _get_facts(db, norm_query)
+    result["supporting_facts"] = dict(facts)
+    result["supporting_facts"]["utility_service_areas"] = [
+        a["name"] or a["category"] for a in areas if a["table"] == "utility_capacity"
+    ]
+    result["supporting_facts"]["nearby_transit_stops"] = [
+        {"name": link["name"] or link["category"], "distance_m": round(link["distance_m"])}
+        for link in sorted(
+            (link for link in links if link["relation"] == "near"), key=lambda link: link["distance_m"]
+        )
+    ]
+    result["supporting_facts"].update(amenities)
 
     # Add data sources for risks
     if any(r["type"] == "flood_zone" for r in result["risks"]):
@@ -62,89 +141,185 @@ def get_parcel_risk_profile(query: str, db: Database) -> dict[str, Any]:
     return result
 
 
-def _find_parcel(db: Database, raw_query: str, norm_query: str) -> dict[str, Any] | None:
-    """Find a parcel by UUID or normalized address."""
-    # Try UUID
+def _find_parcel(
+    db: Database, raw_query: str, norm_query: str, key: str | None
+) -> dict[str, Any] | None:
+    """Find a parcel by UUID, address key, or through the address index."""
+    # Try UUID, then the canonical address key (both indexed), in one statement
+    columns = ", ".join(_PARCEL_COLUMNS)
     row = db.fetchone(
-        "SELECT id, address, address_norm, base_zoning, zoning_desc, latitude, longitude, "
-        "city, state, zip_code FROM parcels WHERE id = ?",
-        (raw_query,),
+        f"SELECT {columns} FROM (SELECT 0 AS pref, {columns} FROM parcels WHERE id = ? "
+        f"UNION ALL SELECT 1, {columns} FROM parcels WHERE address_key = ?) m ORDER BY pref, id LIMIT 1",
+        (raw_query, key),
     )
     if row:
-        return dict(zip(
-            ["id", "address", "address_norm", "base_zoning", "zoning_desc",
-             "latitude", "longitude", "city", "state", "zip_code"],
-            row,
-        ))
+        return dict(zip(_PARCEL_COLUMNS, row))
 
-    # Try normalized address LIKE match
-    row = db.fetchone(
-        "SELECT id, address, address_norm, base_zoning, zoning_desc, latitude, longitude, "
-        "city, state, zip_code FROM parcels WHERE address_norm LIKE ? LIMIT 1",
-        (f"%{norm_query}%",),
-    )
-    if row:
-        return dict(zip(
-            ["id", "address", "address_norm", "base_zoning", "zoning_desc",
-             "latitude", "longitude", "city", "state", "zip_code"],
-            row,
-        ))
+    # Then the address index: anchored prefix, then the closest spelling
+    if norm_query:
+        parcel_id = _indexed_parcel(db, _address_index(db), norm_query)
+        if parcel_id:
+            row = db.fetchone(f"{_PARCEL_SELECT} WHERE id = ?", (parcel_id,))
+            if row:
+                return dict(zip(_PARCEL_COLUMNS, row))
 
     return None
 
 
-def _get_zoning_info(db: Database, parcel: dict, norm_query: str) -> dict[str, Any]:
-    """Build zoning info from parcel and related cases."""
-    zoning: dict[str, Any] = {
-        "base_zone": parcel.get("base_zoning", ""),
-        "description": parcel.get("zoning_desc", ""),
-        "overlays": [],
-        "pending_rezoning": False,
-    }
+def _address_index(db: Database) -> AddressIndex | None:
+    try:
+        return load_address_index(db)
+    except OSError as e:
+        log.warning(f"Address index unavailable, matching addresses in SQL: {e}")
+        return None
 
-    # Check for pending zoning cases
-    row = db.fetchone(
-        "SELECT COUNT(*) FROM zoning_cases WHERE address_norm LIKE ? "
-        "AND status NOT IN ('Closed', 'Withdrawn', 'Denied')",
-        (f"%{norm_query}%",),
-    )
-    if row and row[0] > 0:
-        zoning["pending_rezoning"] = True
 
-    return zoning
+def _amenity_index(db: Database) -> AmenityIndex | None:
+    try:
+        return load_amenity_index(db)
+    except OSError as e:
+        log.warning(f"Amenity index unavailable, profiles omit nearest amenities: {e}")
+        return None
 
 
-def _get_permits(db: Database, norm_query: str) -> list[dict[str, Any]]:
-    """Get permits matching the address."""
-    rows = db.fetchall(
-        "SELECT permit_number, permit_type, status, valuation, issued_date, description "
-        "FROM permits WHERE address_norm LIKE ? ORDER BY issued_date DESC LIMIT 20",
-        (f"%{norm_query}%",),
-    )
-    return [
+def _amenity_facts(db: Database, parcels: list[dict | None]) -> list[dict[str, Any]]:
+    """Nearest transit stop and park of each parcel point, and the stops
+    within each of TRANSIT_COUNT_RADII, from the amenity index in one batch."""
+    facts: list[dict[str, Any]] = [
         {
-            "permit_number": r[0],
-            "type": r[1],
-            "status": r[2],
-            "valuation": r[3],
-            "issued_date": str(r[4]) if r[4] else None,
-            "description": r[5],
+            "nearest_transit_stop": None,
+            **{f"transit_stops_within_{radius:.0f}m": 0 for radius in TRANSIT_COUNT_RADII},
+            "nearest_park": None,
         }
-        for r in rows
+        for _ in parcels
+    ]
+    located = [
+        i for i, p in enumerate(parcels)
+        if p and p.get("latitude") is not None and p.get("longitude") is not None
     ]
+    index = _amenity_index(db) if located else None
+    if index is None:
+        return facts
+    lats = np.array([parcels[i]["latitude"] for i in located], dtype=np.float64)
+    lons = np.array([parcels[i]["longitude"] for i in located], dtype=np.float64)
+    # One search out to the widest radius gives the counts and, mostly, the nearest stop
+    point, row, metres = index.within("stop", lats, lons, max(TRANSIT_COUNT_RADII))
+    for radius in TRANSIT_COUNT_RADII:
+        counts = np.bincount(point[metres <= radius], minlength=len(located))
+        for i, count in enumerate(counts.tolist()):
+            facts[located[i]][f"transit_stops_within_{radius:.0f}m"] = count
+    first = np.flatnonzero(np.r_[True, point[1:] != point[:-1]]) if len(point) else point
+    nearest: dict[str, dict[int, tuple[int, float]]] = {
+        "stop": dict(zip(point[first].tolist(), zip(row[first].tolist(), metres[first].tolist()))),
+    }
+    farther = [i for i in range(len(located)) if i not in nearest["stop"]]
+    if farther:
+        for i, r, d in zip(*index.nearest("stop", lats[farther], lons[farther])):
+            nearest["stop"][farther[i]] = (r, d)
+    nearest["park"] = {i: (r, d) for i, r, d in zip(*index.nearest("park", lats, lons))}
+    for kind, fact in (("stop", "nearest_transit_stop"), ("park", "nearest_park")):
+        for i, (r, d) in nearest[kind].items():
+            amenity = index.describe(kind, r, d)
+            facts[located[i]][fact] = {"name": amenity["name"] or amenity["category"], "distance_m": round(d)}
+    return facts
 
 
-def _get_risks(db: Database, norm_query: str, parcel: dict | None) -> list[dict[str, Any]]:
-    """Identify risks from environmental constraints and other data."""
-    risks = []
+def _indexed_parcel(db: Database, index: AddressIndex | None, norm_query: str) -> str | None:
+    """Parcel id for an address no key matched: the first parcel by
+    (address_norm, id) starting with it, else the parcel of the most similar
+    indexed address sharing its house number (a valuation's parcel shares
+    its address_key). Without an index, only the prefix match, in SQL."""
+    if index is None:
+        # Anchored, so "100 MAIN" never hits "1100 MAIN"
+        row = db.fetchone(
+            "SELECT id FROM parcels WHERE address_norm LIKE ? ORDER BY address_norm, id LIMIT 1",
+            (f"{norm_query}%",),
+        )
+        return row[0] if row else None
+    hit = index.prefix(norm_query)
+    if hit:
+        return hit.id
+    number = _house_number(norm_query)
+    for candidate in index.search(norm_query, limit=FUZZY_CANDIDATES):
+        if _house_number(candidate.address_norm) != number:
+            continue
+        if candidate.table == "parcels":
+            return candidate.id
+        row = db.fetchone(
+            "SELECT MIN(p.id) FROM property_valuations v JOIN parcels p ON p.address_key = v.address_key "
+            "WHERE v.id = ?",
+            (candidate.id,),
+        )
+        if row and row[0]:
+            return row[0]
+    return None
 
-    # Check environmental constraints by address
-    rows = db.fetchall(
-        "SELECT constraint_type, name, severity, description "
-        "FROM environmental_constraints WHERE address_norm LIKE ? OR name LIKE ?",
-        (f"%{norm_query}%", f"%{norm_query}%"),
-    )
-    for r in rows:
+
+def _house_number(norm: str) -> str | None:
+    first = norm.split(" ", 1)[0]
+    return first if first[:1].isdigit() else None
+
+
+def _link_parts(db: Database, where: str, links: str = "parcel_spatial_links") -> list[str]:
+    """One SELECT per polygon/point table over ``links`` rows (parcel_spatial_links
+    or a subset of it) matching ``where``."""
+    parts = []
+    for position, (table, (name, category)) in enumerate(POLYGON_TABLES.items()):
+        if db.column_info(table):
+            parts.append(
+                f"SELECT {position} AS position, l.feature_table, l.feature_id, l.relation, l.distance_m, "
+                f"f.{name} AS name, f.{category} AS category, l.parcel_id FROM {links} l "
+                f"JOIN {table} f ON f.id = l.feature_id WHERE {where} AND l.feature_table = '{table}'"
+            )
+    return parts
+
+
+def _link_dict(row: tuple) -> dict[str, Any]:
+    return {
+        "table": row[1], "id": row[2], "relation": row[3], "distance_m": row[4],
+        "name": row[5], "category": row[6],
+    }
+
+
+def _zoning_info(parcel: dict, areas: list[dict[str, Any]], pending_rezoning: bool) -> dict[str, Any]:
+    """Build zoning info from parcel, the overlays containing it and whether
+    a zoning case at the address is still open."""
+    return {
+        "base_zone": parcel.get("base_zoning", ""),
+        "description": parcel.get("zoning_desc", ""),
+        "overlays": [
+            {"name": a["name"], "type": a["category"]}
+            for a in areas if a["table"] == "zoning_overlays"
+        ],
+        "pending_rezoning": pending_rezoning,
+    }
+
+
+_PERMIT_COLUMNS = "permit_number, permit_type, status, valuation, issued_date, description"
+_PERMIT_ORDER = "issued_date DESC, id"
+_CONSTRAINT_COLUMNS = "constraint_type, name, severity, description"
+
+_OPEN_ZONING = "status NOT IN ('Closed', 'Withdrawn', 'Denied')"
+_RECENT_PERMIT = "issued_date >= CURRENT_DATE - INTERVAL '5 years'"
+
+
+def _permit_dict(r: tuple) -> dict[str, Any]:
+    return {
+        "permit_number": r[0],
+        "type": r[1],
+        "status": r[2],
+        "valuation": r[3],
+        "issued_date": str(r[4]) if r[4] else None,
+        "description": r[5],
+    }
+
+
+def _risks_from_rows(at_address: list[tuple], inside: list[tuple], nearby: list[tuple]) -> list[dict[str, Any]]:
+    """Risk entries from (constraint_type, name, severity, description) rows:
+    every constraint at the address, then the containing and nearby ones
+    whose label is not listed yet."""
+    risks = []
+    for r in at_address:
         risks.append({
             "type": r[0] or "environmental",
             "severity": r[2] or "medium",
@@ -152,58 +327,450 @@ def _get_risks(db: Database, norm_query: str, parcel: dict | None) -> list[dict[
             "detail": r[3] or "",
         })
 
-    # Check for flood zones near parcel lat/lon
+    seen = {r.get("label") for r in risks}
+    for r in inside:
+        label = r[1] or r[0] or "Environmental constraint"
+        if label not in seen:
+            seen.add(label)
+            risks.append({
+                "type": r[0] or "environmental",
+                "severity": r[2] or "medium",
+                "label": label,
+                "detail": r[3] or "Parcel lies within this area",
+            })
+
+    seen = {r.get("label") for r in risks}
+    for r in nearby:
+        label = r[1] or r[0] or "Nearby constraint"
+        if label not in seen:
+            risks.append({
+                "type": r[0] or "environmental",
+                "severity": r[2] or "medium",
+                "label": label,
+                "detail": r[3] or "",
+            })
+
+    return risks
+
+
+# Single profiles
+#
+# _profile_rows reads everything but the parcel in one statement. The permits
+# and constraints at the address (or near the parcel) are each selected once
+# into a materialized CTE, and the permit list, risk rows and fact counts are
+# derived from those. Every section comes back as rows of one UNION ALL,
+# tagged with a part number and laid out on shared typed columns (_ROW).
+
+_TEXT, _DOUBLE = "CAST(NULL AS TEXT)", "CAST(NULL AS DOUBLE PRECISION)"
+_DATE, _BIGINT = "CAST(NULL AS DATE)", "CAST(NULL AS BIGINT)"
+
+_LINKS, _PERMITS, _AT_ADDRESS, _INSIDE, _NEARBY, _FACTS = range(6)
+
+_FACT_NAMES = ("active_permits_5yr", "open_zoning_cases", "total_boa_cases", "environmental_flags")
+
+
+def _row(
+    part: int, pos: str = "0", sort: str = "CAST('' AS TEXT)", texts: tuple[str, ...] = (),
+    num: str = _DOUBLE, day: str = _DATE, n: str = _BIGINT,
+) -> str:
+    """Select list of one UNION ALL branch: part, pos, sort (the order within
+    the part), t1..t5, num, day and n."""
+    texts = (*texts, *(_TEXT for _ in range(5 - len(texts))))
+    columns = ", ".join(f"{t} AS t{i}" for i, t in enumerate(texts, 1))
+    return (
+        f"{part} AS part, CAST({pos} AS BIGINT) AS pos, {sort} AS sort, {columns}, "
+        f"{num} AS num, {day} AS day, {n} AS n"
+    )
+
+
+def _profile_rows(
+    db: Database, column: str, value: Any, norm_query: str, parcel: dict | None
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[tuple], list[tuple], list[tuple], dict[str, int]]:
+    """Links, permits, constraint rows at the address, inside and near the
+    parcel, and facts for the rows whose ``column`` is ``value``."""
+    ctes = [f"permit_rows AS MATERIALIZED (SELECT id, {_PERMIT_COLUMNS} FROM permits WHERE {column} = ?)"]
+    params: list[Any] = [value]
+    if parcel:
+        ctes.append(
+            "link_rows AS MATERIALIZED (SELECT parcel_id, feature_table, feature_id, relation, distance_m "
+            "FROM parcel_spatial_links WHERE parcel_id = ?)"
+        )
+        params.append(parcel["id"])
+
+    # Some sources (brownfield site lists) carry the address only in the
+    # constraint name, so that stays a LIKE
+    flags = [f"{column} = ? AS at_match", "name LIKE ? AS at_name"]
+    params += [value, f"%{norm_query}%"]
     if parcel and parcel.get("latitude"):
+        # Point rows near the parcel through their grid cells, polygon rows
+        # (no point of their own) by bounding box
         lat, lon = parcel["latitude"], parcel["longitude"]
-        rows = db.fetchall(
-            "SELECT constraint_type, name, severity, description "
-            "FROM environmental_constraints "
-            "WHERE latitude IS NOT NULL "
-            "AND ABS(latitude - ?) < 0.005 AND ABS(longitude - ?) < 0.005",
-            (lat, lon),
+        near, near_params = near_clause(lat, lon, NEARBY_RADIUS)
+        overlap, overlap_params = bbox_clause(lat, lon, NEARBY_RADIUS)
+        flags += [f"({near}) AS near_point", f"(latitude IS NULL AND {overlap}) AS near_box"]
+        params += [*near_params, *overlap_params]
+    else:
+        flags += ["FALSE AS near_point", "FALSE AS near_box"]
+    # Constraint polygons (flood zones) the parcel lies inside
+    flags.append(
+        "id IN (SELECT feature_id FROM link_rows WHERE feature_table = 'environmental_constraints' "
+        "AND relation = 'within') AS inside" if parcel else "FALSE AS inside"
+    )
+    ctes.append(
+        "constraint_rows AS MATERIALIZED (SELECT * FROM ("
+        f"SELECT id, {_CONSTRAINT_COLUMNS}, {', '.join(flags)} FROM environmental_constraints"
+        ") c WHERE at_match OR at_name OR near_point OR near_box OR inside)"
+    )
+
+    permit = ("t.permit_number", "t.permit_type", "t.status", "t.description")
+    constraint = ("t.constraint_type", "t.name", "t.severity", "t.description")
+    branches = []
+    links = _link_parts(db, "TRUE", "link_rows") if parcel else []
+    if links:
+        link = ("t.feature_table", "t.feature_id", "t.relation", "t.name", "t.category")
+        branches.append(
+            f"SELECT {_row(_LINKS, 't.position', 't.feature_id', link, num='t.distance_m')} "
+            f"FROM ({' UNION ALL '.join(links)}) t"
         )
-        seen = {r.get("label") for r in risks}
-        for r in rows:
-            label = r[1] or r[0] or "Nearby constraint"
-            if label not in seen:
-                risks.append({
-                    "type": r[0] or "environmental",
-                    "severity": r[2] or "medium",
-                    "label": label,
-                    "detail": r[3] or "",
-                })
+    branches += [
+        (
+            f"SELECT {_row(_PERMITS, 't.pos', texts=permit, num='t.valuation', day='t.issued_date')} "
+            f"FROM (SELECT *, ROW_NUMBER() OVER (ORDER BY {_PERMIT_ORDER}) AS pos FROM permit_rows) t "
+            f"WHERE t.pos <= {PROFILE_PERMITS}"
+        ),
+        (
+            f"SELECT {_row(_AT_ADDRESS, sort='t.id', texts=constraint)} FROM constraint_rows t "
+            "WHERE t.at_match OR t.at_name"
+        ),
+        f"SELECT {_row(_INSIDE, sort='t.id', texts=constraint)} FROM constraint_rows t WHERE t.inside",
+        (
+            f"SELECT {_row(_NEARBY, 'CASE WHEN t.near_point THEN 0 ELSE 1 END', 't.id', constraint)} "
+            "FROM constraint_rows t WHERE t.near_point OR t.near_box"
+        ),
+        f"SELECT {_row(_FACTS, '0', n='COUNT(*)')} FROM permit_rows WHERE {_RECENT_PERMIT}",
+        f"SELECT {_row(_FACTS, '1', n='COUNT(*)')} FROM zoning_cases WHERE {column} = ? AND {_OPEN_ZONING}",
+        f"SELECT {_row(_FACTS, '2', n='COUNT(*)')} FROM boa_cases WHERE {column} = ?",
+        f"SELECT {_row(_FACTS, '3', n='COUNT(CASE WHEN at_match THEN 1 END)')} FROM constraint_rows",
+    ]
+    params += [value, value]
+    rows = db.fetchall(
+        f"WITH {', '.join(ctes)} "
+        f"SELECT * FROM ({' UNION ALL '.join(branches)}) r ORDER BY part, pos, sort",
+        tuple(params),
+    )
 
-    return risks
+    parts: dict[int, list[tuple]] = {part: [] for part in range(6)}
+    for r in rows:
+        parts[r[0]].append(r)
+    return (
+        [_link_dict((r[1], r[3], r[4], r[5], r[8], r[6], r[7])) for r in parts[_LINKS]],
+        [_permit_dict((r[3], r[4], r[5], r[8], r[9], r[6])) for r in parts[_PERMITS]],
+        [r[3:7] for r in parts[_AT_ADDRESS]],
+        [r[3:7] for r in parts[_INSIDE]],
+        [r[3:7] for r in parts[_NEARBY]],
+        {_FACT_NAMES[r[1]]: r[10] for r in parts[_FACTS]},
+    )
 
 
-def _get_facts(db: Database, norm_query: str) -> dict[str, Any]:
-    """Get supporting aggregate facts."""
-    facts: dict[str, Any] = {}
+# Batch profiles
+#
+# get_parcel_risk_profiles answers many queries with a fixed number of
+# set-based statements per chunk: the queries are staged in a temp table,
+# resolved to parcels with joins, and each profile section is read with one
+# grouped query keyed by the match column and value (the batch form of
+# _match_column). Profiles are identical to get_parcel_risk_profile's.
 
-    row = db.fetchone(
-        "SELECT COUNT(*) FROM permits WHERE address_norm LIKE ? "
-        "AND issued_date >= CURRENT_DATE - INTERVAL '5 years'",
-        (f"%{norm_query}%",),
-    )
-    facts["active_permits_5yr"] = row[0] if row else 0
+_QUERIES = "_parcl_profile_queries"
+_MATCHES = "_parcl_profile_matches"
+_PARCELS = "_parcl_profile_parcels"
+_NEAR_CELLS = "_parcl_profile_near"
 
-    row = db.fetchone(
-        "SELECT COUNT(*) FROM zoning_cases WHERE address_norm LIKE ? "
-        "AND status NOT IN ('Closed', 'Withdrawn', 'Denied')",
-        (f"%{norm_query}%",),
+_MATCH_COLUMNS = ("parcel_id", "address_key", "address_norm")
+
+_FACT_SQL = {
+    "permits": (f"SUM(CASE WHEN {_RECENT_PERMIT} THEN 1 ELSE 0 END)", "active_permits_5yr"),
+    "zoning_cases": (f"SUM(CASE WHEN {_OPEN_ZONING} THEN 1 ELSE 0 END)", "open_zoning_cases"),
+    "boa_cases": ("COUNT(*)", "total_boa_cases"),
+    "environmental_constraints": ("COUNT(*)", "environmental_flags"),
+}
+
+
+def get_parcel_risk_profiles(
+    queries: Iterable[str], db: Database, batch_size: int = BATCH_SIZE
+) -> Iterator[dict[str, Any]]:
+    """Risk profiles for many addresses or parcel IDs, yielded in input order.
+
+    Each profile equals :func:`get_parcel_risk_profile` for the same query.
+    Queries are read ``batch_size`` at a time, so any number can be streamed.
+    """
+    it = iter(queries)
+    while chunk := list(islice(it, batch_size)):
+        yield from _profile_chunk(db, chunk)
+
+
+def _match_union(select: str, table: str, where: str = "", group: bool = True) -> str:
+    """One SELECT per match column over the ``table`` rows at the staged
+    matches, each led by the match column name and value. ``{column}`` in
+    ``select`` stands for the match column."""
+    return " UNION ALL ".join(
+        f"SELECT '{column}' AS match_column, t.{column} AS match_value, "
+        f"{select.format(column=column)} FROM {table} t "
+        f"WHERE t.{column} IN (SELECT value FROM {_MATCHES} WHERE match_column = '{column}'){where}"
+        + (f" GROUP BY t.{column}" if group else "")
+        for column in _MATCH_COLUMNS
     )
-    facts["open_zoning_cases"] = row[0] if row else 0
 
-    row = db.fetchone(
-        "SELECT COUNT(*) FROM boa_cases WHERE address_norm LIKE ?",
-        (f"%{norm_query}%",),
+
+def _profile_chunk(db: Database, queries: list[str]) -> list[dict[str, Any]]:
+    norms = [normalize_address(q) for q in queries]
+    keys = [parse_address(q).key for q in queries]
+    try:
+        stage_temp_table(
+            db, _QUERIES, {"pos": "INTEGER", "raw": "TEXT", "norm": "TEXT", "key": "TEXT"},
+            {"pos": list(range(len(queries))), "raw": queries, "norm": norms, "key": keys},
+        )
+        parcels = _find_parcels(db, norms)
+        matches: list[tuple[str, Any]] = []
+        for pos, parcel in enumerate(parcels):
+            if parcel:
+                keys[pos] = parcel.get("address_key") or keys[pos]
+            matches.append(_match_column(parcel, keys[pos], norms[pos]))
+        distinct = sorted(set(matches), key=str)
+        stage_temp_table(
+            db, _MATCHES, {"match_column": "TEXT", "value": "TEXT"},
+            {"match_column": [m[0] for m in distinct], "value": [m[1] for m in distinct]},
+        )
+        located = {p["id"]: p for p in parcels if p}
+        stage_temp_table(
+            db, _PARCELS, {"id": "TEXT", "latitude": "DOUBLE", "longitude": "DOUBLE"},
+            {
+                "id": list(located),
+                "latitude": [p["latitude"] for p in located.values()],
+                "longitude": [p["longitude"] for p in located.values()],
+            },
+        )
+
+        links = _batch_links(db)
+        facts = _batch_facts(db)
+        permits = _batch_permits(db)
+        at_match, at_name = _batch_constraints_at_address(db)
+        inside = _batch_constraints_inside(db, links)
+        nearby = _batch_constraints_nearby(db, located)
+    finally:
+        for name in (_QUERIES, _MATCHES, _PARCELS, _NEAR_CELLS):
+            db.execute(f"DROP TABLE IF EXISTS {name}")
+        db.commit()
+
+    amenities = _amenity_facts(db, parcels)
+    profiles = []
+    empty_facts = {fact: 0 for _, fact in _FACT_SQL.values()}
+    for pos, (query, parcel, match) in enumerate(zip(queries, parcels, matches)):
+        parcel_id = parcel["id"] if parcel else None
+        address_rows = {**at_match.get(match, {}), **at_name.get(pos, {})}
+        profiles.append(_build_profile(
+            query, norms[pos], parcel, links.get(parcel_id, []),
+            permits=permits.get(match, []),
+            risks=_risks_from_rows(
+                [address_rows[i] for i in sorted(address_rows)],
+                inside.get(parcel_id, []),
+                nearby.get(parcel_id, []),
+            ),
+            facts={**empty_facts, **facts.get(match, {})},
+            amenities=amenities[pos],
+        ))
+    return profiles
+
+
+def _find_parcels(db: Database, norms: list[str]) -> list[dict[str, Any] | None]:
+    """:func:`_find_parcel` for every staged query: ids and keys in one
+    set-based step, the rest through the address index."""
+    found: dict[int, str] = {}
+    rows = db.fetchall(
+        f"SELECT q.pos, COALESCE(i.id, k.id) FROM {_QUERIES} q "
+        "LEFT JOIN parcels i ON i.id = q.raw "
+        "LEFT JOIN (SELECT address_key, MIN(id) AS id FROM parcels "
+        f"WHERE address_key IN (SELECT key FROM {_QUERIES}) GROUP BY address_key) k ON k.address_key = q.key"
     )
-    facts["total_boa_cases"] = row[0] if row else 0
+    found.update((r[0], r[1]) for r in rows if r[1] is not None)
+
+    index = _address_index(db)
+    for pos, norm in enumerate(norms):
+        if pos not in found and norm:
+            parcel_id = _indexed_parcel(db, index, norm)
+            if parcel_id:
+                found[pos] = parcel_id
+
+    by_id: dict[str, dict[str, Any]] = {}
+    ids = sorted(set(found.values()))
+    for start in range(0, len(ids), 1000):
+        part = ids[start:start + 1000]
+        rows = db.fetchall(
+            f"{_PARCEL_SELECT} WHERE id IN ({', '.join('?' for _ in part)})", tuple(part)
+        )
+        by_id.update((r[0], dict(zip(_PARCEL_COLUMNS, r))) for r in rows)
+    return [by_id.get(found[pos]) if pos in found else None for pos in range(len(norms))]
 
-    row = db.fetchone(
-        "SELECT COUNT(*) FROM environmental_constraints WHERE address_norm LIKE ?",
-        (f"%{norm_query}%",),
+
+def _batch_links(db: Database) -> dict[str, list[dict[str, Any]]]:
+    parts = _link_parts(db, f"l.parcel_id IN (SELECT id FROM {_PARCELS})")
+    out: dict[str, list[dict[str, Any]]] = {}
+    for r in db.fetchall(" UNION ALL ".join(parts) + " ORDER BY parcel_id, position, feature_id"):
+        out.setdefault(r[7], []).append(_link_dict(r))
+    return out
+
+
+def _batch_facts(db: Database) -> dict[tuple[str, Any], dict[str, int]]:
+    out: dict[tuple[str, Any], dict[str, int]] = {}
+    for table, (aggregate, fact) in _FACT_SQL.items():
+        for r in db.fetchall(_match_union(aggregate, table)):
+            out.setdefault((r[0], r[1]), {})[fact] = int(r[2] or 0)
+    return out
+
+
+def _batch_permits(db: Database) -> dict[tuple[str, Any], list[dict[str, Any]]]:
+    ranked = _match_union(
+        f"{_PERMIT_COLUMNS}, ROW_NUMBER() OVER (PARTITION BY t.{{column}} ORDER BY {_PERMIT_ORDER}) AS n",
+        "permits", group=False,
+    )
+    out: dict[tuple[str, Any], list[dict[str, Any]]] = {}
+    rows = db.fetchall(
+        f"SELECT * FROM ({ranked}) r WHERE n <= {PROFILE_PERMITS} ORDER BY match_column, match_value, n"
+    )
+    for r in rows:
+        out.setdefault((r[0], r[1]), []).append(_permit_dict(r[2:8]))
+    return out
+
+
+def _batch_constraints_at_address(
+    db: Database,
+) -> tuple[dict[tuple[str, Any], dict[str, tuple]], dict[int, dict[str, tuple]]]:
+    """Constraint rows by match and, for the name LIKE of _profile_rows, by
+    query position; both keyed by constraint id."""
+    by_match: dict[tuple[str, Any], dict[str, tuple]] = {}
+    for r in db.fetchall(_match_union(f"id, {_CONSTRAINT_COLUMNS}", "environmental_constraints", group=False)):
+        by_match.setdefault((r[0], r[1]), {})[r[2]] = r[3:]
+    by_name: dict[int, dict[str, tuple]] = {}
+    rows = db.fetchall(
+        f"SELECT q.pos, e.id, {', '.join('e.' + c for c in _CONSTRAINT_COLUMNS.split(', '))} "
+        f"FROM {_QUERIES} q JOIN environmental_constraints e ON e.name LIKE ('%' || q.norm || '%')"
     )
-    facts["environmental_flags"] = row[0] if row else 0
+    for r in rows:
+        by_name.setdefault(r[0], {})[r[1]] = r[2:]
+    return by_match, by_name
 
-    return facts
+
+def _batch_constraints_inside(
+    db: Database, links: dict[str, list[dict[str, Any]]]
+) -> dict[str, list[tuple]]:
+    inside = {
+        parcel_id: [a["id"] for a in parcel_links if a["table"] == "environmental_constraints"
+                    and a["relation"] == "within"]
+        for parcel_id, parcel_links in links.items()
+    }
+    ids = sorted({i for v in inside.values() for i in v})
+    rows: dict[str, tuple] = {}
+    for start in range(0, len(ids), 1000):
+        part = ids[start:start + 1000]
+        rows.update((r[0], r[1:]) for r in db.fetchall(
+            f"SELECT id, {_CONSTRAINT_COLUMNS} FROM environmental_constraints "
+            f"WHERE id IN ({', '.join('?' for _ in part)})", tuple(part)
+        ))
+    return {parcel_id: [rows[i] for i in sorted(v) if i in rows] for parcel_id, v in inside.items() if v}
+
+
+def _batch_constraints_nearby(db: Database, located: dict[str, dict[str, Any]]) -> dict[str, list[tuple]]:
+    """The nearby constraint rows of _profile_rows for every staged parcel: point
+    rows through the cells around each parcel, polygon rows by bounding box."""
+    points = {pid: p for pid, p in located.items() if p.get("latitude")}
+    if not points:
+        return {}
+    ids = list(points)
+    column, point, cells = cells_near_many(
+        np.array([points[i]["latitude"] for i in ids], dtype=np.float64),
+        np.array([points[i]["longitude"] for i in ids], dtype=np.float64),
+        NEARBY_RADIUS,
+    )
+    stage_temp_table(
+        db, _NEAR_CELLS, {"id": "TEXT", "cell": "BIGINT"},
+        {"id": [ids[i] for i in point.tolist()], "cell": cells.tolist()},
+    )
+    r = NEARBY_RADIUS
+    columns = ", ".join("e." + c for c in _CONSTRAINT_COLUMNS.split(", "))
+    rows = db.fetchall(
+        f"SELECT p.id, 0 AS part, e.id AS constraint_id, {columns} FROM {_NEAR_CELLS} c "
+        f"JOIN {_PARCELS} p ON p.id = c.id JOIN environmental_constraints e ON e.{column} = c.cell "
+        f"WHERE e.latitude > p.latitude - {r!r} AND e.latitude < p.latitude + {r!r} "
+        f"AND e.longitude > p.longitude - {r!r} AND e.longitude < p.longitude + {r!r} "
+        f"UNION ALL SELECT p.id, 1, e.id, {columns} FROM {_PARCELS} p "
+        "JOIN environmental_constraints e ON e.latitude IS NULL "
+        f"AND e.min_x < p.longitude + {r!r} AND e.max_x > p.longitude - {r!r} "
+        f"AND e.min_y < p.latitude + {r!r} AND e.max_y > p.latitude - {r!r} "
+        "ORDER BY 1, 2, 3"
+    )
+    out: dict[str, list[tuple]] = {}
+    for row in rows:
+        out.setdefault(row[0], []).append(row[3:])
+    return out
+
+
+# Profiles by location
+#
+# A point is resolved to a parcel id by the parcel locator (the TCAD polygon
+# containing it, else the nearest parcel point), and the parcel's profile is
+# then built as for that id. The point becomes the profile's query, and a
+# "location" entry records how the parcel was found. A point with no parcel
+# near it still gets the amenities around it.
+
+
+def get_parcel_risk_profile_at(lat: float, lon: float, db: Database) -> dict[str, Any]:
+    """Risk profile of the parcel at, or nearest to, a latitude/longitude."""
+    return profiles_at(db, [(lat, lon)], lambda ids: [get_parcel_risk_profile(i, db) for i in ids])[0]
+
+
+def get_parcel_risk_profiles_at(
+    points: Iterable[tuple[float, float]], db: Database, batch_size: int = BATCH_SIZE
+) -> Iterator[dict[str, Any]]:
+    """:func:`get_parcel_risk_profile_at` for many ``(lat, lon)`` points, in
+    input order; each chunk is located in one batch and profiled with
+    :func:`get_parcel_risk_profiles`."""
+    it = iter(points)
+    while chunk := list(islice(it, batch_size)):
+        yield from profiles_at(db, chunk, lambda ids: list(get_parcel_risk_profiles(ids, db)))
+
+
+def profiles_at(
+    db: Database,
+    points: list[tuple[float, float]],
+    build: Callable[[list[str]], list[dict[str, Any]]],
+) -> list[dict[str, Any]]:
+    """Profiles for ``(lat, lon)`` points, in order, where ``build`` returns
+    the profiles of a list of parcel ids (so a cache can be put in front)."""
+    lats = [float(p[0]) for p in points]
+    lons = [float(p[1]) for p in points]
+    located = load_parcel_locator(db).locate(lats, lons)
+    built = iter(build([hit.parcel_id for hit in located if hit]))
+    missing = [i for i, hit in enumerate(located) if hit is None]
+    amenities = dict(zip(missing, _amenity_facts(
+        db, [{"latitude": lats[i], "longitude": lons[i]} for i in missing]
+    )))
+
+    profiles = []
+    for i, hit in enumerate(located):
+        query = f"{lats[i]},{lons[i]}"
+        if hit:
+            profile = {**next(built), "query": query}
+        else:
+            profile = _build_profile(
+                query, query, None, [], permits=[], risks=[],
+                facts={fact: 0 for fact in _FACT_NAMES}, amenities=amenities[i],
+            )
+            profile["matched_address"] = None
+            profile["warnings"] = [f"No parcel within {LOCATE_RADIUS_M:.0f} m of {query}."]
+        profile["location"] = {
+            "latitude": lats[i],
+            "longitude": lons[i],
+            "method": hit.method if hit else None,
+            "distance_m": round(hit.distance_m, 1) if hit else None,
+        }
+        profiles.append(profile)
+    return profiles
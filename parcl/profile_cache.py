@@ -0,0 +1,283 @@
+"""Persistent cache of parcel risk profiles.
+
+Profiles are stored in a SQLite file under the cache directory, keyed by
+the normalized address (or, for queries without a house number and street,
+such as parcel IDs, by the query as typed), with an in-memory LRU in front
+of it for long-running processes.
+
+Every entry carries the data version it was built from (see
+:func:`data_version`): a stamp over the ``last_run_at`` of the sources
+loading the tables a profile reads. An entry with another stamp is a miss,
+so profiles are rebuilt only once one of those sources has reloaded
+(``parcl run``) or been rebuilt from its landed pages (``parcl retransform``).
+Maintenance commands that change profile inputs without a source run
+(``parcl init``, ``parcl db --resolve-parcels``, ``--refresh-links``,
+``--refresh-features``, ``--refresh-address-index``) clear the cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from parcl.address import normalize_address, parse_address
+from parcl.db import Database
+from parcl.logger import get_logger
+from parcl.polygons import POLYGON_TABLES
+from parcl.profile import get_parcel_risk_profile, get_parcel_risk_profiles, profiles_at
+
+log = get_logger("profile_cache")
+
+CACHE_FILE = "profiles.sqlite"
+
+# Tables get_parcel_risk_profile reads; their sources' runs version the cache
+PROFILE_TABLES = ("parcels", "permits", "zoning_cases", "boa_cases", "property_valuations", *POLYGON_TABLES)
+
+# Entries kept (least recently used are evicted first)
+MAX_ENTRIES = 10_000
+
+# Entries also held in memory
+MEMORY_ENTRIES = 1024
+
+# Seconds a data version read from the database is trusted
+VERSION_TTL = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    key TEXT PRIMARY KEY, version TEXT NOT NULL, profile TEXT NOT NULL, used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_used ON profiles (used);
+CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+_COUNTERS = ("hits", "misses", "evictions")
+
+
+def data_version(db: Database) -> str:
+    """Stamp of the last run of every source feeding the profile tables."""
+    rows = db.fetchall(
+        "SELECT id, target_table, last_run_at FROM sources "
+        f"WHERE target_table IN ({', '.join('?' for _ in PROFILE_TABLES)}) ORDER BY id",
+        PROFILE_TABLES,
+    )
+    return hashlib.sha256(repr([(r[0], r[1], str(r[2])) for r in rows]).encode()).hexdigest()[:16]
+
+
+def cache_key(query: str) -> str:
+    """Normalized address for address queries, else the trimmed query."""
+    if parse_address(query).key:
+        return normalize_address(query)
+    return query.strip()
+
+
+def _for_query(profile: dict[str, Any], query: str) -> dict[str, Any]:
+    """A cached profile as built for ``query`` (another spelling of its address)."""
+    if profile["query"] == query:
+        return profile
+    return {
+        **profile,
+        "query": query,
+        "warnings": [w.replace(f"'{profile['query']}'", f"'{query}'") for w in profile["warnings"]],
+    }
+
+
+class ProfileCache:
+    """Size-bounded LRU of profiles, persisted in ``path`` (None: memory only).
+
+    Safe to share between threads. Returned profiles are shared with the
+    cache and must not be modified.
+    """
+
+    def __init__(self, path: Path | str | None, max_entries: int = MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, tuple[str, dict[str, Any]]] = OrderedDict()
+        self._memory_entries = min(MEMORY_ENTRIES, max_entries)
+        self._counts = dict.fromkeys(_COUNTERS, 0)
+        self._version: str | None = None
+        self._version_read = 0.0
+        # Hits since the last flush: key -> time used, written lazily
+        self._touched: dict[str, float] = {}
+        self._lock = threading.RLock()
+        target = ":memory:"
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            target = str(path)
+        self._conn = sqlite3.connect(target, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    @classmethod
+    def open(cls, cache_dir: Path, max_entries: int = MAX_ENTRIES) -> ProfileCache:
+        return cls(cache_dir / CACHE_FILE, max_entries)
+
+    def version(self, db: Database) -> str:
+        """The current data version, re-read at most every VERSION_TTL seconds.
+        Entries of any other version are dropped when it changes."""
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._version_read <= VERSION_TTL:
+                return self._version
+        version = data_version(db)
+        with self._lock:
+            self._version_read = now
+            if version != self._version:
+                self._version = version
+                self._drop_other_versions(version)
+            return version
+
+    def get(self, query: str, version: str) -> dict[str, Any] | None:
+        with self._lock:
+            key = cache_key(query)
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] == version:
+                self._memory.move_to_end(key)
+                self._touched[key] = time.time()
+                self._counts["hits"] += 1
+                return _for_query(entry[1], query)
+            row = self._conn.execute(
+                "SELECT profile FROM profiles WHERE key = ? AND version = ?", (key, version)
+            ).fetchone()
+            if row is None:
+                self._counts["misses"] += 1
+                return None
+            self._touched[key] = time.time()
+            profile = json.loads(row[0])
+            self._remember(key, version, profile)
+            self._counts["hits"] += 1
+            return _for_query(profile, query)
+
+    def put(self, query: str, version: str, profile: dict[str, Any]) -> None:
+        with self._lock:
+            key = cache_key(query)
+            payload = json.dumps(profile, default=str)
+            replaced = self._conn.execute("DELETE FROM profiles WHERE key = ?", (key,)).rowcount
+            self._conn.execute(
+                "INSERT INTO profiles (key, version, profile, used) VALUES (?, ?, ?, ?)",
+                (key, version, payload, time.time()),
+            )
+            self._entries += 1 - replaced
+            over = self._entries - self.max_entries
+            if over > 0:
+                self._flush_touched()
+                evicted = [r[0] for r in self._conn.execute(
+                    "SELECT key FROM profiles ORDER BY used LIMIT ?", (over,)
+                )]
+                self._conn.executemany("DELETE FROM profiles WHERE key = ?", [(k,) for k in evicted])
+                for k in evicted:
+                    self._memory.pop(k, None)
+                self._entries -= len(evicted)
+                self._counts["evictions"] += len(evicted)
+            self._conn.commit()
+            # Keep the JSON round-trip's form so hits look the same from memory and disk
+            self._remember(key, version, json.loads(payload))
+
+    def warm(self, version: str) -> int:
+        """Load the most recently used entries of ``version`` into memory."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, profile FROM profiles WHERE version = ? ORDER BY used DESC LIMIT ?",
+                (version, self._memory_entries),
+            ).fetchall()
+            for key, profile in reversed(rows):
+                self._remember(key, version, json.loads(profile))
+            return len(rows)
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE profiles SET used = ? WHERE key = ?", [(t, k) for k, t in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _remember(self, key: str, version: str, profile: dict[str, Any]) -> None:
+        self._memory[key] = (version, profile)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def _drop_other_versions(self, version: str) -> None:
+        dropped = self._conn.execute("DELETE FROM profiles WHERE version <> ?", (version,)).rowcount
+        self._conn.commit()
+        self._entries -= dropped
+        self._memory.clear()
+        self._touched.clear()
+        if dropped:
+            log.info(f"Dropped {dropped} cached profiles of an older data version")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM profiles")
+            self._conn.commit()
+            self._entries = 0
+            self._memory.clear()
+            self._touched.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Entries, and hits, misses and evictions including earlier sessions."""
+        with self._lock:
+            saved = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            counts = {name: saved.get(name, 0) + self._counts[name] for name in _COUNTERS}
+            lookups = counts["hits"] + counts["misses"]
+            return {
+                "entries": self._entries,
+                "max_entries": self.max_entries,
+                **counts,
+                "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        """Add this session's counters to the saved stats and close the file."""
+        with self._lock:
+            self._flush_touched()
+            for name, value in self._counts.items():
+                if value:
+                    self._conn.execute(
+                        "INSERT INTO stats (name, value) VALUES (?, ?) "
+                        "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                        (name, value),
+                    )
+            self._conn.commit()
+            self._counts = dict.fromkeys(_COUNTERS, 0)
+            self._conn.close()
+
+
+def cached_profile(query: str, db: Database, cache: ProfileCache) -> dict[str, Any]:
+    """:func:`~parcl.profile.get_parcel_risk_profile` through ``cache``."""
+    version = cache.version(db)
+    profile = cache.get(query, version)
+    if profile is None:
+        profile = get_parcel_risk_profile(query, db)
+        cache.put(query, version, profile)
+    return profile
+
+
+def cached_profiles(queries: list[str], db: Database, cache: ProfileCache) -> list[dict[str, Any]]:
+    """:func:`~parcl.profile.get_parcel_risk_profiles` through ``cache``: the
+    misses are built in one batch and cached."""
+    version = cache.version(db)
+    profiles = [cache.get(query, version) for query in queries]
+    missing = [i for i, profile in enumerate(profiles) if profile is None]
+    built = get_parcel_risk_profiles([queries[i] for i in missing], db)
+    for i, profile in zip(missing, built):
+        cache.put(queries[i], version, profile)
+        profiles[i] = profile
+    return profiles
+
+
+def cached_profile_at(lat: float, lon: float, db: Database, cache: ProfileCache) -> dict[str, Any]:
+    """:func:`~parcl.profile.get_parcel_risk_profile_at` through ``cache``,
+    which holds the profile under the id of the parcel found."""
+    return profiles_at(db, [(lat, lon)], lambda ids: [cached_profile(i, db, cache) for i in ids])[0]
+
+
+def cached_profiles_at(
+    points: list[tuple[float, float]], db: Database, cache: ProfileCache
+) -> list[dict[str, Any]]:
+    """:func:`~parcl.profile.get_parcel_risk_profiles_at` through ``cache``."""
+    return profiles_at(db, points, lambda ids: cached_profiles(ids, db, cache))
@@ -0,0 +1,224 @@
+"""Resolve permits, cases and constraints to the parcel they concern.
+
+After a load, rows of the :data:`~parcl.etl.loader.RESOLVED_TABLES` whose
+``parcel_resolved_at`` is NULL (new rows, and rows the load changed) are
+linked to a parcel, ``batch_size`` at a time:
+
+1. ``address_key``: a parcel with the row's address key. Score 1.0, or
+   :data:`SHARED_KEY_SCORE` when several parcels share the key (the lowest
+   parcel id is taken).
+2. ``nearest``: for rows with coordinates and no key match, the nearest
+   parcel point within :data:`NEAREST_RADIUS_M`. Scored from
+   :data:`NEAREST_MAX_SCORE` at 0 m down to :data:`NEAREST_MIN_SCORE` at the
+   radius.
+3. ``none``: no parcel; score 0.
+
+Each batch is written back with one staged UPDATE. Aggregations and the
+profile then join on ``parcel_id``. A parcel load calls
+:func:`requeue_for_parcels` so rows near, at, or linked to changed parcels
+are resolved again.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+
+from parcl.db import Database
+from parcl.etl.loader import (
+    RESOLVED_TABLES,
+    TABLE_COLUMNS,
+    _stage_update,
+    stage_temp_table,
+)
+from parcl.grid import cells_near_many, degrees_for_metres, distance_sql
+from parcl.logger import get_logger
+
+log = get_logger("resolve")
+
+# A row's point further than this from every parcel point stays unmatched
+NEAREST_RADIUS_M = 50.0
+
+SHARED_KEY_SCORE = 0.9
+NEAREST_MAX_SCORE = 0.8
+NEAREST_MIN_SCORE = 0.5
+
+BATCH_SIZE = 50_000
+
+_NEAREST_BOX = degrees_for_metres(NEAREST_RADIUS_M)
+
+_BATCH = "_parcl_resolve_batch"
+_CELLS = "_parcl_resolve_cells"
+_REQUEUE = "_parcl_resolve_parcels"
+_REQUEUE_KEYS = "_parcl_resolve_keys"
+_REQUEUE_CELLS = "_parcl_resolve_near"
+
+
+def _has_points(table: str) -> bool:
+    return "latitude" in TABLE_COLUMNS[table]
+
+
+def _key_matches(db: Database) -> dict[str, tuple[str, int]]:
+    """Batch row id -> (parcel id, parcels sharing the key)."""
+    rows = db.fetchall(
+        "SELECT b.id, m.parcel_id, m.parcels FROM "
+        f"{_BATCH} b JOIN (SELECT address_key, MIN(id) AS parcel_id, COUNT(*) AS parcels FROM parcels "
+        f"WHERE address_key IN (SELECT address_key FROM {_BATCH}) GROUP BY address_key) m "
+        "ON m.address_key = b.address_key"
+    )
+    return {r[0]: (r[1], r[2]) for r in rows}
+
+
+def _nearest_matches(db: Database, points: list[tuple[str, float, float]]) -> dict[str, tuple[str, float]]:
+    """Row id -> (nearest parcel id, metres) for points within NEAREST_RADIUS_M."""
+    column, point, cells = cells_near_many(
+        np.array([p[1] for p in points]), np.array([p[2] for p in points]), _NEAREST_BOX
+    )
+    ids = [points[i][0] for i in point.tolist()]
+    stage_temp_table(db, _CELLS, {"id": "TEXT", "cell": "BIGINT"}, {"id": ids, "cell": cells.tolist()})
+    distance = distance_sql("b", "p")
+    rows = db.fetchall(
+        "SELECT id, parcel_id, distance_m FROM ("
+        f"SELECT c.id, p.id AS parcel_id, {distance} AS distance_m, "
+        f"ROW_NUMBER() OVER (PARTITION BY c.id ORDER BY {distance}, p.id) AS pos "
+        f"FROM {_CELLS} c JOIN {_BATCH} b ON b.id = c.id "
+        f"JOIN parcels p ON p.{column} = c.cell "
+        f"WHERE p.latitude IS NOT NULL AND p.longitude IS NOT NULL AND {distance} <= {NEAREST_RADIUS_M!r}"
+        ") r WHERE pos = 1"
+    )
+    return {r[0]: (r[1], r[2]) for r in rows}
+
+
+def _nearest_score(metres: float) -> float:
+    share = min(max(metres / NEAREST_RADIUS_M, 0.0), 1.0)
+    return round(NEAREST_MAX_SCORE - (NEAREST_MAX_SCORE - NEAREST_MIN_SCORE) * share, 4)
+
+
+def _resolve_batch(db: Database, rows: list[tuple]) -> dict[str, list[Any]]:
+    """Match one batch of (id, address_key, latitude, longitude) rows; returns
+    the column values to write back, one per row."""
+    stage_temp_table(
+        db, _BATCH,
+        {"id": "TEXT", "address_key": "TEXT", "latitude": "DOUBLE", "longitude": "DOUBLE"},
+        {
+            "id": [r[0] for r in rows],
+            "address_key": [r[1] for r in rows],
+            "latitude": [r[2] for r in rows],
+            "longitude": [r[3] for r in rows],
+        },
+    )
+    by_key = _key_matches(db)
+    unmatched = [(r[0], r[2], r[3]) for r in rows if r[0] not in by_key and r[2] is not None and r[3] is not None]
+    nearest = _nearest_matches(db, unmatched) if unmatched else {}
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    values: dict[str, list[Any]] = {
+        "parcel_id": [], "parcel_match_method": [], "parcel_match_score": [], "parcel_resolved_at": [],
+    }
+    for row_id, *_ in rows:
+        if row_id in by_key:
+            parcel_id, shared = by_key[row_id]
+            method, score = "address_key", 1.0 if shared == 1 else SHARED_KEY_SCORE
+        elif row_id in nearest:
+            parcel_id, metres = nearest[row_id]
+            method, score = "nearest", _nearest_score(metres)
+        else:
+            parcel_id, method, score = None, "none", 0.0
+        values["parcel_id"].append(parcel_id)
+        values["parcel_match_method"].append(method)
+        values["parcel_match_score"].append(score)
+        values["parcel_resolved_at"].append(now)
+    return values
+
+
+def resolve_parcels(
+    db: Database, tables: list[str] | None = None, batch_size: int = BATCH_SIZE
+) -> dict[str, Any]:
+    """Resolve every queued row of ``tables`` (default: all resolved tables).
+
+    Returns ``{"rows": {table: {method: n}}, "parcel_ids": set}``, where
+    ``parcel_ids`` holds every parcel a resolved row now belongs to or
+    belonged to before, i.e. the parcels whose aggregates may have changed.
+    """
+    counts: dict[str, dict[str, int]] = {}
+    parcels: set[str] = set()
+    try:
+        for table in RESOLVED_TABLES:
+            if tables and table not in tables:
+                continue
+            point_cols = "latitude, longitude" if _has_points(table) else "NULL, NULL"
+            methods: dict[str, int] = {}
+            last_id = ""
+            while True:
+                rows = db.fetchall(
+                    f"SELECT id, address_key, {point_cols}, parcel_id FROM {table} "
+                    f"WHERE parcel_resolved_at IS NULL AND id > ? ORDER BY id LIMIT {int(batch_size)}",
+                    (last_id,),
+                )
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                values = _resolve_batch(db, rows)
+                parcels.update(r[4] for r in rows if r[4] is not None)
+                parcels.update(p for p in values["parcel_id"] if p is not None)
+                _stage_update(db, table, [r[0] for r in rows], values)
+                for method in values["parcel_match_method"]:
+                    methods[method] = methods.get(method, 0) + 1
+            if methods:
+                log.info(f"Resolved {sum(methods.values())} {table} rows to parcels: {methods}")
+                counts[table] = methods
+    finally:
+        for name in (_BATCH, _CELLS):
+            db.execute(f"DROP TABLE IF EXISTS {name}")
+        db.commit()
+    return {"rows": counts, "parcel_ids": parcels}
+
+
+def requeue_for_parcels(db: Database, parcel_ids: set[str] | None = None) -> int:
+    """Queue rows for resolution again after parcels were loaded.
+
+    With ``parcel_ids``, that is rows resolved to those parcels, rows at
+    their address keys, and rows near them that did not match by key (a new
+    parcel may be nearer); with None, every row. Returns the rows queued.
+    """
+    queued = 0
+    try:
+        if parcel_ids is not None:
+            stage_temp_table(db, _REQUEUE, {"id": "TEXT"}, {"id": sorted(parcel_ids)})
+            parcels = db.fetchall(
+                f"SELECT address_key, latitude, longitude FROM parcels WHERE id IN (SELECT id FROM {_REQUEUE})"
+            )
+            stage_temp_table(
+                db, _REQUEUE_KEYS, {"address_key": "TEXT"},
+                {"address_key": sorted({r[0] for r in parcels if r[0]})},
+            )
+            located = [(lat, lon) for _, lat, lon in parcels if lat is not None and lon is not None]
+            column, _, cells = cells_near_many(
+                np.array([p[0] for p in located], dtype=np.float64),
+                np.array([p[1] for p in located], dtype=np.float64),
+                _NEAREST_BOX,
+            )
+            stage_temp_table(db, _REQUEUE_CELLS, {"cell": "BIGINT"}, {"cell": np.unique(cells).tolist()})
+        with db.transaction():
+            for table in RESOLVED_TABLES:
+                where = "parcel_resolved_at IS NOT NULL"
+                if parcel_ids is not None:
+                    near = (
+                        f" OR (parcel_match_method <> 'address_key' "
+                        f"AND {column} IN (SELECT cell FROM {_REQUEUE_CELLS}))"
+                    ) if _has_points(table) else ""
+                    where += (
+                        f" AND (parcel_id IN (SELECT id FROM {_REQUEUE}) "
+                        f"OR address_key IN (SELECT address_key FROM {_REQUEUE_KEYS}){near})"
+                    )
+                queued += db.fetchone(f"SELECT COUNT(*) FROM {table} WHERE {where}")[0]
+                db.execute(f"UPDATE {table} SET parcel_resolved_at = NULL WHERE {where}")
+    finally:
+        for name in (_REQUEUE, _REQUEUE_KEYS, _REQUEUE_CELLS):
+            db.execute(f"DROP TABLE IF EXISTS {name}")
+        db.commit()
+    if queued:
+        log.info(f"Queued {queued} rows for parcel resolution")
+    return queued
@@ -0,0 +1,231 @@
+"""Long-running HTTP/JSON API for parcel risk profiles.
+
+``parcl serve`` keeps what a one-shot ``parcl profile`` rebuilds on every
+call: settings, the database driver, a pool of open connections and the
+profile cache with its in-memory LRU. Requests are handled on threads; each
+takes a connection from the pool for the duration of its queries.
+
+Endpoints::
+
+    GET  /profile?q=<address or parcel id>   one profile
+    GET  /profile?at=<lat>,<lon>             profile of the parcel at or nearest to a point
+    POST /profiles  {"queries": [...]}       profiles in input order
+    POST /profiles  {"points": [[lat, lon], ...]}
+    GET  /stats                              request counts, latency percentiles, cache stats
+    GET  /health
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from parcl.db import Database
+from parcl.locator import load_parcel_locator, parse_point
+from parcl.logger import get_logger
+from parcl.profile import get_parcel_risk_profile
+from parcl.profile_cache import (
+    ProfileCache,
+    cached_profile,
+    cached_profile_at,
+    cached_profiles,
+    cached_profiles_at,
+)
+
+log = get_logger("server")
+
+# Latencies kept per endpoint for the percentiles in /stats
+LATENCY_WINDOW = 10_000
+
+# Largest POST /profiles request
+MAX_BATCH = 10_000
+
+
+class LatencyStats:
+    """Request counts and a sliding window of latencies per endpoint."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._window = window
+        self._latencies: dict[str, deque[float]] = {}
+        self._counts: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float, status: int) -> None:
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=self._window)).append(seconds)
+            counts = self._counts.setdefault(endpoint, {"requests": 0, "errors": 0})
+            counts["requests"] += 1
+            if status >= 400:
+                counts["errors"] += 1
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            windows = {endpoint: np.array(values) for endpoint, values in self._latencies.items()}
+            counts = {endpoint: dict(c) for endpoint, c in self._counts.items()}
+        out = {}
+        for endpoint, ms in windows.items():
+            ms = ms * 1000.0
+            p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+            out[endpoint] = {
+                **counts[endpoint],
+                "p50_ms": round(float(p50), 3),
+                "p90_ms": round(float(p90), 3),
+                "p99_ms": round(float(p99), 3),
+                "max_ms": round(float(ms.max()), 3),
+            }
+        return out
+
+
+class ProfileServer(ThreadingHTTPServer):
+    """HTTP server answering from a pool of ``databases`` through ``cache``."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], databases: list[Database], cache: ProfileCache) -> None:
+        super().__init__(address, _Handler)
+        self.databases = databases
+        self.cache = cache
+        self.latency = LatencyStats()
+        self.started = time.time()
+        self._pool: queue.Queue[Database] = queue.Queue()
+        for db in databases:
+            self._pool.put(db)
+
+    @contextmanager
+    def database(self) -> Iterator[Database]:
+        db = self._pool.get()
+        try:
+            yield db
+        except Exception:
+            if db.db_type == "postgresql":
+                db.conn.rollback()
+            raise
+        finally:
+            self._pool.put(db)
+
+    def warm(self) -> None:
+        """Run one profile on every connection and load recent cached profiles
+        and the parcel locator, so the first requests do not pay for cold
+        buffers or index loads."""
+        with self.database() as db:
+            version = self.cache.version(db)
+            load_parcel_locator(db)
+            row = db.fetchone("SELECT address FROM parcels WHERE address IS NOT NULL LIMIT 1")
+        warmed = self.cache.warm(version)
+        if row:
+            for db in self.databases:
+                get_parcel_risk_profile(row[0], db)
+        log.info(f"Warmed {len(self.databases)} connections, {warmed} cached profiles in memory")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "connections": len(self.databases),
+            "endpoints": self.latency.summary(),
+            "cache": self.cache.stats(),
+        }
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.cache.close()
+        for db in self.databases:
+            db.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: ProfileServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == "/profile":
+            params = parse_qs(url.query)
+            query = params.get("q", [""])[0].strip()
+            at = params.get("at", [""])[0].strip()
+            if at:
+                self._timed("/profile", lambda: self._profile_at(at))
+            elif query:
+                self._timed("/profile", lambda: (200, self._profile(query)))
+            else:
+                self._timed("/profile", lambda: (400, {"error": "Missing query parameter 'q' or 'at'"}))
+        elif url.path == "/stats":
+            self._send(200, self.server.stats())
+        elif url.path == "/health":
+            self._send(200, {"status": "ok"})
+        else:
+            self._send(404, {"error": f"Unknown path {url.path}"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/profiles":
+            self._send(404, {"error": f"Unknown path {url.path}"})
+            return
+        self._timed("/profiles", self._batch)
+
+    def _profile(self, query: str) -> dict[str, Any]:
+        with self.server.database() as db:
+            return cached_profile(query, db, self.server.cache)
+
+    def _profile_at(self, at: str) -> tuple[int, Any]:
+        try:
+            lat, lon = parse_point(at)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        with self.server.database() as db:
+            return 200, cached_profile_at(lat, lon, db, self.server.cache)
+
+    def _batch(self) -> tuple[int, Any]:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if "points" in body:
+                return self._batch_points(body["points"])
+            queries = body["queries"]
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"Expected a JSON body {{\"queries\": [...]}} or {{\"points\": [...]}}: {e}"}
+        if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+            return 400, {"error": "'queries' must be a list of strings"}
+        if len(queries) > MAX_BATCH:
+            return 400, {"error": f"At most {MAX_BATCH} queries per request"}
+        with self.server.database() as db:
+            return 200, {"profiles": cached_profiles(queries, db, self.server.cache)}
+
+    def _batch_points(self, points: Any) -> tuple[int, Any]:
+        try:
+            points = [parse_point(f"{lat},{lon}") for lat, lon in points]
+        except (ValueError, TypeError) as e:
+            return 400, {"error": f"'points' must be a list of [lat, lon] pairs: {e}"}
+        if len(points) > MAX_BATCH:
+            return 400, {"error": f"At most {MAX_BATCH} points per request"}
+        with self.server.database() as db:
+            return 200, {"profiles": cached_profiles_at(points, db, self.server.cache)}
+
+    def _timed(self, endpoint: str, handle) -> None:
+        started = time.perf_counter()
+        try:
+            status, payload = handle()
+        except Exception as e:
+            log.exception(f"{endpoint} failed")
+            status, payload = 500, {"error": str(e)}
+        self._send(status, payload)
+        self.server.latency.record(endpoint, time.perf_counter() - started, status)
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.debug(format % args)
@@ -5,35 +5,27 @@ from __future__ import annotations
 from typing import Any, Iterator
 
 from parcl.config import CrawlerConfig, SourceConfig
+from parcl.geometry import from_arcgis, simplify, to_wkb, to_wkt
 from parcl.sources import register
 from parcl.sources.base import BaseSource
 
 
 def rings_to_wkt(rings: list[list[list[float]]]) -> str:
-    """Convert ArcGIS ring geometry to WKT POLYGON."""
+    """Convert ArcGIS ring geometry to WKT POLYGON (or MULTIPOLYGON)."""
     if not rings:
         return ""
-    parts = []
-    for ring in rings:
-        coords = ", ".join(f"{pt[0]} {pt[1]}" for pt in ring)
-        parts.append(f"({coords})")
-    return f"POLYGON({', '.join(parts)})"
+    return geometry_to_wkt({"rings": rings})
 
 
 def geometry_to_wkt(geom: dict[str, Any] | None) -> str:
     """Convert ArcGIS geometry object to WKT string."""
-    if not geom:
-        return ""
-    if "rings" in geom:
-        return rings_to_wkt(geom["rings"])
-    if "x" in geom and "y" in geom:
-        return f"POINT({geom['x']} {geom['y']})"
-    if "paths" in geom:
-        paths = geom["paths"]
-        if paths:
-            coords = ", ".join(f"{pt[0]} {pt[1]}" for pt in paths[0])
-            return f"LINESTRING({coords})"
-    return ""
+    return to_wkt(from_arcgis(geom))
+
+
+def geometry_to_wkb(geom: dict[str, Any] | None) -> bytes | None:
+    """Convert ArcGIS geometry object to WKB bytes."""
+    parsed = from_arcgis(geom)
+    return to_wkb(parsed) if parsed else None
 
 
 @register("arcgis")
@@ -42,6 +34,7 @@ class ArcGISSource(BaseSource):
 
     def fetch(self) -> Iterator[list[dict[str, Any]]]:
         layers = self.config.layers or [{"id": 0, "name": "default"}]
+        self.stats.update(vertices_in=0, vertices_out=0, vertices_removed=0)
 
         for layer_def in layers:
             layer_id = layer_def.get("id", 0)
@@ -63,6 +56,7 @@ class ArcGISSource(BaseSource):
                 "where": self.config.filters.get("where", "1=1"),
                 "outFields": self.config.filters.get("outFields", "*"),
                 "returnGeometry": "true",
+                "outSR": self.config.filters.get("outSR", 4326),
                 "f": "json",
             }
             if use_pagination:
@@ -90,17 +84,18 @@ class ArcGISSource(BaseSource):
                 self.log.warning(
                     f"Layer {layer_name} ({layer_id}): ArcGIS error: {err_msg}"
                 )
+                self.complete = False
                 break
 
             features = data.get("features", [])
             if not features:
                 break
 
-            # Flatten: merge attributes + geometry WKT + layer metadata
+            # Flatten: merge attributes + geometry WKB + layer metadata
             records = []
             for feat in features:
                 rec = dict(feat.get("attributes", {}))
-                rec["_geometry_wkt"] = geometry_to_wkt(feat.get("geometry"))
+                self._add_geometry(rec, feat.get("geometry"))
                 rec["_layer_id"] = layer_id
                 rec["_layer_name"] = layer_name
                 records.append(rec)
@@ -117,3 +112,24 @@ class ArcGISSource(BaseSource):
                 break
 
             self._rate_limit()
+        else:
+            self.log.warning(f"Layer {layer_name} ({layer_id}): stopped at max_pages")
+            self.complete = False
+
+    def _add_geometry(self, rec: dict[str, Any], arcgis_geom: dict[str, Any] | None) -> None:
+        """Encode a feature's geometry, simplifying it if the source asks to."""
+        geom = from_arcgis(arcgis_geom)
+        if geom is None:
+            rec["_geometry_wkb"] = None
+            return
+        before = geom.vertex_count
+        tolerance = self.config.simplify_tolerance
+        if tolerance:
+            if self.config.keep_original_geometry:
+                rec["_geometry_wkb_original"] = to_wkb(geom)
+            geom = simplify(geom, tolerance)
+        after = geom.vertex_count
+        self.stats["vertices_in"] += before
+        self.stats["vertices_out"] += after
+        self.stats["vertices_removed"] += before - after
+        rec["_geometry_wkb"] = to_wkb(geom)
@@ -25,6 +25,11 @@ class BaseSource(abc.ABC):
         self.crawler = crawler_config
         self.log = get_logger(f"source.{source_config.id}")
         self.session = self._build_session()
+        # Per-run counters merged into the pipeline summary
+        self.stats: dict[str, Any] = {}
+        # Cleared when fetch() stops before the end of the data (page cap,
+        # service error); a partial fetch must not replace a full table.
+        self.complete = True
 
     def _build_session(self) -> requests.Session:
         """Build a requests session with retry and backoff."""
@@ -68,3 +68,6 @@ class SocrataSource(BaseSource):
                 break
 
             self._rate_limit()
+        else:
+            self.log.warning(f"Stopped at max_pages ({self.crawler.max_pages})")
+            self.complete = False
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Microbenchmark address normalization on a synthetic Austin permit corpus.
+
+Compares the original two-regex normalizer with the memoized single-pass
+one and checks that every output is byte-identical.
+
+Usage: python scripts/bench_address.py [--records N] [--unique U]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from parcl.address import (
+    DIRECTIONAL_MAP,
+    SUFFIX_MAP,
+    UNIT_MAP,
+    _normalize,
+    normalize_address,
+    normalize_addresses,
+)
+
+STREETS = [
+    "Congress", "Lamar", "Guadalupe", "Riverside", "Burnet", "Airport",
+    "Cesar Chavez", "Martin Luther King Jr", "Oltorf", "William Cannon",
+    "Slaughter", "Parmer", "Anderson", "Koenig", "Manor", "Pleasant Valley",
+    "Brodie", "Mopac", "Research", "Braker", "Rundberg", "Stassney",
+    "Ben White", "Barton Springs", "Enfield", "Duval", "Red River", "Springdale",
+]
+SUFFIXES = ["St", "Street", "Ave", "Avenue", "Blvd", "Boulevard", "Dr", "Drive",
+            "Ln", "Rd", "Road", "Cv", "Cove", "Trl", "Pkwy", "Ct", "Loop"]
+DIRS = ["", "", "", "N", "S", "E", "W", "North", "South", "E.", "W."]
+UNITS = ["", "", "", "", "Unit 3", "Apt 12", "Apartment 4B", "Ste 200", "Suite 110", "# 7", "Bldg A"]
+
+
+def legacy_normalize_address(address):
+    """The two-regex normalizer that shipped before the memoized version."""
+    if not address:
+        return ""
+    addr = address.upper().strip()
+    addr = re.sub(r"[.,;:!?'\"\(\)\[\]]", "", addr)
+    words = addr.split()
+    normalized = []
+    for word in words:
+        if word in DIRECTIONAL_MAP:
+            normalized.append(DIRECTIONAL_MAP[word])
+        elif word in SUFFIX_MAP:
+            normalized.append(SUFFIX_MAP[word])
+        elif word in UNIT_MAP:
+            normalized.append(UNIT_MAP[word])
+        else:
+            normalized.append(word)
+    result = " ".join(normalized)
+    result = re.sub(r"\s+", " ", result).strip()
+    return result
+
+
+def make_corpus(records: int, unique: int, seed: int = 11) -> list[str]:
+    """Permit-like address list: a few thousand sites, heavily repeated (Zipf)."""
+    rng = random.Random(seed)
+    sites = []
+    for _ in range(unique):
+        parts = [str(rng.randint(100, 15999)), rng.choice(DIRS), rng.choice(STREETS),
+                 rng.choice(SUFFIXES), rng.choice(UNITS)]
+        addr = " ".join(p for p in parts if p)
+        if rng.random() < 0.3:
+            addr = addr.upper()
+        if rng.random() < 0.2:
+            addr += ", Austin TX 787" + str(rng.randint(1, 59)).zfill(2)
+        sites.append(addr)
+    weights = [1 / (i + 1) for i in range(unique)]
+    return rng.choices(sites, weights=weights, k=records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=500_000)
+    parser.add_argument("--unique", type=int, default=40_000)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.records, args.unique)
+    print(f"{len(corpus):,} addresses, {len(set(corpus)):,} distinct")
+
+    t0 = time.perf_counter()
+    expected = [legacy_normalize_address(a) for a in corpus]
+    t_legacy = time.perf_counter() - t0
+
+    _normalize.cache_clear()
+    t0 = time.perf_counter()
+    single = [normalize_address(a) for a in corpus]
+    t_single = time.perf_counter() - t0
+
+    _normalize.cache_clear()
+    t0 = time.perf_counter()
+    batch = normalize_addresses(corpus)
+    t_batch = time.perf_counter() - t0
+
+    assert single == expected and batch == expected, "output differs from legacy"
+
+    # Tokenizer alone, no cache, distinct addresses only
+    distinct = list(set(corpus))
+    t0 = time.perf_counter()
+    for a in distinct:
+        legacy_normalize_address(a)
+    t_legacy_distinct = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for a in distinct:
+        _normalize.__wrapped__(a)
+    t_uncached = time.perf_counter() - t0
+
+    for label, t in [("legacy (2x re.sub)", t_legacy), ("normalize_address", t_single),
+                     ("normalize_addresses", t_batch)]:
+        print(f"{label:<22} {t:7.3f}s  {len(corpus) / t:>12,.0f}/s  {t_legacy / t:5.1f}x")
+    print(f"uncached, distinct only: legacy {len(distinct) / t_legacy_distinct:,.0f}/s, "
+          f"single-pass {len(distinct) / t_uncached:,.0f}/s "
+          f"({t_legacy_distinct / t_uncached:.1f}x)")
+    print(f"cache: {_normalize.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Benchmark the trigram address index on synthetic data.
+
+Generates parcels and as many valuations (the same addresses, streets
+spelled out) in a fresh on-disk DuckDB database. Times building, saving and
+reloading the index, applying a changed page, and per-query lookups: the
+SQL prefix LIKE the profile used before, the index prefix and the fuzzy
+search behind misspelled queries.
+
+Usage: python scripts/bench_address_index.py [--parcels N] [--queries Q]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from parcl import address_index, index_cache
+from parcl.address_index import load_address_index, update_address_index
+from parcl.db import Database, init_schema
+from parcl.profile import _address_index, _indexed_parcel
+
+STREETS = [
+    "CONGRESS AVE", "LAMAR BLVD", "GUADALUPE ST", "BURNET RD", "OLTORF ST", "RIVERSIDE DR",
+    "BARTON SPRINGS RD", "MANOR RD", "AIRPORT BLVD", "CAMERON RD", "SLAUGHTER LN", "WILLIAM CANNON DR",
+]
+
+
+def populate(db: Database, parcels: int) -> None:
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels'), ('tv', 'Values', 'csv', 'property_valuations')"
+    )
+    streets = "[" + ", ".join(f"'{s}'" for s in STREETS) + "]"
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_norm, address_key) "
+        f"SELECT 'p' || g, 'tcad', CAST(g AS TEXT), a, a FROM ("
+        f"SELECT g, (g % 9000 + 1) || ' ' || CASE WHEN g % 3 = 0 THEN 'W ' ELSE '' END || "
+        f"{streets}[g // 9000 % {len(STREETS)} + 1] || CASE WHEN g // 9000 >= {len(STREETS)} "
+        f"THEN ' UNIT ' || (g // 9000) ELSE '' END AS a "
+        f"FROM generate_series(1, {parcels}) AS t(g))"
+    )
+    db.execute(
+        "INSERT INTO property_valuations (id, source_id, external_id, address_norm, address_key) "
+        "SELECT 'v' || substr(id, 2), 'tv', external_id, "
+        "replace(replace(address_norm, ' AVE', ' AVENUE'), ' RD', ' ROAD'), address_key FROM parcels"
+    )
+    db.commit()
+
+
+def misspell(rng: random.Random, norm: str) -> str:
+    number, street = norm.split(" ", 1)
+    i = rng.randrange(len(street))
+    return f"{number} {street[:i]}{street[i + 1:]}"
+
+
+def per_query(label: str, fn, queries: list[str]) -> None:
+    t0 = time.perf_counter()
+    hits = sum(fn(q) is not None for q in queries)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<28} {elapsed / len(queries) * 1000:8.3f} ms/query  {hits}/{len(queries)} matched")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parcels", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp) / "cache"
+        # Keep the index out of the project's cache directory
+        index_cache.default_cache_dir = lambda: cache
+        db = Database(duckdb.connect(str(Path(tmp) / "bench.duckdb")), "duckdb")
+        init_schema(db)
+        populate(db, args.parcels)
+        print(f"{args.parcels:,} parcels, {args.parcels:,} valuations")
+
+        t0 = time.perf_counter()
+        index = load_address_index(db)
+        print(f"{'build + save':<28} {time.perf_counter() - t0:8.2f}s  {len(index):,} addresses, "
+              f"{(cache / address_index.CACHE_FILE).stat().st_size / 1e6:.1f} MB")
+        address_index._cache.clear()
+        t0 = time.perf_counter()
+        load_address_index(db)
+        print(f"{'load from disk':<28} {time.perf_counter() - t0:8.2f}s")
+        t0 = time.perf_counter()
+        for _ in range(20):
+            load_address_index(db)
+        print(f"{'stamp check (warm)':<28} {(time.perf_counter() - t0) / 20 * 1000:8.2f} ms")
+
+        db.execute("UPDATE parcels SET address_norm = address_norm || ' X' WHERE id IN "
+                   "(SELECT 'p' || g FROM generate_series(1, 5000) AS t(g))")
+        t0 = time.perf_counter()
+        update_address_index(db, "parcels", {f"p{g}" for g in range(1, 5001)})
+        print(f"{'changed page (5000 rows)':<28} {time.perf_counter() - t0:8.2f}s")
+
+        norms = [r[0] for r in db.fetchall(
+            f"SELECT address_norm FROM parcels USING SAMPLE {args.queries} ROWS (reservoir, 1)"
+        )]
+        prefixes = [n.rsplit(" ", 1)[0] for n in norms]
+        typos = [misspell(rng, n) for n in norms]
+        index = _address_index(db)
+
+        def sql_prefix(q: str):
+            return db.fetchone(
+                "SELECT id FROM parcels WHERE address_norm LIKE ? ORDER BY address_norm, id LIMIT 1", (f"{q}%",)
+            )
+
+        per_query("SQL prefix LIKE", sql_prefix, prefixes)
+        per_query("index prefix", index.prefix, prefixes)
+        per_query("SQL prefix LIKE (typo)", sql_prefix, typos)
+        per_query("index search (typo)", lambda q: (index.search(q) or None), typos)
+        per_query("_indexed_parcel (typo)", lambda q: _indexed_parcel(db, _address_index(db), q), typos)
+        found = [_indexed_parcel(db, index, q) for q in typos]
+        correct = sum(
+            db.fetchone("SELECT address_norm FROM parcels WHERE id = ?", (parcel_id,))[0] == norm
+            for parcel_id, norm in zip(found, norms) if parcel_id
+        )
+        print(f"{'typos matched correctly':<28} {correct}/{len(typos)}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark the nearest-amenity KD-tree on synthetic data.
+
+Scatters transit stops and parks over a Travis-County-sized box in a fresh
+on-disk DuckDB database. Times building, saving and reloading the index,
+then the nearest stop and the stops within 800 m for sample points: in SQL
+(a full scan ordered by distance, and the grid cell box filter), and from
+the index one point at a time and as one batch.
+
+Usage: python scripts/bench_amenities.py [--stops N] [--parks N] [--points P]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+import numpy as np
+
+from parcl import amenities
+from parcl.amenities import load_amenity_index
+from parcl.db import Database, init_schema
+from parcl.etl.loader import backfill_grid_cells
+from parcl.grid import degrees_for_metres, near_clause
+
+# Travis County, roughly
+LAT, LON, SPAN = 30.05, -98.05, 0.6
+
+
+def populate(db: Database, stops: int, parks: int) -> None:
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES ('cm', 'Stops', 'gtfs', 'transit_amenities')"
+    )
+    db.execute(
+        "INSERT INTO transit_amenities (id, source_id, external_id, amenity_type, name, latitude, longitude) "
+        f"SELECT 's' || g, 'cm', 's' || g, 'bus_stop', 'Stop ' || g, {LAT} + random() * {SPAN}, "
+        f"{LON} + random() * {SPAN} FROM generate_series(1, {stops}) AS t(g)"
+    )
+    db.execute(
+        "INSERT INTO transit_amenities (id, source_id, external_id, amenity_type, name, centroid_y, centroid_x) "
+        f"SELECT 'k' || g, 'cm', 'k' || g, 'park', 'Park ' || g, {LAT} + random() * {SPAN}, "
+        f"{LON} + random() * {SPAN} FROM generate_series(1, {parks}) AS t(g)"
+    )
+    backfill_grid_cells(db, ["transit_amenities"])
+    db.commit()
+
+
+def per_point(label: str, elapsed: float, points: int) -> None:
+    print(f"{label:<32} {elapsed / points * 1e6:10.1f} us/point")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stops", type=int, default=5_000)
+    parser.add_argument("--parks", type=int, default=1_000)
+    parser.add_argument("--points", type=int, default=200, help="Points timed one at a time")
+    parser.add_argument("--batch", type=int, default=100_000, help="Points timed as one batch")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp) / "cache"
+        db = Database(duckdb.connect(str(Path(tmp) / "bench.duckdb")), "duckdb")
+        init_schema(db)
+        populate(db, args.stops, args.parks)
+        print(f"{args.stops:,} stops, {args.parks:,} parks")
+
+        t0 = time.perf_counter()
+        index = load_amenity_index(db, cache)
+        print(f"{'build + save':<32} {time.perf_counter() - t0:10.3f}s")
+        amenities._cache.clear()
+        t0 = time.perf_counter()
+        load_amenity_index(db, cache)
+        print(f"{'load from disk':<32} {time.perf_counter() - t0:10.3f}s")
+
+        lats = LAT + rng.random(args.points) * SPAN
+        lons = LON + rng.random(args.points) * SPAN
+        box = degrees_for_metres(800.0)
+        distance = "111320.0 * SQRT(POW(? - latitude, 2) + POW((? - longitude) * COS(RADIANS(?)), 2))"
+
+        t0 = time.perf_counter()
+        for lat, lon in zip(lats, lons):
+            db.fetchone(
+                f"SELECT id, {distance} AS d FROM transit_amenities WHERE amenity_type = 'bus_stop' "
+                "ORDER BY d, id LIMIT 1", (lat, lon, lat),
+            )
+        per_point("SQL nearest stop (scan)", time.perf_counter() - t0, args.points)
+        t0 = time.perf_counter()
+        for lat, lon in zip(lats, lons):
+            where, params = near_clause(lat, lon, box)
+            db.fetchone(
+                f"SELECT COUNT(*) FROM transit_amenities WHERE amenity_type = 'bus_stop' AND {where} "
+                f"AND {distance} <= 800", (*params, lat, lon, lat),
+            )
+        per_point("SQL stops within 800 m (cells)", time.perf_counter() - t0, args.points)
+
+        t0 = time.perf_counter()
+        for lat, lon in zip(lats, lons):
+            index.nearest_to(lat, lon, "stop")
+        per_point("index nearest stop", time.perf_counter() - t0, args.points)
+        t0 = time.perf_counter()
+        for lat, lon in zip(lats, lons):
+            index.count_within("stop", [lat], [lon], 800.0)
+        per_point("index stops within 800 m", time.perf_counter() - t0, args.points)
+
+        lats = LAT + rng.random(args.batch) * SPAN
+        lons = LON + rng.random(args.batch) * SPAN
+        t0 = time.perf_counter()
+        index.nearest("stop", lats, lons, k=5)
+        per_point(f"batch 5 nearest stops ({args.batch:,})", time.perf_counter() - t0, args.batch)
+        t0 = time.perf_counter()
+        index.nearest("park", lats, lons)
+        per_point(f"batch nearest park ({args.batch:,})", time.perf_counter() - t0, args.batch)
+        t0 = time.perf_counter()
+        index.count_within("stop", lats, lons, 800.0)
+        per_point("batch stops within 800 m", time.perf_counter() - t0, args.batch)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark exporting parcel_features on synthetic data.
+
+Fills parcel_features in a fresh on-disk DuckDB database, then exports it
+to each format in a child process, both with DuckDB's COPY (what
+``parcl export`` runs on DuckDB) and through the row-streaming writers
+(what it runs on PostgreSQL). Reports time, rows per second, output size
+and the child's peak resident memory.
+
+Usage: python scripts/bench_export.py [--rows N] [--formats csv,jsonl,parquet] [--threads T]
+"""
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from parcl.db import Database, init_schema
+
+
+def populate(path: str, rows: int) -> None:
+    db = Database(duckdb.connect(path), "duckdb")
+    init_schema(db)
+    db.execute(
+        "INSERT INTO parcel_features (parcel_id, address, address_norm, city, state, zip_code, county, "
+        "latitude, longitude, base_zoning, zoning_desc, lot_size_sqft, apn, total_permits, permits_5yr, "
+        "active_permits, total_zoning_cases, open_zoning_cases, total_boa_cases, environmental_flags, "
+        "overlay_count, fetched_at) "
+        "SELECT 'p' || lpad(i::VARCHAR, 9, '0'), i || ' Main St', i || ' MAIN ST', 'Austin', 'TX', "
+        "(78700 + i % 100)::VARCHAR, 'Travis', 30.0 + random() * 0.6, -98.0 + random() * 0.6, "
+        "'SF-3', 'Family Residence', 5000 + i % 9000, 'APN' || i, i % 40, i % 12, i % 3, i % 5, i % 2, "
+        "i % 4, i % 6, i % 3, TIMESTAMP '2024-01-15 08:30:00' + INTERVAL (i % 1000) MINUTE "
+        f"FROM range({rows}) t(i)"
+    )
+    db.close()
+
+
+def run_export(db_path: str, fmt: str, method: str, threads: int, out_dir: str, queue) -> None:
+    from parcl import exporter
+
+    db = Database(duckdb.connect(db_path), "duckdb")
+    t0 = time.perf_counter()
+    if method == "copy":
+        path = exporter.export_data(db, fmt, out_dir, threads=threads)
+    else:
+        path = Path(out_dir) / f"streamed.{fmt}"
+        exporter._stream_export(db, fmt, path, "snappy", exporter.EXPORT_BATCH_ROWS)
+    elapsed = time.perf_counter() - t0
+    db.close()
+    queue.put((elapsed, Path(path).stat().st_size, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--formats", default="csv,jsonl,parquet")
+    parser.add_argument("--threads", type=int, default=0, help="DuckDB threads for COPY (0: all)")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.duckdb")
+        populate(db_path, args.rows)
+        print(f"{args.rows:,} parcel_features rows")
+        for fmt in args.formats.split(","):
+            for method in ("copy", "stream"):
+                queue = ctx.Queue()
+                child = ctx.Process(target=run_export, args=(db_path, fmt, method, args.threads, tmp, queue))
+                child.start()
+                elapsed, size, peak_kb = queue.get()
+                child.join()
+                print(f"{fmt:<8} {method:<7} {elapsed:8.2f}s {args.rows / elapsed:12,.0f} rows/s "
+                      f"{size / 1e6:9.1f} MB  peak RSS {peak_kb / 1024:7.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Benchmark building parcel_features on synthetic data.
+
+Compares the former ``parcel_features`` view (one correlated subquery per
+count) against a full rebuild of the table and an incremental refresh after
+one page of permits. Data is generated in SQL into a fresh on-disk DuckDB
+database, or a throwaway PostgreSQL schema with ``--postgres-url``.
+
+Usage: python scripts/bench_features.py [--parcels N] [--page-size P] [--postgres-url URL]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from parcl.db import Database, init_schema, refresh_statistics
+from parcl.etl.loader import load_records
+from parcl.features import FeatureChanges, refresh_features
+
+# The view parcel_features was defined as before it became a table
+LEGACY_VIEW = """
+SELECT
+    p.id AS parcel_id,
+    (SELECT COUNT(*) FROM permits pm WHERE pm.address_key = p.address_key) AS total_permits,
+    (SELECT COUNT(*) FROM permits pm WHERE pm.address_key = p.address_key
+        AND pm.issued_date >= CURRENT_DATE - INTERVAL '5 years') AS permits_5yr,
+    (SELECT COUNT(*) FROM permits pm WHERE pm.address_key = p.address_key
+        AND pm.status IN ('Active', 'In Review', 'Issued')) AS active_permits,
+    (SELECT COUNT(*) FROM zoning_cases zc WHERE zc.address_key = p.address_key) AS total_zoning_cases,
+    (SELECT COUNT(*) FROM zoning_cases zc WHERE zc.address_key = p.address_key
+        AND zc.status NOT IN ('Closed', 'Withdrawn', 'Denied')) AS open_zoning_cases,
+    (SELECT COUNT(*) FROM boa_cases bc WHERE bc.address_key = p.address_key) AS total_boa_cases,
+    (SELECT COUNT(*) FROM environmental_constraints ec
+        WHERE ec.address_key = p.address_key OR (
+            ec.latitude IS NOT NULL AND p.latitude IS NOT NULL
+            AND ABS(ec.latitude - p.latitude) < 0.001
+            AND ABS(ec.longitude - p.longitude) < 0.001
+        )) AS environmental_flags,
+    (SELECT COUNT(*) FROM zoning_overlays zo WHERE zo.source_id IN (
+        SELECT s.id FROM sources s WHERE s.jurisdiction_id = p.jurisdiction_id
+            AND s.target_table = 'zoning_overlays'
+    )) AS overlay_count
+FROM parcels p
+"""
+
+FEATURE_COUNTS = [
+    "total_permits", "permits_5yr", "active_permits", "total_zoning_cases",
+    "open_zoning_cases", "total_boa_cases", "environmental_flags", "overlay_count",
+]
+
+
+def populate(db: Database, parcels: int) -> None:
+    """Parcels on a grid around Austin, ~3 permits per parcel, constraints, cases."""
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table, jurisdiction_id) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels', 'austin-tx'), "
+        "('pm', 'Permits', 'socrata', 'permits', 'austin-tx'), "
+        "('zc', 'Zoning', 'socrata', 'zoning_cases', 'austin-tx'), "
+        "('ec', 'Flood', 'arcgis', 'environmental_constraints', 'austin-tx')"
+    )
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_key, latitude, longitude, jurisdiction_id) "
+        "SELECT 'p' || g, 'tcad', CAST(g AS TEXT), g || ' MAIN ST', "
+        f"30.1 + (g % 500) * 0.0008, -97.9 + (g - g % 500) / 500 * 0.0008, 'austin-tx' "
+        f"FROM generate_series(1, {parcels}) AS t(g)"
+    )
+    db.execute(
+        "INSERT INTO permits (id, source_id, external_id, address_key, status, issued_date) "
+        "SELECT 'pm' || g, 'pm', CAST(g AS TEXT), (g % ?) || ' MAIN ST', "
+        "CASE WHEN g % 3 = 0 THEN 'Issued' ELSE 'Final' END, DATE '2012-01-01' + CAST(g % 4000 AS INTEGER) "
+        f"FROM generate_series(1, {parcels * 3}) AS t(g)",
+        (parcels,),
+    )
+    db.execute(
+        "INSERT INTO zoning_cases (id, source_id, external_id, address_key, status) "
+        "SELECT 'zc' || g, 'zc', CAST(g AS TEXT), (g * 7 % ?) || ' MAIN ST', "
+        "CASE WHEN g % 2 = 0 THEN 'Closed' ELSE 'Pending' END "
+        f"FROM generate_series(1, {parcels // 10}) AS t(g)",
+        (parcels,),
+    )
+    db.execute(
+        "INSERT INTO environmental_constraints (id, source_id, external_id, constraint_type, latitude, longitude) "
+        "SELECT 'ec' || g, 'ec', CAST(g AS TEXT), 'flood', "
+        "30.1 + (g * 37 % 500) * 0.0008, -97.9 + (g * 11 % 400) * 0.0008 "
+        f"FROM generate_series(1, {parcels // 20}) AS t(g)"
+    )
+    db.commit()
+    refresh_statistics(db)
+
+
+def timed(label: str, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"{label:<24} {time.perf_counter() - t0:8.2f}s  {result}")
+    return result
+
+
+def run(db: Database, parcels: int, page_size: int) -> None:
+    init_schema(db)
+    populate(db, parcels)
+    print(f"{parcels:,} parcels, {parcels * 3:,} permits")
+
+    # Sum every count so no subquery can be skipped by the planner
+    every = " + ".join(FEATURE_COUNTS)
+    timed("legacy view", lambda: db.fetchone(f"SELECT COUNT(*), SUM({every}) FROM ({LEGACY_VIEW}) v"))
+    timed("full refresh", lambda: refresh_features(db))
+
+    page = [
+        {"id": f"new{i}", "source_id": "pm", "external_id": f"new{i}",
+         "address_key": f"{i * 13 % parcels} MAIN ST", "status": "Issued", "issued_date": "2024-05-01"}
+        for i in range(page_size)
+    ]
+    changes = FeatureChanges.for_table(db, "permits", "pm")
+    changes.capture(db, page)
+    load_records(db, "permits", page)
+    changes.add(page)
+    timed(f"incremental ({page_size} permits)", lambda: refresh_features(db, changes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parcels", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--postgres-url", default=None)
+    args = parser.parse_args()
+
+    if args.postgres_url:
+        import psycopg2
+
+        conn = psycopg2.connect(args.postgres_url)
+        schema = f"parcl_bench_{uuid.uuid4().hex[:8]}"
+        conn.cursor().execute(f"CREATE SCHEMA {schema}; SET search_path TO {schema}")
+        conn.commit()
+        try:
+            run(Database(conn, "postgresql"), args.parcels, args.page_size)
+        finally:
+            conn.rollback()
+            conn.cursor().execute(f"DROP SCHEMA {schema} CASCADE")
+            conn.commit()
+            conn.close()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(duckdb.connect(str(Path(tmp) / "bench.duckdb")), "duckdb")
+        run(db, args.parcels, args.page_size)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Benchmark ArcGIS geometry conversion (legacy WKT vs WKB) and simplification.
+
+Usage: python scripts/bench_geometry.py [--features N] [--vertices V] [--tolerance T]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from parcl.geometry import from_arcgis, simplify, to_wkb, wkb_to_wkt
+
+
+def legacy_geometry_to_wkt(geom):
+    """The f-string WKT builder that shipped before WKB encoding."""
+    if not geom:
+        return ""
+    if "rings" in geom:
+        parts = []
+        for ring in geom["rings"]:
+            coords = ", ".join(f"{pt[0]} {pt[1]}" for pt in ring)
+            parts.append(f"({coords})")
+        return f"POLYGON({', '.join(parts)})"
+    if "x" in geom and "y" in geom:
+        return f"POINT({geom['x']} {geom['y']})"
+    return ""
+
+
+def make_features(n: int, vertices: int, seed: int = 7) -> list[dict]:
+    """Flood-zone-like polygons around Austin.
+
+    Each shell is a smooth, densely digitized outline with sub-metre noise;
+    about a third get a hole.
+    """
+    rng = random.Random(seed)
+    features = []
+    for _ in range(n):
+        cx = -97.74 + rng.uniform(-0.3, 0.3)
+        cy = 30.27 + rng.uniform(-0.3, 0.3)
+        r = rng.uniform(0.001, 0.01)
+        k1, k2 = rng.randint(2, 5), rng.randint(6, 11)
+        shell = []
+        for i in range(vertices):
+            a = -2 * math.pi * i / vertices  # clockwise, as ArcGIS writes shells
+            rr = r * (1 + 0.2 * math.sin(k1 * a) + 0.1 * math.sin(k2 * a))
+            shell.append([cx + rr * math.cos(a) + rng.gauss(0, 2e-6),
+                          cy + rr * math.sin(a) + rng.gauss(0, 2e-6)])
+        shell.append(shell[0])
+        rings = [shell]
+        if rng.random() < 0.3:
+            hole = [[cx + r * 0.2 * math.cos(2 * math.pi * i / 64),
+                     cy + r * 0.2 * math.sin(2 * math.pi * i / 64)] for i in range(64)]
+            hole.append(hole[0])
+            rings.append(hole)
+        features.append({"rings": rings})
+    return features
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--features", type=int, default=2000)
+    parser.add_argument("--vertices", type=int, default=1000)
+    parser.add_argument("--tolerance", type=float, default=0.00001,
+                        help="Simplification tolerance in degrees (0 to skip)")
+    args = parser.parse_args()
+
+    features = make_features(args.features, args.vertices)
+    total_vertices = sum(len(r) for f in features for r in f["rings"])
+    print(f"{args.features} polygons, {total_vertices:,} vertices")
+
+    t0 = time.perf_counter()
+    wkt = [legacy_geometry_to_wkt(f) for f in features]
+    t_wkt = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    wkb = [to_wkb(from_arcgis(f)) for f in features]
+    t_wkb = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for b in wkb:
+        wkb_to_wkt(b)
+    t_derive = time.perf_counter() - t0
+
+    wkt_bytes = sum(len(s.encode()) for s in wkt)
+    wkb_bytes = sum(len(b) for b in wkb)
+
+    print(f"{'legacy WKT build':<24} {t_wkt:8.3f}s  {total_vertices / t_wkt:>14,.0f} vertices/s")
+    print(f"{'WKB encode':<24} {t_wkb:8.3f}s  {total_vertices / t_wkb:>14,.0f} vertices/s")
+    print(f"{'speedup':<24} {t_wkt / t_wkb:8.1f}x")
+    print(f"{'WKT derived from WKB':<24} {t_derive:8.3f}s  (on demand only)")
+    print(f"{'WKT storage':<24} {wkt_bytes / 1e6:8.1f} MB")
+    print(f"{'WKB storage':<24} {wkb_bytes / 1e6:8.1f} MB  ({1 - wkb_bytes / wkt_bytes:.0%} smaller)")
+
+    if args.tolerance > 0:
+        t0 = time.perf_counter()
+        simple = [simplify(from_arcgis(f), args.tolerance) for f in features]
+        t_simplify = time.perf_counter() - t0
+        kept = sum(g.vertex_count for g in simple)
+        simple_bytes = sum(len(to_wkb(g)) for g in simple)
+        print(f"{'simplify':<24} {t_simplify:8.3f}s  tolerance={args.tolerance}")
+        print(f"{'vertices kept':<24} {kept:>8,}  ({1 - kept / total_vertices:.0%} removed)")
+        print(f"{'simplified WKB':<24} {simple_bytes / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark maintaining parcel_spatial_links on synthetic data.
+
+Loads parcels on a grid around Austin, small overlay polygons, one large
+many-sided flood zone and transit stops into a fresh on-disk DuckDB database,
+then times a full link rebuild in process and with a process pool, a
+re-crawl of the overlay source, and a relink of one page of parcels.
+
+Usage: python scripts/bench_links.py [--parcels N] [--polygons P] [--stops S] [--workers W]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+import numpy as np
+
+from parcl.db import Database, init_schema
+from parcl.etl.loader import backfill_grid_cells, load_records
+from parcl.geometry import Geometry, to_wkb
+from parcl.links import refresh_links
+
+
+def ring(cx: float, cy: float, radius: np.ndarray) -> list:
+    t = np.linspace(0, 2 * np.pi, len(radius))
+    coords = np.c_[cx + radius * np.cos(t), cy + radius * np.sin(t)]
+    coords[-1] = coords[0]
+    return [[np.ascontiguousarray(coords)]]
+
+
+def populate(db: Database, parcels: int, polygons: int, stops: int) -> None:
+    rng = np.random.default_rng(3)
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels'), ('zo', 'Overlays', 'arcgis', 'zoning_overlays'), "
+        "('fz', 'Flood', 'arcgis', 'environmental_constraints'), ('cm', 'Stops', 'gtfs', 'transit_amenities')"
+    )
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, latitude, longitude) "
+        "SELECT 'p' || g, 'tcad', CAST(g AS TEXT), "
+        "30.1 + (g % 500) * 0.0008, -97.9 + (g - g % 500) / 500 * 0.0008 "
+        f"FROM generate_series(1, {parcels}) AS t(g)"
+    )
+    db.execute(
+        "INSERT INTO transit_amenities (id, source_id, external_id, name, amenity_type, latitude, longitude) "
+        "SELECT 's' || g, 'cm', CAST(g AS TEXT), 'Stop ' || g, 'bus_stop', "
+        "30.1 + (g * 37 % 997) * 0.0004, -97.9 + (g * 11 % 991) * 0.0004 "
+        f"FROM generate_series(1, {stops}) AS t(g)"
+    )
+    db.commit()
+    backfill_grid_cells(db, ["parcels", "transit_amenities"])
+    load_records(db, "zoning_overlays", [
+        {"id": f"o{i}", "source_id": "zo", "external_id": str(i), "overlay_name": f"Overlay {i}",
+         "geometry_wkb": to_wkb(Geometry("Polygon", ring(
+             -97.9 + rng.random() * 0.4, 30.1 + rng.random() * 0.4,
+             (0.002 + 0.01 * rng.random()) * (1 + 0.2 * rng.random(40)))))}
+        for i in range(polygons)
+    ])
+    t = np.linspace(0, 2 * np.pi, 20_000)
+    load_records(db, "environmental_constraints", [
+        {"id": "flood", "source_id": "fz", "external_id": "1", "constraint_type": "flood_zone",
+         "name": "Zone AE", "geometry_wkb": to_wkb(Geometry("Polygon", ring(-97.7, 30.3, 0.1 * (1 + 0.2 * np.sin(37 * t)))))},
+    ])
+
+
+def timed(label: str, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"{label:<30} {time.perf_counter() - t0:8.2f}s  links={result['links']}")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parcels", type=int, default=200_000)
+    parser.add_argument("--polygons", type=int, default=5000)
+    parser.add_argument("--stops", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(duckdb.connect(str(Path(tmp) / "bench.duckdb")), "duckdb")
+        init_schema(db)
+        populate(db, args.parcels, args.polygons, args.stops)
+        print(f"{args.parcels:,} parcels, {args.polygons + 1:,} polygons, {args.stops:,} stops")
+
+        timed("full, in process", lambda: refresh_links(db, workers=1))
+        if args.workers > 1:
+            timed(f"full, {args.workers} workers", lambda: refresh_links(db, workers=args.workers))
+        else:
+            print("full, process pool             skipped (1 CPU)")
+        timed("overlay source re-crawl", lambda: refresh_links(db, source=("zoning_overlays", "zo")))
+        timed("one page of parcels", lambda: refresh_links(db, parcel_ids={f"p{i}" for i in range(1, 1001)}))
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
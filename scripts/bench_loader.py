@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Benchmark loading synthetic permits into DuckDB or PostgreSQL.
+
+Compares the row-by-row upsert (one ``execute`` per record) with the bulk
+Arrow-staged merge used by ``load_records``. Each run loads into a fresh
+on-disk database, then reloads the same pages to exercise the update path.
+The row-by-row baseline commits every statement and runs at a few hundred
+records per second on disk, so it only loads the first ``--baseline`` records.
+
+A third run loads the same pages with ``load_mode: replace`` semantics:
+append to a shadow table, then swap the source's rows in one transaction.
+
+With ``--postgres-url`` both paths run against PostgreSQL instead, each in
+a throwaway schema: one INSERT round trip per record versus COPY into a
+staging table plus one merge per page.
+
+Usage: python scripts/bench_loader.py [--records N] [--page-size P] [--baseline B]
+                                      [--postgres-url URL]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, timedelta
+from functools import partial
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from parcl.address import parse_address
+from parcl.db import Database, init_schema
+from parcl.etl.loader import (
+    TABLE_COLUMNS,
+    ReplaceLoad,
+    _load_rows,
+    dedupe_records,
+    load_records,
+)
+
+STREETS = ["Congress Ave", "Lamar Blvd", "Guadalupe St", "Riverside Dr", "Burnet Rd",
+           "Airport Blvd", "Oltorf St", "Manor Rd", "Brodie Ln", "Parmer Ln"]
+TYPES = ["Building", "Electrical", "Mechanical", "Plumbing", "Demolition"]
+STATUSES = ["Issued", "Active", "Final", "Expired", "Withdrawn"]
+
+
+def make_permits(n: int, dup_rate: float, seed: int = 11) -> list[dict]:
+    rng = random.Random(seed)
+    base = date(2015, 1, 1)
+    records = []
+    for i in range(n):
+        ext = f"P{i:07d}"
+        if records and rng.random() < dup_rate:
+            ext = records[rng.randrange(len(records))]["external_id"]
+        address = f"{rng.randint(100, 9999)} {rng.choice(STREETS)}"
+        record = {
+            "id": str(uuid.uuid4()),
+            "source_id": "bench",
+            "external_id": ext,
+            "permit_number": ext,
+            "permit_type": rng.choice(TYPES),
+            "status": rng.choice(STATUSES),
+            "description": "Synthetic permit " * rng.randint(1, 6),
+            "address": address,
+            "address_norm": address.upper(),
+            "valuation": round(rng.uniform(1_000, 2_000_000), 2),
+            "issued_date": base + timedelta(days=rng.randint(0, 3600)),
+            "latitude": 30.27 + rng.uniform(-0.2, 0.2),
+            "longitude": -97.74 + rng.uniform(-0.2, 0.2),
+            "jurisdiction_id": "austin-tx",
+            "raw_payload": '{"synthetic": true}',
+        }
+        record.update(parse_address(address).as_columns())
+        records.append(record)
+    return records
+
+
+@contextmanager
+def duckdb_database():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(duckdb.connect(str(Path(tmp) / "bench.duckdb")), "duckdb")
+        yield db
+        db.close()
+
+
+@contextmanager
+def postgres_database(url: str):
+    import psycopg2
+
+    conn = psycopg2.connect(url)
+    schema = f"parcl_bench_{uuid.uuid4().hex[:8]}"
+    cur = conn.cursor()
+    cur.execute(f"CREATE SCHEMA {schema}")
+    cur.execute(f"SET search_path TO {schema}")
+    conn.commit()
+    try:
+        yield Database(conn, "postgresql")
+    finally:
+        conn.rollback()
+        conn.cursor().execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.commit()
+        conn.close()
+
+
+def run(label: str, database, load, pages: list[list[dict]], total: int, replace=False) -> None:
+    with database() as db:
+        init_schema(db)
+        db.execute(
+            "INSERT INTO sources (id, name, source_type, target_table) "
+            "VALUES ('bench', 'Bench', 'synthetic', 'permits')"
+        )
+        db.commit()
+        for phase in ("insert", "update"):
+            t0 = time.perf_counter()
+            if replace:
+                shadow = ReplaceLoad(db, "permits", "bench")
+                loaded = sum(shadow.load(page) for page in pages)
+                shadow.swap()
+            else:
+                loaded = sum(load(db, page) for page in pages)
+            elapsed = time.perf_counter() - t0
+            print(f"{label:<12} {phase:<7} {loaded:>9,} rows {elapsed:8.2f}s "
+                  f"{total / elapsed:>12,.0f} records/s")
+        rows = db.fetchone("SELECT COUNT(*) FROM permits")[0]
+        print(f"{'':<12} {'rows':<7} {rows:>9,} in table")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--dup-rate", type=float, default=0.01,
+                        help="Fraction of records repeating an earlier key")
+    parser.add_argument("--baseline", type=int, default=5000,
+                        help="Records loaded by the row-by-row baseline (0 to skip)")
+    parser.add_argument("--postgres-url", help="Benchmark PostgreSQL instead of DuckDB")
+    args = parser.parse_args()
+
+    if args.postgres_url:
+        database = partial(postgres_database, args.postgres_url)
+    else:
+        database = duckdb_database
+
+    records = make_permits(args.records, args.dup_rate)
+    pages = [records[i : i + args.page_size] for i in range(0, len(records), args.page_size)]
+    print(f"{args.records:,} permits in {len(pages)} pages of {args.page_size}")
+
+    columns = TABLE_COLUMNS["permits"]
+    if args.baseline:
+        sample = records[: args.baseline]
+        sample_pages = [sample[i : i + args.page_size] for i in range(0, len(sample), args.page_size)]
+        run("row-by-row", database, lambda db, page: _load_rows(db, "permits", columns, dedupe_records(page)),
+            sample_pages, len(sample))
+    run("bulk", database, lambda db, page: load_records(db, "permits", page), pages, args.records)
+    run("replace", database, None, pages, args.records, replace=True)
+
+
+if __name__ == "__main__":
+    main()
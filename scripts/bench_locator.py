@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Benchmark reverse lookups (parcel at a latitude/longitude) on synthetic data.
+
+Lays out square TCAD lots on a grid in a fresh on-disk DuckDB database,
+with a parcel point at most lots; the rest have a valuation but no parcel.
+Times building, saving and reloading the parcel locator, then locating
+random points (inside lots and in the gaps between them) one at a time and
+as one batch, against a SQL nearest-parcel query over the grid cells, and
+the full warm profile at a point from the profile cache.
+
+Usage: python scripts/bench_locator.py [--lots N] [--points P] [--batch B]
+"""
+
+import argparse
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from parcl import index_cache, locator
+from parcl.db import Database, init_schema
+from parcl.etl.loader import backfill_grid_cells
+from parcl.grid import degrees_for_metres, distance_sql, near_clause
+from parcl.locator import load_parcel_locator
+from parcl.profile_cache import ProfileCache, cached_profile_at
+
+LAT, LON = 30.20, -97.85
+# Lot pitch and half-width in degrees (about 44 m and 20 m)
+PITCH, HALF = 0.0004, 0.00018
+
+
+def _square_wkb(lat: float, lon: float) -> bytes:
+    ring = [(lon - HALF, lat - HALF), (lon - HALF, lat + HALF), (lon + HALF, lat + HALF),
+            (lon + HALF, lat - HALF), (lon - HALF, lat - HALF)]
+    return struct.pack("<bIII", 1, 3, 1, 5) + struct.pack("<10d", *(v for xy in ring for v in xy))
+
+
+def populate(db: Database, lots: int) -> None:
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('zba', 'Zoning', 'csv', 'parcels'), ('tcad', 'TCAD', 'arcgis', 'property_valuations')"
+    )
+    side = int(np.ceil(np.sqrt(lots)))
+    i = np.arange(lots)
+    lats, lons = LAT + (i // side) * PITCH, LON + (i % side) * PITCH
+    keys = [f"{n} MAIN ST" for n in i]
+    lots_df = pd.DataFrame({
+        "id": [f"v{n}" for n in i], "address_key": keys,
+        "geometry_wkb": [_square_wkb(lat, lon) for lat, lon in zip(lats, lons)],
+        "min_x": lons - HALF, "min_y": lats - HALF, "max_x": lons + HALF, "max_y": lats + HALF,
+        "centroid_x": lons, "centroid_y": lats,
+    })
+    db.conn.register("lots_df", lots_df)
+    db.execute(
+        "INSERT INTO property_valuations (id, source_id, external_id, address_key, geometry_wkb, "
+        "min_x, min_y, max_x, max_y, centroid_x, centroid_y) SELECT id, 'tcad', id, address_key, geometry_wkb, "
+        "min_x, min_y, max_x, max_y, centroid_x, centroid_y FROM lots_df"
+    )
+    # One lot in ten has no parcel of its own
+    has_parcel = i % 10 != 0
+    parcels_df = pd.DataFrame({
+        "id": [f"p{n}" for n in i[has_parcel]], "address_key": [keys[n] for n in i[has_parcel]],
+        "latitude": lats[has_parcel] + HALF / 3, "longitude": lons[has_parcel] - HALF / 3,
+    })
+    db.conn.register("parcels_df", parcels_df)
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_norm, address_key, latitude, longitude) "
+        "SELECT id, 'zba', id, address_key, address_key, latitude, longitude FROM parcels_df"
+    )
+    backfill_grid_cells(db, ["parcels"])
+    db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lots", type=int, default=200_000)
+    parser.add_argument("--points", type=int, default=500, help="Points located one at a time")
+    parser.add_argument("--batch", type=int, default=100_000, help="Points located as one batch")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp) / "cache"
+        # Keep the locator out of the project's cache directory
+        index_cache.default_cache_dir = lambda: cache
+        db = Database(duckdb.connect(str(Path(tmp) / "bench.duckdb")), "duckdb")
+        init_schema(db)
+        populate(db, args.lots)
+        side = int(np.ceil(np.sqrt(args.lots)))
+        print(f"{args.lots:,} lots on a {side} x {side} grid")
+
+        t0 = time.perf_counter()
+        finder = load_parcel_locator(db)
+        print(f"{'build + save':<30} {time.perf_counter() - t0:10.2f}s  "
+              f"{(cache / locator.CACHE_FILE).stat().st_size / 1e6:.1f} MB")
+        locator._cache.clear()
+        t0 = time.perf_counter()
+        finder = load_parcel_locator(db)
+        print(f"{'load from disk':<30} {time.perf_counter() - t0:10.2f}s")
+
+        span = (side - 1) * PITCH
+        lats = LAT + rng.random(args.points) * span
+        lons = LON + rng.random(args.points) * span
+        t0 = time.perf_counter()
+        found = [finder.locate([lat], [lon])[0] for lat, lon in zip(lats, lons)]
+        elapsed = time.perf_counter() - t0
+        within = sum(1 for f in found if f and f.method == "within")
+        print(f"{'locate, one at a time':<30} {elapsed / args.points * 1000:10.3f} ms/point  "
+              f"{within}/{args.points} inside a lot")
+
+        radius = degrees_for_metres(locator.LOCATE_RADIUS_M)
+        t0 = time.perf_counter()
+        for lat, lon in zip(lats, lons):
+            where, params = near_clause(lat, lon, radius, "p")
+            db.fetchone(
+                f"SELECT p.id FROM parcels p, (SELECT ? AS latitude, ? AS longitude) q WHERE {where} "
+                f"ORDER BY {distance_sql('q', 'p')}, p.id LIMIT 1", (lat, lon, *params),
+            )
+        elapsed = time.perf_counter() - t0
+        print(f"{'SQL nearest parcel (cells)':<30} {elapsed / args.points * 1000:10.3f} ms/point")
+
+        batch_lats = LAT + rng.random(args.batch) * span
+        batch_lons = LON + rng.random(args.batch) * span
+        t0 = time.perf_counter()
+        finder.locate(batch_lats, batch_lons)
+        elapsed = time.perf_counter() - t0
+        print(f"{f'locate, batch of {args.batch:,}':<30} {elapsed / args.batch * 1000:10.4f} ms/point")
+
+        profiles = ProfileCache.open(cache, max_entries=args.points)
+        for lat, lon in zip(lats, lons):
+            cached_profile_at(lat, lon, db, profiles)
+        t0 = time.perf_counter()
+        for lat, lon in zip(lats, lons):
+            cached_profile_at(lat, lon, db, profiles)
+        elapsed = time.perf_counter() - t0
+        print(f"{'profile at point (cache warm)':<30} {elapsed / args.points * 1000:10.3f} ms/point")
+        profiles.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Benchmark the point-in-polygon index on synthetic overlays.
+
+Builds small overlay polygons scattered over Austin plus one large
+many-sided flood zone, then times the index build, a cache reload, a batch
+query of parcel points, single-point lookups, and the same batch checked by
+testing every polygon's bounding box and rings in turn.
+
+Usage: python scripts/bench_polygons.py [--polygons N] [--points P] [--flood-vertices V]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from parcl.geometry import Geometry, points_in_ring, to_wkb
+from parcl.polygons import PolygonIndex
+
+
+def ring(cx: float, cy: float, radius: np.ndarray) -> np.ndarray:
+    t = np.linspace(0, 2 * np.pi, len(radius))
+    coords = np.c_[cx + radius * np.cos(t), cy + radius * np.sin(t)]
+    coords[-1] = coords[0]
+    return np.ascontiguousarray(coords)
+
+
+def make_rows(polygons: int, flood_vertices: int, seed: int = 3) -> list[tuple]:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(polygons):
+        shape = ring(-97.9 + rng.random() * 0.4, 30.1 + rng.random() * 0.4,
+                     (0.002 + 0.01 * rng.random()) * (1 + 0.2 * rng.random(40)))
+        rows.append(("zoning_overlays", f"o{i}", f"Overlay {i}", "overlay",
+                     to_wkb(Geometry("Polygon", [[shape]]))))
+    t = np.linspace(0, 2 * np.pi, flood_vertices)
+    flood = ring(-97.7, 30.3, 0.1 * (1 + 0.2 * np.sin(37 * t)))
+    rows.append(("environmental_constraints", "flood", "Zone AE", "flood_zone",
+                  to_wkb(Geometry("Polygon", [[flood]]))))
+    return rows
+
+
+def naive(rows: list[tuple], lats: np.ndarray, lons: np.ndarray) -> int:
+    """Bounding-box check then ray casting, polygon by polygon."""
+    from parcl.geometry import from_wkb
+
+    hits = 0
+    for *_, wkb in rows:
+        shell = from_wkb(wkb).parts[0][0]
+        near = (
+            (lons >= shell[:, 0].min()) & (lons <= shell[:, 0].max())
+            & (lats >= shell[:, 1].min()) & (lats <= shell[:, 1].max())
+        )
+        idx = np.flatnonzero(near)
+        step = max(1, 4_000_000 // len(shell))
+        for i in range(0, len(idx), step):
+            chunk = idx[i:i + step]
+            hits += int(points_in_ring(lons[chunk], lats[chunk], shell).sum())
+    return hits
+
+
+def timed(label: str, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"{label:<26} {time.perf_counter() - t0:8.3f}s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--polygons", type=int, default=5000)
+    parser.add_argument("--points", type=int, default=200_000)
+    parser.add_argument("--flood-vertices", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.polygons, args.flood_vertices)
+    rng = np.random.default_rng(11)
+    lats = 30.1 + rng.random(args.points) * 0.4
+    lons = -97.9 + rng.random(args.points) * 0.4
+    print(f"{len(rows):,} polygons, {args.points:,} points")
+
+    index = timed("build", lambda: PolygonIndex.build(rows))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "polygons.npz"
+        index.save(path)
+        timed("load from cache", lambda: PolygonIndex.load(path))
+    point, _ = timed("batch query", lambda: index.query(lats, lons))
+    hits = timed("naive per-polygon loop", lambda: naive(rows, lats, lons))
+    assert hits == len(point), (hits, len(point))
+
+    t0 = time.perf_counter()
+    for lat, lon in zip(lats[:500], lons[:500]):
+        index.containing(lat, lon)
+    print(f"{'single point (mean)':<26} {(time.perf_counter() - t0) / 500 * 1000:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
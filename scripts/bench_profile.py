@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Benchmark batch parcel profiles against one profile per query.
+
+Loads parcels on a grid around Austin with permits, zoning cases and point
+constraints into a fresh on-disk DuckDB database, resolves and links them,
+then profiles a list of addresses (some unknown) one at a time, with
+get_parcel_risk_profiles, and through the profile cache (cold, warm from
+disk in a new process-like instance, and warm from memory).
+
+Usage: python scripts/bench_profile.py [--parcels N] [--queries Q] [--single S]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from parcl import index_cache
+from parcl.db import Database, init_schema
+from parcl.etl.loader import backfill_grid_cells
+from parcl.links import refresh_links
+from parcl.profile import get_parcel_risk_profile, get_parcel_risk_profiles
+from parcl.profile_cache import ProfileCache, cached_profile
+from parcl.resolve import resolve_parcels
+
+
+def populate(db: Database, parcels: int) -> None:
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels'), ('pm', 'Permits', 'socrata', 'permits'), "
+        "('zc', 'Zoning', 'socrata', 'zoning_cases'), ('ec', 'Constraints', 'arcgis', 'environmental_constraints')"
+    )
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address, address_norm, address_key, latitude, longitude) "
+        "SELECT 'p' || g, 'tcad', CAST(g AS TEXT), g || ' Main St', g || ' MAIN ST', g || ' MAIN ST', "
+        "30.1 + (g % 500) * 0.0008, -97.9 + (g - g % 500) / 500 * 0.0008 "
+        f"FROM generate_series(1, {parcels}) AS t(g)"
+    )
+    db.execute(
+        "INSERT INTO permits (id, source_id, external_id, permit_number, address_key, issued_date) "
+        "SELECT 'pm' || g, 'pm', CAST(g AS TEXT), 'BP-' || g, "
+        f"(g % {parcels}) || ' MAIN ST', DATE '2015-01-01' + CAST(g % 3650 AS INTEGER) "
+        f"FROM generate_series(1, {parcels * 3}) AS t(g)"
+    )
+    db.execute(
+        "INSERT INTO zoning_cases (id, source_id, external_id, address_key, status) "
+        "SELECT 'z' || g, 'zc', CAST(g AS TEXT), (g * 7 % " + str(parcels) + ") || ' MAIN ST', "
+        "CASE WHEN g % 2 = 0 THEN 'Filed' ELSE 'Closed' END "
+        f"FROM generate_series(1, {parcels // 10}) AS t(g)"
+    )
+    db.execute(
+        "INSERT INTO environmental_constraints (id, source_id, external_id, constraint_type, name, latitude, longitude) "
+        "SELECT 'e' || g, 'ec', CAST(g AS TEXT), 'wetland', 'Wetland ' || g, "
+        "30.1 + (g * 37 % 997) * 0.0004, -97.9 + (g * 11 % 991) * 0.0004 "
+        f"FROM generate_series(1, {parcels // 100}) AS t(g)"
+    )
+    db.commit()
+    backfill_grid_cells(db, ["parcels", "environmental_constraints"])
+    resolve_parcels(db)
+    refresh_links(db)
+
+
+def timed_lookups(label: str, fn, count: int) -> None:
+    t0 = time.perf_counter()
+    fn()
+    print(f"{label:<16} {(time.perf_counter() - t0) / count * 1e6:10,.1f} us/profile")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parcels", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=10_000)
+    parser.add_argument("--single", type=int, default=500, help="Queries timed one at a time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the address index out of the project's cache directory
+        index_cache.default_cache_dir = lambda: Path(tmp) / "cache"
+        db = Database(duckdb.connect(str(Path(tmp) / "bench.duckdb")), "duckdb")
+        init_schema(db)
+        populate(db, args.parcels)
+        queries = [
+            f"{(i * 13) % args.parcels} Main Street" if i % 10 else f"{i} Unknown Rd"
+            for i in range(args.queries)
+        ]
+        print(f"{args.parcels:,} parcels, {args.queries:,} queries")
+
+        t0 = time.perf_counter()
+        single = [get_parcel_risk_profile(q, db) for q in queries[:args.single]]
+        rate = len(single) / (time.perf_counter() - t0)
+        print(f"{'one at a time':<16} {rate:10,.0f} profiles/s  (first {len(single):,})")
+
+        t0 = time.perf_counter()
+        batch = list(get_parcel_risk_profiles(queries, db))
+        rate = len(batch) / (time.perf_counter() - t0)
+        print(f"{'batch':<16} {rate:10,.0f} profiles/s")
+        assert batch[:len(single)] == single
+
+        sample = queries[:args.single]
+        cache = ProfileCache.open(Path(tmp))
+        timed_lookups("cache, cold", lambda: [cached_profile(q, db, cache) for q in sample], len(sample))
+        cache.close()
+        cache = ProfileCache.open(Path(tmp))
+        timed_lookups("cache, disk", lambda: [cached_profile(q, db, cache) for q in sample], len(sample))
+        timed_lookups("cache, memory", lambda: [cached_profile(q, db, cache) for q in sample], len(sample))
+        print(f"{'cache stats':<16} {cache.stats()}")
+        cache.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Benchmark resolving permits to parcels on synthetic data.
+
+Generates parcels on a grid around Austin and permits of which half carry a
+parcel's address key, a quarter only coordinates a few metres from a parcel
+and a quarter nothing usable, in a fresh on-disk DuckDB database. Times the
+first resolution of every permit, then a re-crawl of one changed page.
+
+Usage: python scripts/bench_resolve.py [--parcels N] [--permits P] [--page-size S] [--batch-size B]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import duckdb
+
+from parcl.db import Database, init_schema
+from parcl.etl.loader import backfill_grid_cells, load_records
+from parcl.resolve import BATCH_SIZE, resolve_parcels
+
+
+def populate(db: Database, parcels: int, permits: int) -> None:
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels'), ('pm', 'Permits', 'socrata', 'permits')"
+    )
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_key, latitude, longitude) "
+        "SELECT 'p' || g, 'tcad', CAST(g AS TEXT), g || ' MAIN ST', "
+        "30.1 + (g % 500) * 0.0008, -97.9 + (g - g % 500) / 500 * 0.0008 "
+        f"FROM generate_series(1, {parcels}) AS t(g)"
+    )
+    db.execute(
+        "INSERT INTO permits (id, source_id, external_id, address_key, latitude, longitude) "
+        "SELECT 'pm' || g, 'pm', CAST(g AS TEXT), "
+        f"CASE WHEN g % 4 < 2 THEN (g % {parcels}) || ' MAIN ST' END, "
+        f"CASE WHEN g % 4 = 2 THEN 30.1 + (g % {parcels} % 500) * 0.0008 + 0.00005 END, "
+        f"CASE WHEN g % 4 = 2 THEN -97.9 + (g % {parcels} - g % {parcels} % 500) / 500 * 0.0008 END "
+        f"FROM generate_series(1, {permits}) AS t(g)"
+    )
+    db.commit()
+    backfill_grid_cells(db, ["parcels", "permits"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parcels", type=int, default=200_000)
+    parser.add_argument("--permits", type=int, default=600_000)
+    parser.add_argument("--page-size", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(duckdb.connect(str(Path(tmp) / "bench.duckdb")), "duckdb")
+        init_schema(db)
+        populate(db, args.parcels, args.permits)
+        print(f"{args.parcels:,} parcels, {args.permits:,} permits")
+
+        t0 = time.perf_counter()
+        result = resolve_parcels(db, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - t0
+        print(f"{'resolve all':<20} {elapsed:8.2f}s  {args.permits / elapsed:,.0f} rows/s  {result['rows']}")
+
+        page = [
+            {"id": f"pm{i}", "source_id": "pm", "external_id": str(i),
+             "address_key": f"{(i * 7) % args.parcels} MAIN ST", "status": "Issued"}
+            for i in range(1, args.page_size + 1)
+        ]
+        load_records(db, "permits", page)
+        t0 = time.perf_counter()
+        result = resolve_parcels(db, batch_size=args.batch_size)
+        print(f"{'changed page':<20} {time.perf_counter() - t0:8.2f}s  {result['rows']}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+-- parcel_features rows for the parcels matching the filter filled in by
+-- parcl.features, computed with one grouped pass per source table instead
+-- of per-parcel subqueries. The environmental box half-width is ENV_RADIUS.
+-- Rows count toward the parcel parcl.resolve linked them to. Overlay counts
+-- and polygon constraints come from parcel_spatial_links.
+INSERT INTO parcel_features (
+    parcel_id, address, address_norm, city, state, zip_code, county,
+    latitude, longitude, base_zoning, zoning_desc, lot_size_sqft, apn,
+    total_permits, permits_5yr, active_permits,
+    total_zoning_cases, open_zoning_cases, total_boa_cases,
+    environmental_flags, overlay_count, fetched_at,
+    address_key, jurisdiction_id, refreshed_at
+)
+-- NOT MATERIALIZED: over a materialized CTE DuckDB runs the range join in
+-- env_pairs about 15x slower than over a plain scan of parcels
+WITH target AS NOT MATERIALIZED (
+    SELECT * FROM parcels p WHERE {PARCEL_FILTER}
+),
+permit_counts AS (
+    SELECT
+        parcel_id,
+        COUNT(*) AS total_permits,
+        COUNT(*) FILTER (WHERE issued_date >= CURRENT_DATE - INTERVAL '5 years') AS permits_5yr,
+        COUNT(*) FILTER (WHERE status IN ('Active', 'In Review', 'Issued')) AS active_permits
+    FROM permits
+    WHERE parcel_id IN (SELECT id FROM target)
+    GROUP BY parcel_id
+),
+zoning_counts AS (
+    SELECT
+        parcel_id,
+        COUNT(*) AS total_zoning_cases,
+        COUNT(*) FILTER (WHERE status NOT IN ('Closed', 'Withdrawn', 'Denied')) AS open_zoning_cases
+    FROM zoning_cases
+    WHERE parcel_id IN (SELECT id FROM target)
+    GROUP BY parcel_id
+),
+boa_counts AS (
+    SELECT parcel_id, COUNT(*) AS total_boa_cases
+    FROM boa_cases
+    WHERE parcel_id IN (SELECT id FROM target)
+    GROUP BY parcel_id
+),
+overlay_counts AS (
+    SELECT parcel_id, COUNT(*) AS overlay_count
+    FROM parcel_spatial_links
+    WHERE feature_table = 'zoning_overlays' AND relation = 'within'
+        AND parcel_id IN (SELECT id FROM target)
+    GROUP BY parcel_id
+),
+-- A constraint counts once per parcel whether it is resolved to it, within
+-- the box around it or contains it
+env_pairs AS (
+    SELECT parcel_id, id AS constraint_id
+    FROM environmental_constraints
+    WHERE parcel_id IN (SELECT id FROM target)
+    UNION
+    SELECT t.id, ec.id
+    FROM target t JOIN environmental_constraints ec
+        ON ec.latitude > t.latitude - {ENV_RADIUS} AND ec.latitude < t.latitude + {ENV_RADIUS}
+        AND ec.longitude > t.longitude - {ENV_RADIUS} AND ec.longitude < t.longitude + {ENV_RADIUS}
+    UNION
+    SELECT l.parcel_id, l.feature_id
+    FROM parcel_spatial_links l
+    WHERE l.feature_table = 'environmental_constraints' AND l.relation = 'within'
+        AND l.parcel_id IN (SELECT id FROM target)
+),
+env_counts AS (
+    SELECT parcel_id, COUNT(*) AS environmental_flags FROM env_pairs GROUP BY parcel_id
+)
+SELECT
+    t.id, t.address, t.address_norm, t.city, t.state, t.zip_code, t.county,
+    t.latitude, t.longitude, t.base_zoning, t.zoning_desc, t.lot_size_sqft, t.apn,
+    COALESCE(pc.total_permits, 0),
+    COALESCE(pc.permits_5yr, 0),
+    COALESCE(pc.active_permits, 0),
+    COALESCE(zc.total_zoning_cases, 0),
+    COALESCE(zc.open_zoning_cases, 0),
+    COALESCE(bc.total_boa_cases, 0),
+    COALESCE(ec.environmental_flags, 0),
+    COALESCE(oc.overlay_count, 0),
+    t.fetched_at,
+    t.address_key,
+    t.jurisdiction_id,
+    CURRENT_TIMESTAMP
+FROM target t
+LEFT JOIN permit_counts pc ON pc.parcel_id = t.id
+LEFT JOIN zoning_counts zc ON zc.parcel_id = t.id
+LEFT JOIN boa_counts bc ON bc.parcel_id = t.id
+LEFT JOIN env_counts ec ON ec.parcel_id = t.id
+LEFT JOIN overlay_counts oc ON oc.parcel_id = t.id
@@ -1,5 +1,6 @@
 -- parcl-crawler schema (DuckDB + PostgreSQL compatible)
 -- Use {JSON_TYPE} placeholder: JSON for DuckDB, JSONB for PG
+-- Use {BLOB_TYPE} placeholder: BLOB for DuckDB, BYTEA for PG
 
 CREATE TABLE IF NOT EXISTS sources (
     id              TEXT PRIMARY KEY,
@@ -34,15 +35,21 @@ CREATE TABLE IF NOT EXISTS parcels (
     apn             TEXT,
     address         TEXT,
     address_norm    TEXT,
+    house_number    TEXT,
+    predir          TEXT,
+    street_name     TEXT,
+    street_suffix   TEXT,
+    unit            TEXT,
+    address_key     TEXT,
     city            TEXT,
     state           TEXT,
     zip_code        TEXT,
     county          TEXT,
-    latitude        DOUBLE,
-    longitude       DOUBLE,
+    latitude        {DOUBLE_TYPE},
+    longitude       {DOUBLE_TYPE},
     base_zoning     TEXT,
     zoning_desc     TEXT,
-    lot_size_sqft   DOUBLE,
+    lot_size_sqft   {DOUBLE_TYPE},
     jurisdiction_id TEXT REFERENCES jurisdictions(id),
     raw_payload     {JSON_TYPE},
     fetched_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -61,15 +68,21 @@ CREATE TABLE IF NOT EXISTS permits (
     description     TEXT,
     address         TEXT,
     address_norm    TEXT,
+    house_number    TEXT,
+    predir          TEXT,
+    street_name     TEXT,
+    street_suffix   TEXT,
+    unit            TEXT,
+    address_key     TEXT,
     applicant       TEXT,
     contractor      TEXT,
-    valuation       DOUBLE,
+    valuation       {DOUBLE_TYPE},
     issued_date     DATE,
     filed_date      DATE,
     completed_date  DATE,
     expired_date    DATE,
-    latitude        DOUBLE,
-    longitude       DOUBLE,
+    latitude        {DOUBLE_TYPE},
+    longitude       {DOUBLE_TYPE},
     jurisdiction_id TEXT REFERENCES jurisdictions(id),
     raw_payload     {JSON_TYPE},
     fetched_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -84,6 +97,12 @@ CREATE TABLE IF NOT EXISTS zoning_cases (
     case_name       TEXT,
     address         TEXT,
     address_norm    TEXT,
+    house_number    TEXT,
+    predir          TEXT,
+    street_name     TEXT,
+    street_suffix   TEXT,
+    unit            TEXT,
+    address_key     TEXT,
     existing_zoning TEXT,
     proposed_zoning TEXT,
     status          TEXT,
@@ -104,6 +123,12 @@ CREATE TABLE IF NOT EXISTS boa_cases (
     case_number     TEXT,
     address         TEXT,
     address_norm    TEXT,
+    house_number    TEXT,
+    predir          TEXT,
+    street_name     TEXT,
+    street_suffix   TEXT,
+    unit            TEXT,
+    address_key     TEXT,
     variance_type   TEXT,
     status          TEXT,
     filed_date      DATE,
@@ -125,6 +150,8 @@ CREATE TABLE IF NOT EXISTS zoning_overlays (
     layer_name      TEXT,
     layer_id        INTEGER,
     geometry_wkt    TEXT,
+    geometry_wkb    {BLOB_TYPE},
+    geometry_wkb_original {BLOB_TYPE},
     properties      {JSON_TYPE},
     jurisdiction_id TEXT REFERENCES jurisdictions(id),
     raw_payload     {JSON_TYPE},
@@ -139,11 +166,13 @@ CREATE TABLE IF NOT EXISTS utility_capacity (
     utility_type    TEXT NOT NULL,  -- water, wastewater, electric, gas
     facility_name   TEXT,
     metric_name     TEXT,
-    metric_value    DOUBLE,
+    metric_value    {DOUBLE_TYPE},
     metric_unit     TEXT,
     period_start    DATE,
     period_end      DATE,
     geometry_wkt    TEXT,
+    geometry_wkb    {BLOB_TYPE},
+    geometry_wkb_original {BLOB_TYPE},
     jurisdiction_id TEXT REFERENCES jurisdictions(id),
     raw_payload     {JSON_TYPE},
     fetched_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -160,9 +189,17 @@ CREATE TABLE IF NOT EXISTS environmental_constraints (
     description     TEXT,
     address         TEXT,
     address_norm    TEXT,
-    latitude        DOUBLE,
-    longitude       DOUBLE,
+    house_number    TEXT,
+    predir          TEXT,
+    street_name     TEXT,
+    street_suffix   TEXT,
+    unit            TEXT,
+    address_key     TEXT,
+    latitude        {DOUBLE_TYPE},
+    longitude       {DOUBLE_TYPE},
     geometry_wkt    TEXT,
+    geometry_wkb    {BLOB_TYPE},
+    geometry_wkb_original {BLOB_TYPE},
     properties      {JSON_TYPE},
     jurisdiction_id TEXT REFERENCES jurisdictions(id),
     raw_payload     {JSON_TYPE},
@@ -178,11 +215,19 @@ CREATE TABLE IF NOT EXISTS rights_restrictions (
     parcel_id       TEXT,
     address         TEXT,
     address_norm    TEXT,
+    house_number    TEXT,
+    predir          TEXT,
+    street_name     TEXT,
+    street_suffix   TEXT,
+    unit            TEXT,
+    address_key     TEXT,
     grantor         TEXT,
     grantee         TEXT,
     recorded_date   DATE,
     description     TEXT,
     geometry_wkt    TEXT,
+    geometry_wkb    {BLOB_TYPE},
+    geometry_wkb_original {BLOB_TYPE},
     jurisdiction_id TEXT REFERENCES jurisdictions(id),
     raw_payload     {JSON_TYPE},
     fetched_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -199,17 +244,25 @@ CREATE TABLE IF NOT EXISTS property_valuations (
     geo_id            TEXT,
     address           TEXT,
     address_norm      TEXT,
+    house_number      TEXT,
+    predir            TEXT,
+    street_name       TEXT,
+    street_suffix     TEXT,
+    unit              TEXT,
+    address_key       TEXT,
     city              TEXT,
     zip_code          TEXT,
     subdivision       TEXT,
     entities          TEXT,
-    acreage           DOUBLE,
+    acreage           {DOUBLE_TYPE},
     legal_description TEXT,
-    appraised_value   DOUBLE,
-    land_value        DOUBLE,
-    improvement_value DOUBLE,
+    appraised_value   {DOUBLE_TYPE},
+    land_value        {DOUBLE_TYPE},
+    improvement_value {DOUBLE_TYPE},
     tax_year          INTEGER,
     geometry_wkt      TEXT,
+    geometry_wkb      {BLOB_TYPE},
+    geometry_wkb_original {BLOB_TYPE},
     jurisdiction_id   TEXT REFERENCES jurisdictions(id),
     raw_payload       {JSON_TYPE},
     fetched_at        TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -225,17 +278,225 @@ CREATE TABLE IF NOT EXISTS transit_amenities (
     description     TEXT,
     address         TEXT,
     address_norm    TEXT,
+    house_number    TEXT,
+    predir          TEXT,
+    street_name     TEXT,
+    street_suffix   TEXT,
+    unit            TEXT,
+    address_key     TEXT,
     stop_id         TEXT,
     route_id        TEXT,
     route_type      TEXT,
     park_type       TEXT,
-    acreage         DOUBLE,
-    latitude        DOUBLE,
-    longitude       DOUBLE,
+    acreage         {DOUBLE_TYPE},
+    latitude        {DOUBLE_TYPE},
+    longitude       {DOUBLE_TYPE},
     geometry_wkt    TEXT,
+    geometry_wkb    {BLOB_TYPE},
+    geometry_wkb_original {BLOB_TYPE},
     properties      {JSON_TYPE},
     jurisdiction_id TEXT REFERENCES jurisdictions(id),
     raw_payload     {JSON_TYPE},
     fetched_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(source_id, external_id)
 );
+
+-- Rows rejected by the loader (bad types, missing required fields)
+CREATE TABLE IF NOT EXISTS load_errors (
+    target_table    TEXT NOT NULL,
+    source_id       TEXT,
+    external_id     TEXT,
+    error           TEXT,
+    record          {JSON_TYPE},
+    created_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- parcel_features: one row per parcel with aggregated counts for LLM embeddings.
+-- Filled by parcl.features from sql/features.sql, fully or for touched parcels.
+CREATE TABLE IF NOT EXISTS parcel_features (
+    parcel_id           TEXT PRIMARY KEY,
+    address             TEXT,
+    address_norm        TEXT,
+    city                TEXT,
+    state               TEXT,
+    zip_code            TEXT,
+    county              TEXT,
+    latitude            {DOUBLE_TYPE},
+    longitude           {DOUBLE_TYPE},
+    base_zoning         TEXT,
+    zoning_desc         TEXT,
+    lot_size_sqft       {DOUBLE_TYPE},
+    apn                 TEXT,
+    total_permits       BIGINT NOT NULL DEFAULT 0,
+    permits_5yr         BIGINT NOT NULL DEFAULT 0,
+    active_permits      BIGINT NOT NULL DEFAULT 0,
+    total_zoning_cases  BIGINT NOT NULL DEFAULT 0,
+    open_zoning_cases   BIGINT NOT NULL DEFAULT 0,
+    total_boa_cases     BIGINT NOT NULL DEFAULT 0,
+    environmental_flags BIGINT NOT NULL DEFAULT 0,
+    overlay_count       BIGINT NOT NULL DEFAULT 0,
+    fetched_at          TIMESTAMP,
+    address_key         TEXT,
+    jurisdiction_id     TEXT,
+    refreshed_at        TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- parcel_spatial_links: precomputed parcel-to-feature spatial relations.
+-- "within" rows are polygons (overlays, flood zones, service areas, parks)
+-- containing the parcel point, "near" rows transit stops within a walking
+-- radius. Maintained by parcl.links, which writes each (parcel, feature)
+-- pair once. No primary key: DuckDB would keep it as an ART index, and
+-- relinking a source deletes and reinserts over a million rows at a time.
+CREATE TABLE IF NOT EXISTS parcel_spatial_links (
+    parcel_id           TEXT NOT NULL,
+    feature_table       TEXT NOT NULL,
+    feature_id          TEXT NOT NULL,
+    feature_source_id   TEXT,
+    relation            TEXT NOT NULL,
+    distance_m          {DOUBLE_TYPE},
+    linked_at           TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Binary geometry (OGC WKB). geometry_wkt is only populated by legacy rows
+ALTER TABLE zoning_overlays ADD COLUMN IF NOT EXISTS geometry_wkb {BLOB_TYPE};
+ALTER TABLE utility_capacity ADD COLUMN IF NOT EXISTS geometry_wkb {BLOB_TYPE};
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS geometry_wkb {BLOB_TYPE};
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS geometry_wkb {BLOB_TYPE};
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS geometry_wkb {BLOB_TYPE};
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS geometry_wkb {BLOB_TYPE};
+
+-- Pre-simplification geometry, kept only for sources with keep_original_geometry
+ALTER TABLE zoning_overlays ADD COLUMN IF NOT EXISTS geometry_wkb_original {BLOB_TYPE};
+ALTER TABLE utility_capacity ADD COLUMN IF NOT EXISTS geometry_wkb_original {BLOB_TYPE};
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS geometry_wkb_original {BLOB_TYPE};
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS geometry_wkb_original {BLOB_TYPE};
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS geometry_wkb_original {BLOB_TYPE};
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS geometry_wkb_original {BLOB_TYPE};
+
+-- Structured address components and canonical match key
+ALTER TABLE parcels ADD COLUMN IF NOT EXISTS house_number TEXT;
+ALTER TABLE parcels ADD COLUMN IF NOT EXISTS predir TEXT;
+ALTER TABLE parcels ADD COLUMN IF NOT EXISTS street_name TEXT;
+ALTER TABLE parcels ADD COLUMN IF NOT EXISTS street_suffix TEXT;
+ALTER TABLE parcels ADD COLUMN IF NOT EXISTS unit TEXT;
+ALTER TABLE parcels ADD COLUMN IF NOT EXISTS address_key TEXT;
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS house_number TEXT;
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS predir TEXT;
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS street_name TEXT;
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS street_suffix TEXT;
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS unit TEXT;
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS address_key TEXT;
+ALTER TABLE zoning_cases ADD COLUMN IF NOT EXISTS house_number TEXT;
+ALTER TABLE zoning_cases ADD COLUMN IF NOT EXISTS predir TEXT;
+ALTER TABLE zoning_cases ADD COLUMN IF NOT EXISTS street_name TEXT;
+ALTER TABLE zoning_cases ADD COLUMN IF NOT EXISTS street_suffix TEXT;
+ALTER TABLE zoning_cases ADD COLUMN IF NOT EXISTS unit TEXT;
+ALTER TABLE zoning_cases ADD COLUMN IF NOT EXISTS address_key TEXT;
+ALTER TABLE boa_cases ADD COLUMN IF NOT EXISTS house_number TEXT;
+ALTER TABLE boa_cases ADD COLUMN IF NOT EXISTS predir TEXT;
+ALTER TABLE boa_cases ADD COLUMN IF NOT EXISTS street_name TEXT;
+ALTER TABLE boa_cases ADD COLUMN IF NOT EXISTS street_suffix TEXT;
+ALTER TABLE boa_cases ADD COLUMN IF NOT EXISTS unit TEXT;
+ALTER TABLE boa_cases ADD COLUMN IF NOT EXISTS address_key TEXT;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS house_number TEXT;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS predir TEXT;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS street_name TEXT;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS street_suffix TEXT;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS unit TEXT;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS address_key TEXT;
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS house_number TEXT;
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS predir TEXT;
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS street_name TEXT;
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS street_suffix TEXT;
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS unit TEXT;
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS address_key TEXT;
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS house_number TEXT;
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS predir TEXT;
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS street_name TEXT;
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS street_suffix TEXT;
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS unit TEXT;
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS address_key TEXT;
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS house_number TEXT;
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS predir TEXT;
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS street_name TEXT;
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS street_suffix TEXT;
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS unit TEXT;
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS address_key TEXT;
+
+-- Grid cell keys (parcl.grid) for proximity lookups on rows with coordinates
+ALTER TABLE parcels ADD COLUMN IF NOT EXISTS cell_z12 BIGINT;
+ALTER TABLE parcels ADD COLUMN IF NOT EXISTS cell_z14 BIGINT;
+ALTER TABLE parcels ADD COLUMN IF NOT EXISTS cell_z16 BIGINT;
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS cell_z12 BIGINT;
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS cell_z14 BIGINT;
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS cell_z16 BIGINT;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS cell_z12 BIGINT;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS cell_z14 BIGINT;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS cell_z16 BIGINT;
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS cell_z12 BIGINT;
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS cell_z14 BIGINT;
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS cell_z16 BIGINT;
+
+-- Where a parcel's latitude/longitude came from: NULL for the source's own
+-- coordinates, 'valuation' for the centroid of the property_valuations lot
+-- at its address key (parcel sources without coordinates)
+ALTER TABLE parcels ADD COLUMN IF NOT EXISTS location_source TEXT;
+
+-- Bounding box and centroid of geometry_wkb (x = longitude, y = latitude),
+-- a cheap prefilter ahead of any exact geometry test
+ALTER TABLE zoning_overlays ADD COLUMN IF NOT EXISTS min_x {DOUBLE_TYPE};
+ALTER TABLE zoning_overlays ADD COLUMN IF NOT EXISTS min_y {DOUBLE_TYPE};
+ALTER TABLE zoning_overlays ADD COLUMN IF NOT EXISTS max_x {DOUBLE_TYPE};
+ALTER TABLE zoning_overlays ADD COLUMN IF NOT EXISTS max_y {DOUBLE_TYPE};
+ALTER TABLE zoning_overlays ADD COLUMN IF NOT EXISTS centroid_x {DOUBLE_TYPE};
+ALTER TABLE zoning_overlays ADD COLUMN IF NOT EXISTS centroid_y {DOUBLE_TYPE};
+ALTER TABLE utility_capacity ADD COLUMN IF NOT EXISTS min_x {DOUBLE_TYPE};
+ALTER TABLE utility_capacity ADD COLUMN IF NOT EXISTS min_y {DOUBLE_TYPE};
+ALTER TABLE utility_capacity ADD COLUMN IF NOT EXISTS max_x {DOUBLE_TYPE};
+ALTER TABLE utility_capacity ADD COLUMN IF NOT EXISTS max_y {DOUBLE_TYPE};
+ALTER TABLE utility_capacity ADD COLUMN IF NOT EXISTS centroid_x {DOUBLE_TYPE};
+ALTER TABLE utility_capacity ADD COLUMN IF NOT EXISTS centroid_y {DOUBLE_TYPE};
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS min_x {DOUBLE_TYPE};
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS min_y {DOUBLE_TYPE};
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS max_x {DOUBLE_TYPE};
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS max_y {DOUBLE_TYPE};
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS centroid_x {DOUBLE_TYPE};
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS centroid_y {DOUBLE_TYPE};
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS min_x {DOUBLE_TYPE};
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS min_y {DOUBLE_TYPE};
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS max_x {DOUBLE_TYPE};
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS max_y {DOUBLE_TYPE};
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS centroid_x {DOUBLE_TYPE};
+ALTER TABLE rights_restrictions ADD COLUMN IF NOT EXISTS centroid_y {DOUBLE_TYPE};
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS min_x {DOUBLE_TYPE};
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS min_y {DOUBLE_TYPE};
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS max_x {DOUBLE_TYPE};
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS max_y {DOUBLE_TYPE};
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS centroid_x {DOUBLE_TYPE};
+ALTER TABLE property_valuations ADD COLUMN IF NOT EXISTS centroid_y {DOUBLE_TYPE};
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS min_x {DOUBLE_TYPE};
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS min_y {DOUBLE_TYPE};
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS max_x {DOUBLE_TYPE};
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS max_y {DOUBLE_TYPE};
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS centroid_x {DOUBLE_TYPE};
+ALTER TABLE transit_amenities ADD COLUMN IF NOT EXISTS centroid_y {DOUBLE_TYPE};
+
+-- Parcel each row resolved to by parcl.resolve: how (address_key, nearest
+-- or none), with what confidence (0-1) and when. A NULL parcel_resolved_at
+-- queues the row for resolution
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS parcel_id TEXT;
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS parcel_match_method TEXT;
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS parcel_match_score {DOUBLE_TYPE};
+ALTER TABLE permits ADD COLUMN IF NOT EXISTS parcel_resolved_at TIMESTAMP;
+ALTER TABLE zoning_cases ADD COLUMN IF NOT EXISTS parcel_id TEXT;
+ALTER TABLE zoning_cases ADD COLUMN IF NOT EXISTS parcel_match_method TEXT;
+ALTER TABLE zoning_cases ADD COLUMN IF NOT EXISTS parcel_match_score {DOUBLE_TYPE};
+ALTER TABLE zoning_cases ADD COLUMN IF NOT EXISTS parcel_resolved_at TIMESTAMP;
+ALTER TABLE boa_cases ADD COLUMN IF NOT EXISTS parcel_id TEXT;
+ALTER TABLE boa_cases ADD COLUMN IF NOT EXISTS parcel_match_method TEXT;
+ALTER TABLE boa_cases ADD COLUMN IF NOT EXISTS parcel_match_score {DOUBLE_TYPE};
+ALTER TABLE boa_cases ADD COLUMN IF NOT EXISTS parcel_resolved_at TIMESTAMP;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS parcel_id TEXT;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS parcel_match_method TEXT;
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS parcel_match_score {DOUBLE_TYPE};
+ALTER TABLE environmental_constraints ADD COLUMN IF NOT EXISTS parcel_resolved_at TIMESTAMP;
@@ -11,9 +11,17 @@ from parcl.config import (
     FieldMapping,
     SourceConfig,
 )
+from parcl import index_cache
 from parcl.db import Database, init_schema
 
 
+@pytest.fixture(autouse=True)
+def polygon_cache_dir(tmp_path, monkeypatch):
+    """Keep the saved indexes out of the project's data directory."""
+    monkeypatch.setattr(index_cache, "default_cache_dir", lambda: tmp_path / "cache")
+    return tmp_path / "cache"
+
+
 @pytest.fixture
 def in_memory_db():
     """Create an in-memory DuckDB database with schema initialized."""
@@ -36,8 +44,11 @@ def in_memory_db():
     );
     CREATE TABLE IF NOT EXISTS parcels (
         id TEXT PRIMARY KEY, source_id TEXT NOT NULL, external_id TEXT NOT NULL,
-        apn TEXT, address TEXT, address_norm TEXT, city TEXT, state TEXT,
+        apn TEXT, address TEXT, address_norm TEXT,
+        house_number TEXT, predir TEXT, street_name TEXT, street_suffix TEXT,
+        unit TEXT, address_key TEXT, city TEXT, state TEXT,
         zip_code TEXT, county TEXT, latitude DOUBLE, longitude DOUBLE,
+        cell_z12 BIGINT, cell_z14 BIGINT, cell_z16 BIGINT, location_source TEXT,
         base_zoning TEXT, zoning_desc TEXT, lot_size_sqft DOUBLE,
         jurisdiction_id TEXT, raw_payload JSON,
         fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -47,15 +58,24 @@ def in_memory_db():
         id TEXT PRIMARY KEY, source_id TEXT NOT NULL, external_id TEXT NOT NULL,
         permit_number TEXT, permit_type TEXT, permit_class TEXT, work_class TEXT,
         status TEXT, description TEXT, address TEXT, address_norm TEXT,
+        house_number TEXT, predir TEXT, street_name TEXT, street_suffix TEXT,
+        unit TEXT, address_key TEXT,
+        parcel_id TEXT, parcel_match_method TEXT, parcel_match_score DOUBLE,
+        parcel_resolved_at TIMESTAMP,
         applicant TEXT, contractor TEXT, valuation DOUBLE,
         issued_date DATE, filed_date DATE, completed_date DATE, expired_date DATE,
-        latitude DOUBLE, longitude DOUBLE, jurisdiction_id TEXT, raw_payload JSON,
+        latitude DOUBLE, longitude DOUBLE,
+        cell_z12 BIGINT, cell_z14 BIGINT, cell_z16 BIGINT, jurisdiction_id TEXT, raw_payload JSON,
         fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         UNIQUE(source_id, external_id)
     );
     CREATE TABLE IF NOT EXISTS zoning_cases (
         id TEXT PRIMARY KEY, source_id TEXT NOT NULL, external_id TEXT NOT NULL,
         case_number TEXT, case_name TEXT, address TEXT, address_norm TEXT,
+        house_number TEXT, predir TEXT, street_name TEXT, street_suffix TEXT,
+        unit TEXT, address_key TEXT,
+        parcel_id TEXT, parcel_match_method TEXT, parcel_match_score DOUBLE,
+        parcel_resolved_at TIMESTAMP,
         existing_zoning TEXT, proposed_zoning TEXT, status TEXT,
         filed_date DATE, decided_date DATE, council_district TEXT,
         description TEXT, jurisdiction_id TEXT, raw_payload JSON,
@@ -65,6 +85,10 @@ def in_memory_db():
     CREATE TABLE IF NOT EXISTS boa_cases (
         id TEXT PRIMARY KEY, source_id TEXT NOT NULL, external_id TEXT NOT NULL,
         case_number TEXT, address TEXT, address_norm TEXT,
+        house_number TEXT, predir TEXT, street_name TEXT, street_suffix TEXT,
+        unit TEXT, address_key TEXT,
+        parcel_id TEXT, parcel_match_method TEXT, parcel_match_score DOUBLE,
+        parcel_resolved_at TIMESTAMP,
         variance_type TEXT, status TEXT, filed_date DATE, hearing_date DATE,
         decision TEXT, description TEXT, jurisdiction_id TEXT, raw_payload JSON,
         fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -73,7 +97,10 @@ def in_memory_db():
     CREATE TABLE IF NOT EXISTS zoning_overlays (
         id TEXT PRIMARY KEY, source_id TEXT NOT NULL, external_id TEXT NOT NULL,
         overlay_name TEXT, overlay_type TEXT, layer_name TEXT, layer_id INTEGER,
-        geometry_wkt TEXT, properties JSON, jurisdiction_id TEXT, raw_payload JSON,
+        geometry_wkt TEXT, geometry_wkb BLOB, geometry_wkb_original BLOB,
+        min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE,
+        centroid_x DOUBLE, centroid_y DOUBLE,
+        properties JSON, jurisdiction_id TEXT, raw_payload JSON,
         fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         UNIQUE(source_id, external_id)
     );
@@ -81,26 +108,65 @@ def in_memory_db():
         id TEXT PRIMARY KEY, source_id TEXT NOT NULL, external_id TEXT NOT NULL,
         utility_type TEXT NOT NULL, facility_name TEXT, metric_name TEXT,
         metric_value DOUBLE, metric_unit TEXT, period_start DATE, period_end DATE,
-        geometry_wkt TEXT, jurisdiction_id TEXT, raw_payload JSON,
+        geometry_wkt TEXT, geometry_wkb BLOB, geometry_wkb_original BLOB,
+        min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE,
+        centroid_x DOUBLE, centroid_y DOUBLE,
+        jurisdiction_id TEXT, raw_payload JSON,
         fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         UNIQUE(source_id, external_id)
     );
     CREATE TABLE IF NOT EXISTS environmental_constraints (
         id TEXT PRIMARY KEY, source_id TEXT NOT NULL, external_id TEXT NOT NULL,
         constraint_type TEXT NOT NULL, name TEXT, severity TEXT, description TEXT,
-        address TEXT, address_norm TEXT, latitude DOUBLE, longitude DOUBLE,
-        geometry_wkt TEXT, properties JSON, jurisdiction_id TEXT, raw_payload JSON,
+        address TEXT, address_norm TEXT,
+        house_number TEXT, predir TEXT, street_name TEXT, street_suffix TEXT,
+        unit TEXT, address_key TEXT, latitude DOUBLE, longitude DOUBLE,
+        parcel_id TEXT, parcel_match_method TEXT, parcel_match_score DOUBLE,
+        parcel_resolved_at TIMESTAMP,
+        cell_z12 BIGINT, cell_z14 BIGINT, cell_z16 BIGINT,
+        geometry_wkt TEXT, geometry_wkb BLOB, geometry_wkb_original BLOB,
+        min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE,
+        centroid_x DOUBLE, centroid_y DOUBLE,
+        properties JSON, jurisdiction_id TEXT, raw_payload JSON,
         fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         UNIQUE(source_id, external_id)
     );
     CREATE TABLE IF NOT EXISTS rights_restrictions (
         id TEXT PRIMARY KEY, source_id TEXT NOT NULL, external_id TEXT NOT NULL,
         restriction_type TEXT NOT NULL, parcel_id TEXT, address TEXT,
-        address_norm TEXT, grantor TEXT, grantee TEXT, recorded_date DATE,
-        description TEXT, jurisdiction_id TEXT, raw_payload JSON,
+        address_norm TEXT,
+        house_number TEXT, predir TEXT, street_name TEXT, street_suffix TEXT,
+        unit TEXT, address_key TEXT, grantor TEXT, grantee TEXT, recorded_date DATE,
+        description TEXT, geometry_wkt TEXT, geometry_wkb BLOB,
+        geometry_wkb_original BLOB, min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE,
+        centroid_x DOUBLE, centroid_y DOUBLE,
+        jurisdiction_id TEXT, raw_payload JSON,
         fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         UNIQUE(source_id, external_id)
     );
+    CREATE TABLE IF NOT EXISTS load_errors (
+        target_table TEXT NOT NULL, source_id TEXT, external_id TEXT,
+        error TEXT, record JSON, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS parcel_features (
+        parcel_id TEXT PRIMARY KEY, address TEXT, address_norm TEXT, city TEXT,
+        state TEXT, zip_code TEXT, county TEXT, latitude DOUBLE, longitude DOUBLE,
+        base_zoning TEXT, zoning_desc TEXT, lot_size_sqft DOUBLE, apn TEXT,
+        total_permits BIGINT NOT NULL DEFAULT 0, permits_5yr BIGINT NOT NULL DEFAULT 0,
+        active_permits BIGINT NOT NULL DEFAULT 0,
+        total_zoning_cases BIGINT NOT NULL DEFAULT 0,
+        open_zoning_cases BIGINT NOT NULL DEFAULT 0,
+        total_boa_cases BIGINT NOT NULL DEFAULT 0,
+        environmental_flags BIGINT NOT NULL DEFAULT 0,
+        overlay_count BIGINT NOT NULL DEFAULT 0, fetched_at TIMESTAMP,
+        address_key TEXT, jurisdiction_id TEXT,
+        refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS parcel_spatial_links (
+        parcel_id TEXT NOT NULL, feature_table TEXT NOT NULL, feature_id TEXT NOT NULL,
+        feature_source_id TEXT, relation TEXT NOT NULL, distance_m DOUBLE,
+        linked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
     """
     for stmt in schema_sql.split(";"):
         stmt = stmt.strip()
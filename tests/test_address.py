@@ -0,0 +1,62 @@
+"""Tests for address normalization."""
+
+import pytest
+
+from parcl.address import (
+    ADDRESS_COLUMNS,
+    address_key,
+    normalize_address,
+    normalize_addresses,
+    parse_address,
+)
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("600 Congress Avenue", "600 CONGRESS AVE"),
+        ("1100 north lamar blvd.", "1100 N LAMAR BLVD"),
+        ("  4500 S. Congress  Ave, Unit 12 ", "4500 S CONGRESS AVE UNIT 12"),
+        ("123 Main St Apartment #4", "123 MAIN ST APT #4"),
+        ("9201 Research Boulevard Suite 100", "9201 RESEARCH BLVD STE 100"),
+        ("301 W. 2nd St (City Hall)", "301 W 2ND ST CITY HALL"),
+        ("", ""),
+        (None, ""),
+    ],
+)
+def test_normalize_address(raw, expected):
+    assert normalize_address(raw) == expected
+
+
+def test_normalize_addresses_matches_single():
+    raw = ["600 Congress Ave", None, "600 congress avenue", "", "100 E Riverside Dr"]
+    assert normalize_addresses(raw) == [normalize_address(a) for a in raw]
+    assert normalize_addresses(iter(raw))[2] == "600 CONGRESS AVE"
+
+
+@pytest.mark.parametrize(
+    "raw, columns",
+    [
+        (
+            "600 Congress Ave, Austin TX 78701",
+            ("600", None, "CONGRESS", "AVE", None, "600 CONGRESS AVE"),
+        ),
+        (
+            "1100 North Lamar Blvd Suite 200",
+            ("1100", "N", "LAMAR", "BLVD", "STE 200", "1100 N LAMAR BLVD"),
+        ),
+        (
+            "4500 S. Congress Ave, Unit 12",
+            ("4500", "S", "CONGRESS", "AVE", "UNIT 12", "4500 S CONGRESS AVE"),
+        ),
+        ("9300 IH 35 N", ("9300", None, "IH 35 N", None, None, "9300 IH 35 N")),
+        ("Congress Ave", (None, None, "CONGRESS", "AVE", None, None)),
+    ],
+)
+def test_parse_address(raw, columns):
+    assert parse_address(raw).as_columns() == dict(zip(ADDRESS_COLUMNS, columns))
+
+
+def test_address_key_separates_house_numbers():
+    assert address_key("100 Main St") != address_key("1100 Main St")
+    assert address_key("100 Main Street Apt 3") == address_key("100 MAIN ST")
@@ -0,0 +1,125 @@
+"""Tests for the trigram address index."""
+
+import random
+
+from parcl import address_index, index_cache
+from parcl.address import normalize_address, parse_address
+from parcl.address_index import AddressIndex, load_address_index, update_address_index
+from parcl.etl.loader import load_records
+from parcl.profile import get_parcel_risk_profile, get_parcel_risk_profiles
+
+
+def _keyed(record):
+    return {**record, "address_norm": normalize_address(record["address"]),
+            "address_key": parse_address(record["address"]).key}
+
+
+def _grams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def test_search_matches_brute_force_similarity():
+    rng = random.Random(7)
+    streets = ["CONGRESS AVE", "LAMAR BLVD", "GUADALUPE ST", "MAIN ST", "BURNET RD", "OLTORF ST"]
+    rows = [("parcels", f"p{i}", f"{rng.randint(1, 999)} {rng.choice(streets)}") for i in range(400)]
+    index = AddressIndex.build(rows[:300])
+    index.update(rows[300:], removed=[("parcels", "p0"), ("parcels", "p1")])
+    live = rows[2:]
+
+    for query in ["600 CONGRES AVE", "12 LAMAR BLV", "77 GUADELUPE ST", "5 MAIN"]:
+        q = _grams(f"  {query} ")
+        expected = []
+        for table, row_id, norm in live:
+            d = _grams(f"  {norm} ")
+            score = len(q & d) / len(q | d)
+            if score >= 0.5:
+                expected.append((-round(score, 4), norm, row_id))
+        found = [(-c.score, c.address_norm, c.id) for c in index.search(query, limit=1000)]
+        assert found == sorted(expected)
+        assert [(-c.score, c.address_norm, c.id) for c in index.search(query, limit=3)] == sorted(expected)[:3]
+
+
+def test_prefix_is_anchored_and_deterministic():
+    index = AddressIndex.build([
+        ("parcels", "p3", "100 MAIN ST UNIT 2"),
+        ("parcels", "p2", "100 MAIN ST"),
+        ("parcels", "p1", "100 MAIN ST"),
+        ("parcels", "p4", "1100 MAIN ST"),
+        ("property_valuations", "v1", "100 MAIN"),
+    ])
+    assert index.prefix("100 MAIN").id == "p1"
+    assert index.prefix("1100 MAIN").id == "p4"
+    assert index.prefix("100 MAIN", "property_valuations").id == "v1"
+    assert index.prefix("10 MAIN") is None
+
+
+def test_index_updated_on_load_and_reused_from_disk(in_memory_db, polygon_cache_dir, monkeypatch):
+    db = in_memory_db
+    db.execute("INSERT INTO sources (id, name, source_type, target_table) VALUES ('tcad', 'TCAD', 'csv', 'parcels')")
+    load_records(db, "parcels", [
+        _keyed({"id": "p1", "source_id": "tcad", "external_id": "1", "address": "600 Congress Ave"}),
+        _keyed({"id": "p2", "source_id": "tcad", "external_id": "2", "address": "700 Lavaca St"}),
+    ])
+    index = load_address_index(db)
+    assert (polygon_cache_dir / address_index.CACHE_FILE).exists()
+    assert len(index) == 2
+
+    # A rewrite in place keeps the stamp: the load's update applies it
+    load_records(db, "parcels", [
+        _keyed({"id": "p2", "source_id": "tcad", "external_id": "2", "address": "710 Lavaca St"}),
+    ])
+    assert update_address_index(db, "parcels", {"p2"}) == 1
+    assert [c.id for c in load_address_index(db).search("710 LAVACA ST")] == ["p2"]
+    # The index handed out before is left as it was
+    assert [c.address_norm for c in index.search("710 LAVACA ST")] == ["700 LAVACA ST"]
+
+    # Unchanged tables: served from disk, never rebuilt
+    monkeypatch.setattr(AddressIndex, "build", None)
+    address_index._cache.clear()
+    assert load_address_index(db).prefix("710 LAV").id == "p2"
+
+
+def test_profile_matches_misspelled_address(in_memory_db):
+    db = in_memory_db
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels'), ('tv', 'Values', 'csv', 'property_valuations')"
+    )
+    load_records(db, "parcels", [
+        _keyed({"id": "p1", "source_id": "tcad", "external_id": "1", "address": "600 Congress Ave"}),
+        _keyed({"id": "p2", "source_id": "tcad", "external_id": "2", "address": "1200 Btn Spgs Rd"}),
+    ])
+    db.execute(
+        "CREATE TABLE property_valuations (id TEXT PRIMARY KEY, source_id TEXT, external_id TEXT, "
+        "address TEXT, address_norm TEXT, address_key TEXT, fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    db.execute(
+        "INSERT INTO property_valuations (id, source_id, external_id, address, address_norm, address_key) "
+        "VALUES ('v1', 'tv', '1', '1200 Barton Springs Rd', '1200 BARTON SPRINGS RD', '1200 BTN SPGS RD')"
+    )
+
+    assert get_parcel_risk_profile("600 Congres Ave", db)["matched_address"] == "600 CONGRESS AVE"
+    # Only the valuation spells it this way; its parcel shares the key
+    assert get_parcel_risk_profile("1200 Barton Sprngs Road", db)["matched_address"] == "1200 BTN SPGS RD"
+    # A close spelling at another house number is not the same parcel
+    assert "parcels" not in get_parcel_risk_profile("601 Congress Ave", db)["data_sources"]
+
+    queries = ["600 Congres Ave", "1200 Barton Sprngs Road", "601 Congress Ave", "600 CONG"]
+    assert list(get_parcel_risk_profiles(queries, db)) == [get_parcel_risk_profile(q, db) for q in queries]
+
+
+def test_stamp_reread_after_ttl(in_memory_db, monkeypatch):
+    db = in_memory_db
+    db.execute("INSERT INTO sources (id, name, source_type, target_table) VALUES ('tcad', 'TCAD', 'csv', 'parcels')")
+    load_records(db, "parcels", [
+        _keyed({"id": "p1", "source_id": "tcad", "external_id": "1", "address": "600 Congress Ave"}),
+    ])
+    clock = [100.0]
+    monkeypatch.setattr(index_cache.time, "monotonic", lambda: clock[0])
+    index = load_address_index(db)
+    load_records(db, "parcels", [
+        _keyed({"id": "p2", "source_id": "tcad", "external_id": "2", "address": "700 Lavaca St"}),
+    ])
+    assert load_address_index(db) is index
+    clock[0] += index_cache.STAMP_TTL + 0.1
+    assert load_address_index(db).prefix("700 LAV").id == "p2"
@@ -0,0 +1,116 @@
+"""Tests for the KD-tree and the nearest-amenity index."""
+
+import numpy as np
+
+from parcl import amenities, index_cache
+from parcl.amenities import AmenityIndex, load_amenity_index
+from parcl.grid import METRES_PER_DEGREE
+from parcl.kdtree import KDTree
+from parcl.profile import get_parcel_risk_profile, get_parcel_risk_profiles
+
+
+def _brute(lats, lons, qlat, qlon):
+    dlat = qlat[:, None] - lats[None, :]
+    dlon = (qlon[:, None] - lons[None, :]) * np.cos(np.radians(qlat[:, None]))
+    return METRES_PER_DEGREE * np.sqrt(dlat * dlat + dlon * dlon)
+
+
+def test_kdtree_matches_brute_force():
+    rng = np.random.default_rng(3)
+    lats, lons = 30.0 + rng.random(700) * 0.6, -98.0 + rng.random(700) * 0.6
+    # Duplicates tie on distance and are ordered by input position
+    lats[:5], lons[:5] = lats[5], lons[5]
+    qlat, qlon = 29.9 + rng.random(200) * 0.8, -98.1 + rng.random(200) * 0.8
+    tree = KDTree.build(lats, lons)
+    dist = _brute(lats, lons, qlat, qlon)
+
+    for k in (1, 6, 40):
+        point, item, metres = tree.nearest(qlat, qlon, k)
+        for q in range(len(qlat)):
+            expected = sorted(range(len(lats)), key=lambda i: (dist[q, i], i))[:k]
+            assert item[point == q].tolist() == expected
+            assert np.allclose(metres[point == q], dist[q, expected])
+
+    point, item, _ = tree.within(qlat, qlon, 2500.0)
+    assert sorted(zip(point.tolist(), item.tolist())) == sorted(zip(*np.nonzero(dist <= 2500.0)))
+    assert tree.count_within(qlat, qlon, 800.0).tolist() == (dist <= 800.0).sum(axis=1).tolist()
+    point, _, metres = tree.nearest(qlat, qlon, 3, radius=1500.0)
+    assert np.bincount(point, minlength=len(qlat)).tolist() == np.minimum((dist <= 1500.0).sum(axis=1), 3).tolist()
+    assert (metres <= 1500.0).all()
+
+    assert len(KDTree.build([], []).nearest(qlat, qlon, 3)[0]) == 0
+
+
+def _amenities_db(db):
+    db.execute(
+        "CREATE TABLE transit_amenities (id TEXT PRIMARY KEY, source_id TEXT, external_id TEXT, "
+        "name TEXT, amenity_type TEXT, latitude DOUBLE, longitude DOUBLE, "
+        "centroid_x DOUBLE, centroid_y DOUBLE)"
+    )
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels'), ('cm', 'Stops', 'gtfs', 'transit_amenities')"
+    )
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_norm, latitude, longitude) VALUES "
+        "('p1', 'tcad', '1', '600 CONGRESS AVE', 30.270, -97.740), ('p2', 'tcad', '2', '1 NOWHERE RD', NULL, NULL), "
+        "('p3', 'tcad', '3', '9000 FAR RD', 30.450, -97.650)"
+    )
+    # 0.001 deg of latitude is about 111 m; the park is a polygon placed by its centroid
+    db.execute(
+        "INSERT INTO transit_amenities (id, source_id, external_id, name, amenity_type, latitude, longitude, "
+        "centroid_x, centroid_y) VALUES "
+        "('s1', 'cm', 's1', 'Congress/7th', 'bus_stop', 30.273, -97.740, NULL, NULL), "
+        "('s2', 'cm', 's2', 'Congress/5th', 'bus_stop', 30.264, -97.740, NULL, NULL), "
+        "('s3', 'cm', 's3', 'Far Stop', 'bus_stop', 30.500, -97.600, NULL, NULL), "
+        "('k1', 'cm', 'k1', 'Republic Square', 'park', NULL, NULL, -97.745, 30.268), "
+        "('r1', 'cm', 'r1', 'Route 1', 'bus_route', 30.270, -97.740, NULL, NULL)"
+    )
+    return db
+
+
+def test_index_rebuilt_when_amenities_change(in_memory_db, polygon_cache_dir, monkeypatch):
+    db = _amenities_db(in_memory_db)
+    index = load_amenity_index(db)
+    assert (polygon_cache_dir / amenities.CACHE_FILE).exists()
+    # Routes are not indexed
+    assert len(index) == 4
+    assert [a["id"] for a in index.nearest_to(30.270, -97.740, "stop", k=2)] == ["s1", "s2"]
+    assert index.nearest_to(30.270, -97.740, "park")[0]["name"] == "Republic Square"
+
+    # Unchanged table: served from disk, never rebuilt
+    build = AmenityIndex.build
+    monkeypatch.setattr(AmenityIndex, "build", None)
+    amenities._cache.clear()
+    assert load_amenity_index(db).nearest_to(30.270, -97.740, "stop")[0]["id"] == "s1"
+
+    # A moved stop is seen once the stamp is read again
+    monkeypatch.setattr(AmenityIndex, "build", build)
+    clock = [100.0]
+    monkeypatch.setattr(index_cache.time, "monotonic", lambda: clock[0])
+    amenities._cache.clear()
+    load_amenity_index(db)
+    db.execute("UPDATE transit_amenities SET latitude = 30.2705 WHERE id = 's2'")
+    assert load_amenity_index(db).nearest_to(30.270, -97.740, "stop")[0]["id"] == "s1"
+    clock[0] += index_cache.STAMP_TTL + 0.1
+    assert load_amenity_index(db).nearest_to(30.270, -97.740, "stop")[0]["id"] == "s2"
+
+
+def test_profile_reports_nearest_stop_and_park(in_memory_db):
+    db = _amenities_db(in_memory_db)
+    facts = get_parcel_risk_profile("p1", db)["supporting_facts"]
+    assert facts["nearest_transit_stop"] == {"name": "Congress/7th", "distance_m": 334}
+    assert facts["transit_stops_within_400m"] == 1
+    assert facts["transit_stops_within_800m"] == 2
+    assert facts["nearest_park"]["name"] == "Republic Square"
+
+    # Beyond the count radii, the nearest stop is still found
+    facts = get_parcel_risk_profile("p3", db)["supporting_facts"]
+    assert facts["nearest_transit_stop"]["name"] == "Far Stop" and facts["transit_stops_within_800m"] == 0
+
+    # No coordinates, no amenities
+    facts = get_parcel_risk_profile("p2", db)["supporting_facts"]
+    assert facts["nearest_transit_stop"] is None and facts["transit_stops_within_800m"] == 0
+
+    queries = ["p1", "p2", "p3", "600 Congress Ave", "9 Missing St"]
+    assert list(get_parcel_risk_profiles(queries, db)) == [get_parcel_risk_profile(q, db) for q in queries]
@@ -3,6 +3,7 @@
 import responses
 import pytest
 
+from parcl.geometry import wkb_to_wkt
 from parcl.sources.arcgis_source import ArcGISSource, rings_to_wkt, geometry_to_wkt
 from parcl.config import SourceConfig, FieldMapping, CrawlerConfig
 
@@ -19,6 +20,19 @@ def test_geometry_to_wkt_point():
     assert result == "POINT(-97.7431 30.2672)"
 
 
+def test_rings_to_wkt_multipolygon():
+    # Two clockwise shells plus a counter-clockwise hole inside the first
+    rings = [
+        [[0.0, 0.0], [0.0, 4.0], [4.0, 4.0], [4.0, 0.0], [0.0, 0.0]],
+        [[1.0, 1.0], [2.0, 1.0], [2.0, 2.0], [1.0, 2.0], [1.0, 1.0]],
+        [[10.0, 10.0], [10.0, 11.0], [11.0, 11.0], [10.0, 10.0]],
+    ]
+    result = rings_to_wkt(rings)
+    assert result.startswith("MULTIPOLYGON(((0.0 0.0")
+    assert "), (1.0 1.0" in result  # hole stays with its shell
+    assert "((10.0 10.0" in result
+
+
 def test_geometry_to_wkt_none():
     assert geometry_to_wkt(None) == ""
     assert geometry_to_wkt({}) == ""
@@ -53,5 +67,34 @@ def test_arcgis_fetch_single_layer(sample_crawler_config):
     assert len(batches) == 1
     assert len(batches[0]) == 2
     assert batches[0][0]["NAME"] == "Zone A"
-    assert batches[0][0]["_geometry_wkt"] == "POINT(-97.7 30.2)"
+    assert wkb_to_wkt(batches[0][0]["_geometry_wkb"]) == "POINT(-97.7 30.2)"
     assert batches[0][0]["_layer_name"] == "TestLayer"
+
+
+@responses.activate
+def test_arcgis_fetch_simplifies_geometry(sample_crawler_config):
+    config = SourceConfig(
+        id="test_flood",
+        source_type="arcgis",
+        target_table="environmental_constraints",
+        base_url="https://maps.example.com/MapServer",
+        layers=[{"id": 1, "name": "Flood"}],
+        simplify_tolerance=0.001,
+        keep_original_geometry=True,
+    )
+    # Clockwise square with a near-collinear vertex on every edge
+    ring = [
+        [0.0, 0.0], [0.0, 0.5], [0.0, 1.0], [0.5, 1.0001], [1.0, 1.0],
+        [1.0, 0.5], [1.0, 0.0], [0.5, 0.0], [0.0, 0.0],
+    ]
+    responses.add(
+        responses.GET, "https://maps.example.com/MapServer/1/query",
+        json={"features": [{"attributes": {"FLD_ZONE": "AE"}, "geometry": {"rings": [ring]}}]},
+        status=200,
+    )
+
+    source = ArcGISSource(config, sample_crawler_config)
+    record = list(source.fetch())[0][0]
+    assert wkb_to_wkt(record["_geometry_wkb"]).count(",") == 4
+    assert wkb_to_wkt(record["_geometry_wkb_original"]).count(",") == 8
+    assert source.stats == {"vertices_in": 9, "vertices_out": 5, "vertices_removed": 4}
@@ -36,3 +36,13 @@ def test_source_config_defaults():
     assert sc.jurisdiction_id == "austin-tx"
     assert sc.filters == {}
     assert sc.field_map == []
+    assert sc.load_mode == "upsert"
+
+
+def test_source_config_load_mode():
+    sc = SourceConfig.from_dict(
+        {"id": "x", "source_type": "arcgis", "target_table": "permits", "load_mode": "replace"}
+    )
+    assert sc.load_mode == "replace"
+    with pytest.raises(ValueError, match="load_mode"):
+        SourceConfig(id="x", source_type="csv", target_table="permits", load_mode="append")
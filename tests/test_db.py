@@ -0,0 +1,63 @@
+"""Tests for secondary index and statistics management."""
+
+import duckdb
+import pytest
+
+from parcl.db import (
+    Database,
+    declared_indexes,
+    ensure_indexes,
+    existing_indexes,
+    index_report,
+    init_schema,
+    refresh_statistics,
+)
+
+
+@pytest.fixture
+def schema_db():
+    db = Database(duckdb.connect(":memory:"), "duckdb")
+    init_schema(db)
+    yield db
+    db.close()
+
+
+def test_init_schema_creates_declared_indexes(schema_db):
+    declared = {spec.name for spec in declared_indexes(schema_db)}
+    assert "idx_permits_address_key" in declared
+    # Range indexes are PostgreSQL-only
+    assert "idx_environmental_constraints_cell_z16" not in declared
+    assert set(existing_indexes(schema_db)) == declared
+    assert ensure_indexes(schema_db) == []
+
+
+def test_ensure_indexes_drops_stale_and_recreates_missing(schema_db):
+    schema_db.execute("CREATE INDEX idx_parcels_city ON parcels (city)")
+    schema_db.execute("CREATE INDEX manual_parcels_zip ON parcels (zip_code)")
+    schema_db.execute("DROP INDEX idx_boa_cases_address_key")
+
+    assert ensure_indexes(schema_db) == ["idx_boa_cases_address_key"]
+    existing = existing_indexes(schema_db)
+    assert "idx_parcels_city" not in existing
+    # Only idx_* names are managed
+    assert "manual_parcels_zip" in existing
+
+
+def test_index_report(schema_db):
+    schema_db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES ('s', 'S', 'csv', 'parcels')"
+    )
+    schema_db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_key) "
+        "VALUES ('p1', 's', '1', '100 N LAMAR BLVD'), ('p2', 's', '2', NULL)"
+    )
+    schema_db.execute("CREATE INDEX manual_parcels_zip ON parcels (zip_code)")
+    refresh_statistics(schema_db)
+    refresh_statistics(schema_db, ["parcels"])
+
+    report = {entry["name"]: entry for entry in index_report(schema_db)}
+    parcels = report["idx_parcels_address_key"]
+    assert parcels["declared"] and parcels["exists"]
+    assert parcels["columns"] == ["address_key"]
+    assert parcels["size_bytes"] == len("100 N LAMAR BLVD") + 16
+    assert report["manual_parcels_zip"]["declared"] is False
@@ -0,0 +1,65 @@
+"""Tests for exporting parcel_features."""
+
+import csv
+import json
+
+import pyarrow.parquet as pq
+import pytest
+
+from parcl import exporter
+from parcl.exporter import VIEW_COLUMNS, export_data
+
+
+@pytest.fixture
+def features_db(in_memory_db):
+    # p1's coordinates are NULL, so the first batch's latitude column is all NULL
+    in_memory_db.execute(
+        "INSERT INTO parcel_features (parcel_id, address, latitude, longitude, total_permits, fetched_at) "
+        "SELECT 'p' || i, i || ' \"Main\", St é', CASE WHEN i > 1 THEN 30.0 + i / 100 END, "
+        "CASE WHEN i > 1 THEN -97.7 END, i, TIMESTAMP '2024-01-15 08:30:00' FROM range(1, 6) t(i)"
+    )
+    return in_memory_db
+
+
+def test_copy_export_matches_streamed_export(features_db, tmp_path):
+    expected = features_db.fetchall(f"SELECT {', '.join(VIEW_COLUMNS)} FROM parcel_features ORDER BY parcel_id")
+    for fmt in ("csv", "jsonl", "parquet"):
+        # On DuckDB export_data writes with COPY; the streaming path is the PostgreSQL one
+        path = export_data(features_db, fmt, str(tmp_path), row_group_size=2)
+        streamed = tmp_path / f"streamed.{fmt}"
+        assert exporter._stream_export(features_db, fmt, streamed, "snappy", 2) == 5
+        if fmt == "parquet":
+            assert pq.ParquetFile(streamed).num_row_groups == 3
+            copied, table = pq.read_table(path), pq.read_table(streamed)
+            assert copied.equals(table)
+            assert table.column_names == VIEW_COLUMNS
+            assert [tuple(r.values()) for r in table.to_pylist()] == expected
+        else:
+            with open(path, "rb") as f, open(streamed, "rb") as g:
+                assert f.read() == g.read()
+    assert not list(tmp_path.glob("*.tmp"))
+
+    with open(tmp_path / "parcel_features.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == VIEW_COLUMNS
+    assert [r[0] for r in rows[1:]] == ["p1", "p2", "p3", "p4", "p5"]
+    with open(tmp_path / "parcel_features.jsonl", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert list(records[0]) == VIEW_COLUMNS
+    assert records[0]["address"] == '1 "Main", St é' and records[0]["fetched_at"] == "2024-01-15 08:30:00"
+
+
+def test_export_options(features_db, tmp_path):
+    threads = features_db.fetchone("SELECT current_setting('threads')")[0]
+    path = export_data(features_db, "parquet", str(tmp_path), compression="zstd", threads=1)
+    assert pq.ParquetFile(path).metadata.row_group(0).column(0).compression == "ZSTD"
+    assert features_db.fetchone("SELECT current_setting('threads')")[0] == threads
+
+    streamed = tmp_path / "streamed.parquet"
+    exporter._stream_export(features_db, "parquet", streamed, "uncompressed", 10)
+    assert pq.ParquetFile(streamed).metadata.row_group(0).column(0).compression == "UNCOMPRESSED"
+
+    with pytest.raises(ValueError):
+        export_data(features_db, "xlsx", str(tmp_path))
+    with pytest.raises(ValueError):
+        export_data(features_db, "parquet", str(tmp_path), compression="lzma")
@@ -0,0 +1,138 @@
+"""Tests for the parcel_features table refresh."""
+
+import pytest
+
+from parcl.etl.loader import backfill_grid_cells, load_records
+from parcl.features import FeatureChanges, refresh_features
+from parcl.geometry import from_arcgis, to_wkb
+from parcl.links import refresh_links
+from parcl.resolve import resolve_parcels
+
+
+def _overlay(external_id, lat, lon, half):
+    """A square zoning overlay centred on a point."""
+    ring = [[lon - half, lat - half], [lon - half, lat + half], [lon + half, lat + half],
+            [lon + half, lat - half], [lon - half, lat - half]]
+    return {"id": external_id, "source_id": "zo", "external_id": external_id,
+            "overlay_name": external_id, "geometry_wkb": to_wkb(from_arcgis({"rings": [ring]}))}
+
+
+@pytest.fixture
+def features_db(in_memory_db):
+    db = in_memory_db
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table, jurisdiction_id) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels', 'austin-tx'), "
+        "('pm', 'Permits', 'socrata', 'permits', 'austin-tx'), "
+        "('ec', 'Flood', 'arcgis', 'environmental_constraints', NULL), "
+        "('zo', 'Overlays', 'arcgis', 'zoning_overlays', 'austin-tx')"
+    )
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_key, latitude, longitude, jurisdiction_id) VALUES "
+        "('p1', 'tcad', '1', '100 N LAMAR BLVD', 30.30, -97.75, 'austin-tx'), "
+        "('p2', 'tcad', '2', '200 CONGRESS AVE', 30.27, -97.74, 'austin-tx'), "
+        "('p3', 'tcad', '3', NULL, 30.40, -97.70, NULL)"
+    )
+    db.execute(
+        "INSERT INTO permits (id, source_id, external_id, address_key, status, issued_date) VALUES "
+        "('a', 'pm', 'a', '100 N LAMAR BLVD', 'Issued', CURRENT_DATE), "
+        "('b', 'pm', 'b', '100 N LAMAR BLVD', 'Final', DATE '2001-01-01'), "
+        "('c', 'pm', 'c', NULL, 'Issued', CURRENT_DATE)"
+    )
+    db.execute(
+        "INSERT INTO zoning_cases (id, source_id, external_id, address_key, status) VALUES "
+        "('z1', 'pm', 'z1', '200 CONGRESS AVE', 'Closed'), "
+        "('z2', 'pm', 'z2', '200 CONGRESS AVE', 'Pending')"
+    )
+    db.execute(
+        "INSERT INTO environmental_constraints (id, source_id, external_id, constraint_type, "
+        "address_key, latitude, longitude) VALUES "
+        "('e1', 'ec', 'e1', 'flood', '100 N LAMAR BLVD', 30.3005, -97.7505), "
+        "('e2', 'ec', 'e2', 'flood', NULL, 30.4002, -97.7002), "
+        "('e3', 'ec', 'e3', 'flood', NULL, 31.0, -98.0)"
+    )
+    # Covers p1 and p2, not p3
+    load_records(db, "zoning_overlays", [_overlay("o1", 30.285, -97.745, 0.03)])
+    backfill_grid_cells(db, ["parcels", "environmental_constraints"])
+    refresh_links(db)
+    resolve_parcels(db)
+    return db
+
+
+def _features(db):
+    rows = db.fetchall(
+        "SELECT parcel_id, total_permits, permits_5yr, active_permits, total_zoning_cases, "
+        "open_zoning_cases, environmental_flags, overlay_count FROM parcel_features ORDER BY parcel_id"
+    )
+    return {r[0]: r[1:] for r in rows}
+
+
+def test_full_refresh(features_db):
+    assert refresh_features(features_db) == {"mode": "full", "parcels": 3}
+    assert _features(features_db) == {
+        # e1 matches p1 by address and by box but counts once
+        "p1": (2, 1, 1, 0, 0, 1, 1),
+        "p2": (0, 0, 0, 2, 1, 0, 1),
+        "p3": (0, 0, 0, 0, 0, 1, 0),
+    }
+    # A second full refresh replaces rather than duplicates
+    assert refresh_features(features_db)["parcels"] == 3
+
+
+def test_incremental_refresh_follows_moved_rows(features_db):
+    refresh_features(features_db)
+    changes = FeatureChanges.for_table(features_db, "permits", "pm")
+    moved = [{"external_id": "a", "address_key": "200 CONGRESS AVE"}]
+    changes.capture(features_db, moved)
+    features_db.execute(
+        "UPDATE permits SET address_key = '200 CONGRESS AVE', parcel_resolved_at = NULL WHERE id = 'a'"
+    )
+    changes.add(moved)
+    changes.add_parcels(resolve_parcels(features_db, ["permits"])["parcel_ids"])
+
+    # The old address (p1) and the new one (p2) are both recomputed, p3 is not
+    assert refresh_features(features_db, changes) == {"mode": "incremental", "parcels": 2}
+    features = _features(features_db)
+    assert features["p1"][:3] == (1, 0, 0)
+    assert features["p2"][:3] == (1, 1, 1)
+
+
+def test_incremental_refresh_by_proximity_and_overlays(features_db):
+    refresh_features(features_db)
+    env = FeatureChanges.for_table(features_db, "environmental_constraints", "ec")
+    new = [{"external_id": "e4", "address_key": None, "latitude": 30.2702, "longitude": -97.7398}]
+    env.capture(features_db, new)
+    features_db.execute(
+        "INSERT INTO environmental_constraints (id, source_id, external_id, constraint_type, latitude, longitude) "
+        "VALUES ('e4', 'ec', 'e4', 'flood', 30.2702, -97.7398)"
+    )
+    env.add(new)
+    assert refresh_features(features_db, env) == {"mode": "incremental", "parcels": 1}
+    assert _features(features_db)["p2"][5] == 1
+
+    # A re-crawled overlay source refreshes only the parcels whose links changed
+    overlays = FeatureChanges.for_table(features_db, "zoning_overlays", "zo")
+    overlays.add_parcels(refresh_links(features_db, source=("zoning_overlays", "zo"))["changed_parcels"])
+    assert refresh_features(features_db, overlays)["mode"] == "none"
+    load_records(features_db, "zoning_overlays", [_overlay("o2", 30.30, -97.75, 0.01)])
+    overlays.add_parcels(refresh_links(features_db, source=("zoning_overlays", "zo"))["changed_parcels"])
+    assert refresh_features(features_db, overlays) == {"mode": "incremental", "parcels": 1}
+    assert _features(features_db)["p1"][6] == 2
+    assert _features(features_db)["p2"][6] == 1
+
+    # A flood polygon around p3 counts once although its box also matches e2
+    load_records(features_db, "environmental_constraints", [
+        {"id": "e5", "source_id": "ec", "external_id": "e5", "constraint_type": "flood",
+         "geometry_wkb": _overlay("e5", 30.40, -97.70, 0.01)["geometry_wkb"]},
+    ])
+    env = FeatureChanges.for_table(features_db, "environmental_constraints", "ec")
+    env.add_parcels(refresh_links(features_db, source=("environmental_constraints", "ec"))["changed_parcels"])
+    assert refresh_features(features_db, env) == {"mode": "incremental", "parcels": 1}
+    assert _features(features_db)["p3"][5] == 2
+
+
+def test_untracked_tables_and_removals(features_db):
+    assert FeatureChanges.for_table(features_db, "utility_capacity", "u") is None
+    changes = FeatureChanges.for_table(features_db, "permits", "pm")
+    changes.removed(3)
+    assert refresh_features(features_db, changes)["mode"] == "full"
@@ -0,0 +1,95 @@
+"""Tests for WKB geometry encoding."""
+
+import struct
+
+import numpy as np
+import pytest
+
+from parcl.geometry import (
+    from_arcgis,
+    from_wkb,
+    geometry_bounds,
+    simplify,
+    simplify_coords,
+    to_wkb,
+    to_wkt,
+    wkb_to_wkt,
+)
+
+
+def test_point_wkb_layout():
+    wkb = to_wkb(from_arcgis({"x": -97.7431, "y": 30.2672}))
+    assert wkb == struct.pack("<BIdd", 1, 1, -97.7431, 30.2672)
+    assert wkb_to_wkt(wkb) == "POINT(-97.7431 30.2672)"
+
+
+def test_polygon_roundtrip():
+    ring = [[0.0, 0.0], [0.0, 1.0], [1.0, 1.0], [1.0, 0.0], [0.0, 0.0]]
+    geom = from_arcgis({"rings": [ring]})
+    assert geom.kind == "Polygon"
+    decoded = from_wkb(to_wkb(geom))
+    assert decoded.kind == "Polygon"
+    np.testing.assert_array_equal(decoded.parts[0][0], np.array(ring))
+
+
+def test_multipolygon_from_disjoint_shells():
+    shells = [
+        [[0.0, 0.0], [0.0, 1.0], [1.0, 1.0], [0.0, 0.0]],
+        [[5.0, 5.0], [5.0, 6.0], [6.0, 6.0], [5.0, 5.0]],
+    ]
+    geom = from_wkb(to_wkb(from_arcgis({"rings": shells})))
+    assert geom.kind == "MultiPolygon"
+    assert len(geom.parts) == 2
+    assert geom.vertex_count == 8
+
+
+def test_paths_and_z_values():
+    line = from_arcgis({"paths": [[[0, 0, 5], [1, 1, 5]]]})
+    assert to_wkt(line) == "LINESTRING(0.0 0.0, 1.0 1.0)"
+    multi = from_arcgis({"paths": [[[0, 0], [1, 1]], [[2, 2], [3, 3]]]})
+    assert wkb_to_wkt(to_wkb(multi)) == "MULTILINESTRING((0.0 0.0, 1.0 1.0), (2.0 2.0, 3.0 3.0))"
+
+
+@pytest.mark.parametrize("geom", [None, {}, {"rings": []}, {"x": "NaN", "y": "NaN"}])
+def test_empty_geometries(geom):
+    assert from_arcgis(geom) is None
+    assert wkb_to_wkt(None) == ""
+
+
+def test_wkb_as_text_sql_function(in_memory_db):
+    wkb = to_wkb(from_arcgis({"x": 1.5, "y": 2.5}))
+    row = in_memory_db.fetchone("SELECT wkb_as_text(?)", (wkb,))
+    assert row[0] == "POINT(1.5 2.5)"
+
+
+def test_simplify_drops_collinear_vertices():
+    line = np.array([[0.0, 0.0], [1.0, 0.0001], [2.0, 0.0], [3.0, 5.0]])
+    simple = simplify_coords(line, 0.001)
+    np.testing.assert_array_equal(simple, line[[0, 2, 3]])
+
+
+def test_simplify_keeps_shell_drops_tiny_hole():
+    shell = [[0.0, 0.0], [0.0, 10.0], [0.0005, 10.0], [10.0, 10.0], [10.0, 0.0], [0.0, 0.0]]
+    hole = [[5.0, 5.0], [5.001, 5.0], [5.001, 5.001], [5.0, 5.0]]
+    geom = simplify(from_arcgis({"rings": [shell, hole]}), 0.01)
+    assert geom.kind == "Polygon"
+    assert len(geom.parts[0]) == 1  # hole collapsed below 4 vertices
+    assert len(geom.parts[0][0]) == 5
+
+
+def test_geometry_bounds_batch():
+    # Clockwise 4 x 4 shell with a counter-clockwise 2 x 2 hole in its lower-left quarter
+    shell = [[0.0, 0.0], [0.0, 4.0], [4.0, 4.0], [4.0, 0.0], [0.0, 0.0]]
+    hole = [[0.0, 0.0], [2.0, 0.0], [2.0, 2.0], [0.0, 2.0], [0.0, 0.0]]
+    square = to_wkb(from_arcgis({"rings": [shell, hole]}))
+    point = to_wkb(from_arcgis({"x": -97.5, "y": 30.25}))
+    line = to_wkb(from_arcgis({"paths": [[[0, 0], [2, 0], [2, 2]]]}))
+
+    bounds = geometry_bounds([square, None, point, b"\x01\x63\x00\x00\x00", line])
+    assert bounds["min_x"] == [0.0, None, -97.5, None, 0.0]
+    assert bounds["max_y"] == [4.0, None, 30.25, None, 2.0]
+    # (16 * (2, 2) - 4 * (1, 1)) / 12
+    assert bounds["centroid_x"][0] == pytest.approx(7 / 3)
+    assert bounds["centroid_y"][0] == pytest.approx(7 / 3)
+    assert (bounds["centroid_x"][2], bounds["centroid_y"][2]) == (-97.5, 30.25)
+    assert bounds["centroid_x"][4] == pytest.approx(4 / 3)
@@ -0,0 +1,78 @@
+"""Tests for grid cell keys and proximity filters."""
+
+import random
+
+import numpy as np
+import pytest
+
+from parcl.etl.loader import load_records
+from parcl.grid import (
+    cell_key,
+    cell_keys,
+    cells_near,
+    cells_near_many,
+    level_for_radius,
+    near_clause,
+)
+
+
+def test_cell_keys_are_hierarchical():
+    lat, lon = 30.2672, -97.7431
+    assert cell_key(lat, lon, 16) >> 4 == cell_key(lat, lon, 14)
+    assert cell_key(lat, lon, 14) >> 4 == cell_key(lat, lon, 12)
+
+    cells = cell_keys([lat, None, 30.0], [lon, -97.0, None])
+    assert cells["cell_z16"] == [cell_key(lat, lon, 16), None, None]
+    assert cells["cell_z12"][0] == cell_key(lat, lon, 12)
+
+
+def test_cells_near_picks_level_by_radius():
+    assert level_for_radius(0.001) == 16
+    assert level_for_radius(0.005) == 14
+    assert level_for_radius(0.03) == 12
+
+    column, keys = cells_near(30.2672, -97.7431, 0.001)
+    assert column == "cell_z16"
+    assert 1 <= len(keys) <= 9
+    assert cell_key(30.2672, -97.7431, 16) in keys
+
+
+# 0.002 deg boxes are wider than a level 16 cell (0.0027 deg), so some span 3 cells a side
+@pytest.mark.parametrize("radius", [0.004, 0.002])
+def test_cells_near_many_matches_per_point(radius):
+    rng = random.Random(7)
+    lats = np.array([30 + rng.random() for _ in range(200)])
+    lons = np.array([-98 + rng.random() for _ in range(200)])
+    column, point, keys = cells_near_many(lats, lons, radius)
+    assert column == cells_near(lats[0], lons[0], radius)[0]
+    for i in range(200):
+        assert sorted(keys[point == i].tolist()) == sorted(cells_near(lats[i], lons[i], radius)[1])
+
+
+def test_near_clause_matches_box_scan(in_memory_db):
+    db = in_memory_db
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) "
+        "VALUES ('ec', 'Flood', 'arcgis', 'environmental_constraints')"
+    )
+    rng = random.Random(3)
+    records = [
+        {
+            "id": f"e{i}", "source_id": "ec", "external_id": str(i), "constraint_type": "flood",
+            "latitude": 30.2 + rng.random() * 0.1, "longitude": -97.8 + rng.random() * 0.1,
+        }
+        for i in range(2000)
+    ]
+    assert load_records(db, "environmental_constraints", records) == 2000
+    assert db.fetchone("SELECT COUNT(*) FROM environmental_constraints WHERE cell_z16 IS NULL")[0] == 0
+
+    for _ in range(20):
+        lat, lon = 30.2 + rng.random() * 0.1, -97.8 + rng.random() * 0.1
+        for radius in (0.001, 0.005, 0.02):
+            where, params = near_clause(lat, lon, radius)
+            got = {r[0] for r in db.fetchall(f"SELECT id FROM environmental_constraints WHERE {where}", params)}
+            expected = {
+                r["id"] for r in records
+                if abs(r["latitude"] - lat) < radius and abs(r["longitude"] - lon) < radius
+            }
+            assert got == expected
@@ -0,0 +1,33 @@
+"""Tests for the raw page landing zone."""
+
+from parcl.landing import RawPageWriter, list_pages, list_runs, read_manifest, read_page
+
+
+def test_pages_round_trip_with_binary_values(tmp_path):
+    writer = RawPageWriter(tmp_path, "arcgis_zoning", run_id="20240101T000000Z")
+    page1 = [{"OBJECTID": 1, "NAME": "SF-3", "_geometry_wkb": b"\x01\x03\x00\x00\x00"}]
+    page2 = [{"OBJECTID": 2, "NAME": None, "_geometry_wkb": None, "nested": {"a": [1, 2]}}]
+    writer.write(page1)
+    writer.write(page2)
+    writer.finish(complete=True)
+
+    paths = list_pages(tmp_path, "arcgis_zoning", "20240101T000000Z")
+    assert [p.name for p in paths] == ["page=00001.jsonl.gz", "page=00002.jsonl.gz"]
+    assert read_page(paths[0]) == page1
+    assert read_page(paths[1]) == page2
+
+    manifest = read_manifest(tmp_path, "arcgis_zoning", "20240101T000000Z")
+    assert manifest["pages"] == 2
+    assert manifest["records"] == 2
+    assert manifest["complete"] is True
+
+
+def test_list_runs_skips_unfinished_runs(tmp_path):
+    for run_id, finish in [("20240102T000000Z", True), ("20240101T000000Z", True), ("20240103T000000Z", False)]:
+        writer = RawPageWriter(tmp_path, "src", run_id=run_id)
+        writer.write([{"a": 1}])
+        if finish:
+            writer.finish(complete=True)
+
+    assert list_runs(tmp_path, "src") == ["20240101T000000Z", "20240102T000000Z"]
+    assert list_runs(tmp_path, "missing") == []
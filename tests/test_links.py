@@ -0,0 +1,122 @@
+"""Tests for parcel_spatial_links maintenance."""
+
+import numpy as np
+import pytest
+
+from parcl import links
+from parcl.etl.loader import backfill_grid_cells, load_records
+from parcl.geometry import from_arcgis, to_wkb
+from parcl.links import contained_pairs, refresh_links
+from parcl.polygons import PolygonIndex
+from parcl.profile import get_parcel_risk_profile
+
+
+def _square(lat, lon, half):
+    ring = [[lon - half, lat - half], [lon - half, lat + half], [lon + half, lat + half],
+            [lon + half, lat - half], [lon - half, lat - half]]
+    return to_wkb(from_arcgis({"rings": [ring]}))
+
+
+@pytest.fixture
+def links_db(in_memory_db):
+    db = in_memory_db
+    db.execute(
+        "CREATE TABLE transit_amenities (id TEXT PRIMARY KEY, source_id TEXT, external_id TEXT, "
+        "name TEXT, amenity_type TEXT, latitude DOUBLE, longitude DOUBLE, "
+        "cell_z12 BIGINT, cell_z14 BIGINT, cell_z16 BIGINT, geometry_wkb BLOB, min_x DOUBLE, "
+        "min_y DOUBLE, max_x DOUBLE, max_y DOUBLE, centroid_x DOUBLE, centroid_y DOUBLE)"
+    )
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels'), ('zo', 'Overlays', 'arcgis', 'zoning_overlays'), "
+        "('fz', 'Flood', 'arcgis', 'environmental_constraints'), ('cm', 'Stops', 'gtfs', 'transit_amenities')"
+    )
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, latitude, longitude) VALUES "
+        "('p1', 'tcad', '1', 30.270, -97.740), ('p2', 'tcad', '2', 30.272, -97.740), "
+        "('p3', 'tcad', '3', 30.400, -97.700)"
+    )
+    # 0.001 deg of latitude is about 111 m
+    db.execute(
+        "INSERT INTO transit_amenities (id, source_id, external_id, name, amenity_type, latitude, longitude) "
+        "VALUES ('s1', 'cm', 's1', 'Congress/7th', 'bus_stop', 30.273, -97.740), "
+        "('s2', 'cm', 's2', 'Far Stop', 'bus_stop', 30.500, -97.600)"
+    )
+    backfill_grid_cells(db, ["parcels", "transit_amenities"])
+    load_records(db, "zoning_overlays", [
+        {"id": "o1", "source_id": "zo", "external_id": "1", "overlay_name": "Downtown",
+         "geometry_wkb": _square(30.271, -97.740, 0.005)},
+    ])
+    load_records(db, "environmental_constraints", [
+        {"id": "f1", "source_id": "fz", "external_id": "1", "constraint_type": "flood_zone",
+         "name": "Zone AE", "geometry_wkb": _square(30.270, -97.740, 0.0015)},
+    ])
+    return db
+
+
+def _links(db):
+    rows = db.fetchall(
+        "SELECT parcel_id, feature_id, feature_source_id, relation, distance_m FROM parcel_spatial_links "
+        "ORDER BY parcel_id, feature_id"
+    )
+    return [(r[0], r[1], r[2], r[3], round(r[4])) for r in rows]
+
+
+def test_full_refresh_links_polygons_and_nearby_stops(links_db):
+    result = refresh_links(links_db)
+    assert result == {"mode": "full", "links": 5, "changed_parcels": None}
+    # p3 is in no polygon and 26 km from the far stop
+    assert _links(links_db) == [
+        ("p1", "f1", "fz", "within", 0),
+        ("p1", "o1", "zo", "within", 0),
+        ("p1", "s1", "cm", "near", 334),
+        ("p2", "o1", "zo", "within", 0),
+        ("p2", "s1", "cm", "near", 111),
+    ]
+    # Rebuilding replaces rather than duplicates
+    assert refresh_links(links_db)["links"] == 5
+
+    facts = get_parcel_risk_profile("p2", links_db)["supporting_facts"]
+    assert facts["nearby_transit_stops"] == [{"name": "Congress/7th", "distance_m": 111}]
+
+
+def test_source_and_parcel_refresh_report_changed_parcels(links_db):
+    refresh_links(links_db)
+    assert refresh_links(links_db, source=("zoning_overlays", "zo"))["changed_parcels"] == set()
+
+    # The overlay shrinks away from p2: only that source's links are rebuilt
+    load_records(links_db, "zoning_overlays", [
+        {"id": "o1", "source_id": "zo", "external_id": "1", "overlay_name": "Downtown",
+         "geometry_wkb": _square(30.270, -97.740, 0.001)},
+    ])
+    result = refresh_links(links_db, source=("zoning_overlays", "zo"))
+    assert result == {"mode": "source", "links": 1, "changed_parcels": {"p2"}}
+    assert ("p1", "f1") in {(r[0], r[1]) for r in _links(links_db)}
+
+    # p3 moves next to the stop
+    links_db.execute(
+        "UPDATE parcels SET latitude = 30.2735, longitude = -97.7401, "
+        "cell_z12 = NULL, cell_z14 = NULL, cell_z16 = NULL WHERE id = 'p3'"
+    )
+    backfill_grid_cells(links_db, ["parcels"])
+    result = refresh_links(links_db, parcel_ids={"p3"})
+    assert result["mode"] == "parcels"
+    assert result["changed_parcels"] == {"p3"}
+    assert {r[1] for r in _links(links_db) if r[0] == "p3"} == {"s1"}
+
+
+def test_parallel_join_matches_in_process(monkeypatch):
+    rng = np.random.default_rng(5)
+    rows = [("zoning_overlays", str(i), None, None,
+             _square(30 + rng.random() * 0.5, -98 + rng.random() * 0.5, 0.01 + 0.05 * rng.random()))
+            for i in range(200)]
+    index = PolygonIndex.build(rows)
+    lats = 30 + rng.random(3000) * 0.5
+    lons = -98 + rng.random(3000) * 0.5
+    tiles = rng.integers(0, 16, 3000)
+
+    expected = set(zip(*(a.tolist() for a in index.query(lats, lons))))
+    monkeypatch.setattr(links, "PARALLEL_MIN_PARCELS", 0)
+    point, polygon = contained_pairs(index, lats, lons, tiles, workers=2)
+    assert set(zip(point.tolist(), polygon.tolist())) == expected
+    assert len(point) == len(expected)
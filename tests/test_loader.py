@@ -2,7 +2,8 @@
 
 import pytest
 
-from parcl.etl.loader import load_records
+from parcl.etl.loader import ReplaceLoad, backfill_geometry_bounds, load_records
+from parcl.geometry import from_arcgis, to_wkb
 
 
 def test_load_permits(in_memory_db):
@@ -98,3 +99,143 @@ def test_upsert_dedup(in_memory_db):
 def test_load_empty_batch(in_memory_db):
     loaded = load_records(in_memory_db, "permits", [])
     assert loaded == 0
+
+
+def _permit(external_id, **overrides):
+    record = {
+        "id": f"uuid-{external_id}",
+        "source_id": "test",
+        "external_id": external_id,
+        "permit_number": external_id,
+        "address": "123 Main St",
+        "address_norm": "123 MAIN ST",
+        "valuation": 100.0,
+        "issued_date": "2024-01-15",
+        "jurisdiction_id": "austin-tx",
+        "raw_payload": "{}",
+    }
+    record.update(overrides)
+    return record
+
+
+def test_duplicate_keys_in_batch_keep_last(in_memory_db):
+    records = [
+        _permit("P001", description="first"),
+        _permit("P002"),
+        _permit("P001", id="uuid-other", description="last"),
+    ]
+    loaded = load_records(in_memory_db, "permits", records)
+    assert loaded == 2
+
+    rows = in_memory_db.fetchall("SELECT external_id, description FROM permits ORDER BY external_id")
+    assert rows == [("P001", "last"), ("P002", None)]
+
+
+def test_bad_rows_go_to_load_errors(in_memory_db):
+    records = [
+        _permit("P001"),
+        _permit("P002", issued_date="not a date"),
+        _permit("P003", valuation="lots"),
+        _permit(None),
+    ]
+    loaded = load_records(in_memory_db, "permits", records)
+    assert loaded == 1
+    assert in_memory_db.fetchone("SELECT COUNT(*) FROM permits")[0] == 1
+
+    errors = in_memory_db.fetchall(
+        "SELECT external_id, error FROM load_errors WHERE target_table = 'permits' "
+        "ORDER BY external_id NULLS LAST"
+    )
+    assert [e[0] for e in errors] == ["P002", "P003", None]
+    assert "issued_date" in errors[0][1]
+    assert "valuation" in errors[1][1]
+    assert "external_id" in errors[2][1]
+
+
+def test_load_geometry_blob(in_memory_db):
+    in_memory_db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) "
+        "VALUES ('zo', 'Zoning', 'arcgis', 'zoning_overlays')"
+    )
+    wkb = b"\x01\x01\x00\x00\x00" + bytes(16)
+    records = [
+        {"id": "z1", "source_id": "zo", "external_id": "1", "layer_id": 3, "geometry_wkb": wkb},
+        {"id": "z2", "source_id": "zo", "external_id": "2", "layer_id": None, "geometry_wkb": None},
+    ]
+    assert load_records(in_memory_db, "zoning_overlays", records) == 2
+
+    row = in_memory_db.fetchone("SELECT geometry_wkb, layer_id FROM zoning_overlays WHERE id = 'z1'")
+    assert bytes(row[0]) == wkb
+    assert row[1] == 3
+
+
+def test_geometry_bounds_on_load_and_backfill(in_memory_db):
+    in_memory_db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) "
+        "VALUES ('fz', 'Flood', 'arcgis', 'environmental_constraints')"
+    )
+    ring = [[-97.8, 30.2], [-97.8, 30.3], [-97.7, 30.3], [-97.7, 30.2], [-97.8, 30.2]]
+    wkb = to_wkb(from_arcgis({"rings": [ring]}))
+    load_records(in_memory_db, "environmental_constraints", [
+        {"id": "f1", "source_id": "fz", "external_id": "1", "constraint_type": "flood_zone",
+         "geometry_wkb": wkb},
+    ])
+    row = in_memory_db.fetchone(
+        "SELECT min_x, min_y, max_x, max_y, centroid_x, centroid_y "
+        "FROM environmental_constraints WHERE id = 'f1'"
+    )
+    assert row == pytest.approx((-97.8, 30.2, -97.7, 30.3, -97.75, 30.25))
+
+    # Rows written before the columns existed get them from the backfill
+    in_memory_db.execute(
+        "INSERT INTO environmental_constraints (id, source_id, external_id, constraint_type, geometry_wkb) "
+        "VALUES ('f2', 'fz', '2', 'flood_zone', ?), ('f3', 'fz', '3', 'flood_zone', ?)",
+        (wkb, b"not wkb"),
+    )
+    assert backfill_geometry_bounds(in_memory_db, ["environmental_constraints"], batch_size=1) == 1
+    rows = in_memory_db.fetchall(
+        "SELECT id, centroid_x FROM environmental_constraints WHERE id <> 'f1' ORDER BY id"
+    )
+    assert rows[0] == ("f2", pytest.approx(-97.75))
+    assert rows[1] == ("f3", None)
+
+
+def _ids(db, source_id="test"):
+    return dict(db.fetchall(
+        "SELECT external_id, id FROM permits WHERE source_id = ? ORDER BY external_id", (source_id,)
+    ))
+
+
+def test_replace_load_swaps_source_rows(in_memory_db):
+    in_memory_db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) "
+        "VALUES ('other', 'Other', 'socrata', 'permits')"
+    )
+    load_records(in_memory_db, "permits", [_permit("A"), _permit("B"), _permit("C")])
+    load_records(in_memory_db, "permits", [_permit("X", source_id="other")])
+
+    replace = ReplaceLoad(in_memory_db, "permits", "test")
+    assert replace.load([_permit("B", id="new-B", status="Final"), _permit("C", id="new-C")]) == 2
+    assert replace.load([_permit("D", status="v1"), _permit("D", id="new-D", status="v2")]) == 2
+
+    # Nothing is visible until the swap
+    assert _ids(in_memory_db) == {"A": "uuid-A", "B": "uuid-B", "C": "uuid-C"}
+
+    result = replace.swap()
+    assert result == {"rows": 3, "kept": 2, "removed": 1}
+    assert _ids(in_memory_db) == {"B": "uuid-B", "C": "uuid-C", "D": "new-D"}
+    rows = in_memory_db.fetchall("SELECT external_id, status FROM permits WHERE source_id = 'test' ORDER BY 1")
+    assert rows == [("B", "Final"), ("C", None), ("D", "v2")]
+    assert _ids(in_memory_db, "other") == {"X": "uuid-X"}
+
+
+def test_replace_load_discard_keeps_rows(in_memory_db):
+    load_records(in_memory_db, "permits", [_permit("A")])
+
+    replace = ReplaceLoad(in_memory_db, "permits", "test")
+    replace.load([_permit("B"), _permit(None)])
+    replace.discard()
+
+    assert _ids(in_memory_db) == {"A": "uuid-A"}
+    errors = in_memory_db.fetchall("SELECT error FROM load_errors")
+    assert errors == [("missing external_id",)]
@@ -0,0 +1,205 @@
+"""Tests for the PostgreSQL COPY load path.
+
+Run against a local server by setting PARCL_TEST_POSTGRES_URL, e.g.
+``postgresql://postgres@localhost:5432/postgres``. Each test works in a
+throwaway schema.
+"""
+
+import os
+import uuid
+
+import pytest
+
+from parcl.db import Database, init_schema
+from parcl.etl.loader import ReplaceLoad, backfill_grid_cells, load_records
+
+POSTGRES_URL = os.environ.get("PARCL_TEST_POSTGRES_URL")
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="PARCL_TEST_POSTGRES_URL not set")
+
+
+@pytest.fixture
+def pg_db():
+    import psycopg2
+
+    conn = psycopg2.connect(POSTGRES_URL)
+    schema = f"parcl_test_{uuid.uuid4().hex[:8]}"
+    cur = conn.cursor()
+    cur.execute(f"CREATE SCHEMA {schema}")
+    cur.execute(f"SET search_path TO {schema}")
+    conn.commit()
+
+    db = Database(conn, "postgresql")
+    init_schema(db)
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) "
+        "VALUES ('test', 'Test', 'socrata', 'permits')"
+    )
+    db.commit()
+
+    yield db
+
+    conn.rollback()
+    conn.cursor().execute(f"DROP SCHEMA {schema} CASCADE")
+    conn.commit()
+    conn.close()
+
+
+def _permit(external_id, **overrides):
+    record = {
+        "id": f"uuid-{external_id}",
+        "source_id": "test",
+        "external_id": external_id,
+        "permit_number": external_id,
+        "description": 'Say "hi",\nthen leave',
+        "address": "123 Main St",
+        "address_norm": "123 MAIN ST",
+        "valuation": 100.0,
+        "issued_date": "2024-01-15",
+        "jurisdiction_id": "austin-tx",
+        "raw_payload": "{}",
+    }
+    record.update(overrides)
+    return record
+
+
+def test_copy_load_and_update(pg_db):
+    records = [_permit("P001"), _permit("P002", applicant=""), _permit("P001", valuation=5.0)]
+    assert load_records(pg_db, "permits", records) == 2
+
+    rows = pg_db.fetchall(
+        "SELECT external_id, valuation, description, applicant, contractor "
+        "FROM permits ORDER BY external_id"
+    )
+    assert rows == [
+        ("P001", 5.0, 'Say "hi",\nthen leave', None, None),
+        ("P002", 100.0, 'Say "hi",\nthen leave', "", None),
+    ]
+
+    assert load_records(pg_db, "permits", [_permit("P002", id="uuid-new", status="Final")]) == 1
+    row = pg_db.fetchone("SELECT id, status FROM permits WHERE external_id = 'P002'")
+    assert row == ("uuid-P002", "Final")
+
+
+def test_copy_load_bytea(pg_db):
+    pg_db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) "
+        "VALUES ('zo', 'Zoning', 'arcgis', 'zoning_overlays')"
+    )
+    pg_db.commit()
+    wkb = b"\x01\x01\x00\x00\x00" + bytes(range(16))
+    records = [{"id": "z1", "source_id": "zo", "external_id": "1", "geometry_wkb": wkb}]
+    assert load_records(pg_db, "zoning_overlays", records) == 1
+
+    row = pg_db.fetchone("SELECT geometry_wkb FROM zoning_overlays WHERE id = 'z1'")
+    assert bytes(row[0]) == wkb
+
+
+def test_bad_rows_go_to_load_errors(pg_db):
+    records = [_permit("P001"), _permit(None), _permit("P003", issued_date="not a date")]
+    loaded = load_records(pg_db, "permits", records)
+
+    # The bad date fails the COPY, so the page is retried row by row
+    assert loaded == 1
+    assert pg_db.fetchone("SELECT COUNT(*) FROM permits")[0] == 1
+    errors = pg_db.fetchall("SELECT external_id FROM load_errors ORDER BY external_id NULLS LAST")
+    assert [e[0] for e in errors] == ["P003", None]
+
+
+def test_replace_load(pg_db):
+    load_records(pg_db, "permits", [_permit("A"), _permit("B")])
+
+    replace = ReplaceLoad(pg_db, "permits", "test")
+    replace.load([_permit("B", id="new-B", status="Final"), _permit("C")])
+    replace.load([_permit("C", id="new-C", status="v2")])
+    assert replace.swap() == {"rows": 2, "kept": 1, "removed": 1}
+
+    rows = pg_db.fetchall("SELECT external_id, id, status FROM permits ORDER BY external_id")
+    assert rows == [("B", "uuid-B", "Final"), ("C", "new-C", "v2")]
+
+
+def test_secondary_indexes(pg_db):
+    from parcl.db import (
+        declared_indexes,
+        ensure_indexes,
+        index_report,
+        refresh_statistics,
+    )
+
+    assert ensure_indexes(pg_db) == []
+    refresh_statistics(pg_db, ["permits"])
+    report = {entry["name"]: entry for entry in index_report(pg_db)}
+    assert set(report) == {spec.name for spec in declared_indexes(pg_db)}
+    cells = report["idx_environmental_constraints_cell_z16"]
+    assert cells["exists"] and cells["columns"] == ["cell_z16"]
+    assert cells["size_bytes"] > 0
+    assert cells["scans"] == 0
+
+
+def test_refresh_features(pg_db):
+    from parcl.features import FeatureChanges, refresh_features
+    from parcl.resolve import resolve_parcels
+
+    pg_db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_key, latitude, longitude) VALUES "
+        "('p1', 'test', '1', '123 MAIN ST', 30.3, -97.7), ('p2', 'test', '2', '9 ELM ST', 30.5, -97.5)"
+    )
+    pg_db.commit()
+    load_records(pg_db, "permits", [_permit("A", address_key="123 MAIN ST", status="Issued")])
+    resolve_parcels(pg_db)
+    assert refresh_features(pg_db) == {"mode": "full", "parcels": 2}
+
+    changes = FeatureChanges.for_table(pg_db, "permits", "test")
+    page = [_permit("B", address_key="9 ELM ST")]
+    changes.capture(pg_db, page)
+    load_records(pg_db, "permits", page)
+    changes.add(page)
+    changes.add_parcels(resolve_parcels(pg_db, ["permits"])["parcel_ids"])
+    assert refresh_features(pg_db, changes) == {"mode": "incremental", "parcels": 1}
+
+    rows = pg_db.fetchall(
+        "SELECT parcel_id, total_permits, active_permits FROM parcel_features ORDER BY parcel_id"
+    )
+    assert rows == [("p1", 1, 1), ("p2", 1, 0)]
+
+
+def test_batch_profiles(pg_db):
+    from parcl.profile import get_parcel_risk_profile, get_parcel_risk_profiles
+    from parcl.resolve import resolve_parcels
+
+    pg_db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_norm, address_key, latitude, longitude) "
+        "VALUES ('p1', 'test', '1', '123 MAIN ST', '123 MAIN ST', 30.3, -97.7)"
+    )
+    pg_db.execute(
+        "INSERT INTO environmental_constraints (id, source_id, external_id, constraint_type, name, "
+        "latitude, longitude) VALUES ('e1', 'test', 'e1', 'wetland', 'Marsh', 30.301, -97.7)"
+    )
+    pg_db.commit()
+    backfill_grid_cells(pg_db, ["parcels", "environmental_constraints"])
+    load_records(pg_db, "permits", [
+        _permit("A", address_key="123 MAIN ST"), _permit("B", address="9 Elm St", address_key="9 ELM ST"),
+    ])
+    resolve_parcels(pg_db)
+
+    queries = ["123 Main St", "9 Elm St", "p1", "1 Nowhere Rd"]
+    profiles = list(get_parcel_risk_profiles(queries, pg_db))
+    assert profiles == [get_parcel_risk_profile(q, pg_db) for q in queries]
+    assert profiles[0]["risks"][0]["label"] == "Marsh"
+
+
+def test_export_streams_from_server_cursor(pg_db, tmp_path):
+    import pyarrow.parquet as pq
+
+    from parcl.exporter import export_data
+
+    pg_db.execute(
+        "INSERT INTO parcel_features (parcel_id, latitude, total_permits) "
+        "SELECT 'p' || i, CASE WHEN i > 2 THEN 30.0 END, i FROM generate_series(1, 5) AS t(i)"
+    )
+    pg_db.commit()
+    parquet = pq.ParquetFile(export_data(pg_db, "parquet", str(tmp_path), row_group_size=2))
+    assert parquet.num_row_groups == 3
+    table = parquet.read()
+    assert table.column("total_permits").to_pylist() == [1, 2, 3, 4, 5]
+    assert table.column("latitude").to_pylist() == [None, None, 30.0, 30.0, 30.0]
@@ -0,0 +1,92 @@
+"""Tests for finding parcels and profiles by latitude/longitude."""
+
+import pytest
+
+from parcl import locator
+from parcl.geometry import from_arcgis, to_wkb
+from parcl.locator import load_parcel_locator, parse_point
+from parcl.profile import (
+    get_parcel_risk_profile,
+    get_parcel_risk_profile_at,
+    get_parcel_risk_profiles_at,
+)
+
+
+def _square(lat, lon, half):
+    ring = [[lon - half, lat - half], [lon - half, lat + half], [lon + half, lat + half],
+            [lon + half, lat - half], [lon - half, lat - half]]
+    return to_wkb(from_arcgis({"rings": [ring]}))
+
+
+@pytest.fixture
+def located_db(in_memory_db):
+    db = in_memory_db
+    db.execute(
+        "CREATE TABLE property_valuations (id TEXT PRIMARY KEY, source_id TEXT, external_id TEXT, "
+        "address_key TEXT, geometry_wkb BLOB, min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE, "
+        "centroid_x DOUBLE, centroid_y DOUBLE, fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('zba', 'Zoning', 'csv', 'parcels'), ('tcad', 'TCAD', 'arcgis', 'property_valuations')"
+    )
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_norm, address_key, latitude, longitude) VALUES "
+        "('p1', 'zba', '1', '600 CONGRESS AVE', '600 CONGRESS AVE', 30.270, -97.740), "
+        "('p2', 'zba', '2', '700 LAVACA ST', '700 LAVACA ST', 30.272, -97.742)"
+    )
+    # v1 is p1's lot; v2 has no parcel of its own. 0.001 deg of latitude is about 111 m
+    for vid, key, lat, lon, half in [
+        ("v1", "600 CONGRESS AVE", 30.2705, -97.7405, 0.0008),
+        ("v2", "999 NOWHERE RD", 30.2715, -97.7415, 0.0003),
+    ]:
+        db.execute(
+            "INSERT INTO property_valuations (id, source_id, external_id, address_key, geometry_wkb, "
+            "min_x, min_y, max_x, max_y, centroid_x, centroid_y) VALUES (?, 'tcad', ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (vid, vid, key, _square(lat, lon, half), lon - half, lat - half, lon + half, lat + half, lon, lat),
+        )
+    return db
+
+
+def test_locate_prefers_polygon_then_nearest_point(located_db):
+    finder = load_parcel_locator(located_db)
+    inside, orphan, far = finder.locate([30.2710, 30.2716, 30.5], [-97.7410, -97.7416, -97.5])
+    # Inside p1's TCAD lot, though p2's point is about as close
+    assert (inside.parcel_id, inside.method, inside.distance_m) == ("p1", "within", 0.0)
+    # Inside a lot with no parcel: the nearest parcel point
+    assert (orphan.parcel_id, orphan.method) == ("p2", "nearest")
+    assert 50 < orphan.distance_m < 70
+    assert far is None
+
+    # A new parcel is picked up once the stamp is read again
+    located_db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, latitude, longitude) "
+        "VALUES ('p3', 'zba', '3', 30.5001, -97.5)"
+    )
+    locator._cache.clear()
+    assert load_parcel_locator(located_db).locate([30.5], [-97.5])[0].parcel_id == "p3"
+
+    with pytest.raises(ValueError):
+        parse_point("30.27")
+    with pytest.raises(ValueError):
+        parse_point("97.74,30.27,1")
+    assert parse_point(" 30.27, -97.74") == (30.27, -97.74)
+
+
+def test_profile_at_point(located_db):
+    profile = get_parcel_risk_profile_at(30.2710, -97.7410, located_db)
+    assert profile["query"] == "30.271,-97.741"
+    assert profile["location"] == {"latitude": 30.271, "longitude": -97.741, "method": "within", "distance_m": 0.0}
+    expected = get_parcel_risk_profile("p1", located_db)
+    assert {k: v for k, v in profile.items() if k not in ("query", "location")} == {
+        k: v for k, v in expected.items() if k != "query"
+    }
+
+    empty = get_parcel_risk_profile_at(30.5, -97.5, located_db)
+    assert empty["matched_address"] is None and empty["location"]["method"] is None
+    assert empty["warnings"] == ["No parcel within 250 m of 30.5,-97.5."]
+
+    points = [(30.2710, -97.7410), (30.2716, -97.7416), (30.5, -97.5)]
+    assert list(get_parcel_risk_profiles_at(points, located_db)) == [
+        get_parcel_risk_profile_at(lat, lon, located_db) for lat, lon in points
+    ]
@@ -0,0 +1,246 @@
+"""Tests for the threaded ETL pipeline with a stub source plugin."""
+
+import dataclasses
+
+import duckdb
+import pytest
+
+from parcl.config import PROJECT_ROOT, FieldMapping, load_settings, load_source_config
+from parcl.db import Database, init_schema
+from parcl.etl import pipeline
+from parcl.etl.loader import load_records
+from parcl.geometry import from_arcgis, to_wkb
+from parcl.landing import list_runs, read_manifest
+from parcl.profile import get_parcel_risk_profile
+from parcl.sources.base import BaseSource
+
+
+def _square(lat, lon, half):
+    ring = [[lon - half, lat - half], [lon - half, lat + half], [lon + half, lat + half],
+            [lon + half, lat - half], [lon - half, lat - half]]
+    return to_wkb(from_arcgis({"rings": [ring]}))
+
+
+def _page(start, n):
+    return [
+        {"permit_number": f"P{i:03d}", "original_address1": f"{i} Main St", "total_job_valuation": i}
+        for i in range(start, start + n)
+    ]
+
+
+class StubSource(BaseSource):
+    pages = []
+    fail_after = None
+
+    def fetch(self):
+        for i, page in enumerate(self.pages):
+            if self.fail_after is not None and i == self.fail_after:
+                raise ConnectionError("upstream went away")
+            yield page
+
+
+@pytest.fixture(autouse=True)
+def landing_dir(tmp_path, monkeypatch):
+    settings = dataclasses.replace(load_settings(), landing_dir=str(tmp_path / "raw"))
+    monkeypatch.setattr(pipeline, "load_settings", lambda: settings)
+    return tmp_path / "raw"
+
+
+@pytest.fixture
+def stub_source(monkeypatch):
+    StubSource.pages = [_page(0, 10), _page(10, 10), _page(20, 5)]
+    StubSource.fail_after = None
+    monkeypatch.setattr(pipeline, "get_source_class", lambda source_type: StubSource)
+    return StubSource
+
+
+def test_run_source_loads_all_pages(in_memory_db, sample_source_config, stub_source):
+    summary = pipeline.run_source(sample_source_config, in_memory_db)
+
+    assert summary["pages"] == 3
+    assert summary["raw_records"] == 25
+    assert summary["loaded_records"] == 25
+    assert summary["errors"] == 0
+    assert set(summary["stages"]) == {"fetch", "transform", "load"}
+    assert summary["bottleneck"] in summary["stages"]
+    assert in_memory_db.fetchone("SELECT COUNT(*) FROM permits")[0] == 25
+
+
+def test_run_source_fetch_error_keeps_earlier_pages(in_memory_db, sample_source_config, stub_source):
+    stub_source.fail_after = 2
+
+    summary = pipeline.run_source(sample_source_config, in_memory_db)
+
+    assert summary["errors"] == 1
+    assert summary["pages"] == 2
+    assert in_memory_db.fetchone("SELECT COUNT(*) FROM permits")[0] == 20
+
+
+def test_run_source_transform_error_stops_pipeline(
+    in_memory_db, sample_source_config, stub_source, monkeypatch
+):
+    calls = []
+
+    def failing_transform(batch, config):
+        calls.append(len(batch))
+        raise ValueError("bad mapping")
+
+    monkeypatch.setattr(pipeline, "transform_batch", failing_transform)
+    stub_source.pages = [_page(i * 10, 10) for i in range(50)]
+
+    summary = pipeline.run_source(sample_source_config, in_memory_db)
+
+    assert summary["errors"] == 1
+    assert summary["loaded_records"] == 0
+    assert calls == [10]
+
+
+def test_run_source_lands_raw_pages(in_memory_db, sample_source_config, stub_source, landing_dir):
+    summary = pipeline.run_source(sample_source_config, in_memory_db)
+
+    runs = list_runs(landing_dir, "test_permits")
+    assert runs == [summary["raw_run_id"]]
+    manifest = read_manifest(landing_dir, "test_permits", runs[0])
+    assert manifest["pages"] == 3
+    assert manifest["records"] == 25
+    assert manifest["complete"] is True
+
+
+def test_retransform_replays_landed_run(in_memory_db, sample_source_config, stub_source):
+    pipeline.run_source(sample_source_config, in_memory_db)
+    assert in_memory_db.fetchone("SELECT COUNT(*) FROM permits WHERE valuation IS NULL")[0] == 0
+
+    # Fix a mapping, then rebuild from the landed pages without fetching
+    stub_source.pages = []
+    config = dataclasses.replace(
+        sample_source_config,
+        field_map=sample_source_config.field_map + [
+            FieldMapping("permit_number", "description", "text"),
+        ],
+    )
+    summary = pipeline.retransform_source(config, in_memory_db, workers=2)
+
+    assert summary["pages"] == 3
+    assert summary["loaded_records"] == 25
+    assert summary["errors"] == 0
+    rows = in_memory_db.fetchall("SELECT permit_number, description FROM permits ORDER BY 1")
+    assert len(rows) == 25
+    assert all(number == description for number, description in rows)
+
+
+def test_retransform_unknown_run(in_memory_db, sample_source_config, stub_source):
+    pipeline.run_source(sample_source_config, in_memory_db)
+    with pytest.raises(ValueError, match="not found"):
+        pipeline.retransform_source(sample_source_config, in_memory_db, run_id="nope")
+
+
+def test_run_source_refreshes_touched_features(in_memory_db, sample_source_config, stub_source):
+    in_memory_db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES ('tcad', 'TCAD', 'csv', 'parcels')"
+    )
+    in_memory_db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_key) VALUES "
+        "('p1', 'tcad', '1', '1 MAIN ST'), ('p2', 'tcad', '2', '999 ELM ST')"
+    )
+    summary = pipeline.run_source(sample_source_config, in_memory_db)
+
+    assert summary["features"] == {"mode": "incremental", "parcels": 1}
+    row = in_memory_db.fetchone("SELECT parcel_id, total_permits FROM parcel_features")
+    assert row == ("p1", 1)
+
+
+def test_run_source_loads_overlays(in_memory_db, sample_source_config, stub_source):
+    config = dataclasses.replace(
+        sample_source_config,
+        id="test_overlays",
+        target_table="zoning_overlays",
+        field_map=[
+            FieldMapping("name", "overlay_name", "text", True),
+            FieldMapping("type", "overlay_type", "text", False),
+        ],
+    )
+    stub_source.pages = [[{"name": "Waterfront", "type": "combining"}]]
+    summary = pipeline.run_source(config, in_memory_db)
+
+    assert (summary["loaded_records"], summary["errors"]) == (1, 0)
+    assert in_memory_db.fetchone("SELECT overlay_name FROM zoning_overlays")[0] == "Waterfront"
+    # A second run overwrites the row, capturing what it replaces first
+    summary = pipeline.run_source(config, in_memory_db)
+    assert (summary["loaded_records"], summary["errors"]) == (1, 0)
+
+
+def test_retransform_invalidates_cached_profiles(
+    in_memory_db, sample_source_config, stub_source, tmp_path, monkeypatch
+):
+    from parcl import profile_cache
+    from parcl.profile_cache import ProfileCache, cached_profile
+
+    monkeypatch.setattr(profile_cache, "VERSION_TTL", 0.0)
+    pipeline.run_source(sample_source_config, in_memory_db)
+    cache = ProfileCache.open(tmp_path / "cache")
+    cached_profile("1 Main St", in_memory_db, cache)
+    cached_profile("1 Main St", in_memory_db, cache)
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+    stub_source.pages = []
+    pipeline.retransform_source(sample_source_config, in_memory_db, workers=1)
+    cached_profile("1 Main St", in_memory_db, cache)
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+    cache.close()
+
+
+def test_parcels_without_coordinates_take_valuation_centroid(stub_source):
+    db = Database(duckdb.connect(":memory:"), "duckdb")
+    init_schema(db)
+    config = load_source_config(PROJECT_ROOT / "config" / "sources" / "austin_zoning_by_address.yaml")
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'arcgis', 'property_valuations'), ('zo', 'Overlays', 'arcgis', 'zoning_overlays'), "
+        "('cm', 'Stops', 'gtfs', 'transit_amenities'), ('pm', 'Permits', 'socrata', 'permits')"
+    )
+    # 0.001 deg of latitude is about 111 m
+    load_records(db, "property_valuations", [
+        {"id": "v1", "source_id": "tcad", "external_id": "1", "address_key": "600 CONGRESS AVE",
+         "geometry_wkb": _square(30.270, -97.740, 0.0005)},
+    ])
+    load_records(db, "zoning_overlays", [
+        {"id": "o1", "source_id": "zo", "external_id": "1", "overlay_name": "Downtown",
+         "geometry_wkb": _square(30.270, -97.740, 0.002)},
+    ])
+    load_records(db, "transit_amenities", [
+        {"id": "s1", "source_id": "cm", "external_id": "s1", "name": "Congress/7th",
+         "amenity_type": "bus_stop", "latitude": 30.271, "longitude": -97.740},
+    ])
+    # A permit with a point but no address resolves to the nearest parcel
+    load_records(db, "permits", [
+        {"id": "x1", "source_id": "pm", "external_id": "1", "permit_number": "X1",
+         "latitude": 30.2701, "longitude": -97.7401},
+    ])
+
+    stub_source.pages = [[{"full_street_name": "600 Congress Ave", "base_zone": "CBD"}]]
+    summary = pipeline.run_source(config, db)
+    assert (summary["loaded_records"], summary["located"]) == (1, 1)
+    pid, lat, lon, source, cell = db.fetchone(
+        "SELECT id, latitude, longitude, location_source, cell_z16 FROM parcels"
+    )
+    assert (round(lat, 4), round(lon, 4), source) == (30.27, -97.74, "valuation") and cell is not None
+    assert db.fetchone("SELECT parcel_id FROM permits")[0] == pid
+    assert {r[0] for r in db.fetchall("SELECT feature_id FROM parcel_spatial_links")} == {"o1", "s1"}
+    facts = get_parcel_risk_profile(pid, db)["supporting_facts"]
+    assert facts["nearest_transit_stop"]["name"] == "Congress/7th"
+
+    # The lot moves away from the overlay; its parcel follows
+    load_records(db, "property_valuations", [
+        {"id": "v1", "source_id": "tcad", "external_id": "1", "address_key": "600 CONGRESS AVE",
+         "geometry_wkb": _square(30.300, -97.700, 0.0005)},
+    ])
+    tcad = dataclasses.replace(config, id="tcad", target_table="property_valuations")
+    assert pipeline._locate_parcels(db, tcad, 1, None, None) == 1
+    assert db.fetchone("SELECT latitude FROM parcels")[0] == pytest.approx(30.3)
+    assert db.fetchone("SELECT COUNT(*) FROM parcel_spatial_links")[0] == 0
+    assert db.fetchone("SELECT overlay_count FROM parcel_features")[0] == 0
+
+    # Coordinates from the parcel source itself are kept
+    db.execute("UPDATE parcels SET latitude = 30.25, longitude = -97.75, location_source = NULL")
+    assert pipeline._locate_parcels(db, tcad, 1, None, None) == 0
+    db.close()
@@ -0,0 +1,117 @@
+"""Tests for the point-in-polygon index."""
+
+import random
+
+import numpy as np
+
+from parcl import polygons
+from parcl.etl.loader import load_records
+from parcl.geometry import from_arcgis, points_in_ring, to_wkb
+from parcl.links import refresh_links
+from parcl.polygons import PolygonIndex, load_polygon_index
+from parcl.profile import get_parcel_risk_profile
+
+
+def _square(x, y, half):
+    return [[x - half, y - half], [x - half, y + half], [x + half, y + half],
+            [x + half, y - half], [x - half, y - half]]
+
+
+def _wkb(rings):
+    return to_wkb(from_arcgis({"rings": rings}))
+
+
+def test_query_matches_ray_casting_every_polygon():
+    rng = random.Random(7)
+    shapes = []
+    for i in range(300):
+        x, y = rng.uniform(-98, -97.5), rng.uniform(30, 30.5)
+        shapes.append([_square(x, y, rng.uniform(0.005, 0.05))])
+    # A square with a hole, and a many-sided shape that is ray-cast in bands
+    shapes.append([_square(-97.75, 30.25, 0.1), _square(-97.75, 30.25, 0.02)[::-1]])
+    t = np.linspace(0, 2 * np.pi, 2000)
+    star = np.c_[-97.7 + 0.08 * (1 + 0.3 * np.sin(9 * t)) * np.cos(t),
+                 30.3 + 0.08 * (1 + 0.3 * np.sin(9 * t)) * np.sin(t)]
+    star[-1] = star[0]
+    shapes.append([star[::-1].tolist()])
+    index = PolygonIndex.build(("zoning_overlays", str(i), None, None, _wkb(s)) for i, s in enumerate(shapes))
+    assert len(index.levels) > 2
+
+    lats = np.array([rng.uniform(30, 30.5) for _ in range(2000)])
+    lons = np.array([rng.uniform(-98, -97.5) for _ in range(2000)])
+    point, polygon = index.query(lats, lons)
+    found = set(zip(point.tolist(), index.ids[polygon].tolist()))
+
+    expected = set()
+    for i, rings in enumerate(shapes):
+        inside = np.zeros(len(lats), dtype=bool)
+        for ring in rings:
+            inside ^= points_in_ring(lons, lats, np.asarray(ring, dtype=float))
+        expected.update((p, str(i)) for p in np.flatnonzero(inside).tolist())
+    assert found == expected
+    # The hole is outside its polygon, the ring around it inside
+    assert "300" not in {a["id"] for a in index.containing(30.25, -97.75)}
+    assert "300" in {a["id"] for a in index.containing(30.30, -97.75, "zoning_overlays")}
+
+
+def test_index_cache_reused_until_polygons_change(in_memory_db, polygon_cache_dir, monkeypatch):
+    db = in_memory_db
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) "
+        "VALUES ('fz', 'Flood', 'arcgis', 'environmental_constraints')"
+    )
+    zone = {"id": "f1", "source_id": "fz", "external_id": "1", "constraint_type": "flood_zone",
+            "name": "Zone AE", "geometry_wkb": _wkb([_square(-97.74, 30.27, 0.01)])}
+    load_records(db, "environmental_constraints", [zone])
+
+    index = load_polygon_index(db)
+    assert (polygon_cache_dir / polygons.CACHE_FILE).exists()
+    assert [a["name"] for a in index.containing(30.27, -97.74)] == ["Zone AE"]
+
+    # Unchanged tables: served from memory, then from disk, never rebuilt
+    build = PolygonIndex.build
+    monkeypatch.setattr(PolygonIndex, "build", None)
+    assert load_polygon_index(db) is index
+    polygons._cache.clear()
+    assert load_polygon_index(db).stamp == index.stamp
+    monkeypatch.setattr(PolygonIndex, "build", build)
+
+    load_records(db, "environmental_constraints", [{**zone, "geometry_wkb": _wkb([_square(-97.0, 30.0, 0.01)])}])
+    moved = load_polygon_index(db)
+    assert moved.stamp != index.stamp
+    assert moved.containing(30.27, -97.74) == []
+
+
+def test_profile_reports_containing_overlays_and_flood_zones(in_memory_db):
+    db = in_memory_db
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels'), ('zo', 'Overlays', 'arcgis', 'zoning_overlays'), "
+        "('fz', 'Flood', 'arcgis', 'environmental_constraints')"
+    )
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address, address_norm, address_key, "
+        "latitude, longitude) VALUES ('p1', 'tcad', '1', '600 Congress Ave', '600 CONGRESS AVE', "
+        "'600 CONGRESS AVE', 30.27, -97.74)"
+    )
+    load_records(db, "zoning_overlays", [
+        {"id": "o1", "source_id": "zo", "external_id": "1", "overlay_name": "Waterfront",
+         "overlay_type": "overlay", "geometry_wkb": _wkb([_square(-97.74, 30.27, 0.02)])},
+        # Bounding box covers the parcel, the shape itself does not
+        {"id": "o2", "source_id": "zo", "external_id": "2", "overlay_name": "Capitol View",
+         "overlay_type": "overlay",
+         "geometry_wkb": _wkb([[[-97.8, 30.2], [-97.8, 30.3], [-97.79, 30.3], [-97.79, 30.21],
+                                [-97.7, 30.21], [-97.7, 30.2], [-97.8, 30.2]]])},
+    ])
+    load_records(db, "environmental_constraints", [
+        {"id": "f1", "source_id": "fz", "external_id": "1", "constraint_type": "flood_zone",
+         "name": "Zone AE", "severity": "high", "geometry_wkb": _wkb([_square(-97.74, 30.27, 0.05)])},
+    ])
+
+    refresh_links(db)
+    result = get_parcel_risk_profile("600 Congress Ave", db)
+    assert result["zoning"]["overlays"] == [{"name": "Waterfront", "type": "overlay"}]
+    assert "zoning_overlays" in result["data_sources"]
+    assert [(r["label"], r["detail"]) for r in result["risks"]] == [
+        ("Zone AE", "Parcel lies within this area")
+    ]
@@ -2,7 +2,24 @@
 
 import pytest
 
-from parcl.profile import get_parcel_risk_profile
+from parcl.address import normalize_address, parse_address
+from parcl.etl.loader import backfill_grid_cells, load_records
+from parcl.geometry import from_arcgis, to_wkb
+from parcl.links import refresh_links
+from parcl.profile import get_parcel_risk_profile, get_parcel_risk_profiles
+from parcl.resolve import resolve_parcels
+
+
+def _keyed(record):
+    """Add the address_norm and address_key the transformer would set."""
+    return {**record, "address_norm": normalize_address(record["address"]),
+            "address_key": parse_address(record["address"]).key}
+
+
+def _square(lat, lon, half):
+    ring = [[lon - half, lat - half], [lon - half, lat + half], [lon + half, lat + half],
+            [lon + half, lat - half], [lon - half, lat - half]]
+    return to_wkb(from_arcgis({"rings": [ring]}))
 
 
 def test_profile_no_data(in_memory_db):
@@ -42,12 +59,111 @@ def test_profile_with_permits(in_memory_db):
     )
     in_memory_db.execute(
         "INSERT INTO permits (id, source_id, external_id, permit_number, permit_type, "
-        "status, address, address_norm, valuation, jurisdiction_id, raw_payload) "
+        "status, address, address_norm, address_key, valuation, jurisdiction_id, raw_payload) "
         "VALUES ('pm1', 'test_permits', 'BP001', 'BP-2024-001', 'Building', "
-        "'Issued', '600 Congress Ave', '600 CONGRESS AVE', 2500000, 'austin-tx', '{}')"
+        "'Issued', '600 Congress Ave', '600 CONGRESS AVE', '600 CONGRESS AVE', "
+        "2500000, 'austin-tx', '{}')"
     )
 
     result = get_parcel_risk_profile("600 Congress Ave", in_memory_db)
     assert len(result["permits"]) == 1
     assert result["permits"][0]["permit_number"] == "BP-2024-001"
     assert result["permits"][0]["valuation"] == 2500000
+
+
+def test_profile_does_not_match_longer_house_number(in_memory_db):
+    """'100 MAIN ST' must not pick up permits at '1100 MAIN ST'."""
+    in_memory_db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) "
+        "VALUES ('test_permits', 'Test Permits', 'socrata', 'permits')"
+    )
+    for pid, addr in [("pm1", "1100 MAIN ST"), ("pm2", "100 MAIN ST STE 5")]:
+        in_memory_db.execute(
+            "INSERT INTO permits (id, source_id, external_id, permit_number, address, "
+            "address_norm, address_key, unit) VALUES (?, 'test_permits', ?, ?, ?, ?, ?, ?)",
+            (pid, pid, pid, addr, addr, " ".join(addr.split()[:3]),
+             "STE 5" if "STE" in addr else None),
+        )
+
+    result = get_parcel_risk_profile("100 Main Street, Austin TX 78701", in_memory_db)
+    assert [p["permit_number"] for p in result["permits"]] == ["pm2"]
+
+
+def test_profile_finds_polygon_constraint_by_bounding_box(in_memory_db):
+    """Flood zone polygons have no point of their own; their bbox is matched."""
+    in_memory_db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels'), ('fz', 'Flood', 'arcgis', 'environmental_constraints')"
+    )
+    in_memory_db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address, address_norm, address_key, "
+        "latitude, longitude) VALUES ('p1', 'tcad', '1', '600 Congress Ave', '600 CONGRESS AVE', "
+        "'600 CONGRESS AVE', 30.27, -97.74)"
+    )
+    in_memory_db.execute(
+        "INSERT INTO environmental_constraints (id, source_id, external_id, constraint_type, name, "
+        "min_x, min_y, max_x, max_y) VALUES "
+        "('near', 'fz', '1', 'flood_zone', 'Zone AE', -97.76, 30.26, -97.742, 30.268), "
+        "('far', 'fz', '2', 'flood_zone', 'Zone X', -97.9, 30.1, -97.8, 30.2)"
+    )
+
+    result = get_parcel_risk_profile("600 Congress Ave", in_memory_db)
+    assert [r["label"] for r in result["risks"]] == ["Zone AE"]
+
+
+def test_batch_profiles_match_single_profiles(in_memory_db):
+    """get_parcel_risk_profiles returns exactly what one call per query would."""
+    db = in_memory_db
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels'), ('pm', 'Permits', 'socrata', 'permits'), "
+        "('zc', 'Zoning', 'socrata', 'zoning_cases'), ('boa', 'BOA', 'socrata', 'boa_cases'), "
+        "('fz', 'Flood', 'arcgis', 'environmental_constraints'), ('zo', 'Overlays', 'arcgis', 'zoning_overlays')"
+    )
+    load_records(db, "parcels", [_keyed(r) for r in [
+        {"id": "p1", "source_id": "tcad", "external_id": "1", "address": "600 Congress Ave",
+         "base_zoning": "CS-MU", "latitude": 30.2700, "longitude": -97.7400},
+        {"id": "p2", "source_id": "tcad", "external_id": "2", "address": "100 Main St",
+         "latitude": 30.2800, "longitude": -97.7500},
+        {"id": "p3", "source_id": "tcad", "external_id": "3", "address": "Lot 7 Ranch Rd"},
+    ]])
+    load_records(db, "permits", [
+        _keyed({"id": f"pm{i}", "source_id": "pm", "external_id": str(i), "permit_number": f"BP-{i}",
+                "address": "600 Congress Ave" if i % 3 else "9 Oak St",
+                "issued_date": f"20{10 + i % 14}-01-0{1 + i % 7}"})
+        for i in range(40)
+    ])
+    load_records(db, "zoning_cases", [
+        _keyed({"id": "z1", "source_id": "zc", "external_id": "z1", "address": "100 Main St", "status": "Filed"}),
+        _keyed({"id": "z2", "source_id": "zc", "external_id": "z2", "address": "9 Oak St", "status": "Closed"}),
+    ])
+    load_records(db, "boa_cases", [
+        _keyed({"id": "b1", "source_id": "boa", "external_id": "b1", "address": "9 Oak St"}),
+    ])
+    load_records(db, "environmental_constraints", [
+        {"id": "f1", "source_id": "fz", "external_id": "f1", "constraint_type": "flood_zone", "name": "Zone AE",
+         "geometry_wkb": _square(30.2700, -97.7400, 0.001)},
+        {"id": "f2", "source_id": "fz", "external_id": "f2", "constraint_type": "flood_zone", "name": "Zone X",
+         "geometry_wkb": _square(30.2830, -97.7500, 0.001)},
+        {"id": "e1", "source_id": "fz", "external_id": "e1", "constraint_type": "brownfield",
+         "name": "Site at 100 MAIN ST", "severity": "high"},
+        {"id": "e2", "source_id": "fz", "external_id": "e2", "constraint_type": "wetland",
+         "name": "Marsh", "latitude": 30.2810, "longitude": -97.7500},
+    ])
+    load_records(db, "zoning_overlays", [
+        {"id": "o1", "source_id": "zo", "external_id": "o1", "overlay_name": "Downtown",
+         "overlay_type": "district", "geometry_wkb": _square(30.2750, -97.7450, 0.01)},
+    ])
+    backfill_grid_cells(db, ["parcels", "environmental_constraints"])
+    resolve_parcels(db)
+    refresh_links(db)
+
+    queries = [
+        "600 Congress Ave", "p2", "100 MAIN STREET", "9 Oak St", "LOT 7", "123 Fake St", "", "600 Congress Ave",
+    ]
+    expected = [get_parcel_risk_profile(q, db) for q in queries]
+    assert list(get_parcel_risk_profiles(queries, db, batch_size=3)) == expected
+    assert len(expected[0]["permits"]) == 20
+    assert expected[1]["zoning"]["pending_rezoning"] is True
+    assert {r["label"] for r in expected[2]["risks"]} == {"Site at 100 MAIN ST", "Zone X", "Marsh"}
+    assert expected[4]["matched_address"] == "LOT 7 RANCH RD"
@@ -0,0 +1,84 @@
+"""Tests for the persistent profile cache."""
+
+import pytest
+
+from parcl import profile_cache
+from parcl.profile_cache import ProfileCache, cached_profile
+
+
+@pytest.fixture
+def cache_db(in_memory_db, monkeypatch):
+    monkeypatch.setattr(profile_cache, "VERSION_TTL", 0.0)
+    db = in_memory_db
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table, last_run_at) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels', TIMESTAMP '2026-01-01 00:00:00'), "
+        "('aw', 'Water', 'socrata', 'water_usage', TIMESTAMP '2026-01-01 00:00:00')"
+    )
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address, address_norm, address_key, base_zoning) "
+        "VALUES ('p1', 'tcad', '1', '600 Congress Ave', '600 CONGRESS AVE', '600 CONGRESS AVE', 'CS')"
+    )
+    return db
+
+
+def test_hits_follow_the_normalized_address(cache_db, tmp_path):
+    cache = ProfileCache.open(tmp_path)
+    first = cached_profile("600 Congress Ave", cache_db, cache)
+    assert first["zoning"]["base_zone"] == "CS"
+
+    again = cached_profile("600 congress avenue", cache_db, cache)
+    assert again == {**first, "query": "600 congress avenue"}
+    missing = cached_profile("1 Nowhere Rd", cache_db, cache)
+    assert cached_profile("1 NOWHERE ROAD", cache_db, cache)["warnings"] == [
+        "No parcel record found for '1 NOWHERE ROAD'. Using permit/case data only."
+    ]
+    assert missing["warnings"][0].startswith("No parcel record found for '1 Nowhere Rd'")
+    assert cache.stats() == {
+        "entries": 2, "max_entries": 10_000, "hits": 2, "misses": 2, "evictions": 0, "hit_rate": 0.5,
+    }
+    cache.close()
+
+    # Entries and counters persist
+    cache = ProfileCache.open(tmp_path)
+    assert cached_profile("600 CONGRESS AVE", cache_db, cache)["zoning"]["base_zone"] == "CS"
+    assert cache.stats()["hits"] == 3
+
+
+def test_reload_of_a_feeding_source_invalidates(cache_db, tmp_path):
+    cache = ProfileCache.open(tmp_path)
+    cached_profile("600 Congress Ave", cache_db, cache)
+
+    # A source the profile does not read reloads: still a hit
+    cache_db.execute("UPDATE sources SET last_run_at = TIMESTAMP '2026-02-01 00:00:00' WHERE id = 'aw'")
+    cache_db.execute("UPDATE parcels SET base_zoning = 'MF-4'")
+    assert cached_profile("600 Congress Ave", cache_db, cache)["zoning"]["base_zone"] == "CS"
+
+    cache_db.execute("UPDATE sources SET last_run_at = TIMESTAMP '2026-02-01 00:00:00' WHERE id = 'tcad'")
+    assert cached_profile("600 Congress Ave", cache_db, cache)["zoning"]["base_zone"] == "MF-4"
+    assert cache.stats()["entries"] == 1
+
+
+def test_reload_of_valuations_invalidates(cache_db, tmp_path):
+    # Valuations feed the address lookup and the location of parcels without coordinates
+    cache_db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table, last_run_at) VALUES "
+        "('tv', 'TCAD values', 'arcgis', 'property_valuations', TIMESTAMP '2026-01-01 00:00:00')"
+    )
+    cache = ProfileCache.open(tmp_path)
+    cached_profile("600 Congress Ave", cache_db, cache)
+    cache_db.execute("UPDATE sources SET last_run_at = TIMESTAMP '2026-02-01 00:00:00' WHERE id = 'tv'")
+    cached_profile("600 Congress Ave", cache_db, cache)
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (0, 2)
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(cache_db, tmp_path):
+    cache = ProfileCache.open(tmp_path, max_entries=2)
+    for query in ("600 Congress Ave", "1 A St", "600 Congress Ave", "2 B St"):
+        cached_profile(query, cache_db, cache)
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (2, 1)
+    version = cache.version(cache_db)
+    assert cache.get("1 A St", version) is None
+    assert cache.get("600 Congress Ave", version) is not None
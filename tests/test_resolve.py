@@ -0,0 +1,124 @@
+"""Tests for resolving permits, cases and constraints to parcels."""
+
+import pytest
+
+from parcl.address import parse_address
+from parcl.etl.loader import load_records
+from parcl.profile import get_parcel_risk_profile
+from parcl.resolve import (
+    NEAREST_MAX_SCORE,
+    SHARED_KEY_SCORE,
+    requeue_for_parcels,
+    resolve_parcels,
+)
+
+
+def _keyed(record):
+    """Add the address_key the transformer would set."""
+    return {**record, "address_key": parse_address(record["address"]).key if record.get("address") else None}
+
+
+@pytest.fixture
+def resolve_db(in_memory_db):
+    db = in_memory_db
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES "
+        "('tcad', 'TCAD', 'csv', 'parcels'), ('pm', 'Permits', 'socrata', 'permits'), "
+        "('zc', 'Zoning', 'socrata', 'zoning_cases')"
+    )
+    load_records(db, "parcels", [_keyed(r) for r in [
+        {"id": "p1", "source_id": "tcad", "external_id": "1", "address": "600 Congress Ave",
+         "latitude": 30.2700, "longitude": -97.7400},
+        # Two condo parcels share one address
+        {"id": "p2", "source_id": "tcad", "external_id": "2", "address": "100 Main St Unit 1",
+         "latitude": 30.2800, "longitude": -97.7500},
+        {"id": "p3", "source_id": "tcad", "external_id": "3", "address": "100 Main St Unit 2",
+         "latitude": 30.2800, "longitude": -97.7500},
+    ]])
+    return db
+
+
+def _permit(external_id, address=None, lat=None, lon=None, **extra):
+    return _keyed({"id": external_id, "source_id": "pm", "external_id": external_id, "address": address,
+                   "latitude": lat, "longitude": lon, **extra})
+
+
+def _resolved(db, table="permits"):
+    rows = db.fetchall(
+        f"SELECT id, parcel_id, parcel_match_method, parcel_match_score FROM {table} ORDER BY id"
+    )
+    return {r[0]: (r[1], r[2], r[3]) for r in rows}
+
+
+def test_resolve_by_address_key_then_nearest(resolve_db):
+    db = resolve_db
+    load_records(db, "permits", [
+        _permit("a", "600 CONGRESS AVENUE"),
+        _permit("b", "100 Main St"),
+        # No address, about 22 m north of p1
+        _permit("c", lat=30.2702, lon=-97.7400),
+        # Too far from any parcel
+        _permit("d", "9 Nowhere Rd", lat=30.3, lon=-97.6),
+    ])
+    load_records(db, "zoning_cases", [
+        _keyed({"id": "z1", "source_id": "zc", "external_id": "z1", "address": "600 Congress Ave"}),
+    ])
+
+    result = resolve_parcels(db, batch_size=2)
+    assert result["rows"] == {
+        "permits": {"address_key": 2, "nearest": 1, "none": 1},
+        "zoning_cases": {"address_key": 1},
+    }
+    assert result["parcel_ids"] == {"p1", "p2"}
+    resolved = _resolved(db)
+    assert resolved["a"] == ("p1", "address_key", 1.0)
+    assert resolved["b"] == ("p2", "address_key", SHARED_KEY_SCORE)
+    assert resolved["c"][:2] == ("p1", "nearest")
+    assert 0.6 < resolved["c"][2] < NEAREST_MAX_SCORE
+    assert resolved["d"] == (None, "none", 0.0)
+    assert _resolved(db, "zoning_cases")["z1"][0] == "p1"
+
+    # The profile reads rows by parcel, so the nearest match shows up too
+    permits = get_parcel_risk_profile("600 Congress Ave", db)["permits"]
+    assert len(permits) == 2
+
+
+def test_only_new_or_changed_rows_are_resolved_again(resolve_db):
+    db = resolve_db
+    load_records(db, "permits", [_permit("a", "600 Congress Ave", status="Issued")])
+    resolve_parcels(db)
+    assert resolve_parcels(db) == {"rows": {}, "parcel_ids": set()}
+
+    # Unchanged re-crawl: nothing queued
+    load_records(db, "permits", [_permit("a", "600 Congress Ave", status="Issued")])
+    assert resolve_parcels(db)["rows"] == {}
+
+    # A changed row is queued again and follows its new address
+    load_records(db, "permits", [_permit("a", "100 Main St", status="Issued")])
+    result = resolve_parcels(db)
+    assert result == {"rows": {"permits": {"address_key": 1}}, "parcel_ids": {"p1", "p2"}}
+    assert _resolved(db)["a"][0] == "p2"
+
+
+def test_requeue_after_parcel_load(resolve_db):
+    db = resolve_db
+    load_records(db, "permits", [
+        _permit("a", "7 Elm St"),
+        _permit("b", "600 Congress Ave"),
+        _permit("c", lat=30.2900, lon=-97.7600),
+    ])
+    resolve_parcels(db)
+    assert [v[1] for v in _resolved(db).values()] == ["none", "address_key", "none"]
+
+    load_records(db, "parcels", [_keyed(
+        {"id": "p4", "source_id": "tcad", "external_id": "4", "address": "7 Elm St",
+         "latitude": 30.2901, "longitude": -97.7600},
+    )])
+    # Rows at p4's address and near it; b is resolved by key elsewhere and stays
+    assert requeue_for_parcels(db, {"p4"}) == 2
+    assert resolve_parcels(db)["parcel_ids"] == {"p4"}
+    assert {k: v[:2] for k, v in _resolved(db).items()} == {
+        "a": ("p4", "address_key"), "b": ("p1", "address_key"), "c": ("p4", "nearest"),
+    }
+
+    assert requeue_for_parcels(db) == 3
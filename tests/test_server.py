@@ -0,0 +1,98 @@
+"""Tests for the profile HTTP server."""
+
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from parcl import locator
+from parcl.db import Database
+from parcl.profile import get_parcel_risk_profile
+from parcl.profile_cache import ProfileCache
+from parcl.server import ProfileServer
+
+
+@pytest.fixture
+def server(in_memory_db):
+    db = in_memory_db
+    db.execute(
+        "INSERT INTO sources (id, name, source_type, target_table) VALUES ('tcad', 'TCAD', 'csv', 'parcels')"
+    )
+    db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address, address_norm, address_key, base_zoning) "
+        "VALUES ('p1', 'tcad', '1', '600 Congress Ave', '600 CONGRESS AVE', '600 CONGRESS AVE', 'CS')"
+    )
+    databases = [db] + [Database(db.conn.cursor(), "duckdb") for _ in range(2)]
+    srv = ProfileServer(("127.0.0.1", 0), databases, ProfileCache(None))
+    srv.warm()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _call(srv, path, body=None):
+    url = f"http://127.0.0.1:{srv.server_address[1]}{path}"
+    data = json.dumps(body).encode() if body is not None else None
+    try:
+        with urlopen(Request(url, data=data, headers={"Content-Type": "application/json"})) as resp:
+            return resp.status, json.loads(resp.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_profile_and_batch_endpoints(server, in_memory_db):
+    status, profile = _call(server, "/profile?q=600+Congress+Ave")
+    assert status == 200
+    assert profile == json.loads(json.dumps(get_parcel_risk_profile("600 Congress Ave", in_memory_db)))
+
+    # Concurrent requests share the connection pool
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(_call(server, "/profile?q=p1"))) for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [r[1]["zoning"]["base_zone"] for r in results] == ["CS"] * 8
+
+    status, body = _call(server, "/profiles", {"queries": ["p1", "1 Nowhere Rd", "600 CONGRESS AVENUE"]})
+    assert status == 200
+    assert [p["query"] for p in body["profiles"]] == ["p1", "1 Nowhere Rd", "600 CONGRESS AVENUE"]
+    assert body["profiles"][2]["matched_address"] == "600 CONGRESS AVE"
+
+    stats = _call(server, "/stats")[1]
+    assert stats["endpoints"]["/profile"]["requests"] == 9
+    assert stats["endpoints"]["/profile"]["p50_ms"] <= stats["endpoints"]["/profile"]["p99_ms"]
+    assert stats["cache"]["hits"] + stats["cache"]["misses"] == 12
+    assert stats["cache"]["hits"] >= 2
+
+
+def test_bad_requests(server):
+    assert _call(server, "/profile")[0] == 400
+    assert _call(server, "/profiles", {"queries": "p1"})[0] == 400
+    assert _call(server, "/nope")[0] == 404
+    assert _call(server, "/stats")[1]["endpoints"]["/profile"]["errors"] == 1
+
+
+def test_profile_at_point_endpoints(server, in_memory_db):
+    in_memory_db.execute(
+        "INSERT INTO parcels (id, source_id, external_id, address_norm, latitude, longitude) "
+        "VALUES ('p2', 'tcad', '2', '700 LAVACA ST', 30.270, -97.740)"
+    )
+    locator._cache.clear()
+    status, profile = _call(server, "/profile?at=30.2701,-97.7401")
+    assert status == 200
+    assert profile["matched_address"] == "700 LAVACA ST"
+    assert profile["location"]["method"] == "nearest"
+
+    status, body = _call(server, "/profiles", {"points": [[30.2701, -97.7401], [31.0, -98.0]]})
+    assert status == 200
+    assert [p["location"]["method"] for p in body["profiles"]] == ["nearest", None]
+
+    assert _call(server, "/profile?at=north")[0] == 400
+    assert _call(server, "/profiles", {"points": [[30.27]]})[0] == 400
@@ -0,0 +1,72 @@
+"""Tests for the bounded page queues used by the ETL pipeline."""
+
+import threading
+import time
+
+from parcl.etl.stages import PageQueue, estimate_page_bytes
+
+
+def _put_in_thread(queue, item, size):
+    result = {}
+    t = threading.Thread(target=lambda: result.setdefault("ok", queue.put(item, size)))
+    t.start()
+    return t, result
+
+
+def test_queue_blocks_at_page_limit():
+    q = PageQueue(max_pages=2, max_bytes=1_000_000)
+    assert q.put("a", 1)
+    assert q.put("b", 1)
+
+    t, result = _put_in_thread(q, "c", 1)
+    time.sleep(0.05)
+    assert t.is_alive()  # blocked: queue full
+
+    assert q.get() == "a"
+    t.join(timeout=1)
+    assert result["ok"] is True
+    assert q.peak_pages == 2
+
+
+def test_queue_blocks_at_byte_limit_but_admits_oversized_page():
+    q = PageQueue(max_pages=10, max_bytes=100)
+    assert q.put("huge", 500)  # empty queue: admitted anyway
+
+    t, _ = _put_in_thread(q, "small", 10)
+    time.sleep(0.05)
+    assert t.is_alive()
+
+    assert q.get() == "huge"
+    t.join(timeout=1)
+    assert q.get() == "small"
+
+
+def test_close_drains_then_reports_error():
+    q = PageQueue(max_pages=4, max_bytes=100)
+    q.put("a", 1)
+    err = RuntimeError("boom")
+    q.close(err)
+
+    assert q.put("late", 1) is False
+    assert q.get() == "a"
+    assert q.get() is None
+    assert q.error is err
+
+
+def test_abort_unblocks_producer():
+    q = PageQueue(max_pages=1, max_bytes=100)
+    q.put("a", 1)
+    t, result = _put_in_thread(q, "b", 1)
+    time.sleep(0.05)
+
+    q.abort()
+    t.join(timeout=1)
+    assert result["ok"] is False
+    assert q.get() is None
+
+
+def test_estimate_page_bytes():
+    page = [{"address": "x" * 100, "geometry_wkb": b"\0" * 900, "valuation": 1.0}] * 50
+    estimate = estimate_page_bytes(page)
+    assert 50_000 <= estimate <= 53_000
+    assert estimate_page_bytes([]) == 0